@@ -0,0 +1,46 @@
+"""
+Async API views
+APIView whose handlers are coroutines, for endpoints that await several queries
+
+DRF dispatches handlers synchronously. AsyncAPIView keeps APIView's request
+wrapping, authentication, permissions, throttling, exception handling and
+rendering, and only changes dispatch: the sync checks run together in one
+sync_to_async call, then the handler is awaited on the event loop, where it
+can run independent queries side by side with asyncio.gather.
+
+Under WSGI Django runs these views through async_to_sync, so they work
+there too, but the point is an ASGI deployment.
+"""
+import asyncio
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """APIView for ``async def get(...)`` style handlers"""
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Authentication may load the user; permissions may read it
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            # OPTIONS and method-not-allowed stay APIView's sync handlers
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
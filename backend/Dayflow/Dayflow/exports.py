@@ -0,0 +1,140 @@
+"""
+Streaming CSV/NDJSON exports for HR list endpoints
+
+Export views stream rows straight from a values_list() iterator, so memory
+stays flat however many rows match, and the header line goes out before
+the query has even run. No model instances or serializer dicts are built.
+
+Query parameters:
+    export_format - 'csv' (default) or 'ndjson'
+    gzip          - 'true' to download a gzip-compressed file (.csv.gz / .ndjson.gz)
+
+``format`` is left alone because DRF reserves it for renderer selection.
+
+Under ASGI the chunks are handed over through an async iterator, one
+sync_to_async call per chunk, since Django would otherwise read a sync
+iterator to the end before sending anything.
+
+CSV text cells starting with =, +, -, @, tab or carriage return are
+prefixed with a single quote
+so spreadsheet apps show free text (notes, reasons, comments) instead of
+evaluating it as a formula.
+"""
+import csv
+import io
+import zlib
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+
+DEFAULT_EXPORT_CHUNK_SIZE = 2000
+
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+
+def csv_cell(value):
+    """Quote text that a spreadsheet would run as a formula"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_chunks(headers, rows, rows_per_chunk):
+    """Yield CSV text, the header line first and then ``rows_per_chunk`` rows at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    yield buffer.getvalue()
+
+    buffer.seek(0)
+    buffer.truncate()
+    for count, row in enumerate(rows, 1):
+        writer.writerow([csv_cell(value) for value in row])
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def ndjson_chunks(headers, rows, rows_per_chunk):
+    """Yield one JSON object per line, ``rows_per_chunk`` lines at a time"""
+    encoder = DjangoJSONEncoder()
+    lines = []
+    for row in rows:
+        lines.append(encoder.encode(dict(zip(headers, row))))
+        if len(lines) >= rows_per_chunk:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def gzip_chunks(chunks):
+    """Compress text chunks into one gzip stream as they are produced"""
+    # wbits=31 writes the gzip header and trailer
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def async_chunks(chunks):
+    """Yield a sync iterator's chunks from the event loop, one thread hop each"""
+    # Thread-sensitive, so the database cursor stays on one thread
+    next_chunk = sync_to_async(next)
+    chunks = iter(chunks)
+    done = object()
+    while True:
+        chunk = await next_chunk(chunks, done)
+        if chunk is done:
+            return
+        yield chunk
+
+
+def export_response(request, queryset, columns, filename):
+    """
+    Stream ``queryset`` as a file download
+
+    Args:
+        request: DRF request; export_format and gzip are read from its query params
+        queryset: Filtered and ordered queryset to export
+        columns: Sequence of (header, field lookup) pairs, e.g. ('employee_id', 'employee__employee_id')
+        filename: Download name without extension
+
+    Raises ValueError for an unsupported export_format.
+    """
+    export_format = request.query_params.get('export_format', 'csv').lower()
+    if export_format not in CONTENT_TYPES:
+        raise ValueError(f"Unsupported export_format. Must be one of {sorted(CONTENT_TYPES)}.")
+    compress = request.query_params.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+    chunk_size = getattr(settings, 'EXPORT_CHUNK_SIZE', DEFAULT_EXPORT_CHUNK_SIZE)
+    headers = [header for header, _ in columns]
+    rows = queryset.values_list(*[field for _, field in columns]).iterator(chunk_size=chunk_size)
+    encode = csv_chunks if export_format == 'csv' else ndjson_chunks
+    chunks = encode(headers, rows, chunk_size)
+
+    filename = f'{filename}.{export_format}'
+    content_type = CONTENT_TYPES[export_format]
+    if compress:
+        chunks = gzip_chunks(chunks)
+        content_type = 'application/gzip'
+        filename += '.gz'
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        chunks = async_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # Keep proxies from buffering the whole body before sending it on
+    response['X-Accel-Buffering'] = 'no'
+    return response
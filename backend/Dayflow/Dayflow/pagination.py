@@ -0,0 +1,209 @@
+"""
+Keyset (cursor) pagination for list endpoints
+
+List views page through their querysets by the model's natural ordering
+with an ``id`` tie-breaker, so every page is a bounded index range scan
+instead of an OFFSET over the whole table. The total COUNT(*) is only run
+when the client asks for it.
+
+Responses carry ``page_count`` (rows in this page) and ``count``, the total
+number of matching rows. ``count`` is known for free when the whole result
+fits in the first page; otherwise it is null unless exact_count is sent.
+
+Query parameters:
+    cursor      - opaque cursor returned as ``next_cursor`` by the previous page
+    page_size   - rows per page (capped at LIST_MAX_PAGE_SIZE)
+    exact_count - 'true' to receive the total row count in X-Total-Count
+
+Clients may also send an ``X-Exact-Count: true`` request header instead of
+the ``exact_count`` query parameter.
+"""
+import base64
+import json
+from datetime import date, datetime
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework import status
+
+
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_MAX_PAGE_SIZE = 1000
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on an ordering tuple, e.g. ('-date', '-id')
+
+    The last ordering field should be unique (normally ``id``) so that
+    rows sharing the same date/timestamp are never skipped or repeated.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    exact_count_query_param = 'exact_count'
+    exact_count_header = 'HTTP_X_EXACT_COUNT'
+    total_count_response_header = 'X-Total-Count'
+
+    def __init__(self, ordering=('-id',), page_size=None, max_page_size=None):
+        ordering = tuple(ordering)
+        if ordering[-1].lstrip('-') not in ('id', 'pk'):
+            # Stable tie-breaking on id
+            ordering += ('-id',) if ordering[0].startswith('-') else ('id',)
+        self.ordering = ordering
+        self.page_size = page_size or getattr(settings, 'LIST_PAGE_SIZE', DEFAULT_PAGE_SIZE)
+        self.max_page_size = max_page_size or getattr(settings, 'LIST_MAX_PAGE_SIZE', DEFAULT_MAX_PAGE_SIZE)
+        self.next_cursor = None
+        self.total_count = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return one page of ``queryset`` as a list"""
+        page_size = self.get_page_size(request)
+
+        if self.wants_exact_count(request):
+            self.total_count = queryset.count()
+
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.cursor_filter(self.decode_cursor(cursor, queryset.model)))
+
+        # Fetch one extra row to know whether there is a next page
+        return self._page(list(queryset[:page_size + 1]), page_size, first_page=not cursor)
+
+    def paginate_union(self, querysets, request):
+        """
+        Return one page of the UNION ALL of several ``values()`` querysets
+
+        Every part must select the ordering fields under the same names and
+        in the same column order. The cursor predicate is applied to each
+        part before the union, so the page is still a single query.
+        """
+        page_size = self.get_page_size(request)
+
+        if self.wants_exact_count(request):
+            self.total_count = sum(queryset.count() for queryset in querysets)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            condition = self.cursor_filter(self.decode_cursor(cursor, querysets[0].model))
+            querysets = [queryset.filter(condition) for queryset in querysets]
+
+        # Compound statements can't order their parts
+        first, *rest = [queryset.order_by() for queryset in querysets]
+        combined = first.union(*rest, all=True).order_by(*self.ordering)
+        return self._page(list(combined[:page_size + 1]), page_size, first_page=not cursor)
+
+    def _page(self, rows, page_size, first_page):
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_cursor = self.encode_cursor(rows[-1])
+        else:
+            self.next_cursor = None
+            if first_page and self.total_count is None:
+                # The whole result fits in this page
+                self.total_count = len(rows)
+        return rows
+
+    def get_paginated_response(self, data, results_key='results', extra=None, status_code=status.HTTP_200_OK):
+        """Build the list response, keeping the endpoint's own results key"""
+        body = {
+            'count': self.total_count,
+            'page_count': len(data),
+            'next_cursor': self.next_cursor,
+        }
+        if extra:
+            body.update(extra)
+        body[results_key] = data
+
+        response = Response(body, status=status_code)
+        if self.total_count is not None:
+            response[self.total_count_response_header] = str(self.total_count)
+        return response
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        if page_size < 1:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def wants_exact_count(self, request):
+        value = request.query_params.get(self.exact_count_query_param) or \
+            request.META.get(self.exact_count_header, '')
+        return str(value).lower() in ('1', 'true', 'yes')
+
+    # Cursor encoding
+
+    def encode_cursor(self, obj):
+        values = [self._serialize(self._get_value(obj, field.lstrip('-'))) for field in self.ordering]
+        raw = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor, model=None):
+        """
+        Ordering values from a cursor, converted with ``model``'s fields
+
+        Raises:
+            NotFound: for anything that is not a cursor this paginator issued
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        except (TypeError, ValueError):
+            raise NotFound('Invalid cursor')
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound('Invalid cursor')
+
+        cleaned = []
+        for field, value in zip(self.ordering, values):
+            if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+                raise NotFound('Invalid cursor')
+            try:
+                model_field = model._meta.get_field(field.lstrip('-')) if model else None
+            except FieldDoesNotExist:
+                # An annotation such as the feed's source; compared as given
+                model_field = None
+            if model_field is not None:
+                try:
+                    value = model_field.to_python(value)
+                except (TypeError, ValueError, ValidationError):
+                    raise NotFound('Invalid cursor')
+            cleaned.append(value)
+        return cleaned
+
+    def cursor_filter(self, values):
+        """
+        Build the keyset predicate for rows after ``values``
+
+        For ordering (a DESC, id DESC) this is:
+            a < v_a OR (a = v_a AND id < v_id)
+        """
+        condition = Q()
+        equal_so_far = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal_so_far & Q(**{f'{name}__{lookup}': value})
+            equal_so_far &= Q(**{name: value})
+        return condition
+
+    @staticmethod
+    def _get_value(obj, field):
+        if isinstance(obj, dict):
+            return obj[field]
+        for part in field.split('__'):
+            obj = getattr(obj, 'pk' if part == 'pk' else part)
+        return obj
+
+    @staticmethod
+    def _serialize(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return value
@@ -0,0 +1,171 @@
+"""
+Declarative prefetch plans for list serializers
+Derives select_related/prefetch_related lookups from a serializer's fields
+
+A serializer that mixes in PrefetchPlanMixin reads its plan off its own
+fields: a dotted source such as ``employee.username`` becomes
+``select_related('employee')``, a nested serializer over a forward relation
+is joined in along with its own plan, and a nested ``many=True`` serializer
+becomes a ``Prefetch`` whose queryset follows the nested serializer's plan.
+Relations read in SerializerMethodFields can be declared on Meta:
+
+    class Meta:
+        select_related = ['employee__profile']
+        prefetch_related = ['employee__groups']
+
+Serializing with ``many=True`` applies the plan automatically, whether the
+view hands over a queryset or a page of instances from KeysetPagination,
+so list views cost the same number of queries however many rows they
+return. Relations a view already select_related()s are not fetched again.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch, QuerySet, prefetch_related_objects
+from rest_framework import serializers
+
+
+class PrefetchPlan:
+    """Related lookups one serializer needs, ready to apply to a queryset or a list"""
+
+    def __init__(self, select_related=(), prefetch_related=()):
+        self.select_related = list(dict.fromkeys(select_related))
+        self.prefetch_related = list(prefetch_related)
+
+    def __bool__(self):
+        return bool(self.select_related or self.prefetch_related)
+
+    def __repr__(self):
+        prefetches = [getattr(p, 'prefetch_to', p) for p in self.prefetch_related]
+        return f'<PrefetchPlan select_related={self.select_related} prefetch_related={prefetches}>'
+
+    def apply(self, queryset):
+        """Add the plan to an unevaluated queryset"""
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset
+
+    def prefetch(self, instances):
+        """Fetch the plan's relations for already loaded instances, one query per relation"""
+        if instances and self:
+            # Joins can't be added after the fact; each becomes an IN query,
+            # and relations already cached on the instances are skipped
+            prefetch_related_objects(instances, *self.select_related, *self.prefetch_related)
+        return instances
+
+    def nested(self, prefix):
+        """This plan's lookups relative to the model ``prefix`` leads from"""
+        prefetches = []
+        for lookup in self.prefetch_related:
+            if isinstance(lookup, Prefetch):
+                lookup = Prefetch(f'{prefix}__{lookup.prefetch_through}', queryset=lookup.queryset)
+            else:
+                lookup = f'{prefix}__{lookup}'
+            prefetches.append(lookup)
+        return PrefetchPlan([f'{prefix}__{lookup}' for lookup in self.select_related], prefetches)
+
+
+def relation_path(model, attrs):
+    """
+    Follow ``attrs`` through model relations
+
+    Returns the ``__`` lookup for the longest prefix that is a chain of
+    relations, whether every step in it is single-valued (so it can be
+    joined), and the model it ends on.
+    """
+    parts = []
+    single_valued = True
+    for attr in attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation or field.related_model is None:
+            break
+        parts.append(attr)
+        if field.many_to_many or field.one_to_many:
+            single_valued = False
+        model = field.related_model
+    return '__'.join(parts), single_valued, model
+
+
+def build_prefetch_plan(serializer_class):
+    """Derive the plan for a ModelSerializer class from its readable fields"""
+    meta = getattr(serializer_class, 'Meta', None)
+    model = getattr(meta, 'model', None)
+    select = list(getattr(meta, 'select_related', ()))
+    prefetch = list(getattr(meta, 'prefetch_related', ()))
+    if model is None:
+        return PrefetchPlan(select, prefetch)
+
+    for field in serializer_class().fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if isinstance(nested, serializers.ModelSerializer):
+            lookup, single_valued, _ = relation_path(model, field.source_attrs)
+            if not lookup:
+                continue
+            child_plan = get_prefetch_plan(type(nested))
+            if single_valued and nested is field:
+                select.append(lookup)
+                child_plan = child_plan.nested(lookup)
+                select.extend(child_plan.select_related)
+                prefetch.extend(child_plan.prefetch_related)
+            else:
+                child_model = nested.Meta.model
+                prefetch.append(Prefetch(lookup, queryset=child_plan.apply(child_model._default_manager.all())))
+        elif len(field.source_attrs) > 1:
+            # 'employee.username' needs the employee row, not the username
+            lookup, single_valued, _ = relation_path(model, field.source_attrs[:-1])
+            if lookup:
+                (select if single_valued else prefetch).append(lookup)
+    return PrefetchPlan(select, prefetch)
+
+
+_plans = {}
+
+
+def get_prefetch_plan(serializer_class):
+    """Return the cached plan for ``serializer_class``"""
+    plan = _plans.get(serializer_class)
+    if plan is None:
+        plan = _plans[serializer_class] = build_prefetch_plan(serializer_class)
+    return plan
+
+
+class PrefetchPlanListSerializer(serializers.ListSerializer):
+    """ListSerializer that loads the child serializer's relations before serializing"""
+
+    def to_representation(self, data):
+        plan = get_prefetch_plan(type(self.child))
+        if isinstance(data, QuerySet) and data._result_cache is None:
+            data = plan.apply(data)
+        elif isinstance(data, (list, tuple)):
+            plan.prefetch(list(data))
+        # Related managers (nested serializers) were prefetched by the parent
+        return super().to_representation(data)
+
+
+class PrefetchPlanMixin:
+    """
+    Mixin for ModelSerializers whose list output reads related rows
+
+    ``many=True`` instances use PrefetchPlanListSerializer unless Meta names
+    another list_serializer_class. ``optimize_queryset()`` applies the same
+    plan to a queryset up front, e.g. for a view that evaluates it itself.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        meta = getattr(cls, 'Meta', None)
+        if meta is not None and not hasattr(meta, 'list_serializer_class'):
+            meta.list_serializer_class = PrefetchPlanListSerializer
+
+    @classmethod
+    def get_prefetch_plan(cls):
+        return get_prefetch_plan(cls)
+
+    @classmethod
+    def optimize_queryset(cls, queryset):
+        return get_prefetch_plan(cls).apply(queryset)
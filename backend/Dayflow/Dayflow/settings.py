@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -52,9 +53,11 @@ INSTALLED_APPS = [
     'payroll',
     'dashboard',
     'notifications',
+    'audit',
 ]
 
 MIDDLEWARE = [
+    'middleware.query_instrumentation.QueryInstrumentationMiddleware',  # Query counts + Server-Timing (outermost)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS - must be before CommonMiddleware
@@ -102,6 +105,31 @@ DATABASES = {
     }
 }
 
+# Applies test-only settings overrides (see Dayflow/test_runner.py)
+TEST_RUNNER = 'Dayflow.test_runner.DayflowTestRunner'
+
+
+# Cache
+# Local memory by default; set REDIS_URL (e.g. redis://127.0.0.1:6379/1) to share
+# the cache between workers
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'dayflow',
+        }
+    }
+
+DASHBOARD_CACHE_TIMEOUT = 300  # Seconds a cached employee dashboard stays valid
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -163,10 +191,13 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
+# Log in with a username, email or employee ID in one indexed query
+AUTHENTICATION_BACKENDS = ['users.backends.IdentifierBackend']
+
 # DRF Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -175,6 +206,94 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
 }
 
+# Keyset pagination for list endpoints (see Dayflow/pagination.py)
+LIST_PAGE_SIZE = 100  # Rows per page when the client doesn't pass page_size
+LIST_MAX_PAGE_SIZE = 1000  # Upper bound for the page_size query parameter
+
+# Streaming CSV/NDJSON exports (see Dayflow/exports.py)
+EXPORT_CHUNK_SIZE = 2000  # Rows fetched per database round trip and written per streamed chunk
+
+# Punch log ingestion (see attendance/ingestion.py)
+ATTENDANCE_INGEST_BATCH_SIZE = 2000  # Employee-days merged and upserted per transaction
+ATTENDANCE_INGEST_MAX_REJECTIONS = 100  # Rejected lines listed per file in the report; all are counted
+
+# Batch recompute of attendance metrics (see attendance/recompute.py)
+ATTENDANCE_RECOMPUTE_CHUNK_SIZE = 20000  # Rows loaded into arrays and written back per chunk
+
+# Per-process work policy cache (see attendance/policies.py)
+ATTENDANCE_POLICY_CACHE_TTL = 300  # Seconds before cached rules and timelines are reloaded
+ATTENDANCE_POLICY_CACHE_MAX_ENTRIES = 50000  # Employee timelines kept before the cache is cleared
+
+# Per-request query instrumentation (see middleware/query_instrumentation.py)
+# Requests slower than SLOW_REQUEST_MS or issuing more than
+# SLOW_REQUEST_QUERY_COUNT queries log their full query list
+QUERY_INSTRUMENTATION_ENABLED = True
+SLOW_REQUEST_MS = 500
+SLOW_REQUEST_QUERY_COUNT = 100
+SLOW_REQUEST_LOG_PARAMS = False  # Also log query parameters (honoured only with DEBUG; they hold personal data)
+
+# Audit pipeline (see audit/pipeline.py)
+# Events are queued and written in batches by a background thread; set
+# AUDIT_ASYNC=false in the environment to write them inline. The test runner
+# (Dayflow/test_runner.py) always writes inline.
+AUDIT_ASYNC = os.environ.get('AUDIT_ASYNC', 'true').lower() not in ('0', 'false', 'no')
+AUDIT_QUEUE_SIZE = 10000  # Events buffered before writes fall back to the request thread
+AUDIT_BATCH_SIZE = 200  # Events per bulk insert
+AUDIT_FLUSH_INTERVAL = 1.0  # Seconds the writer waits for more events before flushing
+
+# Notification preferences (see notifications/preferences.py)
+NOTIFICATION_PREFERENCE_CACHE_TTL = 300  # Seconds before a cached preference row is reloaded
+
+# Notification retention (see notifications/retention.py)
+NOTIFICATION_RETENTION_DAYS = 90  # Read notifications older than this move to the archive
+NOTIFICATION_RETENTION_BY_TYPE = {  # Per notification_type overrides, in days
+    'GENERAL': 30,
+    'PAYROLL_GENERATED': 365,
+    'PAYROLL_PAID': 365,
+}
+NOTIFICATION_RETENTION_BY_PRIORITY = {  # Per priority overrides; the longer of type and priority wins
+    'URGENT': 365,
+}
+NOTIFICATION_ARCHIVE_BATCH_SIZE = 1000  # Notifications moved per transaction by archive_notifications
+
+# Live notification stream (see notifications/events.py and notifications/stream.py).
+# Events go through an in-process log by default; with REDIS_URL they use a
+# Redis stream so that every worker sees every event
+NOTIFICATION_EVENTS = {
+    'BACKEND': (
+        'notifications.events.RedisEventBackend' if os.environ.get('REDIS_URL')
+        else 'notifications.events.LocalEventBackend'
+    ),
+    'LOCATION': os.environ.get('REDIS_URL', ''),
+    'BUFFER_SIZE': 1000,  # Events kept for clients resuming with Last-Event-ID
+}
+NOTIFICATION_STREAM_MAX_AGE = 300  # Seconds an ASGI stream stays open before the client reconnects
+NOTIFICATION_STREAM_HEARTBEAT = 15  # Seconds between keep-alives on an open ASGI stream
+NOTIFICATION_STREAM_RETRY_MS = 3000  # Reconnect delay suggested to EventSource clients; the WSGI polling interval
+
+# Verified access tokens kept in memory until they expire (see users/authentication.py)
+JWT_VERIFIED_TOKEN_CACHE_SIZE = 10000
+
+# Token revocation by version (see users/token_versions.py). Each process
+# re-reads a user's version from the shared cache at most this often, so a
+# role change or deactivation takes effect within that many seconds. With the
+# default local-memory cache only the process that made the change sees it
+# at once; set REDIS_URL to share versions between workers.
+TOKEN_VERSION_CHECK_INTERVAL = 5
+TOKEN_VERSION_CACHE_TIMEOUT = 3600
+
+# Refresh token blacklist (see users/token_blacklist.py)
+# Each process keeps a Bloom filter of blacklisted jtis so refreshes with a
+# live token skip the blacklist join. Filters are rebuilt in the background;
+# set TOKEN_BLACKLIST_FILTER_ASYNC=false in the environment to rebuild inline
+# (the test runner always does, so the filter sees each test's rows). The
+# filter is only trusted when workers share a cache for recent blacklist markers.
+TOKEN_BLACKLIST_SHARED_CACHE = bool(os.environ.get('REDIS_URL'))
+TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS = 300
+TOKEN_BLACKLIST_FILTER_ERROR_RATE = 0.01  # False positives fall back to the database
+TOKEN_BLACKLIST_FILTER_ASYNC = os.environ.get('TOKEN_BLACKLIST_FILTER_ASYNC', 'true').lower() not in ('0', 'false', 'no')
+TOKEN_COMPACTION_CHUNK_SIZE = 5000  # Expired tokens deleted per chunk by compact_token_blacklist
+
 # Simple JWT Configuration
 SIMPLE_JWT = {
     # Token Lifetimes
@@ -0,0 +1,26 @@
+"""
+Test runner
+Runs background writers inline so their rows land inside each test's
+transaction, whatever the environment sets for production.
+"""
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+TEST_SETTINGS = {
+    'AUDIT_ASYNC': False,
+    'TOKEN_BLACKLIST_FILTER_ASYNC': False,
+}
+
+
+class DayflowTestRunner(DiscoverRunner):
+    """DiscoverRunner with TEST_SETTINGS applied for the whole run"""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._test_settings = override_settings(**TEST_SETTINGS)
+        self._test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._test_settings.disable()
+        super().teardown_test_environment(**kwargs)
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Attendance
+from django.db import transaction
+from .models import Attendance, Shift, WorkPolicy
+from .rollups import apply_rollup_change, apply_rollup_changes, rollup_state
 
 
 @admin.register(Attendance)
@@ -14,4 +16,43 @@ class AttendanceAdmin(admin.ModelAdmin):
         ('Employee', {'fields': ('employee',)}),
         ('Attendance', {'fields': ('date', 'check_in_time', 'check_out_time', 'status')}),
     )
-    ordering = ['-date']
\ No newline at end of file
+    ordering = ['-date']
+    
+    # Admin writes keep the daily rollups in step like the API views do
+    
+    def save_model(self, request, obj, form, change):
+        before = rollup_state(Attendance.objects.get(pk=obj.pk)) if change else None
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            apply_rollup_change(before, rollup_state(obj))
+    
+    def delete_model(self, request, obj):
+        before = rollup_state(obj)
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            apply_rollup_change(before, None)
+    
+    def delete_queryset(self, request, queryset):
+        changes = [(rollup_state(attendance), None) for attendance in queryset]
+        with transaction.atomic():
+            super().delete_queryset(request, queryset)
+            apply_rollup_changes(changes)
+
+
+@admin.register(Shift)
+class ShiftAdmin(admin.ModelAdmin):
+    """Admin panel for Shift model"""
+    list_display = ['name', 'start_time', 'end_time', 'workday_hours', 'late_grace_minutes', 'early_grace_minutes']
+    search_fields = ['name']
+    ordering = ['name']
+
+
+@admin.register(WorkPolicy)
+class WorkPolicyAdmin(admin.ModelAdmin):
+    """Admin panel for WorkPolicy model"""
+    list_display = ['shift', 'employee', 'department', 'effective_from', 'effective_to']
+    list_filter = ['shift', 'department']
+    search_fields = ['employee__username', 'employee__employee_id', 'department']
+    raw_id_fields = ['employee']
+    date_hierarchy = 'effective_from'
+    ordering = ['-effective_from']
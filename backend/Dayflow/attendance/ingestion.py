@@ -0,0 +1,333 @@
+"""
+Punch log ingestion
+Turns door controller / biometric punch exports into Attendance rows in bulk
+
+A punch file has one punch per line:
+
+    employee_id,timestamp[,direction]
+    employee_id,date,time[,direction]
+
+Fields may be separated by commas, semicolons or tabs (taken from the
+first line), an optional header line is skipped, and ``direction`` is IN
+or OUT (also I/O, 0/1, CHECKIN/CHECKOUT). Punches without a direction
+count as both.
+
+Files are read line by line. Punches are folded into one first-in /
+last-out accumulator per (employee, date), and every ATTENDANCE_INGEST_BATCH_SIZE
+employee-days the batch is merged with the rows already stored, its hours,
+overtime and late/early flags are computed, and it is upserted with a
+single bulk_create(update_conflicts=True) on the (employee, date) unique
+key. Merging with stored rows keeps the earliest check-in and latest
+check-out, so re-ingesting a file, or ingesting it in pieces, gives the
+same rows as ingesting it once.
+
+Each employee's work policy timeline is resolved once per ingestor
+(attendance.policies). On an overnight shift, punches up to the shift
+end belong to the night that started the day before, and punches are
+ordered by their position within the shift rather than by clock time.
+"""
+import csv
+import io
+import itertools
+import time
+from datetime import date, datetime
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from dashboard.cache import invalidate_employee_dashboards
+from users.models import User
+from .models import Attendance
+from .policies import employee_timelines, policy_on, shift_day
+from .rollups import apply_rollup_changes, employee_departments, rollup_state
+
+DEFAULT_INGEST_BATCH_SIZE = 2000
+DEFAULT_INGEST_MAX_REJECTIONS = 100
+
+DIRECTIONS = {
+    'in': 'IN', 'i': 'IN', '0': 'IN', 'checkin': 'IN', 'check-in': 'IN', 'c/in': 'IN',
+    'out': 'OUT', 'o': 'OUT', '1': 'OUT', 'checkout': 'OUT', 'check-out': 'OUT', 'c/out': 'OUT',
+}
+
+HEADER_NAMES = {'employee_id', 'employee', 'emp_id', 'emp_code', 'user_id'}
+
+UPSERT_FIELDS = [
+    'check_in_time', 'check_out_time', 'status', 'is_late',
+    'is_early_departure', 'working_hours', 'overtime_hours', 'department',
+]
+
+
+class PunchError(ValueError):
+    """A punch line that cannot be ingested"""
+
+
+def sniff_delimiter(line):
+    if '\t' in line:
+        return '\t'
+    if ';' in line and ',' not in line:
+        return ';'
+    return ','
+
+
+def parse_timestamp(value):
+    """Naive local datetime from an ISO timestamp"""
+    stamp = datetime.fromisoformat(value)
+    if timezone.is_aware(stamp):
+        stamp = timezone.make_naive(stamp)
+    return stamp
+
+
+def parse_punch(fields):
+    """
+    (employee code, datetime, direction) from one line's fields
+
+    Raises:
+        PunchError: when the line has no usable timestamp or direction
+    """
+    fields = [field.strip() for field in fields]
+    while fields and not fields[-1]:
+        fields.pop()
+    if len(fields) < 2 or not fields[0]:
+        raise PunchError('expected employee_id and timestamp')
+
+    rest = fields[2:]
+    try:
+        if len(fields[1]) <= 10:
+            # A bare date: the time is in the next column
+            day = date.fromisoformat(fields[1])
+            if not rest:
+                raise PunchError(f'missing time for {day}')
+            stamp = datetime.combine(day, parse_time(rest[0]))
+            rest = rest[1:]
+        else:
+            stamp = parse_timestamp(fields[1])
+    except PunchError:
+        raise
+    except ValueError:
+        raise PunchError('invalid timestamp "%s"' % ' '.join(fields[1:3]))
+
+    direction = None
+    if rest and rest[0]:
+        direction = DIRECTIONS.get(rest[0].lower())
+        if direction is None:
+            raise PunchError(f'unknown direction "{rest[0]}"')
+    return fields[0], stamp, direction
+
+
+def parse_time(value):
+    return datetime.strptime(value, '%H:%M:%S' if value.count(':') == 2 else '%H:%M').time()
+
+
+def fold_punch(day, punch, direction):
+    """
+    Fold one punch into a day's [first_in, last_out] accumulator
+
+    Punches are (shift position, time) pairs so overnight shifts order
+    correctly. IN punches only move the check-in, OUT punches only the
+    check-out; undirected punches move both, so a single one is just a
+    check-in.
+    """
+    first_in, last_out = day
+    if direction != 'OUT' and (first_in is None or punch < first_in):
+        first_in = punch
+    if direction != 'IN' and (last_out is None or punch > last_out):
+        last_out = punch
+    day[0], day[1] = first_in, last_out
+
+
+def build_attendance(employee_id, day, first_in, last_out, existing, policy, department=''):
+    """
+    Attendance row for one employee-day, merged with the stored row if any
+
+    first_in and last_out are fold_punch() pairs (or None); policy is the
+    employee's CompiledPolicy for the day. department is the employee's
+    current one, used unless the stored row is already counted under one.
+    """
+    attendance = Attendance(employee_id=employee_id, date=day, status='PRESENT', department=department)
+    if existing is not None:
+        attendance.notes = existing.notes
+        if existing.department is not None:
+            attendance.department = existing.department
+        if existing.status != 'ABSENT':
+            attendance.status = existing.status
+        if existing.check_in_time:
+            stored_in = (policy.shift_microseconds(existing.check_in_time), existing.check_in_time)
+            if first_in is None or stored_in < first_in:
+                first_in = stored_in
+        if existing.check_out_time:
+            stored_out = (policy.shift_microseconds(existing.check_out_time), existing.check_out_time)
+            if last_out is None or stored_out > last_out:
+                last_out = stored_out
+
+    if first_in is None:
+        first_in = last_out
+    attendance.check_in_time = first_in[1]
+    # A lone punch (or an OUT before the IN) is a check-in without a check-out
+    attendance.check_out_time = last_out[1] if last_out and last_out > first_in else None
+
+    attendance.calculate_working_hours(policy)
+    attendance.check_late_arrival(policy)
+    attendance.check_early_departure(policy)
+    return attendance
+
+
+class PunchIngestor:
+    """
+    Ingests punch files into Attendance
+
+    One ingestor can take several files; employee codes are resolved once.
+    ``ingest`` returns a per-file report dict.
+    """
+
+    def __init__(self, batch_size=None, max_rejections=None):
+        self.batch_size = batch_size or getattr(
+            settings, 'ATTENDANCE_INGEST_BATCH_SIZE', DEFAULT_INGEST_BATCH_SIZE
+        )
+        self.max_rejections = (
+            max_rejections if max_rejections is not None
+            else getattr(settings, 'ATTENDANCE_INGEST_MAX_REJECTIONS', DEFAULT_INGEST_MAX_REJECTIONS)
+        )
+        if self.batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+        self._employees = None
+        self._timelines = None
+
+    @property
+    def employees(self):
+        """employee_id code -> user pk"""
+        if self._employees is None:
+            self._employees = dict(User.objects.values_list('employee_id', 'id'))
+        return self._employees
+
+    @property
+    def timelines(self):
+        """user pk -> work policy timeline, resolved for every employee at once"""
+        if self._timelines is None:
+            self._timelines = employee_timelines(self.employees.values())
+        return self._timelines
+
+    def ingest(self, stream, name=''):
+        """
+        Ingest one punch file
+
+        Args:
+            stream: Binary file object (an upload or an open file)
+            name: File name for the report
+        """
+        started = time.perf_counter()
+        report = {
+            'file': name,
+            'lines': 0,
+            'punches': 0,
+            'rejected': 0,
+            'rejections': [],
+            'employee_days': 0,
+            'created': 0,
+            'updated': 0,
+        }
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline='')
+        try:
+            # The first non-blank line decides the delimiter
+            first, skipped = '', 0
+            for first in text:
+                if first.strip():
+                    break
+                skipped += 1
+            delimiter = sniff_delimiter(first)
+            reader = csv.reader(itertools.chain([first], text), delimiter=delimiter)
+
+            days = {}
+            # Employee-days already upserted from this file; an unsorted file
+            # can bring a day back in a later batch
+            written = set()
+            for row in reader:
+                if not row or not ''.join(row).strip():
+                    continue
+                if reader.line_num == 1 and row[0].strip().lower() in HEADER_NAMES:
+                    continue
+
+                report['lines'] += 1
+                try:
+                    code, stamp, direction = parse_punch(row)
+                    employee_id = self.employees.get(code)
+                    if employee_id is None:
+                        raise PunchError(f'unknown employee "{code}"')
+                except PunchError as e:
+                    self.reject(report, skipped + reader.line_num, str(e), delimiter.join(row))
+                    continue
+
+                report['punches'] += 1
+                shift_date, policy = shift_day(self.timelines[employee_id], stamp)
+                key = (employee_id, shift_date)
+                day = days.get(key)
+                if day is None:
+                    day = days[key] = [None, None]
+                punch_time = stamp.time()
+                fold_punch(day, (policy.shift_microseconds(punch_time), punch_time), direction)
+
+                if len(days) >= self.batch_size:
+                    self.flush(days, report, written)
+                    days = {}
+            if days:
+                self.flush(days, report, written)
+        finally:
+            text.detach()
+
+        elapsed = time.perf_counter() - started
+        report['seconds'] = round(elapsed, 3)
+        report['lines_per_second'] = round(report['lines'] / elapsed) if elapsed else None
+        return report
+
+    def reject(self, report, line_number, reason, line):
+        report['rejected'] += 1
+        if len(report['rejections']) < self.max_rejections:
+            report['rejections'].append({
+                'line': line_number,
+                'reason': reason,
+                'content': line[:200],
+            })
+
+    def flush(self, days, report, written):
+        """Merge one batch of employee-days with stored rows and upsert it"""
+        employee_ids = {employee_id for employee_id, _ in days}
+        dates = [day for _, day in days]
+
+        with transaction.atomic():
+            stored = Attendance.objects.filter(
+                employee_id__in=employee_ids, date__gte=min(dates), date__lte=max(dates)
+            ).only(
+                'id', 'employee_id', 'date', 'check_in_time', 'check_out_time',
+                'status', 'is_late', 'notes', 'department',
+            )
+            existing = {
+                (row.employee_id, row.date): row for row in stored
+                if (row.employee_id, row.date) in days
+            }
+
+            departments = employee_departments(employee_ids)
+            rows = []
+            changes = []
+            for (employee_id, day), (first_in, last_out) in days.items():
+                before = existing.get((employee_id, day))
+                policy = policy_on(self.timelines[employee_id], day)
+                attendance = build_attendance(
+                    employee_id, day, first_in, last_out, before, policy, departments[employee_id]
+                )
+                rows.append(attendance)
+                changes.append((before and rollup_state(before), rollup_state(attendance)))
+
+            Attendance.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['employee', 'date'],
+                update_fields=UPSERT_FIELDS,
+            )
+            apply_rollup_changes(changes)
+
+        # bulk_create skips post_save, so invalidate cached dashboards here
+        invalidate_employee_dashboards(employee_ids)
+
+        for key in days:
+            if key not in written:
+                written.add(key)
+                report['employee_days'] += 1
+                report['updated' if key in existing else 'created'] += 1
@@ -0,0 +1,43 @@
+"""
+Ingest door controller / biometric punch logs into attendance
+
+Usage:
+    python manage.py ingest_punch_logs punches-2026-01-05.csv
+    python manage.py ingest_punch_logs logs/*.csv --batch-size 5000
+"""
+from django.core.management.base import BaseCommand, CommandError
+from attendance.ingestion import PunchIngestor
+
+
+class Command(BaseCommand):
+    help = 'Bulk-load punch log files into Attendance, one first-in/last-out row per employee and day'
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+', help='Punch log files (CSV/TSV)')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Employee-days per upsert (default: ATTENDANCE_INGEST_BATCH_SIZE)')
+
+    def handle(self, *args, **options):
+        try:
+            ingestor = PunchIngestor(batch_size=options['batch_size'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for path in options['files']:
+            try:
+                with open(path, 'rb') as stream:
+                    report = ingestor.ingest(stream, path)
+            except OSError as e:
+                raise CommandError(f'{path}: {e.strerror}')
+
+            for rejection in report['rejections']:
+                self.stderr.write(f"{path}:{rejection['line']}: {rejection['reason']}")
+            if report['rejected'] > len(report['rejections']):
+                self.stderr.write(f"{path}: ... {report['rejected'] - len(report['rejections'])} more rejected line(s)")
+
+            self.stdout.write(self.style.SUCCESS(
+                f"{path}: {report['punches']} punch(es) into {report['employee_days']} attendance row(s) "
+                f"({report['created']} created, {report['updated']} updated), "
+                f"{report['rejected']} rejected of {report['lines']} line(s) "
+                f"in {report['seconds']}s ({report['lines_per_second']} lines/s)"
+            ))
@@ -0,0 +1,34 @@
+"""
+Rebuild daily attendance rollups from the attendance table
+
+Usage:
+    python manage.py rebuild_attendance_rollups
+    python manage.py rebuild_attendance_rollups --from 2026-01-01 --to 2026-01-31
+"""
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from attendance.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute DailyAttendanceRollup rows with one GROUP BY over attendance'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='from_date', help='First date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='to_date', help='Last date to rebuild (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        try:
+            start = self.parse_date(options['from_date'])
+            end = self.parse_date(options['to_date'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        count = rebuild_rollups(start, end)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} daily attendance rollup row(s)'))
+
+    @staticmethod
+    def parse_date(value):
+        if not value:
+            return None
+        return datetime.strptime(value, '%Y-%m-%d').date()
@@ -0,0 +1,50 @@
+"""
+Recompute attendance working hours, overtime and late/early flags
+
+Usage:
+    python manage.py recompute_attendance --from 2026-01-01 --to 2026-03-31
+    python manage.py recompute_attendance --department Engineering --dry-run
+"""
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from attendance.recompute import recompute_attendance
+
+
+class Command(BaseCommand):
+    help = 'Recompute attendance metrics in vectorized chunks, writing back only rows that changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='from_date', help='First date to recompute (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='to_date', help='Last date to recompute (YYYY-MM-DD)')
+        parser.add_argument('--employee', type=int, action='append', dest='employee_ids',
+                            help='Limit to this user id (repeatable)')
+        parser.add_argument('--department', help='Limit to one department')
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help='Rows per chunk (default: ATTENDANCE_RECOMPUTE_CHUNK_SIZE)')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would change')
+
+    def handle(self, *args, **options):
+        try:
+            report = recompute_attendance(
+                self.parse_date(options['from_date']),
+                self.parse_date(options['to_date']),
+                employee_ids=options['employee_ids'],
+                department=options['department'],
+                chunk_size=options['chunk_size'],
+                dry_run=options['dry_run'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        fields = ', '.join(f'{field}: {count}' for field, count in report['fields'].items())
+        verb = 'Would update' if options['dry_run'] else 'Updated'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report['changed']} of {report['rows']} attendance row(s) "
+            f"in {report['seconds']}s ({fields})"
+        ))
+
+    @staticmethod
+    def parse_date(value):
+        if not value:
+            return None
+        return datetime.strptime(value, '%Y-%m-%d').date()
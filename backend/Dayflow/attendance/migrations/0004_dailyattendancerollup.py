@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-17 23:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_attendance_is_early_departure_attendance_is_late_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('department', models.CharField(blank=True, max_length=100)),
+                ('present_count', models.IntegerField(default=0)),
+                ('absent_count', models.IntegerField(default=0)),
+                ('half_day_count', models.IntegerField(default=0)),
+                ('leave_count', models.IntegerField(default=0)),
+                ('late_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily Attendance Rollup',
+                'verbose_name_plural': 'Daily Attendance Rollups',
+                'db_table': 'attendance_daily_rollup',
+                'ordering': ['-date', 'department'],
+                'unique_together': {('date', 'department')},
+            },
+        ),
+    ]
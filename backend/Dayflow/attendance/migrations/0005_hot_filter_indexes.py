@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-17 23:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_dailyattendancerollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['date', 'status'], name='attendance_date_32df9b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendanceregularization',
+            index=models.Index(fields=['status', 'created_at'], name='attendance__status_1425f2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendanceregularization',
+            index=models.Index(fields=['employee', 'created_at'], name='attendance__employe_c90e37_idx'),
+        ),
+    ]
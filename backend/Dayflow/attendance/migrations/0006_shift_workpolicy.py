@@ -0,0 +1,53 @@
+# Generated by Django 5.0.1 on 2026-10-18 01:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0005_hot_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Shift',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField(help_text='Earlier than start_time for shifts that end the next day')),
+                ('workday_hours', models.DecimalField(decimal_places=2, default=8, max_digits=4)),
+                ('late_grace_minutes', models.PositiveIntegerField(default=0)),
+                ('early_grace_minutes', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Shift',
+                'verbose_name_plural': 'Shifts',
+                'db_table': 'attendance_shift',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(blank=True, max_length=100)),
+                ('effective_from', models.DateField()),
+                ('effective_to', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('employee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='work_policies', to=settings.AUTH_USER_MODEL)),
+                ('shift', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='policies', to='attendance.shift')),
+            ],
+            options={
+                'verbose_name': 'Work Policy',
+                'verbose_name_plural': 'Work Policies',
+                'db_table': 'attendance_work_policy',
+                'ordering': ['-effective_from', '-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.1 on 2026-10-18 02:37
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def pin_departments(apps, schema_editor):
+    """
+    Record the department existing rows are counted under
+
+    Rollups so far bucketed every row by the employee's current
+    department, so that is what existing rows are pinned to.
+    """
+    Attendance = apps.get_model('attendance', 'Attendance')
+    EmployeeProfile = apps.get_model('users', 'EmployeeProfile')
+    db_alias = schema_editor.connection.alias
+
+    department = EmployeeProfile.objects.using(db_alias).filter(
+        user_id=OuterRef('employee_id')
+    ).values('department')[:1]
+    Attendance.objects.using(db_alias).filter(department__isnull=True).update(
+        department=Coalesce(Subquery(department), Value(''))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0006_shift_workpolicy'),
+        ('users', '0005_user_identifier_lower_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='department',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.RunPython(pin_departments, migrations.RunPython.noop),
+    ]
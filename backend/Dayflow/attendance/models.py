@@ -1,9 +1,93 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import time
+from decimal import Decimal
 from users.models import User
 
 
+# Thresholds for employees without a WorkPolicy (see attendance/policies.py)
+STANDARD_WORKDAY_HOURS = 8  # Hours beyond this count as overtime
+STANDARD_CHECK_IN = time(9, 0)  # Check-ins after this are late
+STANDARD_CHECK_OUT = time(18, 0)  # Check-outs before this are early departures
+
+MICROSECONDS_PER_CENT_HOUR = 36_000_000  # One hundredth of an hour
+
+
+class Shift(models.Model):
+    """Working hours that late, early and overtime are measured against"""
+    
+    name = models.CharField(max_length=100, unique=True)
+    start_time = models.TimeField()
+    end_time = models.TimeField(help_text='Earlier than start_time for shifts that end the next day')
+    workday_hours = models.DecimalField(max_digits=4, decimal_places=2, default=8)
+    late_grace_minutes = models.PositiveIntegerField(default=0)
+    early_grace_minutes = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'attendance_shift'
+        verbose_name = 'Shift'
+        verbose_name_plural = 'Shifts'
+        ordering = ['name']
+    
+    def __str__(self):
+        return f"{self.name} ({self.start_time:%H:%M}-{self.end_time:%H:%M})"
+    
+    @property
+    def is_overnight(self):
+        return self.end_time < self.start_time
+    
+    def clean(self):
+        if self.start_time == self.end_time:
+            raise ValidationError('A shift must not start and end at the same time.')
+
+
+class WorkPolicy(models.Model):
+    """
+    Assigns a shift to one employee, one department or, with neither,
+    the whole company from effective_from until effective_to (open-ended
+    when empty). Employee assignments beat department ones, which beat
+    company-wide ones; see attendance/policies.py.
+    """
+    
+    shift = models.ForeignKey(Shift, on_delete=models.PROTECT, related_name='policies')
+    employee = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='work_policies')
+    department = models.CharField(max_length=100, blank=True)
+    effective_from = models.DateField()
+    effective_to = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'attendance_work_policy'
+        verbose_name = 'Work Policy'
+        verbose_name_plural = 'Work Policies'
+        ordering = ['-effective_from', '-id']
+    
+    def __str__(self):
+        return f"{self.scope_label} - {self.shift.name} from {self.effective_from}"
+    
+    @property
+    def scope(self):
+        if self.employee_id:
+            return 'EMPLOYEE'
+        if self.department:
+            return 'DEPARTMENT'
+        return 'COMPANY'
+    
+    @property
+    def scope_label(self):
+        if self.employee_id:
+            return f"Employee {self.employee_id}"
+        return self.department or 'Company'
+    
+    def clean(self):
+        if self.employee_id and self.department:
+            raise ValidationError('Assign a policy to an employee or a department, not both.')
+        if self.effective_to and self.effective_to < self.effective_from:
+            raise ValidationError('effective_to must not be before effective_from.')
+
+
 class Attendance(models.Model):
     """Attendance tracking model"""
     
@@ -24,6 +108,10 @@ class Attendance(models.Model):
     working_hours = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     overtime_hours = models.DecimalField(max_digits=5, decimal_places=2, default=0)
     notes = models.TextField(blank=True)
+    # Department the row is counted under in DailyAttendanceRollup, fixed on
+    # first save so a later transfer doesn't move past days between buckets.
+    # NULL only for rows written in bulk without it (see attendance/rollups.py)
+    department = models.CharField(max_length=100, null=True, blank=True, editable=False)
     
     class Meta:
         db_table = 'attendance'
@@ -31,36 +119,45 @@ class Attendance(models.Model):
         verbose_name_plural = 'Attendances'
         unique_together = ['employee', 'date']
         ordering = ['-date']
+        indexes = [
+            # HR lists and range scans without an employee filter
+            models.Index(fields=['date', 'status']),
+        ]
     
     def __str__(self):
         return f"{self.employee.username} - {self.date} - {self.status}"
     
-    def calculate_working_hours(self):
+    def save(self, *args, **kwargs):
+        if self.department is None:
+            from .rollups import employee_department
+            self.department = employee_department(self.employee_id)
+        super().save(*args, **kwargs)
+    
+    def work_policy(self):
+        """The employee's compiled policy for this row's date"""
+        from .policies import resolve_policy
+        return resolve_policy(self.employee_id, self.date)
+    
+    def calculate_working_hours(self, policy=None):
         """Calculate total working hours"""
         if self.check_in_time and self.check_out_time:
-            check_in = datetime.combine(self.date, self.check_in_time)
-            check_out = datetime.combine(self.date, self.check_out_time)
-            duration = check_out - check_in
-            hours = duration.total_seconds() / 3600
-            self.working_hours = round(hours, 2)
+            policy = policy or self.work_policy()
+            # Whole hundredths of an hour, computed the same way as attendance.recompute
+            cents = policy.working_cents(self.check_in_time, self.check_out_time)
+            self.working_hours = Decimal(cents).scaleb(-2)
             
-            # Calculate overtime (standard work day is 8 hours)
-            if hours > 8:
-                self.overtime_hours = round(hours - 8, 2)
-            else:
-                self.overtime_hours = 0
-    
-    def check_late_arrival(self, standard_time='09:00'):
-        """Check if employee arrived late (default: 9 AM)"""
+            # Calculate overtime beyond the shift's work day
+            self.overtime_hours = Decimal(policy.overtime_cents(cents)).scaleb(-2)
+    
+    def check_late_arrival(self, policy=None):
+        """Check if employee arrived after the shift start plus grace"""
         if self.check_in_time:
-            standard = datetime.strptime(standard_time, '%H:%M').time()
-            self.is_late = self.check_in_time > standard
+            self.is_late = (policy or self.work_policy()).is_late(self.check_in_time)
     
-    def check_early_departure(self, standard_time='18:00'):
-        """Check if employee left early (default: 6 PM)"""
+    def check_early_departure(self, policy=None):
+        """Check if employee left before the shift end minus grace"""
         if self.check_out_time:
-            standard = datetime.strptime(standard_time, '%H:%M').time()
-            self.is_early_departure = self.check_out_time < standard
+            self.is_early_departure = (policy or self.work_policy()).is_early(self.check_out_time)
 
 
 class AttendanceRegularization(models.Model):
@@ -87,6 +184,32 @@ class AttendanceRegularization(models.Model):
         verbose_name = 'Attendance Regularization'
         verbose_name_plural = 'Attendance Regularizations'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['employee', 'created_at']),
+        ]
     
     def __str__(self):
         return f"{self.employee.username} - {self.date} - {self.status}"
+
+
+class DailyAttendanceRollup(models.Model):
+    """Per-day, per-department attendance counts maintained on every write"""
+    
+    date = models.DateField()
+    department = models.CharField(max_length=100, blank=True)
+    present_count = models.IntegerField(default=0)
+    absent_count = models.IntegerField(default=0)
+    half_day_count = models.IntegerField(default=0)
+    leave_count = models.IntegerField(default=0)
+    late_count = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'attendance_daily_rollup'
+        verbose_name = 'Daily Attendance Rollup'
+        verbose_name_plural = 'Daily Attendance Rollups'
+        unique_together = ['date', 'department']
+        ordering = ['-date', 'department']
+    
+    def __str__(self):
+        return f"{self.date} - {self.department or 'Unassigned'}"
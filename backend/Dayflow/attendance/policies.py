@@ -0,0 +1,257 @@
+"""
+Work policy resolution
+Per-process cache of compiled shift thresholds and per-employee policy timelines
+
+Which shift applies to an employee on a given day depends on WorkPolicy
+rows at three levels (the employee, their department, the company), each
+with effective dates. Every WorkPolicy row is loaded in one query and its
+shift compiled into a CompiledPolicy whose thresholds are microsecond
+counts, so checking a time is an integer comparison. Each employee's
+timeline (their own assignments, then their department's, then the
+company's) is cached too, so on a warm cache resolve_policy() runs no
+queries at all, and employee_timelines() resolves thousands of employees
+with at most one rules query and one department query.
+
+The handlers in attendance.signals drop the whole cache when a Shift or
+WorkPolicy changes and one employee's timeline when their profile changes.
+Entries also expire after ATTENDANCE_POLICY_CACHE_TTL seconds so that
+edits made in another worker process are picked up.
+"""
+import threading
+import time as clock
+from collections import defaultdict
+from datetime import time, timedelta
+from decimal import Decimal
+from django.conf import settings
+from .models import (
+    MICROSECONDS_PER_CENT_HOUR, STANDARD_CHECK_IN, STANDARD_CHECK_OUT, STANDARD_WORKDAY_HOURS,
+    WorkPolicy,
+)
+from .rollups import employee_departments
+
+DEFAULT_CACHE_TTL = 300  # seconds
+DEFAULT_CACHE_MAX_ENTRIES = 50000
+
+MICROSECONDS_PER_MINUTE = 60_000_000
+MICROSECONDS_PER_DAY = 24 * 60 * MICROSECONDS_PER_MINUTE
+
+
+def time_to_microseconds(value):
+    """Microseconds since midnight"""
+    return ((value.hour * 60 + value.minute) * 60 + value.second) * 1_000_000 + value.microsecond
+
+
+def microseconds_to_time(value):
+    """Time of day for a microsecond count, wrapping past midnight"""
+    seconds, microsecond = divmod(value % MICROSECONDS_PER_DAY, 1_000_000)
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    return time(hour, minute, second, microsecond)
+
+
+class CompiledPolicy:
+    """
+    A shift's thresholds as microseconds since the shift day's midnight
+
+    On an overnight shift, times before ``rollover_us`` (halfway between
+    the shift end and the next start) belong to the night that started
+    the evening before and are pushed a day later (``shift_microseconds``),
+    so 05:00 or a 07:00 check-out on a 22:00-06:00 shift comes after 23:00
+    and the night's hours come out positive.
+    """
+
+    __slots__ = (
+        'shift_id', 'name', 'start_time', 'end_time', 'workday_hours', 'overnight',
+        'rollover_us', 'late_after_us', 'early_before_us', 'workday_cents',
+    )
+
+    def __init__(self, shift_id, name, start_time, end_time, workday_hours,
+                 late_grace_minutes=0, early_grace_minutes=0):
+        self.shift_id = shift_id
+        self.name = name
+        self.start_time = start_time
+        self.end_time = end_time
+        self.workday_hours = Decimal(workday_hours)
+        self.overnight = end_time < start_time
+
+        start_us = time_to_microseconds(start_time)
+        end_us = time_to_microseconds(end_time)
+        self.rollover_us = (end_us + start_us) // 2 if self.overnight else 0
+        shift_end_us = end_us + MICROSECONDS_PER_DAY if self.overnight else end_us
+        self.late_after_us = start_us + late_grace_minutes * MICROSECONDS_PER_MINUTE
+        self.early_before_us = shift_end_us - early_grace_minutes * MICROSECONDS_PER_MINUTE
+        self.workday_cents = int(self.workday_hours * 100)
+
+    @classmethod
+    def from_shift(cls, shift):
+        return cls(
+            shift.id, shift.name, shift.start_time, shift.end_time, shift.workday_hours,
+            shift.late_grace_minutes, shift.early_grace_minutes,
+        )
+
+    def shift_microseconds(self, value):
+        """Microseconds since the shift day's midnight for a time of day"""
+        microseconds = time_to_microseconds(value)
+        if microseconds < self.rollover_us:
+            microseconds += MICROSECONDS_PER_DAY
+        return microseconds
+
+    def working_cents(self, check_in, check_out):
+        """Hundredths of an hour between two times, rounded half to even"""
+        duration = self.shift_microseconds(check_out) - self.shift_microseconds(check_in)
+        if duration < 0:
+            # A check-out before the check-in happened the next day
+            duration += MICROSECONDS_PER_DAY
+        return round(duration / MICROSECONDS_PER_CENT_HOUR)
+
+    def overtime_cents(self, cents):
+        return cents - self.workday_cents if cents > self.workday_cents else 0
+
+    def is_late(self, check_in):
+        return self.shift_microseconds(check_in) > self.late_after_us
+
+    def is_early(self, check_out):
+        return self.shift_microseconds(check_out) < self.early_before_us
+
+    def as_dict(self):
+        return {
+            'shift': self.shift_id,
+            'name': self.name,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'workday_hours': self.workday_hours,
+            'overnight': self.overnight,
+        }
+
+
+# Applies when no WorkPolicy covers an employee's day
+STANDARD_POLICY = CompiledPolicy(None, 'Standard', STANDARD_CHECK_IN, STANDARD_CHECK_OUT, STANDARD_WORKDAY_HOURS)
+
+# (expires_at, rules) where rules holds (effective_from, effective_to, CompiledPolicy)
+# lists per employee id, per lower-cased department and company-wide
+_rules = None
+# employee_id -> (expires_at, timeline tuple in precedence order)
+_timelines = {}
+# Bumped by clear_policy_cache() so loads that raced an invalidation are not stored
+_generation = 0
+_lock = threading.Lock()
+
+
+def _ttl():
+    return getattr(settings, 'ATTENDANCE_POLICY_CACHE_TTL', DEFAULT_CACHE_TTL)
+
+
+def _load_rules(now):
+    global _rules
+    with _lock:
+        if _rules and _rules[0] > now:
+            return _rules[1]
+        generation = _generation
+
+    rules = {'employee': defaultdict(list), 'department': defaultdict(list), 'company': []}
+    compiled = {}
+    for policy in WorkPolicy.objects.select_related('shift').order_by('-effective_from', '-id'):
+        if policy.shift_id not in compiled:
+            compiled[policy.shift_id] = CompiledPolicy.from_shift(policy.shift)
+        rule = (policy.effective_from, policy.effective_to, compiled[policy.shift_id])
+        if policy.employee_id:
+            rules['employee'][policy.employee_id].append(rule)
+        elif policy.department:
+            rules['department'][policy.department.lower()].append(rule)
+        else:
+            rules['company'].append(rule)
+
+    with _lock:
+        if generation == _generation:
+            _rules = (now + _ttl(), rules)
+    return rules
+
+
+def employee_timelines(employee_ids):
+    """
+    Policy timelines for many employees, loading only the uncached ones
+
+    Returns:
+        dict mapping employee id -> tuple of (effective_from, effective_to,
+        CompiledPolicy), most specific and most recent first; pass one to
+        policy_on() with a date
+    """
+    employee_ids = set(employee_ids)
+    now = clock.monotonic()
+    result = {}
+
+    with _lock:
+        generation = _generation
+        for employee_id in employee_ids:
+            entry = _timelines.get(employee_id)
+            if entry and entry[0] > now:
+                result[employee_id] = entry[1]
+
+    missing = employee_ids - result.keys()
+    if missing:
+        rules = _load_rules(now)
+        # Departments only matter when some policy targets one
+        departments = employee_departments(missing) if rules['department'] else {}
+        company = tuple(rules['company'])
+        loaded = {
+            employee_id: (
+                tuple(rules['employee'].get(employee_id, ()))
+                + tuple(rules['department'].get(departments.get(employee_id, '').lower(), ()))
+                + company
+            )
+            for employee_id in missing
+        }
+
+        max_entries = getattr(settings, 'ATTENDANCE_POLICY_CACHE_MAX_ENTRIES', DEFAULT_CACHE_MAX_ENTRIES)
+        with _lock:
+            if generation == _generation:
+                if len(_timelines) + len(loaded) > max_entries:
+                    _timelines.clear()
+                expires_at = now + _ttl()
+                for employee_id, timeline in loaded.items():
+                    _timelines[employee_id] = (expires_at, timeline)
+        result.update(loaded)
+
+    return result
+
+
+def policy_on(timeline, day):
+    """The policy a timeline assigns to a date (STANDARD_POLICY if none)"""
+    for effective_from, effective_to, policy in timeline:
+        if effective_from <= day and (effective_to is None or day <= effective_to):
+            return policy
+    return STANDARD_POLICY
+
+
+def resolve_policy(employee_id, day):
+    """One employee's policy for one date"""
+    return policy_on(employee_timelines([employee_id])[employee_id], day)
+
+
+def shift_day(timeline, stamp):
+    """
+    (date, policy) a punch or check-in at ``stamp`` counts towards
+
+    A time before the rollover of an overnight shift that started the
+    day before belongs to that day.
+    """
+    day = stamp.date()
+    previous = policy_on(timeline, day - timedelta(days=1))
+    if time_to_microseconds(stamp.time()) < previous.rollover_us:
+        return day - timedelta(days=1), previous
+    return day, policy_on(timeline, day)
+
+
+def invalidate_employee_policy(employee_id):
+    """Drop one employee's cached timeline"""
+    with _lock:
+        _timelines.pop(employee_id, None)
+
+
+def clear_policy_cache():
+    """Drop the compiled rules and every cached timeline"""
+    global _rules, _generation
+    with _lock:
+        _rules = None
+        _timelines.clear()
+        _generation += 1
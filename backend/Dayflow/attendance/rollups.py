@@ -0,0 +1,198 @@
+"""
+Daily attendance rollups
+Keeps DailyAttendanceRollup in step with writes to Attendance
+
+Views take a snapshot of the row before they change it and hand both the
+before and after snapshots to apply_rollup_change(), which turns the
+difference into F() increments on the affected (date, department) buckets.
+Bulk writes hand a list of pairs to apply_rollup_changes().
+
+A row is bucketed by Attendance.department, the department it was first
+counted under, so an employee changing department leaves their past days
+where they were counted. Rows bulk-written without one (NULL) fall back to
+the employee's current department. Admin edits go through the same
+helpers (see attendance/admin.py); other direct writes need
+rebuild_rollups() afterwards.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+from users.models import EmployeeProfile
+from .models import Attendance, DailyAttendanceRollup
+
+
+STATUS_FIELDS = {
+    'PRESENT': 'present_count',
+    'ABSENT': 'absent_count',
+    'HALF_DAY': 'half_day_count',
+    'LEAVE': 'leave_count',
+}
+
+COUNT_FIELDS = ('present_count', 'absent_count', 'half_day_count', 'leave_count', 'late_count')
+
+
+def employee_department(employee_id):
+    """Department used to bucket an employee's attendance ('' if unknown)"""
+    return employee_departments([employee_id])[employee_id]
+
+
+def employee_departments(employee_ids):
+    """Departments for many employees in one query ('' if unknown)"""
+    departments = dict.fromkeys(employee_ids, '')
+    for user_id, department in EmployeeProfile.objects.filter(
+        user_id__in=departments
+    ).values_list('user_id', 'department'):
+        departments[user_id] = department or ''
+    return departments
+
+
+def rollup_state(attendance):
+    """Snapshot of the attendance fields the rollup depends on"""
+    return (
+        attendance.date, attendance.employee_id, attendance.department,
+        attendance.status, bool(attendance.is_late),
+    )
+
+
+def apply_rollup_change(before, after):
+    """
+    Apply the difference between two rollup snapshots
+
+    Check-outs and note edits move no count and cost no queries.
+
+    Args:
+        before: Snapshot before the write, or None for a new row
+        after: Snapshot after the write, or None for a deleted row
+    """
+    apply_rollup_changes([(before, after)])
+
+
+def apply_rollup_changes(changes):
+    """
+    Apply many (before, after) snapshot pairs at once
+
+    Used by bulk writes: deltas are summed per (date, department) bucket
+    before any rollup row is touched, so the cost grows with the buckets,
+    not the rows. Rows without a department are looked up in one query.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    for before, after in changes:
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            day, employee_id, department, status, is_late = state
+            field = STATUS_FIELDS.get(status)
+            if field:
+                deltas[(day, employee_id, department)][field] += sign
+            if is_late:
+                deltas[(day, employee_id, department)]['late_count'] += sign
+
+    moved = {
+        key: {field: delta for field, delta in fields.items() if delta}
+        for key, fields in deltas.items()
+    }
+    moved = {key: fields for key, fields in moved.items() if fields}
+    if not moved:
+        return
+
+    unassigned = {employee_id for _, employee_id, department in moved if department is None}
+    current = employee_departments(unassigned) if unassigned else {}
+    buckets = defaultdict(lambda: defaultdict(int))
+    for (day, employee_id, department), fields in moved.items():
+        if department is None:
+            department = current[employee_id]
+        for field, delta in fields.items():
+            buckets[(day, department)][field] += delta
+
+    for (day, department), fields in buckets.items():
+        changes = {field: F(field) + delta for field, delta in fields.items() if delta}
+        if not changes:
+            continue
+        with transaction.atomic():
+            rollup, _ = DailyAttendanceRollup.objects.get_or_create(date=day, department=department)
+            DailyAttendanceRollup.objects.filter(pk=rollup.pk).update(**changes)
+
+
+def rebuild_rollups(start=None, end=None):
+    """
+    Recompute rollups from the attendance table with one GROUP BY
+
+    Used to backfill existing data and to repair drift. Returns the number
+    of rollup rows written.
+    """
+    attendances = Attendance.objects.all()
+    existing = DailyAttendanceRollup.objects.all()
+    if start:
+        attendances = attendances.filter(date__gte=start)
+        existing = existing.filter(date__gte=start)
+    if end:
+        attendances = attendances.filter(date__lte=end)
+        existing = existing.filter(date__lte=end)
+
+    rows = (
+        attendances
+        .order_by()
+        .values('date', bucket=Coalesce('department', 'employee__profile__department'))
+        .annotate(
+            present_count=Count('id', filter=Q(status='PRESENT')),
+            absent_count=Count('id', filter=Q(status='ABSENT')),
+            half_day_count=Count('id', filter=Q(status='HALF_DAY')),
+            leave_count=Count('id', filter=Q(status='LEAVE')),
+            late_count=Count('id', filter=Q(is_late=True)),
+        )
+    )
+
+    merged = {}
+    for row in rows:
+        key = (row['date'], row['bucket'] or '')
+        if key in merged:
+            # NULL (no profile) and '' both map to the unassigned bucket
+            for field in COUNT_FIELDS:
+                merged[key][field] += row[field]
+        else:
+            merged[key] = {field: row[field] for field in COUNT_FIELDS}
+
+    with transaction.atomic():
+        existing.delete()
+        DailyAttendanceRollup.objects.bulk_create([
+            DailyAttendanceRollup(date=day, department=department, **counts)
+            for (day, department), counts in merged.items()
+        ], batch_size=500)
+
+    return len(merged)
+
+
+def attendance_totals(day, department=None):
+    """Company-wide (or one department's) counts for a single day"""
+    rollups = DailyAttendanceRollup.objects.filter(date=day)
+    if department:
+        rollups = rollups.filter(department__iexact=department)
+    totals = rollups.aggregate(**{f'{field}_sum': Sum(field) for field in COUNT_FIELDS})
+    return {field: totals[f'{field}_sum'] or 0 for field in COUNT_FIELDS}
+
+
+def attendance_trend(start, end, department=None):
+    """Per-day counts between two dates, with zero rows for empty days"""
+    rollups = DailyAttendanceRollup.objects.filter(date__gte=start, date__lte=end)
+    if department:
+        rollups = rollups.filter(department__iexact=department)
+
+    by_day = {
+        row['date']: row
+        for row in rollups.order_by('date').values('date').annotate(
+            **{f'{field}_sum': Sum(field) for field in COUNT_FIELDS}
+        )
+    }
+
+    trend = []
+    day = start
+    while day <= end:
+        row = by_day.get(day, {})
+        trend.append({
+            'date': day,
+            **{field: row.get(f'{field}_sum') or 0 for field in COUNT_FIELDS}
+        })
+        day += timedelta(days=1)
+    return trend
@@ -1,8 +1,9 @@
 from rest_framework import serializers
-from .models import Attendance, AttendanceRegularization
+from Dayflow.prefetch import PrefetchPlanMixin
+from .models import Attendance, AttendanceRegularization, Shift, WorkPolicy
 
 
-class AttendanceSerializer(serializers.ModelSerializer):
+class AttendanceSerializer(PrefetchPlanMixin, serializers.ModelSerializer):
     """Attendance Serializer"""
     
     employee_name = serializers.CharField(source='employee.username', read_only=True)
@@ -25,7 +26,7 @@ class AttendanceSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class AttendanceRegularizationSerializer(serializers.ModelSerializer):
+class AttendanceRegularizationSerializer(PrefetchPlanMixin, serializers.ModelSerializer):
     """Attendance Regularization Serializer"""
     
     employee_name = serializers.CharField(source='employee.username', read_only=True)
@@ -37,3 +38,47 @@ class AttendanceRegularizationSerializer(serializers.ModelSerializer):
                   'requested_check_out', 'reason', 'status', 'reviewed_by', 
                   'reviewed_by_name', 'reviewed_at', 'created_at']
         read_only_fields = ['id', 'employee', 'reviewed_by', 'reviewed_at', 'created_at']
+
+
+class ShiftSerializer(serializers.ModelSerializer):
+    """Shift Serializer"""
+    
+    is_overnight = serializers.BooleanField(read_only=True)
+    
+    class Meta:
+        model = Shift
+        fields = ['id', 'name', 'start_time', 'end_time', 'workday_hours',
+                  'late_grace_minutes', 'early_grace_minutes', 'is_overnight', 'created_at']
+        read_only_fields = ['id', 'created_at']
+    
+    def validate(self, attrs):
+        start_time = attrs.get('start_time', getattr(self.instance, 'start_time', None))
+        end_time = attrs.get('end_time', getattr(self.instance, 'end_time', None))
+        if start_time == end_time:
+            raise serializers.ValidationError("A shift must not start and end at the same time.")
+        return attrs
+
+
+class WorkPolicySerializer(PrefetchPlanMixin, serializers.ModelSerializer):
+    """Work Policy Serializer"""
+    
+    shift_name = serializers.CharField(source='shift.name', read_only=True)
+    employee_name = serializers.CharField(source='employee.username', read_only=True)
+    scope = serializers.CharField(read_only=True)
+    
+    class Meta:
+        model = WorkPolicy
+        fields = ['id', 'shift', 'shift_name', 'employee', 'employee_name', 'department',
+                  'scope', 'effective_from', 'effective_to', 'created_at']
+        read_only_fields = ['id', 'created_at']
+    
+    def validate(self, attrs):
+        def current(field):
+            return attrs.get(field, getattr(self.instance, field, None))
+        
+        if current('employee') and current('department'):
+            raise serializers.ValidationError("Assign a policy to an employee or a department, not both.")
+        effective_to = current('effective_to')
+        if effective_to and effective_to < current('effective_from'):
+            raise serializers.ValidationError("effective_to must not be before effective_from.")
+        return attrs
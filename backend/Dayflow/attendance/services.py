@@ -0,0 +1,97 @@
+"""
+Attendance services
+Reusable query helpers shared by attendance views, dashboards and batch jobs
+"""
+import calendar
+from datetime import date
+from django.db.models import Count, Sum, Q
+from .models import Attendance
+
+
+def month_bounds(year, month):
+    """Return the first and last date of a month"""
+    last_day = calendar.monthrange(year, month)[1]
+    return date(year, month, 1), date(year, month, last_day)
+
+
+def filter_attendance(attendances, params):
+    """Apply the employee_id, from_date, to_date and status filters HR list views accept"""
+    employee_id = params.get('employee_id', None)
+    from_date = params.get('from_date', None)
+    to_date = params.get('to_date', None)
+    status_filter = params.get('status', None)
+
+    if employee_id:
+        attendances = attendances.filter(employee__id=employee_id)
+    if from_date:
+        attendances = attendances.filter(date__gte=from_date)
+    if to_date:
+        attendances = attendances.filter(date__lte=to_date)
+    if status_filter:
+        attendances = attendances.filter(status=status_filter.upper())
+    return attendances
+
+
+def empty_summary():
+    """Summary for an employee with no attendance rows in the period"""
+    return {
+        'total_days': 0,
+        'present_days': 0,
+        'absent_days': 0,
+        'half_days': 0,
+        'leaves': 0,
+        'late_arrivals': 0,
+        'early_departures': 0,
+        'total_working_hours': 0.0,
+        'total_overtime_hours': 0.0,
+    }
+
+
+def summarize_monthly_attendance(employee_ids, year, month):
+    """
+    Monthly attendance summary for many employees in a single query
+
+    All counts and hour sums come from one conditional aggregation grouped
+    by employee, so the cost does not depend on how many metrics we report.
+
+    Args:
+        employee_ids: Iterable of user ids
+        year: Calendar year
+        month: Calendar month (1-12)
+
+    Returns:
+        dict mapping employee id -> summary dict. Employees without any
+        attendance in the month get an all-zero summary.
+    """
+    employee_ids = list(employee_ids)
+    if not employee_ids:
+        return {}
+
+    start, end = month_bounds(year, month)
+
+    rows = (
+        Attendance.objects
+        .filter(employee_id__in=employee_ids, date__gte=start, date__lte=end)
+        .order_by()
+        .values('employee_id')
+        .annotate(
+            total_days=Count('id'),
+            present_days=Count('id', filter=Q(status='PRESENT')),
+            absent_days=Count('id', filter=Q(status='ABSENT')),
+            half_days=Count('id', filter=Q(status='HALF_DAY')),
+            leaves=Count('id', filter=Q(status='LEAVE')),
+            late_arrivals=Count('id', filter=Q(is_late=True)),
+            early_departures=Count('id', filter=Q(is_early_departure=True)),
+            total_working_hours=Sum('working_hours'),
+            total_overtime_hours=Sum('overtime_hours'),
+        )
+    )
+
+    summaries = {employee_id: empty_summary() for employee_id in employee_ids}
+    for row in rows:
+        employee_id = row.pop('employee_id')
+        row['total_working_hours'] = float(row['total_working_hours'] or 0)
+        row['total_overtime_hours'] = float(row['total_overtime_hours'] or 0)
+        summaries[employee_id] = row
+
+    return summaries
@@ -0,0 +1,25 @@
+"""
+Attendance signal handlers
+Keep the per-process work policy cache in step with writes
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from users.models import EmployeeProfile
+from .models import Shift, WorkPolicy
+from .policies import clear_policy_cache, invalidate_employee_policy
+
+
+@receiver(post_save, sender=Shift)
+@receiver(post_delete, sender=Shift)
+@receiver(post_save, sender=WorkPolicy)
+@receiver(post_delete, sender=WorkPolicy)
+def clear_cached_policies(sender, instance, **kwargs):
+    """Any shift or assignment change can move many employees, so start over"""
+    clear_policy_cache()
+
+
+@receiver(post_save, sender=EmployeeProfile)
+@receiver(post_delete, sender=EmployeeProfile)
+def invalidate_cached_policy(sender, instance, **kwargs):
+    """A department change moves the employee to another department's policies"""
+    invalidate_employee_policy(instance.user_id)
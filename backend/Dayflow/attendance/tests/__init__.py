@@ -1,2 +1,9 @@
 # Import test modules
 from .test_attendance_enhancements import *
+from .test_attendance_summary import *
+from .test_attendance_pagination import *
+from .test_attendance_rollups import *
+from .test_attendance_exports import *
+from .test_attendance_ingestion import *
+from .test_attendance_recompute import *
+from .test_attendance_policies import *
@@ -0,0 +1,166 @@
+import csv
+import gzip
+import io
+import json
+from datetime import date, time
+from decimal import Decimal
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from users.models import User
+from users.jwt_serializers import CustomTokenObtainPairSerializer
+from attendance.models import Attendance
+
+
+def read(response):
+    return b''.join(response.streaming_content)
+
+
+class AttendanceExportTestCase(APITestCase):
+    """Test streaming CSV/NDJSON attendance exports"""
+
+    def setUp(self):
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        self.other = User.objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='pass123',
+            employee_id='EMP002',
+            role='EMPLOYEE'
+        )
+        self.hr = User.objects.create_user(
+            username='hr',
+            email='hr@example.com',
+            password='pass123',
+            employee_id='HR001',
+            role='HR'
+        )
+
+        for day in range(1, 6):
+            Attendance.objects.create(
+                employee=self.employee,
+                date=date(2025, 1, day),
+                check_in_time=time(9, 0),
+                status='PRESENT' if day % 2 else 'ABSENT',
+                working_hours=Decimal('8.50'),
+            )
+        Attendance.objects.create(employee=self.other, date=date(2025, 1, 3), status='PRESENT')
+
+        self.client.force_authenticate(user=self.hr)
+
+    def test_csv_export(self):
+        """Test CSV exports stream a header and every row, newest first"""
+        response = self.client.get(reverse('export-attendance'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('filename="attendance.csv"', response['Content-Disposition'])
+
+        rows = list(csv.DictReader(io.StringIO(read(response).decode())))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]['date'], '2025-01-05')
+        self.assertEqual(rows[-1]['date'], '2025-01-01')
+        self.assertEqual(rows[0]['employee_id'], 'EMP001')
+        self.assertEqual(rows[0]['check_in_time'], '09:00:00')
+        self.assertEqual(rows[0]['working_hours'], '8.50')
+
+    def test_csv_escapes_formulas(self):
+        """Test free text that looks like a spreadsheet formula is quoted in CSV"""
+        Attendance.objects.filter(employee=self.other).update(notes='=HYPERLINK("http://evil.test","x")')
+        Attendance.objects.filter(employee=self.employee, date=date(2025, 1, 1)).update(notes='-2+3')
+        Attendance.objects.filter(employee=self.employee, date=date(2025, 1, 2)).update(notes='\t=1+1')
+
+        rows = list(csv.DictReader(io.StringIO(read(self.client.get(reverse('export-attendance'))).decode())))
+        notes = {(row['employee_id'], row['date']): row['notes'] for row in rows}
+        self.assertEqual(notes[('EMP002', '2025-01-03')], '\'=HYPERLINK("http://evil.test","x")')
+        self.assertEqual(notes[('EMP001', '2025-01-01')], "'-2+3")
+        self.assertEqual(notes[('EMP001', '2025-01-02')], "'\t=1+1")
+        self.assertEqual(notes[('EMP001', '2025-01-03')], '')
+
+        records = [json.loads(line) for line in read(self.client.get(
+            reverse('export-attendance'), {'export_format': 'ndjson', 'employee_id': self.other.id}
+        )).decode().splitlines()]
+        self.assertEqual(records[0]['notes'], '=HYPERLINK("http://evil.test","x")')
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    async def test_asgi_export_streams_async(self):
+        """Test ASGI requests get an async iterator, so Django doesn't buffer the file"""
+        token = await sync_to_async(CustomTokenObtainPairSerializer.get_token)(self.hr)
+
+        response = await AsyncClient().get(
+            reverse('export-attendance'), headers={'Authorization': f'Bearer {token.access_token}'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertGreater(len(chunks), 2)
+        rows = list(csv.DictReader(io.StringIO(b''.join(chunks).decode())))
+        self.assertEqual(len(rows), 6)
+
+    def test_list_view_filters_apply(self):
+        """Test the export honours the same filters as the all-attendance list"""
+        response = self.client.get(reverse('export-attendance'), {
+            'employee_id': self.employee.id,
+            'from_date': '2025-01-02',
+            'to_date': '2025-01-04',
+            'status': 'present',
+        })
+
+        rows = list(csv.DictReader(io.StringIO(read(response).decode())))
+        self.assertEqual([row['date'] for row in rows], ['2025-01-03'])
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_ndjson_export(self):
+        """Test NDJSON exports write one object per line across chunks"""
+        response = self.client.get(reverse('export-attendance'), {'export_format': 'ndjson'})
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        records = [json.loads(line) for line in read(response).decode().splitlines()]
+        self.assertEqual(len(records), 6)
+        self.assertEqual(records[0]['employee_name'], 'employee')
+        self.assertEqual(records[0]['working_hours'], '8.50')
+        self.assertIs(records[0]['is_late'], False)
+
+    def test_gzip_export(self):
+        """Test gzip=true downloads a compressed file with the same rows"""
+        plain = read(self.client.get(reverse('export-attendance')))
+
+        response = self.client.get(reverse('export-attendance'), {'gzip': 'true'})
+
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('filename="attendance.csv.gz"', response['Content-Disposition'])
+        self.assertEqual(gzip.decompress(read(response)), plain)
+
+    def test_unsupported_format(self):
+        """Test an unknown export_format is rejected"""
+        response = self.client.get(reverse('export-attendance'), {'export_format': 'xlsx'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_employee_filter(self):
+        """Test a non-numeric employee_id is a 400, not a 500"""
+        response = self.client.get(reverse('export-attendance'), {'employee_id': 'abc'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.get(reverse('export-leaves'), {'employee_id': 'abc'}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_employees_cannot_export(self):
+        """Test exports are limited to Admin/HR"""
+        self.client.force_authenticate(user=self.employee)
+
+        response = self.client.get(reverse('export-attendance'))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,182 @@
+from django.urls import reverse
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date, time
+from decimal import Decimal
+from io import BytesIO, StringIO
+import os
+import tempfile
+from users.models import User, EmployeeProfile
+from attendance.models import Attendance, DailyAttendanceRollup
+from attendance.ingestion import PunchIngestor
+
+
+class AttendanceIngestionTestCase(APITestCase):
+    """Test bulk punch log ingestion"""
+
+    def setUp(self):
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        EmployeeProfile.objects.create(user=self.employee, full_name='Employee', department='Engineering')
+        self.other = User.objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='pass123',
+            employee_id='EMP002',
+            role='EMPLOYEE'
+        )
+        self.hr = User.objects.create_user(
+            username='hr',
+            email='hr@example.com',
+            password='pass123',
+            employee_id='HR001',
+            role='HR'
+        )
+
+    def ingest(self, content, **kwargs):
+        return PunchIngestor(**kwargs).ingest(BytesIO(content.encode()), 'punches.csv')
+
+    def test_first_in_last_out(self):
+        """Test punches fold into one row per employee and day with hours and flags"""
+        report = self.ingest(
+            'employee_id,timestamp,direction\n'
+            'EMP001,2026-01-05 09:15:00,IN\n'
+            'EMP002,2026-01-05 08:55:00,IN\n'
+            'EMP001,2026-01-05 13:00:00,OUT\n'
+            'EMP001,2026-01-05 13:30:00,IN\n'
+            'EMP001,2026-01-05 19:15:00,OUT\n'
+            'EMP002,2026-01-05 17:00:00,OUT\n'
+        )
+
+        self.assertEqual(report['lines'], 6)
+        self.assertEqual(report['punches'], 6)
+        self.assertEqual(report['rejected'], 0)
+        self.assertEqual(report['created'], 2)
+        employee = Attendance.objects.get(employee=self.employee, date=date(2026, 1, 5))
+        self.assertEqual(employee.check_in_time, time(9, 15))
+        self.assertEqual(employee.check_out_time, time(19, 15))
+        self.assertEqual(employee.status, 'PRESENT')
+        self.assertEqual(employee.working_hours, Decimal('10.00'))
+        self.assertEqual(employee.overtime_hours, Decimal('2.00'))
+        self.assertTrue(employee.is_late)
+        self.assertFalse(employee.is_early_departure)
+        other = Attendance.objects.get(employee=self.other, date=date(2026, 1, 5))
+        self.assertFalse(other.is_late)
+        self.assertTrue(other.is_early_departure)
+
+    def test_rejected_lines_are_reported(self):
+        """Test bad lines are counted and listed with their line numbers"""
+        report = self.ingest(
+            'EMP001\t2026-01-05\t09:00\n'
+            'EMP999\t2026-01-05\t09:00\n'
+            'EMP001\tyesterday\n'
+            '\n'
+            'EMP001\t2026-01-05\t18:30\tSIDEWAYS\n'
+            'EMP001\t2026-01-05\t18:30\n',
+            max_rejections=2
+        )
+
+        self.assertEqual(report['lines'], 5)
+        self.assertEqual(report['punches'], 2)
+        self.assertEqual(report['rejected'], 3)
+        self.assertEqual([r['line'] for r in report['rejections']], [2, 3])
+        self.assertIn('unknown employee "EMP999"', report['rejections'][0]['reason'])
+        self.assertIn('invalid timestamp', report['rejections'][1]['reason'])
+        attendance = Attendance.objects.get(employee=self.employee)
+        self.assertEqual((attendance.check_in_time, attendance.check_out_time), (time(9, 0), time(18, 30)))
+
+    def test_merges_with_stored_rows_across_batches(self):
+        """Test re-ingesting and batch splits keep the earliest check-in and latest check-out"""
+        Attendance.objects.create(
+            employee=self.employee, date=date(2026, 1, 6), status='ABSENT', notes='Badge reader down'
+        )
+        punches = (
+            'EMP001,2026-01-05T08:50:00\n'
+            'EMP001,2026-01-06T08:40:00\n'
+            'EMP002,2026-01-05T09:00:00\n'
+            'EMP001,2026-01-05T18:10:00\n'
+            'EMP001,2026-01-06T18:00:00\n'
+        )
+
+        first = self.ingest(punches, batch_size=1)
+        second = self.ingest(punches)
+
+        # Days that come back in a later batch are only counted once
+        self.assertEqual((first['created'], first['updated'], first['employee_days']), (2, 1, 3))
+        self.assertEqual((second['created'], second['updated']), (0, 3))
+        self.assertEqual(Attendance.objects.count(), 3)
+        merged = Attendance.objects.get(employee=self.employee, date=date(2026, 1, 5))
+        self.assertEqual((merged.check_in_time, merged.check_out_time), (time(8, 50), time(18, 10)))
+        stored = Attendance.objects.get(employee=self.employee, date=date(2026, 1, 6))
+        self.assertEqual(stored.status, 'PRESENT')
+        self.assertEqual(stored.notes, 'Badge reader down')
+        # A single punch is a check-in without a check-out
+        lone = Attendance.objects.get(employee=self.other)
+        self.assertEqual((lone.check_in_time, lone.check_out_time), (time(9, 0), None))
+
+    def test_rollups_follow_ingestion(self):
+        """Test daily rollups move with the upserted rows"""
+        Attendance.objects.create(employee=self.employee, date=date(2026, 1, 5), status='ABSENT')
+        DailyAttendanceRollup.objects.create(date=date(2026, 1, 5), department='Engineering', absent_count=1)
+
+        self.ingest('EMP001,2026-01-05 09:30,IN\nEMP002,2026-01-05 08:30,IN\n')
+
+        engineering = DailyAttendanceRollup.objects.get(date=date(2026, 1, 5), department='Engineering')
+        self.assertEqual((engineering.absent_count, engineering.present_count, engineering.late_count), (0, 1, 1))
+        unassigned = DailyAttendanceRollup.objects.get(date=date(2026, 1, 5), department='')
+        self.assertEqual((unassigned.present_count, unassigned.late_count), (1, 0))
+
+    def test_ingest_endpoint(self):
+        """Test HR uploads punch files and gets a report per file"""
+        self.client.force_authenticate(user=self.hr)
+        files = [
+            SimpleUploadedFile('door-a.csv', b'EMP001,2026-01-05 09:00:00,IN\nEMP001,2026-01-05 18:00:00,OUT\n'),
+            SimpleUploadedFile('door-b.csv', b'EMP002,2026-01-05 09:00:00\nbad line\n'),
+        ]
+
+        response = self.client.post(reverse('ingest-attendance'), {'file': files}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([report['file'] for report in response.data['files']], ['door-a.csv', 'door-b.csv'])
+        self.assertEqual(response.data['totals']['punches'], 3)
+        self.assertEqual(response.data['totals']['rejected'], 1)
+        self.assertEqual(response.data['totals']['employee_days'], 2)
+        self.assertIn('lines_per_second', response.data['files'][0])
+
+    def test_ingest_endpoint_permissions(self):
+        """Test employees cannot ingest and a file is required"""
+        self.client.force_authenticate(user=self.employee)
+        forbidden = self.client.post(reverse('ingest-attendance'), {}, format='multipart')
+        self.client.force_authenticate(user=self.hr)
+        missing = self.client.post(reverse('ingest-attendance'), {}, format='multipart')
+
+        self.assertEqual(forbidden.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(missing.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(ATTENDANCE_INGEST_BATCH_SIZE=1)
+    def test_management_command(self):
+        """Test the command ingests files and prints throughput and rejections"""
+        path = self.tmp_file('EMP001,2026-01-05 09:00,IN\nEMP404,2026-01-05 09:00,IN\n')
+        out, err = StringIO(), StringIO()
+
+        call_command('ingest_punch_logs', path, stdout=out, stderr=err)
+
+        self.assertIn('1 punch(es) into 1 attendance row(s)', out.getvalue())
+        self.assertIn('lines/s', out.getvalue())
+        self.assertIn(':2: unknown employee "EMP404"', err.getvalue())
+        self.assertTrue(Attendance.objects.filter(employee=self.employee).exists())
+
+    def tmp_file(self, content):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
@@ -0,0 +1,122 @@
+import base64
+import json
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date, timedelta
+from users.models import User
+from attendance.models import Attendance
+
+
+class AttendancePaginationTestCase(APITestCase):
+    """Test keyset pagination on attendance list endpoints"""
+
+    def setUp(self):
+        self.hr = User.objects.create_user(
+            username='hr',
+            email='hr@example.com',
+            password='pass123',
+            employee_id='HR001',
+            role='HR'
+        )
+        self.employees = [
+            User.objects.create_user(
+                username=f'employee{i}',
+                email=f'employee{i}@example.com',
+                password='pass123',
+                employee_id=f'EMP00{i}',
+                role='EMPLOYEE'
+            )
+            for i in range(2)
+        ]
+
+        # Two employees on each of three days, so dates tie within a page
+        start = date(2026, 1, 1)
+        for offset in range(3):
+            for employee in self.employees:
+                Attendance.objects.create(
+                    employee=employee,
+                    date=start + timedelta(days=offset),
+                    status='PRESENT'
+                )
+
+    def _collect_pages(self, url, params):
+        ids, cursor, pages = [], None, 0
+        while True:
+            query = dict(params)
+            if cursor:
+                query['cursor'] = cursor
+            response = self.client.get(url, query)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(row['id'] for row in response.data['attendance'])
+            pages += 1
+            cursor = response.data['next_cursor']
+            if not cursor:
+                return ids, pages
+
+    def test_cursor_walks_every_row_once(self):
+        """Test pages cover all rows in order with ties broken on id"""
+        self.client.force_authenticate(user=self.hr)
+
+        ids, pages = self._collect_pages(reverse('all-attendance'), {'page_size': 4})
+
+        expected = list(
+            Attendance.objects.order_by('-date', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 2)
+
+    def test_cursor_respects_filters(self):
+        """Test filters still apply across pages"""
+        self.client.force_authenticate(user=self.hr)
+
+        ids, _ = self._collect_pages(reverse('all-attendance'), {
+            'page_size': 1,
+            'employee_id': self.employees[0].id
+        })
+
+        self.assertEqual(len(ids), 3)
+
+    def test_exact_count_is_opt_in(self):
+        """Test the total count header is only sent on request"""
+        self.client.force_authenticate(user=self.hr)
+        url = reverse('all-attendance')
+
+        response = self.client.get(url, {'page_size': 2})
+        self.assertNotIn('X-Total-Count', response)
+        # count is the total, never the page length; unknown without a COUNT(*)
+        self.assertIsNone(response.data['count'])
+        self.assertEqual(response.data['page_count'], 2)
+
+        response = self.client.get(url, {'page_size': 2, 'exact_count': 'true'})
+        self.assertEqual(response['X-Total-Count'], '6')
+        self.assertEqual(response.data['count'], 6)
+
+        response = self.client.get(url, {'page_size': 2}, HTTP_X_EXACT_COUNT='true')
+        self.assertEqual(response['X-Total-Count'], '6')
+
+    def test_single_page_count_is_free(self):
+        """Test a result that fits in one page reports its total without a COUNT(*)"""
+        self.client.force_authenticate(user=self.hr)
+
+        response = self.client.get(reverse('all-attendance'))
+
+        self.assertEqual((response.data['count'], response.data['page_count']), (6, 6))
+        self.assertIsNone(response.data['next_cursor'])
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is rejected"""
+        self.client.force_authenticate(user=self.hr)
+
+        response = self.client.get(reverse('all-attendance'), {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_wrong_types(self):
+        """Test cursors that decode but carry the wrong shape or types are rejected"""
+        self.client.force_authenticate(user=self.hr)
+
+        for values in (['soon', 1], [5, 'x'], [['2026-01-01'], 1], ['2026-01-01', None], ['2026-13-45', 1]):
+            cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+            response = self.client.get(reverse('all-attendance'), {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, values)
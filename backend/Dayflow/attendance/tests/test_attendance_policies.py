@@ -0,0 +1,282 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date, time
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+from users.models import User, EmployeeProfile
+from attendance.models import Attendance, Shift, WorkPolicy
+from attendance.ingestion import PunchIngestor
+from attendance.policies import (
+    STANDARD_POLICY, clear_policy_cache, employee_timelines, policy_on, resolve_policy,
+)
+from attendance.recompute import recompute_attendance
+
+
+class WorkPolicyTestCase(APITestCase):
+    """Test shifts, work policies and the cached policy resolver"""
+
+    def setUp(self):
+        clear_policy_cache()
+        # Rolled-back rows send no signals, so never leave a warm cache behind
+        self.addCleanup(clear_policy_cache)
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        self.profile = EmployeeProfile.objects.create(user=self.employee, full_name='Employee', department='Support')
+        self.hr = User.objects.create_user(
+            username='hr',
+            email='hr@example.com',
+            password='pass123',
+            employee_id='HR001',
+            role='HR'
+        )
+        self.early = Shift.objects.create(name='Early', start_time=time(7, 0), end_time=time(15, 0))
+        self.night = Shift.objects.create(
+            name='Night', start_time=time(22, 0), end_time=time(6, 0),
+            workday_hours=Decimal('7.50'), late_grace_minutes=10
+        )
+
+    def assign(self, shift, effective_from=date(2026, 1, 1), **scope):
+        return WorkPolicy.objects.create(shift=shift, effective_from=effective_from, **scope)
+
+    def test_precedence_and_effective_dates(self):
+        """Test employee beats department beats company, within effective dates"""
+        company = Shift.objects.create(name='Office', start_time=time(10, 0), end_time=time(19, 0))
+        self.assign(company)
+        self.assign(self.early, department='support')
+        self.assign(self.night, effective_from=date(2026, 2, 1), effective_to=date(2026, 2, 28), employee=self.employee)
+
+        self.assertIsNone(resolve_policy(self.employee.id, date(2025, 12, 31)).shift_id)
+        self.assertEqual(resolve_policy(self.employee.id, date(2026, 1, 15)).name, 'Early')
+        self.assertEqual(resolve_policy(self.employee.id, date(2026, 2, 28)).name, 'Night')
+        self.assertEqual(resolve_policy(self.employee.id, date(2026, 3, 1)).name, 'Early')
+        self.assertEqual(resolve_policy(self.hr.id, date(2026, 2, 15)).name, 'Office')
+
+    def test_overnight_shift_hours_and_flags(self):
+        """Test overnight shifts give positive hours and honour grace minutes"""
+        self.assign(self.night, employee=self.employee)
+        attendance = Attendance(
+            employee=self.employee, date=date(2026, 1, 5), check_in_time=time(22, 10), check_out_time=time(6, 30)
+        )
+
+        attendance.calculate_working_hours()
+        attendance.check_late_arrival()
+        attendance.check_early_departure()
+
+        self.assertEqual(attendance.working_hours, Decimal('8.33'))
+        self.assertEqual(attendance.overtime_hours, Decimal('0.83'))
+        self.assertFalse(attendance.is_late)
+        self.assertFalse(attendance.is_early_departure)
+        # Past the grace period, and leaving before the shift ends
+        attendance.check_in_time, attendance.check_out_time = time(22, 11), time(5, 0)
+        attendance.check_late_arrival()
+        attendance.check_early_departure()
+        self.assertTrue(attendance.is_late)
+        self.assertTrue(attendance.is_early_departure)
+        # Checking in just after midnight is late for the night that began before it
+        attendance.check_in_time = time(0, 30)
+        attendance.check_late_arrival()
+        self.assertTrue(attendance.is_late)
+
+    def test_warm_cache_resolves_without_queries(self):
+        """Test the hot path costs nothing once an employee's timeline is cached"""
+        self.assign(self.early, department='Support')
+        resolve_policy(self.employee.id, date(2026, 1, 5))
+
+        attendance = Attendance(employee=self.employee, date=date(2026, 1, 6), check_in_time=time(7, 5))
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_policy(self.employee.id, date(2026, 1, 5)).name, 'Early')
+            attendance.check_late_arrival()
+        self.assertTrue(attendance.is_late)
+
+    def test_batch_resolution(self):
+        """Test thousands of employees resolve with one rules and one department query"""
+        self.assign(self.early, department='Support')
+        users = User.objects.bulk_create([
+            User(username=f'bulk{i}', email=f'bulk{i}@example.com', employee_id=f'B{i:04d}')
+            for i in range(2000)
+        ])
+        EmployeeProfile.objects.bulk_create([
+            EmployeeProfile(user=user, full_name=user.username, department='Support' if i % 2 else 'Sales')
+            for i, user in enumerate(users)
+        ])
+        ids = [user.id for user in users]
+
+        with self.assertNumQueries(2):
+            timelines = employee_timelines(ids)
+        with self.assertNumQueries(0):
+            employee_timelines(ids)
+
+        self.assertEqual(policy_on(timelines[ids[1]], date(2026, 1, 5)).name, 'Early')
+        self.assertIs(policy_on(timelines[ids[0]], date(2026, 1, 5)), STANDARD_POLICY)
+
+    def test_signals_invalidate_the_cache(self):
+        """Test policy, shift and department edits are picked up immediately"""
+        policy = self.assign(self.early, department='Support')
+        self.assertEqual(resolve_policy(self.employee.id, date(2026, 1, 5)).name, 'Early')
+
+        self.profile.department = 'Sales'
+        self.profile.save()
+        self.assertIs(resolve_policy(self.employee.id, date(2026, 1, 5)), STANDARD_POLICY)
+
+        policy.department = 'Sales'
+        policy.save()
+        self.assertEqual(resolve_policy(self.employee.id, date(2026, 1, 5)).start_time, time(7, 0))
+
+        self.early.start_time = time(6, 0)
+        self.early.save()
+        self.assertEqual(resolve_policy(self.employee.id, date(2026, 1, 5)).start_time, time(6, 0))
+
+        policy.delete()
+        self.assertIs(resolve_policy(self.employee.id, date(2026, 1, 5)), STANDARD_POLICY)
+
+    def test_cache_expires(self):
+        """Test entries are reloaded after the TTL for edits made by other processes"""
+        resolve_policy(self.employee.id, date(2026, 1, 5))
+        with self.settings(ATTENDANCE_POLICY_CACHE_TTL=60), mock.patch('attendance.policies.clock.monotonic') as now:
+            now.return_value = 10 ** 9
+            with self.assertNumQueries(1):
+                resolve_policy(self.employee.id, date(2026, 1, 5))
+
+    def test_recompute_matches_model_with_policies(self):
+        """Test the batch recompute agrees with the model methods under overnight shifts"""
+        self.assign(self.night, employee=self.employee)
+        rows = [
+            Attendance.objects.create(
+                employee=self.employee, date=day, check_in_time=check_in, check_out_time=check_out, status='PRESENT'
+            )
+            for day, check_in, check_out in [
+                (date(2026, 1, 5), time(22, 0), time(6, 0)),
+                (date(2026, 1, 6), time(22, 15), time(7, 45, 18)),
+                (date(2026, 1, 7), time(0, 5), time(5, 30)),
+                (date(2026, 1, 8), time(21, 50), time(23, 59)),
+            ]
+        ]
+        Attendance.objects.create(
+            employee=self.hr, date=date(2026, 1, 5), check_in_time=time(9, 30), check_out_time=time(18, 0),
+            status='PRESENT'
+        )
+
+        report = recompute_attendance()
+
+        self.assertEqual(report['rows'], 5)
+        for attendance in rows + [Attendance.objects.get(employee=self.hr)]:
+            attendance.refresh_from_db()
+            metrics = (attendance.working_hours, attendance.overtime_hours,
+                       attendance.is_late, attendance.is_early_departure)
+            attendance.calculate_working_hours()
+            attendance.check_late_arrival()
+            attendance.check_early_departure()
+            self.assertEqual(metrics, (attendance.working_hours, attendance.overtime_hours,
+                                       attendance.is_late, attendance.is_early_departure))
+        rows[0].refresh_from_db()
+        self.assertEqual((rows[0].working_hours, rows[0].overtime_hours), (Decimal('8.00'), Decimal('0.50')))
+        self.assertEqual(recompute_attendance()['changed'], 0)
+
+    def test_ingestion_folds_overnight_punches(self):
+        """Test punches after midnight count towards the night that started the day before"""
+        self.assign(self.night, employee=self.employee)
+
+        PunchIngestor().ingest(BytesIO(
+            b'EMP001,2026-01-05 22:05,IN\n'
+            b'EMP001,2026-01-06 02:00,OUT\n'
+            b'EMP001,2026-01-06 02:30,IN\n'
+            b'EMP001,2026-01-06 06:05,OUT\n'
+        ), 'night.csv')
+
+        attendance = Attendance.objects.get(employee=self.employee)
+        self.assertEqual(attendance.date, date(2026, 1, 5))
+        self.assertEqual((attendance.check_in_time, attendance.check_out_time), (time(22, 5), time(6, 5)))
+        self.assertEqual(attendance.working_hours, Decimal('8.00'))
+        self.assertFalse(attendance.is_late)
+
+    def check_in_at(self, day, clock_time):
+        with mock.patch('attendance.views.date') as today, mock.patch('attendance.views.timezone') as clock:
+            today.today.return_value = day
+            clock.now.return_value.time.return_value = clock_time
+            return self.client.post(reverse('check-in'))
+
+    def test_overnight_check_in_after_midnight(self):
+        """Test a check-in after midnight is dated to the night that started the day before"""
+        self.assign(self.night, employee=self.employee)
+        self.client.force_authenticate(user=self.employee)
+
+        late = self.check_in_at(date(2026, 1, 6), time(0, 30))
+        next_night = self.check_in_at(date(2026, 1, 6), time(22, 0))
+
+        self.assertEqual(late.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(late.data['attendance']['date'], '2026-01-05')
+        self.assertTrue(late.data['attendance']['is_late'])
+        self.assertEqual(next_night.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(next_night.data['attendance']['date'], '2026-01-06')
+        self.assertFalse(next_night.data['attendance']['is_late'])
+
+    def test_overnight_check_out(self):
+        """Test checking out after midnight closes the previous night's record"""
+        self.assign(self.night, employee=self.employee)
+        Attendance.objects.create(
+            employee=self.employee, date=date(2026, 1, 5), check_in_time=time(22, 0), status='PRESENT'
+        )
+        self.client.force_authenticate(user=self.employee)
+
+        with mock.patch('attendance.views.date') as today, mock.patch('attendance.views.timezone') as clock:
+            today.today.return_value = date(2026, 1, 6)
+            clock.now.return_value.time.return_value = time(6, 15)
+            response = self.client.post(reverse('check-out'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['attendance']['date'], '2026-01-05')
+        self.assertEqual(response.data['attendance']['working_hours'], '8.25')
+
+    def test_shift_and_policy_endpoints(self):
+        """Test HR manages shifts and policies and employees see their own"""
+        self.client.force_authenticate(user=self.hr)
+        response = self.client.post(reverse('shift-list'), {
+            'name': 'Late', 'start_time': '14:00', 'end_time': '23:00', 'late_grace_minutes': 5
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        shift_id = response.data['shift']['id']
+
+        response = self.client.post(reverse('work-policy-list'), {
+            'shift': shift_id, 'employee': self.employee.id, 'effective_from': '2026-01-01'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['policy']['scope'], 'EMPLOYEE')
+        listed = self.client.get(reverse('work-policy-list'), {'employee_id': self.employee.id})
+        self.assertEqual(listed.data['count'], 1)
+
+        protected = self.client.delete(reverse('shift-detail', args=[shift_id]))
+        self.assertEqual(protected.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=self.employee)
+        mine = self.client.get(reverse('my-work-policy'), {'date': '2026-01-05'})
+        self.assertEqual(mine.status_code, status.HTTP_200_OK)
+        self.assertEqual((mine.data['name'], mine.data['start_time']), ('Late', time(14, 0)))
+        forbidden = self.client.get(reverse('shift-list'))
+        self.assertEqual(forbidden.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_endpoint_validation(self):
+        """Test zero-length shifts, double scopes and reversed dates are rejected"""
+        self.client.force_authenticate(user=self.hr)
+        zero = self.client.post(reverse('shift-list'), {
+            'name': 'Zero', 'start_time': '09:00', 'end_time': '09:00'
+        }, format='json')
+        both = self.client.post(reverse('work-policy-list'), {
+            'shift': self.early.id, 'employee': self.employee.id, 'department': 'Support',
+            'effective_from': '2026-01-01'
+        }, format='json')
+        reversed_dates = self.client.post(reverse('work-policy-list'), {
+            'shift': self.early.id, 'effective_from': '2026-02-01', 'effective_to': '2026-01-01'
+        }, format='json')
+        bad_date = self.client.get(reverse('my-work-policy'), {'date': 'tomorrow'})
+
+        self.assertEqual(zero.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(both.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(reversed_dates.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(bad_date.status_code, status.HTTP_400_BAD_REQUEST)
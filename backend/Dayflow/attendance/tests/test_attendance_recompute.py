@@ -0,0 +1,176 @@
+from django.urls import reverse
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import StringIO
+from users.models import User, EmployeeProfile
+from attendance.models import Attendance, DailyAttendanceRollup
+from attendance.policies import clear_policy_cache
+from attendance.recompute import recompute_attendance
+from attendance.rollups import rebuild_rollups
+
+
+class AttendanceRecomputeTestCase(APITestCase):
+    """Test vectorized batch recompute of attendance metrics"""
+
+    def setUp(self):
+        clear_policy_cache()
+        self.addCleanup(clear_policy_cache)
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        EmployeeProfile.objects.create(user=self.employee, full_name='Employee', department='Engineering')
+        self.hr = User.objects.create_user(
+            username='hr',
+            email='hr@example.com',
+            password='pass123',
+            employee_id='HR001',
+            role='HR'
+        )
+
+    def row(self, day, check_in=None, check_out=None, **stored):
+        return Attendance.objects.create(
+            employee=self.employee, date=day, check_in_time=check_in, check_out_time=check_out,
+            status='PRESENT', **stored
+        )
+
+    def expected(self, attendance):
+        """Metrics the per-row model methods produce for the same times"""
+        attendance.calculate_working_hours()
+        attendance.check_late_arrival()
+        attendance.check_early_departure()
+        return (attendance.working_hours, attendance.overtime_hours, attendance.is_late, attendance.is_early_departure)
+
+    def metrics(self, attendance):
+        attendance.refresh_from_db()
+        return (attendance.working_hours, attendance.overtime_hours, attendance.is_late, attendance.is_early_departure)
+
+    def test_matches_model_methods(self):
+        """Test the array path agrees with the per-row methods, including rounding"""
+        rows = [
+            self.row(date(2026, 1, 5), time(9, 0), time(19, 30)),
+            self.row(date(2026, 1, 6), time(9, 0, 0, 1), time(17, 59, 59, 999999)),
+            # 18 seconds is exactly half a hundredth of an hour
+            self.row(date(2026, 1, 7), time(8, 0), time(16, 0, 18)),
+            self.row(date(2026, 1, 8), time(8, 30, 12, 345678), time(18, 0, 0)),
+        ]
+
+        report = recompute_attendance(date(2026, 1, 1), date(2026, 1, 31), chunk_size=3)
+
+        self.assertEqual(report['rows'], 4)
+        self.assertEqual(report['changed'], 4)
+        for attendance in rows:
+            expected = self.expected(Attendance.objects.get(pk=attendance.pk))
+            self.assertEqual(self.metrics(attendance), expected)
+        self.assertEqual(self.metrics(rows[0]), (Decimal('10.50'), Decimal('2.50'), False, False))
+        self.assertEqual(self.metrics(rows[1])[2:], (True, True))
+        # A second pass finds nothing to write
+        self.assertEqual(recompute_attendance(date(2026, 1, 1), date(2026, 1, 31))['changed'], 0)
+
+    def test_partial_rows_keep_stored_values(self):
+        """Test hours stay as stored without both times and flags without their time"""
+        open_day = self.row(
+            date(2026, 1, 5), time(10, 0), None,
+            working_hours=Decimal('3.00'), is_early_departure=True
+        )
+        blank = self.row(date(2026, 1, 6), is_late=True)
+
+        report = recompute_attendance()
+
+        self.assertEqual(report['fields']['is_late'], 1)
+        self.assertEqual(report['fields']['working_hours'], 0)
+        self.assertEqual(self.metrics(open_day), (Decimal('3.00'), Decimal('0.00'), True, True))
+        self.assertEqual(self.metrics(blank), (None, Decimal('0.00'), True, False))
+
+    def test_only_changed_rows_are_written(self):
+        """Test untouched rows are skipped and rollups follow late flags"""
+        fixed = self.row(date(2026, 1, 5), time(9, 30), time(18, 0))
+        fixed.calculate_working_hours()
+        fixed.check_late_arrival()
+        fixed.check_early_departure()
+        fixed.save()
+        stale = self.row(date(2026, 1, 6), time(9, 30), time(18, 0))
+        rebuild_rollups()
+
+        with self.assertNumQueries(8):
+            # chunk, savepoint pair around the UPDATE (rows carry their
+            # rollup department), savepoint pair around the rollup get_or_create and update;
+            # the model calls above already cached the work policy
+            report = recompute_attendance(chunk_size=10)
+
+        self.assertEqual(report['changed'], 1)
+        self.assertEqual(self.metrics(stale)[2], True)
+        rollup = DailyAttendanceRollup.objects.get(date=date(2026, 1, 6), department='Engineering')
+        self.assertEqual(rollup.late_count, 1)
+
+    def test_filters_and_dry_run(self):
+        """Test date and department filters and that dry runs write nothing"""
+        inside = self.row(date(2026, 1, 5), time(9, 30), time(18, 0))
+        outside = self.row(date(2026, 2, 5), time(9, 30), time(18, 0))
+
+        dry = recompute_attendance(date(2026, 1, 1), date(2026, 1, 31), dry_run=True)
+        other_department = recompute_attendance(department='Sales')
+        report = recompute_attendance(date(2026, 1, 1), date(2026, 1, 31), department='engineering')
+
+        self.assertEqual((dry['rows'], dry['changed']), (1, 1))
+        self.assertEqual(other_department['rows'], 0)
+        self.assertEqual(report['changed'], 1)
+        self.assertTrue(self.metrics(inside)[2])
+        self.assertFalse(self.metrics(outside)[2])
+
+    def test_recompute_endpoint(self):
+        """Test HR recomputes a range over the API"""
+        self.row(date(2026, 1, 5), time(9, 30), time(18, 0))
+        self.client.force_authenticate(user=self.hr)
+
+        response = self.client.post(reverse('recompute-attendance'), {
+            'from_date': '2026-01-01', 'to_date': '2026-01-31', 'dry_run': True
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['report']['changed'], 1)
+        self.assertTrue(response.data['report']['dry_run'])
+
+        response = self.client.post(reverse('recompute-attendance'), {
+            'from_date': '2026-01-01', 'to_date': '2026-01-31', 'employee_id': self.employee.id
+        }, format='json')
+        self.assertEqual(response.data['report']['fields']['is_late'], 1)
+        self.assertTrue(Attendance.objects.get().is_late)
+
+    def test_recompute_endpoint_validation(self):
+        """Test the endpoint needs an ordered date range and HR access"""
+        self.client.force_authenticate(user=self.hr)
+        missing = self.client.post(reverse('recompute-attendance'), {'from_date': '2026-01-01'}, format='json')
+        invalid = self.client.post(reverse('recompute-attendance'), {
+            'from_date': '2026-01-31', 'to_date': 'soon'
+        }, format='json')
+        reversed_range = self.client.post(reverse('recompute-attendance'), {
+            'from_date': '2026-01-31', 'to_date': '2026-01-01'
+        }, format='json')
+        bad_employee = self.client.post(reverse('recompute-attendance'), {
+            'from_date': '2026-01-01', 'to_date': '2026-01-31', 'employee_id': 'abc'
+        }, format='json')
+        self.client.force_authenticate(user=self.employee)
+        forbidden = self.client.post(reverse('recompute-attendance'), {}, format='json')
+
+        self.assertEqual(missing.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(reversed_range.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(bad_employee.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(forbidden.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_management_command(self):
+        """Test the command recomputes and reports per-field changes"""
+        today = date.today()
+        self.row(today - timedelta(days=1), time(9, 30), time(17, 0))
+        out = StringIO()
+
+        call_command('recompute_attendance', '--from', str(today - timedelta(days=7)), stdout=out)
+
+        self.assertIn('Updated 1 of 1 attendance row(s)', out.getvalue())
+        self.assertIn('is_early_departure: 1', out.getvalue())
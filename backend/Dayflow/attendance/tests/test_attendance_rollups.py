@@ -0,0 +1,169 @@
+from django.urls import reverse
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date, time, timedelta
+from io import StringIO
+from users.models import User, EmployeeProfile
+from attendance.models import Attendance, AttendanceRegularization, DailyAttendanceRollup
+from attendance.rollups import rebuild_rollups
+
+
+class AttendanceRollupTestCase(APITestCase):
+    """Test incremental daily attendance rollups"""
+
+    def setUp(self):
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        EmployeeProfile.objects.create(user=self.employee, full_name='Employee', department='Engineering')
+
+        self.hr = User.objects.create_user(
+            username='hr',
+            email='hr@example.com',
+            password='pass123',
+            employee_id='HR001',
+            role='HR'
+        )
+
+    def rollup(self, day, department='Engineering'):
+        return DailyAttendanceRollup.objects.get(date=day, department=department)
+
+    def test_check_in_updates_rollup(self):
+        """Test check-in counts the employee as present"""
+        self.client.force_authenticate(user=self.employee)
+
+        response = self.client.post(reverse('check-in'))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        rollup = self.rollup(date.today())
+        self.assertEqual(rollup.present_count, 1)
+        self.assertEqual(rollup.late_count, 1 if response.data['attendance']['is_late'] else 0)
+
+    def test_status_edit_moves_count(self):
+        """Test editing status moves the row between buckets"""
+        attendance = Attendance.objects.create(employee=self.employee, date=date(2026, 1, 5), status='ABSENT')
+        rebuild_rollups()
+        self.client.force_authenticate(user=self.hr)
+
+        response = self.client.put(
+            reverse('attendance-detail', args=[attendance.id]), {'status': 'HALF_DAY'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rollup = self.rollup(date(2026, 1, 5))
+        self.assertEqual(rollup.absent_count, 0)
+        self.assertEqual(rollup.half_day_count, 1)
+
+    def test_delete_decrements_rollup(self):
+        """Test deleting attendance removes it from the rollup"""
+        attendance = Attendance.objects.create(employee=self.employee, date=date(2026, 1, 5), status='PRESENT')
+        rebuild_rollups()
+        self.client.force_authenticate(user=self.hr)
+
+        self.client.delete(reverse('attendance-detail', args=[attendance.id]))
+
+        self.assertEqual(self.rollup(date(2026, 1, 5)).present_count, 0)
+
+    def test_approved_regularization_updates_rollup(self):
+        """Test approving a regularization for a missing day adds it"""
+        regularization = AttendanceRegularization.objects.create(
+            employee=self.employee,
+            date=date(2026, 1, 6),
+            requested_check_in=time(9, 0),
+            requested_check_out=time(18, 0),
+            reason='Forgot to check in'
+        )
+        self.client.force_authenticate(user=self.hr)
+
+        self.client.post(reverse('regularization-approval', args=[regularization.id]), {'action': 'approve'})
+
+        self.assertEqual(self.rollup(date(2026, 1, 6)).present_count, 1)
+
+    def test_rebuild_matches_incremental(self):
+        """Test rebuilding from scratch groups by date and department"""
+        other = User.objects.create_user(
+            username='other', email='other@example.com', password='pass123', employee_id='EMP002'
+        )
+        day = date(2026, 1, 7)
+        Attendance.objects.create(employee=self.employee, date=day, status='PRESENT', is_late=True)
+        Attendance.objects.create(employee=other, date=day, status='LEAVE')
+
+        out = StringIO()
+        call_command('rebuild_attendance_rollups', '--from', '2026-01-01', stdout=out)
+
+        self.assertIn('Rebuilt 2', out.getvalue())
+        self.assertEqual(self.rollup(day).late_count, 1)
+        self.assertEqual(self.rollup(day, department='').leave_count, 1)
+
+    def test_department_change_keeps_past_rows(self):
+        """Test editing a row after a transfer adjusts the department it was counted under"""
+        day = date(2026, 1, 8)
+        attendance = Attendance.objects.create(employee=self.employee, date=day, status='PRESENT')
+        rebuild_rollups()
+        EmployeeProfile.objects.filter(user=self.employee).update(department='Sales')
+        self.client.force_authenticate(user=self.hr)
+
+        self.client.put(reverse('attendance-detail', args=[attendance.id]), {'status': 'ABSENT'})
+
+        rollup = self.rollup(day)
+        self.assertEqual((rollup.present_count, rollup.absent_count), (0, 1))
+        self.assertFalse(DailyAttendanceRollup.objects.filter(department='Sales').exists())
+
+        rebuild_rollups()
+        rollup = self.rollup(day)
+        self.assertEqual((rollup.present_count, rollup.absent_count), (0, 1))
+        self.assertFalse(DailyAttendanceRollup.objects.filter(department='Sales').exists())
+
+    def test_admin_edits_update_rollup(self):
+        """Test changing and deleting attendance in the admin keeps rollups in step"""
+        admin_user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass123', employee_id='ADM001'
+        )
+        day = date(2026, 1, 9)
+        attendance = Attendance.objects.create(employee=self.employee, date=day, status='PRESENT')
+        rebuild_rollups()
+        self.client.force_login(admin_user)
+
+        response = self.client.post(reverse('admin:attendance_attendance_change', args=[attendance.id]), {
+            'check_in_time': '', 'check_out_time': '', 'status': 'LEAVE',
+        })
+
+        self.assertEqual(response.status_code, 302)
+        rollup = self.rollup(day)
+        self.assertEqual((rollup.present_count, rollup.leave_count), (0, 1))
+
+        self.client.post(reverse('admin:attendance_attendance_delete', args=[attendance.id]), {'post': 'yes'})
+
+        self.assertFalse(Attendance.objects.exists())
+        self.assertEqual(self.rollup(day).leave_count, 0)
+
+    def test_hr_dashboard_reads_rollup(self):
+        """Test HR dashboard counts come from the rollup table"""
+        DailyAttendanceRollup.objects.create(date=date.today(), department='Engineering', present_count=3, absent_count=1)
+        DailyAttendanceRollup.objects.create(date=date.today(), department='Sales', present_count=2, late_count=1)
+        self.client.force_authenticate(user=self.hr)
+
+        response = self.client.get(reverse('hr-dashboard'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['attendance']['present'], 5)
+        self.assertEqual(response.data['attendance']['absent'], 1)
+        self.assertEqual(response.data['attendance']['late'], 1)
+
+    def test_attendance_trend(self):
+        """Test trend endpoint returns one row per day"""
+        yesterday = date.today() - timedelta(days=1)
+        DailyAttendanceRollup.objects.create(date=yesterday, department='Engineering', present_count=4)
+        self.client.force_authenticate(user=self.hr)
+
+        response = self.client.get(reverse('attendance-trend'), {'days': 7, 'department': 'engineering'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['trend']), 7)
+        self.assertEqual(response.data['trend'][-2]['present_count'], 4)
+        self.assertEqual(response.data['trend'][-1]['present_count'], 0)
@@ -0,0 +1,128 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date
+from decimal import Decimal
+from users.models import User, EmployeeProfile
+from attendance.models import Attendance
+from attendance.services import summarize_monthly_attendance
+
+
+class AttendanceSummaryTestCase(APITestCase):
+    """Test single-query monthly attendance summaries"""
+
+    def setUp(self):
+        self.hr = User.objects.create_user(
+            username='hr',
+            email='hr@example.com',
+            password='pass123',
+            employee_id='HR001',
+            role='HR'
+        )
+
+        self.employees = []
+        for i in range(3):
+            employee = User.objects.create_user(
+                username=f'employee{i}',
+                email=f'employee{i}@example.com',
+                password='pass123',
+                employee_id=f'EMP00{i}',
+                role='EMPLOYEE'
+            )
+            EmployeeProfile.objects.create(
+                user=employee,
+                full_name=f'Employee {i}',
+                department='Engineering' if i < 2 else 'Sales'
+            )
+            self.employees.append(employee)
+
+        first = self.employees[0]
+        Attendance.objects.create(employee=first, date=date(2026, 1, 5), status='PRESENT',
+                                  is_late=True, working_hours=Decimal('9.5'),
+                                  overtime_hours=Decimal('1.5'))
+        Attendance.objects.create(employee=first, date=date(2026, 1, 6), status='HALF_DAY',
+                                  is_early_departure=True, working_hours=Decimal('4'))
+        Attendance.objects.create(employee=first, date=date(2026, 1, 7), status='LEAVE')
+        Attendance.objects.create(employee=first, date=date(2026, 1, 8), status='ABSENT')
+        # Outside the month
+        Attendance.objects.create(employee=first, date=date(2026, 2, 1), status='PRESENT')
+        Attendance.objects.create(employee=self.employees[1], date=date(2026, 1, 31),
+                                  status='PRESENT', working_hours=Decimal('8'))
+
+    def test_summaries_for_many_employees_in_one_query(self):
+        """Test every metric comes from one conditional aggregation"""
+        ids = [e.id for e in self.employees]
+
+        with self.assertNumQueries(1):
+            summaries = summarize_monthly_attendance(ids, 2026, 1)
+
+        first = summaries[self.employees[0].id]
+        self.assertEqual(first['total_days'], 4)
+        self.assertEqual(first['present_days'], 1)
+        self.assertEqual(first['absent_days'], 1)
+        self.assertEqual(first['half_days'], 1)
+        self.assertEqual(first['leaves'], 1)
+        self.assertEqual(first['late_arrivals'], 1)
+        self.assertEqual(first['early_departures'], 1)
+        self.assertEqual(first['total_working_hours'], 13.5)
+        self.assertEqual(first['total_overtime_hours'], 1.5)
+
+        self.assertEqual(summaries[self.employees[1].id]['total_days'], 1)
+        # No rows in the month still yields a summary
+        self.assertEqual(summaries[self.employees[2].id]['total_days'], 0)
+
+    def test_monthly_summary_endpoint_shape(self):
+        """Test the per-user endpoint still returns the same summary keys"""
+        self.client.force_authenticate(user=self.employees[0])
+
+        response = self.client.get(reverse('monthly-summary'), {'month': 1, 'year': 2026})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['summary']['total_days'], 4)
+        self.assertEqual(response.data['summary']['total_working_hours'], 13.5)
+
+    def test_team_summary_by_department(self):
+        """Test HR can fetch a whole department's summaries at once"""
+        self.client.force_authenticate(user=self.hr)
+
+        response = self.client.get(reverse('team-monthly-summary'), {
+            'month': 1,
+            'year': 2026,
+            'department': 'engineering'
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        totals = {s['employee']: s['summary']['total_days'] for s in response.data['summaries']}
+        self.assertEqual(totals, {self.employees[0].id: 4, self.employees[1].id: 1})
+
+    def test_team_summary_by_employee_ids(self):
+        """Test HR can request specific employees"""
+        self.client.force_authenticate(user=self.hr)
+
+        response = self.client.get(reverse('team-monthly-summary'), {
+            'month': 1,
+            'year': 2026,
+            'employee_ids': f'{self.employees[1].id},{self.employees[2].id}'
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_employee_cannot_view_team_summary(self):
+        """Test team summaries are HR-only"""
+        self.client.force_authenticate(user=self.employees[0])
+
+        response = self.client.get(reverse('team-monthly-summary'))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_invalid_month_or_year_is_rejected(self):
+        """Test out-of-range or non-numeric months and years return 400, not 500"""
+        for url, user in ((reverse('monthly-summary'), self.employees[0]), (reverse('team-monthly-summary'), self.hr)):
+            self.client.force_authenticate(user=user)
+            for params in ({'month': 13, 'year': 2026}, {'month': 0, 'year': 2026},
+                           {'month': 'jan', 'year': 2026}, {'month': 1, 'year': 0}):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, (url, params))
+                self.assertIn('error', response.data)
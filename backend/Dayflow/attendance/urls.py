@@ -4,8 +4,17 @@ from .views import (
     CheckOutView,
     MyAttendanceView,
     AllAttendanceView,
+    AttendanceExportView,
+    AttendanceIngestView,
+    AttendanceRecomputeView,
+    ShiftListView,
+    ShiftDetailView,
+    WorkPolicyListView,
+    WorkPolicyDetailView,
+    MyWorkPolicyView,
     AttendanceDetailView,
     MonthlyAttendanceSummaryView,
+    TeamAttendanceSummaryView,
     RegularizationRequestView,
     MyRegularizationsView,
     AllRegularizationsView,
@@ -17,9 +26,20 @@ urlpatterns = [
     path('check-out/', CheckOutView.as_view(), name='check-out'),
     path('my-attendance/', MyAttendanceView.as_view(), name='my-attendance'),
     path('monthly-summary/', MonthlyAttendanceSummaryView.as_view(), name='monthly-summary'),
+    path('monthly-summary/team/', TeamAttendanceSummaryView.as_view(), name='team-monthly-summary'),
     path('all/', AllAttendanceView.as_view(), name='all-attendance'),
+    path('export/', AttendanceExportView.as_view(), name='export-attendance'),
+    path('ingest/', AttendanceIngestView.as_view(), name='ingest-attendance'),
+    path('recompute/', AttendanceRecomputeView.as_view(), name='recompute-attendance'),
     path('<int:pk>/', AttendanceDetailView.as_view(), name='attendance-detail'),
     
+    # Shift and work policy endpoints
+    path('shifts/', ShiftListView.as_view(), name='shift-list'),
+    path('shifts/<int:pk>/', ShiftDetailView.as_view(), name='shift-detail'),
+    path('policies/', WorkPolicyListView.as_view(), name='work-policy-list'),
+    path('policies/my/', MyWorkPolicyView.as_view(), name='my-work-policy'),
+    path('policies/<int:pk>/', WorkPolicyDetailView.as_view(), name='work-policy-detail'),
+    
     # Regularization endpoints
     path('regularization/request/', RegularizationRequestView.as_view(), name='regularization-request'),
     path('regularization/my-requests/', MyRegularizationsView.as_view(), name='my-regularizations'),
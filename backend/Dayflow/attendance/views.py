@@ -2,12 +2,23 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import MultiPartParser
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Sum, Count, Q
-from datetime import date, time, datetime
-from .models import Attendance, AttendanceRegularization
-from .serializers import AttendanceSerializer, AttendanceRegularizationSerializer
+from django.db.models import ProtectedError
+from datetime import MAXYEAR, MINYEAR, date, datetime, timedelta
+from .models import Attendance, AttendanceRegularization, Shift, WorkPolicy
+from .serializers import (
+    AttendanceSerializer, AttendanceRegularizationSerializer, ShiftSerializer, WorkPolicySerializer,
+)
+from .services import summarize_monthly_attendance, filter_attendance
+from .rollups import rollup_state, apply_rollup_change
+from .ingestion import PunchIngestor
+from .recompute import recompute_attendance
+from .policies import employee_timelines, resolve_policy, shift_day
+from users.models import User
+from Dayflow.pagination import KeysetPagination
+from Dayflow.exports import export_response
 from users.permissions import IsAdminOrHR, CanModifyAttendance
 
 
@@ -20,10 +31,15 @@ class CheckInView(APIView):
         if not user or not user.is_authenticated:
             return Response({'error': 'Authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
         
-        today = date.today()
+        check_in_time = timezone.now().time()
+        # After midnight on an overnight shift the check-in belongs to the
+        # night that started the day before, as for ingested punches
+        shift_date, policy = shift_day(
+            employee_timelines([user.id])[user.id], datetime.combine(date.today(), check_in_time)
+        )
         
         # Check if already checked in today
-        if Attendance.objects.filter(employee=user, date=today).exists():
+        if Attendance.objects.filter(employee=user, date=shift_date).exists():
             return Response({
                 'error': 'Already checked in today'
             }, status=status.HTTP_400_BAD_REQUEST)
@@ -31,15 +47,17 @@ class CheckInView(APIView):
         # Create attendance record
         attendance = Attendance.objects.create(
             employee=user,
-            date=today,
-            check_in_time=timezone.now().time(),
+            date=shift_date,
+            check_in_time=check_in_time,
             status='PRESENT'
         )
         
         # Check if late arrival
-        attendance.check_late_arrival()
+        attendance.check_late_arrival(policy)
         attendance.save()
         
+        apply_rollup_change(None, rollup_state(attendance))
+        
         serializer = AttendanceSerializer(attendance)
         return Response({
             'message': 'Checked in successfully',
@@ -58,31 +76,45 @@ class CheckOutView(APIView):
         
         today = date.today()
         
-        try:
-            attendance = Attendance.objects.get(employee=user, date=today)
-            
-            if attendance.check_out_time:
-                return Response({
-                    'error': 'Already checked out today'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            attendance.check_out_time = timezone.now().time()
-            
-            # Calculate working hours and check early departure
-            attendance.calculate_working_hours()
-            attendance.check_early_departure()
-            attendance.save()
-            
-            serializer = AttendanceSerializer(attendance)
-            return Response({
-                'message': 'Checked out successfully',
-                'attendance': serializer.data
-            }, status=status.HTTP_200_OK)
-            
-        except Attendance.DoesNotExist:
+        attendance = Attendance.objects.filter(employee=user, date=today).first()
+        if attendance is None:
+            attendance = self.open_overnight_attendance(user, today)
+        if attendance is None:
             return Response({
                 'error': 'No check-in record found for today'
             }, status=status.HTTP_404_NOT_FOUND)
+        
+        if attendance.check_out_time:
+            return Response({
+                'error': 'Already checked out today'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        before = rollup_state(attendance)
+        attendance.check_out_time = timezone.now().time()
+        
+        # Calculate working hours and check early departure
+        policy = attendance.work_policy()
+        attendance.calculate_working_hours(policy)
+        attendance.check_early_departure(policy)
+        attendance.save()
+        
+        apply_rollup_change(before, rollup_state(attendance))
+        
+        serializer = AttendanceSerializer(attendance)
+        return Response({
+            'message': 'Checked out successfully',
+            'attendance': serializer.data
+        }, status=status.HTTP_200_OK)
+    
+    @staticmethod
+    def open_overnight_attendance(user, today):
+        """Yesterday's still-open row when yesterday's shift ran past midnight"""
+        yesterday = today - timedelta(days=1)
+        if not resolve_policy(user.id, yesterday).overnight:
+            return None
+        return Attendance.objects.filter(
+            employee=user, date=yesterday, check_in_time__isnull=False, check_out_time__isnull=True
+        ).first()
 
 
 class MyAttendanceView(APIView):
@@ -108,11 +140,10 @@ class MyAttendanceView(APIView):
         if status_filter:
             attendances = attendances.filter(status=status_filter.upper())
         
-        serializer = AttendanceSerializer(attendances, many=True)
-        return Response({
-            'count': attendances.count(),
-            'attendance': serializer.data
-        }, status=status.HTTP_200_OK)
+        paginator = KeysetPagination(ordering=('-date', '-id'))
+        page = paginator.paginate_queryset(attendances, request)
+        serializer = AttendanceSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data, 'attendance')
 
 
 class AllAttendanceView(APIView):
@@ -120,27 +151,247 @@ class AllAttendanceView(APIView):
     permission_classes = [IsAdminOrHR]
     
     def get(self, request):
-        # Filter parameters
-        employee_id = request.query_params.get('employee_id', None)
-        from_date = request.query_params.get('from_date', None)
-        to_date = request.query_params.get('to_date', None)
-        status_filter = request.query_params.get('status', None)
+        attendances = filter_attendance(Attendance.objects.select_related('employee'), request.query_params)
         
-        attendances = Attendance.objects.select_related('employee').all()
+        paginator = KeysetPagination(ordering=('-date', '-id'))
+        page = paginator.paginate_queryset(attendances, request)
+        serializer = AttendanceSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data, 'attendance')
+
+
+class AttendanceExportView(APIView):
+    """Stream attendance records as CSV or NDJSON (Admin/HR/Manager)"""
+    permission_classes = [IsAdminOrHR]
+    
+    columns = [
+        ('id', 'id'),
+        ('employee', 'employee_id'),
+        ('employee_id', 'employee__employee_id'),
+        ('employee_name', 'employee__username'),
+        ('date', 'date'),
+        ('check_in_time', 'check_in_time'),
+        ('check_out_time', 'check_out_time'),
+        ('status', 'status'),
+        ('is_late', 'is_late'),
+        ('is_early_departure', 'is_early_departure'),
+        ('working_hours', 'working_hours'),
+        ('overtime_hours', 'overtime_hours'),
+        ('notes', 'notes'),
+    ]
+    
+    def get(self, request):
+        try:
+            attendances = filter_attendance(Attendance.objects.all(), request.query_params)
+            return export_response(request, attendances.order_by('-date', '-id'), self.columns, 'attendance')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AttendanceIngestView(APIView):
+    """Bulk-load door controller / biometric punch logs (Admin/HR/Manager)"""
+    permission_classes = [IsAdminOrHR]
+    parser_classes = [MultiPartParser]
+    
+    def post(self, request):
+        uploads = request.FILES.getlist('file')
+        if not uploads:
+            return Response({
+                'error': 'Upload one or more punch files in the "file" field'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
+        ingestor = PunchIngestor()
+        reports = [ingestor.ingest(upload, upload.name) for upload in uploads]
+        
+        totals = {
+            field: sum(report[field] for report in reports)
+            for field in ('lines', 'punches', 'rejected', 'employee_days', 'created', 'updated')
+        }
+        return Response({
+            'message': f"Ingested {totals['punches']} punch(es) into {totals['employee_days']} attendance row(s)",
+            'totals': totals,
+            'files': reports
+        }, status=status.HTTP_200_OK)
+
+
+class AttendanceRecomputeView(APIView):
+    """Recompute hours, overtime and late/early flags over a date range (Admin/HR/Manager)"""
+    permission_classes = [IsAdminOrHR]
+    
+    def post(self, request):
+        try:
+            start = self.parse_date(request.data.get('from_date'))
+            end = self.parse_date(request.data.get('to_date'))
+        except ValueError:
+            return Response({
+                'error': 'from_date and to_date must be YYYY-MM-DD'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if not start or not end:
+            return Response({
+                'error': 'from_date and to_date are required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if start > end:
+            return Response({
+                'error': 'from_date must not be after to_date'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        employee_id = request.data.get('employee_id')
         if employee_id:
-            attendances = attendances.filter(employee__id=employee_id)
-        if from_date:
-            attendances = attendances.filter(date__gte=from_date)
-        if to_date:
-            attendances = attendances.filter(date__lte=to_date)
-        if status_filter:
-            attendances = attendances.filter(status=status_filter.upper())
+            try:
+                employee_id = int(employee_id)
+            except (TypeError, ValueError):
+                return Response({
+                    'error': 'employee_id must be an id'
+                }, status=status.HTTP_400_BAD_REQUEST)
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        report = recompute_attendance(
+            start, end,
+            employee_ids=[employee_id] if employee_id else None,
+            department=request.data.get('department') or None,
+            dry_run=dry_run,
+        )
         
-        serializer = AttendanceSerializer(attendances, many=True)
+        verb = 'Would update' if dry_run else 'Updated'
         return Response({
-            'count': attendances.count(),
-            'attendance': serializer.data
+            'message': f"{verb} {report['changed']} of {report['rows']} attendance row(s)",
+            'report': report
+        }, status=status.HTTP_200_OK)
+    
+    @staticmethod
+    def parse_date(value):
+        if not value:
+            return None
+        return date.fromisoformat(str(value))
+
+
+class ShiftListView(APIView):
+    """List and create shifts (Admin/HR only)"""
+    permission_classes = [IsAdminOrHR]
+    
+    def get(self, request):
+        shifts = Shift.objects.all()
+        serializer = ShiftSerializer(shifts, many=True)
+        return Response({
+            'count': len(serializer.data),
+            'shifts': serializer.data
+        }, status=status.HTTP_200_OK)
+    
+    def post(self, request):
+        serializer = ShiftSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response({
+                'message': 'Shift created successfully',
+                'shift': serializer.data
+            }, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ShiftDetailView(APIView):
+    """Get, update, or delete a shift (Admin/HR only)"""
+    permission_classes = [IsAdminOrHR]
+    
+    def get(self, request, pk):
+        shift = get_object_or_404(Shift, pk=pk)
+        return Response(ShiftSerializer(shift).data, status=status.HTTP_200_OK)
+    
+    def put(self, request, pk):
+        shift = get_object_or_404(Shift, pk=pk)
+        serializer = ShiftSerializer(shift, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response({
+                'message': 'Shift updated successfully',
+                'shift': serializer.data
+            }, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    def delete(self, request, pk):
+        shift = get_object_or_404(Shift, pk=pk)
+        try:
+            shift.delete()
+        except ProtectedError:
+            return Response({
+                'error': 'Shift is assigned by work policies; remove them first'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'message': 'Shift deleted successfully'
+        }, status=status.HTTP_204_NO_CONTENT)
+
+
+class WorkPolicyListView(APIView):
+    """List and create work policies (Admin/HR only)"""
+    permission_classes = [IsAdminOrHR]
+    
+    def get(self, request):
+        policies = WorkPolicy.objects.all()
+        
+        employee_id = request.query_params.get('employee_id')
+        department = request.query_params.get('department')
+        if employee_id:
+            policies = policies.filter(employee_id=employee_id)
+        if department:
+            policies = policies.filter(department__iexact=department)
+        
+        serializer = WorkPolicySerializer(policies, many=True)
+        return Response({
+            'count': len(serializer.data),
+            'policies': serializer.data
+        }, status=status.HTTP_200_OK)
+    
+    def post(self, request):
+        serializer = WorkPolicySerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response({
+                'message': 'Work policy created successfully',
+                'policy': serializer.data
+            }, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class WorkPolicyDetailView(APIView):
+    """Get, update, or delete a work policy (Admin/HR only)"""
+    permission_classes = [IsAdminOrHR]
+    
+    def get(self, request, pk):
+        policy = get_object_or_404(WorkPolicy, pk=pk)
+        return Response(WorkPolicySerializer(policy).data, status=status.HTTP_200_OK)
+    
+    def put(self, request, pk):
+        policy = get_object_or_404(WorkPolicy, pk=pk)
+        serializer = WorkPolicySerializer(policy, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response({
+                'message': 'Work policy updated successfully',
+                'policy': serializer.data
+            }, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    def delete(self, request, pk):
+        policy = get_object_or_404(WorkPolicy, pk=pk)
+        policy.delete()
+        return Response({
+            'message': 'Work policy deleted successfully'
+        }, status=status.HTTP_204_NO_CONTENT)
+
+
+class MyWorkPolicyView(APIView):
+    """Get the shift that applies to the current user on a date (default today)"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        try:
+            day = date.fromisoformat(request.query_params.get('date') or date.today().isoformat())
+        except ValueError:
+            return Response({
+                'error': 'date must be YYYY-MM-DD'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        policy = resolve_policy(request.user.id, day)
+        return Response({
+            'date': day,
+            **policy.as_dict()
         }, status=status.HTTP_200_OK)
 
 
@@ -155,9 +406,11 @@ class AttendanceDetailView(APIView):
     
     def put(self, request, pk):
         attendance = get_object_or_404(Attendance, pk=pk)
+        before = rollup_state(attendance)
         serializer = AttendanceSerializer(attendance, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
+            attendance = serializer.save()
+            apply_rollup_change(before, rollup_state(attendance))
             return Response({
                 'message': 'Attendance updated successfully',
                 'attendance': serializer.data
@@ -166,12 +419,34 @@ class AttendanceDetailView(APIView):
     
     def delete(self, request, pk):
         attendance = get_object_or_404(Attendance, pk=pk)
+        before = rollup_state(attendance)
         attendance.delete()
+        apply_rollup_change(before, None)
         return Response({
             'message': 'Attendance deleted successfully'
         }, status=status.HTTP_204_NO_CONTENT)
 
 
+def parse_month(params):
+    """
+    (year, month) from query params, defaulting to the current month
+    
+    Raises:
+        ValueError: when either is not a number or out of range
+    """
+    now = datetime.now()
+    try:
+        month = int(params.get('month', now.month))
+        year = int(params.get('year', now.year))
+    except (TypeError, ValueError):
+        raise ValueError('month and year must be numbers')
+    if not 1 <= month <= 12:
+        raise ValueError('month must be between 1 and 12')
+    if not MINYEAR <= year <= MAXYEAR:
+        raise ValueError(f'year must be between {MINYEAR} and {MAXYEAR}')
+    return year, month
+
+
 class MonthlyAttendanceSummaryView(APIView):
     """Get monthly attendance summary for an employee"""
     permission_classes = [IsAuthenticated]
@@ -182,47 +457,61 @@ class MonthlyAttendanceSummaryView(APIView):
             return Response({'error': 'Authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
         
         # Get month and year from query params (default to current month)
-        month = int(request.query_params.get('month', datetime.now().month))
-        year = int(request.query_params.get('year', datetime.now().year))
+        try:
+            year, month = parse_month(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Get all attendance for the month
-        attendances = Attendance.objects.filter(
-            employee=user,
-            date__month=month,
-            date__year=year
-        )
+        summary = summarize_monthly_attendance([user.id], year, month)[user.id]
+        
+        return Response({
+            'month': month,
+            'year': year,
+            'summary': summary
+        }, status=status.HTTP_200_OK)
+
+
+class TeamAttendanceSummaryView(APIView):
+    """Get monthly attendance summaries for many employees at once (Admin/HR)"""
+    permission_classes = [IsAdminOrHR]
+    
+    def get(self, request):
+        try:
+            year, month = parse_month(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        department = request.query_params.get('department', None)
+        employee_ids = request.query_params.get('employee_ids', None)  # Comma-separated
         
-        # Calculate statistics
-        total_days = attendances.count()
-        present_days = attendances.filter(status='PRESENT').count()
-        absent_days = attendances.filter(status='ABSENT').count()
-        half_days = attendances.filter(status='HALF_DAY').count()
-        leaves = attendances.filter(status='LEAVE').count()
-        late_arrivals = attendances.filter(is_late=True).count()
-        early_departures = attendances.filter(is_early_departure=True).count()
+        employees = User.objects.filter(is_active=True)
         
-        total_hours = attendances.aggregate(
-            total=Sum('working_hours')
-        )['total'] or 0
+        if department:
+            employees = employees.filter(profile__department__iexact=department)
+        if employee_ids:
+            try:
+                ids = [int(pk) for pk in employee_ids.split(',') if pk.strip()]
+            except ValueError:
+                return Response({
+                    'error': 'employee_ids must be a comma-separated list of ids'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            employees = employees.filter(id__in=ids)
         
-        total_overtime = attendances.aggregate(
-            total=Sum('overtime_hours')
-        )['total'] or 0
+        employees = list(employees.values('id', 'username', 'employee_id'))
+        summaries = summarize_monthly_attendance([e['id'] for e in employees], year, month)
         
         return Response({
             'month': month,
             'year': year,
-            'summary': {
-                'total_days': total_days,
-                'present_days': present_days,
-                'absent_days': absent_days,
-                'half_days': half_days,
-                'leaves': leaves,
-                'late_arrivals': late_arrivals,
-                'early_departures': early_departures,
-                'total_working_hours': float(total_hours),
-                'total_overtime_hours': float(total_overtime)
-            }
+            'count': len(employees),
+            'summaries': [
+                {
+                    'employee': employee['id'],
+                    'employee_name': employee['username'],
+                    'employee_id': employee['employee_id'],
+                    'summary': summaries[employee['id']]
+                }
+                for employee in employees
+            ]
         }, status=status.HTTP_200_OK)
 
 
@@ -255,11 +544,11 @@ class MyRegularizationsView(APIView):
             return Response({'error': 'Authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
         
         regularizations = AttendanceRegularization.objects.filter(employee=user)
-        serializer = AttendanceRegularizationSerializer(regularizations, many=True)
-        return Response({
-            'count': regularizations.count(),
-            'regularizations': serializer.data
-        }, status=status.HTTP_200_OK)
+        
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        page = paginator.paginate_queryset(regularizations, request)
+        serializer = AttendanceRegularizationSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data, 'regularizations')
 
 
 class AllRegularizationsView(APIView):
@@ -277,11 +566,10 @@ class AllRegularizationsView(APIView):
         if employee_id:
             regularizations = regularizations.filter(employee__id=employee_id)
         
-        serializer = AttendanceRegularizationSerializer(regularizations, many=True)
-        return Response({
-            'count': regularizations.count(),
-            'regularizations': serializer.data
-        }, status=status.HTTP_200_OK)
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        page = paginator.paginate_queryset(regularizations, request)
+        serializer = AttendanceRegularizationSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data, 'regularizations')
 
 
 class RegularizationApprovalView(APIView):
@@ -320,7 +608,11 @@ class RegularizationApprovalView(APIView):
                 }
             )
             
-            if not created:
+            if created:
+                apply_rollup_change(None, rollup_state(attendance))
+            else:
+                before = rollup_state(attendance)
+                
                 # Update existing attendance
                 if regularization.requested_check_in:
                     attendance.check_in_time = regularization.requested_check_in
@@ -332,6 +624,8 @@ class RegularizationApprovalView(APIView):
                 attendance.check_late_arrival()
                 attendance.check_early_departure()
                 attendance.save()
+                
+                apply_rollup_change(before, rollup_state(attendance))
         
         serializer = AttendanceRegularizationSerializer(regularization)
         return Response({
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.1 on 2026-10-17 23:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField()),
+                ('username', models.CharField(blank=True, max_length=150)),
+                ('employee_id', models.CharField(blank=True, max_length=20)),
+                ('action', models.CharField(max_length=10)),
+                ('resource', models.CharField(max_length=255)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('user_agent', models.CharField(blank=True, max_length=200)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('request_data', models.JSONField(blank=True, null=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='audit_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Audit Event',
+                'verbose_name_plural': 'Audit Events',
+                'db_table': 'audit_events',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['timestamp'], name='audit_event_timesta_0a9e3b_idx'), models.Index(fields=['user', 'timestamp'], name='audit_event_user_id_69236c_idx'), models.Index(fields=['resource', 'timestamp'], name='audit_event_resourc_0d9f45_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import models
+from users.models import User
+
+
+class AuditEvent(models.Model):
+    """One audited write request, persisted in batches by audit.pipeline"""
+    
+    timestamp = models.DateTimeField()
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='audit_events')
+    username = models.CharField(max_length=150, blank=True)
+    employee_id = models.CharField(max_length=20, blank=True)
+    action = models.CharField(max_length=10)
+    resource = models.CharField(max_length=255)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    user_agent = models.CharField(max_length=200, blank=True)
+    status_code = models.PositiveSmallIntegerField()
+    request_data = models.JSONField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'audit_events'
+        verbose_name = 'Audit Event'
+        verbose_name_plural = 'Audit Events'
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['timestamp']),
+            models.Index(fields=['user', 'timestamp']),
+            models.Index(fields=['resource', 'timestamp']),
+        ]
+    
+    def __str__(self):
+        return f"{self.username or 'anonymous'} {self.action} {self.resource} at {self.timestamp}"
@@ -0,0 +1,193 @@
+"""
+Audit pipeline
+Moves audit writes off the request thread into batched background inserts
+
+The audit middleware hands each event to submit(), which only enqueues it.
+A single writer thread drains the bounded queue in batches of up to
+AUDIT_BATCH_SIZE, bulk-inserts them into AuditEvent and mirrors each one
+as a JSON line on the 'audit' logger (audit.log).
+
+Backpressure: when the queue is full the event is written synchronously on
+the request thread instead of being dropped, and counted in stats().
+Shutdown: stop() is registered with atexit and drains the queue first.
+"""
+import atexit
+import json
+import logging
+import queue
+import threading
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+audit_logger = logging.getLogger('audit')
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+_STOP = object()
+
+
+def write_events(events):
+    """Persist a batch of event dicts and mirror them to the audit log"""
+    from .models import AuditEvent
+
+    AuditEvent.objects.bulk_create([AuditEvent(**event) for event in events])
+    for event in events:
+        audit_logger.info(json.dumps(event, default=str))
+
+
+class AuditPipeline:
+    """Bounded queue plus one writer thread that flushes events in batches"""
+
+    def __init__(self, writer=write_events, queue_size=None, batch_size=None, flush_interval=None):
+        self.writer = writer
+        self.queue = queue.Queue(
+            queue_size or getattr(settings, 'AUDIT_QUEUE_SIZE', DEFAULT_QUEUE_SIZE)
+        )
+        self.batch_size = batch_size or getattr(settings, 'AUDIT_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+        self.flush_interval = flush_interval or getattr(
+            settings, 'AUDIT_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL
+        )
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'batches': 0,
+            'failed': 0,
+            'overflow_sync_writes': 0,
+            'max_queue_depth': 0,
+        }
+
+    def submit(self, event):
+        """Queue an event; write it inline if the queue is full"""
+        self.start()
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self._count('overflow_sync_writes')
+            logger.warning('Audit queue full; writing event on the request thread')
+            self._write([event])
+            return False
+
+        with self._stats_lock:
+            self._stats['enqueued'] += 1
+            depth = self.queue.qsize()
+            if depth > self._stats['max_queue_depth']:
+                self._stats['max_queue_depth'] = depth
+        return True
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def flush(self, timeout=None):
+        """Block until every queued event has been written (or failed)"""
+        if not (self._thread and self._thread.is_alive()):
+            self._drain()
+            return
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait(timeout)
+
+    def stop(self, timeout=10):
+        """Drain the queue and stop the writer thread"""
+        if self._thread and self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join(timeout)
+        self._thread = None
+        # Anything submitted after the sentinel
+        self._drain()
+
+    def stats(self):
+        with self._stats_lock:
+            return {**self._stats, 'queue_depth': self.queue.qsize(), 'queue_size': self.queue.maxsize}
+
+    def _run(self):
+        try:
+            while True:
+                batch, markers, stop = self._next_batch()
+                if batch:
+                    close_old_connections()
+                    self._write(batch)
+                for marker in markers:
+                    marker.set()
+                if stop:
+                    return
+        finally:
+            connection.close()
+
+    def _next_batch(self):
+        """Wait for one item, then take whatever else is queued up to batch_size"""
+        batch, markers = [], []
+        try:
+            item = self.queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return batch, markers, False
+        while True:
+            if item is _STOP:
+                return batch, markers, True
+            if isinstance(item, threading.Event):
+                # flush() marker: write what we have before acknowledging it
+                markers.append(item)
+                return batch, markers, False
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                return batch, markers, False
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return batch, markers, False
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is not _STOP:
+                batch.append(item)
+        for start in range(0, len(batch), self.batch_size):
+            self._write(batch[start:start + self.batch_size])
+
+    def _write(self, batch):
+        try:
+            self.writer(batch)
+        except Exception as e:
+            if len(batch) > 1:
+                # Retry one by one so a single bad row doesn't lose the batch
+                for event in batch:
+                    self._write([event])
+                return
+            self._count('failed')
+            logger.error(f"Failed to write audit event: {str(e)}", exc_info=True)
+        else:
+            self._count('written', len(batch))
+            self._count('batches')
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+
+pipeline = AuditPipeline()
+atexit.register(pipeline.stop)
+
+
+def record_event(event):
+    """Hand an event to the pipeline, or write it inline when AUDIT_ASYNC is off"""
+    if getattr(settings, 'AUDIT_ASYNC', True):
+        pipeline.submit(event)
+    else:
+        pipeline._write([event])
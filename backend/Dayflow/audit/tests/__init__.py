@@ -0,0 +1,2 @@
+# Import test modules
+from .test_audit_pipeline import *
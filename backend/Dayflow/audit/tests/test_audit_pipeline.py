@@ -0,0 +1,141 @@
+import threading
+from datetime import date, timedelta
+from django.test import SimpleTestCase, RequestFactory
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from users.models import User
+from audit.models import AuditEvent
+from audit.pipeline import AuditPipeline
+from middleware.request_body import sanitized_body
+
+
+class AuditMiddlewareTestCase(APITestCase):
+    """Test audited writes land in the AuditEvent table"""
+
+    def setUp(self):
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        self.client.force_authenticate(user=self.employee)
+
+    def test_write_is_audited_with_sanitized_body(self):
+        """Test a POST records one event with its sanitized body"""
+        start = date.today() + timedelta(days=7)
+        response = self.client.post(reverse('apply-leave'), {
+            'leave_type': 'SICK',
+            'start_date': start.isoformat(),
+            'end_date': start.isoformat(),
+            'reason': 'Flu',
+            'token': 'should-not-be-stored',
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        event = AuditEvent.objects.get()
+        self.assertEqual(event.user, self.employee)
+        self.assertEqual(event.employee_id, 'EMP001')
+        self.assertEqual(event.action, 'POST')
+        self.assertEqual(event.resource, '/leaves/apply/')
+        self.assertEqual(event.status_code, 201)
+        self.assertEqual(event.request_data['leave_type'], 'SICK')
+        self.assertEqual(event.request_data['token'], '***REDACTED***')
+
+    def test_reads_are_not_audited(self):
+        """Test GET requests write no events"""
+        self.client.get(reverse('my-leaves'))
+
+        self.assertFalse(AuditEvent.objects.exists())
+
+
+class AuditPipelineTestCase(SimpleTestCase):
+    """Test batching, backpressure and shutdown of the writer thread"""
+
+    def setUp(self):
+        self.batches = []
+
+    def writer(self, batch):
+        self.batches.append(list(batch))
+
+    def test_events_are_batched(self):
+        """Test queued events are written in batches of at most batch_size"""
+        pipeline = AuditPipeline(writer=self.writer, batch_size=2, flush_interval=0.01)
+        # Queue everything before the writer thread starts
+        for i in range(5):
+            pipeline.queue.put_nowait({'n': i})
+        pipeline.start()
+        pipeline.flush(timeout=5)
+        pipeline.stop()
+
+        self.assertEqual([len(batch) for batch in self.batches], [2, 2, 1])
+        self.assertEqual(pipeline.stats()['written'], 5)
+        self.assertEqual(pipeline.stats()['batches'], 3)
+
+    def test_stop_flushes_pending_events(self):
+        """Test shutdown drains the queue"""
+        pipeline = AuditPipeline(writer=self.writer, batch_size=100, flush_interval=0.01)
+        for i in range(10):
+            pipeline.submit({'n': i})
+        pipeline.stop()
+
+        self.assertEqual(sum(len(batch) for batch in self.batches), 10)
+        self.assertEqual(pipeline.stats()['enqueued'], 10)
+        self.assertEqual(pipeline.stats()['queue_depth'], 0)
+
+    def test_full_queue_writes_on_caller_thread(self):
+        """Test backpressure falls back to a synchronous write"""
+        release = threading.Event()
+        picked_up = threading.Event()
+
+        def slow_writer(batch):
+            if threading.current_thread().name == 'audit-writer':
+                picked_up.set()
+                release.wait(5)
+            self.writer(batch)
+
+        pipeline = AuditPipeline(writer=slow_writer, queue_size=1, batch_size=1, flush_interval=0.01)
+        self.assertTrue(pipeline.submit({'n': 1}))
+        picked_up.wait(5)
+        self.assertTrue(pipeline.submit({'n': 2}))
+        self.assertFalse(pipeline.submit({'n': 3}))
+
+        self.assertEqual(self.batches, [[{'n': 3}]])
+        self.assertEqual(pipeline.stats()['overflow_sync_writes'], 1)
+
+        release.set()
+        pipeline.stop()
+        self.assertEqual(sum(len(batch) for batch in self.batches), 3)
+
+    def test_failed_batch_retries_events_individually(self):
+        """Test one bad event doesn't lose the rest of its batch"""
+        def picky_writer(batch):
+            if any(event.get('bad') for event in batch):
+                raise ValueError('bad event')
+            self.writer(batch)
+
+        pipeline = AuditPipeline(writer=picky_writer, batch_size=10)
+        pipeline._write([{'n': 1}, {'bad': True}, {'n': 2}])
+
+        self.assertEqual(self.batches, [[{'n': 1}], [{'n': 2}]])
+        self.assertEqual(pipeline.stats()['failed'], 1)
+
+
+class SanitizedBodyTestCase(SimpleTestCase):
+    """Test the shared request body parser"""
+
+    def test_parsed_once_and_redacted(self):
+        """Test nested secrets are redacted and the result is cached"""
+        request = RequestFactory().post(
+            '/users/change-password/',
+            data='{"old_password": "a", "items": [{"refresh_token": "x", "n": 1}]}',
+            content_type='application/json'
+        )
+
+        body = sanitized_body(request)
+
+        self.assertEqual(body['old_password'], '***REDACTED***')
+        self.assertEqual(body['items'], [{'refresh_token': '***REDACTED***', 'n': 1}])
+        self.assertIs(sanitized_body(request), body)
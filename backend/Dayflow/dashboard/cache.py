@@ -0,0 +1,110 @@
+"""
+Dashboard response cache
+Versioned per-employee cache entries on Django's cache framework
+
+Each employee has a version token stored under its own key. Cached
+dashboards are keyed by that token (and today's date), so invalidating an
+employee is a single write of a new token: old entries simply stop being
+read and age out on their timeout.
+
+Lookups go through the cache's async API (aget/aset/...) since the employee
+dashboard view is async.
+"""
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+
+DEFAULT_TIMEOUT = 300  # seconds
+
+VERSION_KEY = 'dashboard:employee:{employee_id}:version'
+ENTRY_KEY = 'dashboard:employee:{employee_id}:{version}:{day}'
+HITS_KEY = 'dashboard:stats:hits'
+MISSES_KEY = 'dashboard:stats:misses'
+
+
+def get_cache():
+    return caches[getattr(settings, 'DASHBOARD_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def _new_version():
+    return uuid.uuid4().hex[:12]
+
+
+async def _current_version(cache, employee_id):
+    key = VERSION_KEY.format(employee_id=employee_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = _new_version()
+        # add() so concurrent first requests agree on one token
+        if not await cache.aadd(key, version, timeout=None):
+            version = await cache.aget(key, version)
+    return version
+
+
+async def get_employee_dashboard(employee_id, day, build):
+    """
+    Return the cached dashboard for an employee, building it on a miss
+
+    Args:
+        employee_id: User id
+        day: Date the dashboard is for (part of the key)
+        build: Coroutine function returning the dashboard dict
+
+    Returns:
+        (data, hit) tuple
+    """
+    cache = get_cache()
+    version = await _current_version(cache, employee_id)
+    key = ENTRY_KEY.format(employee_id=employee_id, version=version, day=day.isoformat())
+
+    data = await cache.aget(key)
+    if data is not None:
+        await _count(cache, HITS_KEY)
+        return data, True
+
+    await _count(cache, MISSES_KEY)
+    data = await build()
+    await cache.aset(key, data, timeout=get_timeout())
+    return data, False
+
+
+def invalidate_employee_dashboards(employee_ids):
+    """Bump the version token for each employee so cached entries are skipped"""
+    employee_ids = set(employee_ids)
+    if not employee_ids:
+        return
+    get_cache().set_many(
+        {VERSION_KEY.format(employee_id=employee_id): _new_version() for employee_id in employee_ids},
+        timeout=None,
+    )
+
+
+def cache_stats():
+    """Hit/miss counters shared by every process using the same cache"""
+    cache = get_cache()
+    counts = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = counts.get(HITS_KEY, 0)
+    misses = counts.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else 0.0,
+    }
+
+
+def reset_cache_stats():
+    get_cache().delete_many([HITS_KEY, MISSES_KEY])
+
+
+async def _count(cache, key):
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        # Counter not created yet (or evicted)
+        if not await cache.aadd(key, 1, timeout=None):
+            await cache.aincr(key)
@@ -0,0 +1,20 @@
+"""
+Dashboard signal handlers
+Invalidate cached employee dashboards when their source rows change
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from attendance.models import Attendance
+from leaves.models import Leave
+from payroll.models import Payroll
+from .cache import invalidate_employee_dashboards
+
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+@receiver(post_save, sender=Leave)
+@receiver(post_delete, sender=Leave)
+@receiver(post_save, sender=Payroll)
+@receiver(post_delete, sender=Payroll)
+def invalidate_employee_dashboard(sender, instance, **kwargs):
+    invalidate_employee_dashboards([instance.employee_id])
@@ -0,0 +1,3 @@
+# Import test modules
+from .test_dashboard_cache import *
+from .test_async_dashboards import *
@@ -0,0 +1,80 @@
+from datetime import date
+from django.core.cache import cache
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from users.models import User
+from users.jwt_serializers import CustomTokenObtainPairSerializer
+from attendance.models import Attendance, DailyAttendanceRollup
+from leaves.models import Leave
+from dashboard.cache import reset_cache_stats
+
+
+class AsyncDashboardTestCase(APITestCase):
+    """Test the async dashboard views under ASGI"""
+
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        self.hr = User.objects.create_user(
+            username='hr',
+            email='hr@example.com',
+            password='pass123',
+            employee_id='HR001',
+            role='HR'
+        )
+        Attendance.objects.create(employee=self.employee, date=date.today(), status='PRESENT')
+        Leave.objects.create(
+            employee=self.employee, leave_type='SICK', start_date=date.today(),
+            end_date=date.today(), reason='Flu'
+        )
+        self.employee_auth = self.auth(self.employee)
+        self.hr_auth = self.auth(self.hr)
+
+        self.client = AsyncClient()
+
+    @staticmethod
+    def auth(user):
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        return {'Authorization': f'Bearer {token}'}
+
+    async def test_hr_dashboard(self):
+        """Test the HR dashboard gathers its counts"""
+        await DailyAttendanceRollup.objects.acreate(date=date.today(), department='Engineering', present_count=3)
+
+        response = await self.client.get(reverse('hr-dashboard'), headers=self.hr_auth)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['employees']['total'], 1)
+        self.assertEqual(data['attendance']['present'], 3)
+        self.assertEqual(data['leaves']['pending_count'], 1)
+        self.assertEqual(data['payroll']['processed_this_month'], 0)
+
+    async def test_employee_dashboard_is_cached(self):
+        """Test the employee dashboard builds once, then hits the cache"""
+        first = await self.client.get(reverse('employee-dashboard'), headers=self.employee_auth)
+        second = await self.client.get(reverse('employee-dashboard'), headers=self.employee_auth)
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(first.json()['attendance']['status'], 'PRESENT')
+        self.assertEqual(first.json()['leaves']['pending_count'], 1)
+
+    async def test_permissions_still_apply(self):
+        """Test authentication and permission checks run before the handler"""
+        forbidden = await self.client.get(reverse('hr-dashboard'), headers=self.employee_auth)
+        anonymous = await self.client.get(reverse('hr-dashboard'))
+
+        self.assertEqual(forbidden.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(anonymous.status_code, status.HTTP_401_UNAUTHORIZED)
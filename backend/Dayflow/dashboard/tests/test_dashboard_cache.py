@@ -0,0 +1,107 @@
+from django.urls import reverse
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date
+from users.models import User
+from attendance.models import Attendance
+from leaves.models import Leave
+from payroll.models import Payroll
+from dashboard.cache import reset_cache_stats
+
+
+class EmployeeDashboardCacheTestCase(APITestCase):
+    """Test per-employee dashboard caching and invalidation"""
+
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        self.other = User.objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='pass123',
+            employee_id='EMP002',
+            role='EMPLOYEE'
+        )
+        self.hr = User.objects.create_user(
+            username='hr',
+            email='hr@example.com',
+            password='pass123',
+            employee_id='HR001',
+            role='HR'
+        )
+        self.url = reverse('employee-dashboard')
+
+    def test_second_request_is_served_from_cache(self):
+        """Test a repeat request runs no dashboard queries"""
+        self.client.force_authenticate(user=self.employee)
+
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.data, second.data)
+
+    def test_attendance_write_invalidates(self):
+        """Test checking in refreshes the cached dashboard"""
+        self.client.force_authenticate(user=self.employee)
+        self.client.get(self.url)
+
+        Attendance.objects.create(employee=self.employee, date=date.today(), status='PRESENT')
+        response = self.client.get(self.url)
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['attendance']['status'], 'PRESENT')
+
+    def test_leave_and_payroll_writes_invalidate(self):
+        """Test leave and payroll writes refresh the cached dashboard"""
+        self.client.force_authenticate(user=self.employee)
+        self.client.get(self.url)
+
+        Leave.objects.create(
+            employee=self.employee, leave_type='SICK',
+            start_date=date.today(), end_date=date.today(), reason='Flu'
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['leaves']['pending_count'], 1)
+
+        Payroll.objects.create(
+            employee=self.employee, basic_salary=1000, month=date.today().replace(day=1)
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['payroll']['basic_salary'], '1000.00')
+
+    def test_other_employee_write_keeps_cache(self):
+        """Test invalidation is scoped to the affected employee"""
+        self.client.force_authenticate(user=self.employee)
+        self.client.get(self.url)
+
+        Attendance.objects.create(employee=self.other, date=date.today(), status='PRESENT')
+        response = self.client.get(self.url)
+
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_cache_stats(self):
+        """Test hit and miss counters are exported"""
+        self.client.force_authenticate(user=self.employee)
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.client.get(self.url)
+
+        self.client.force_authenticate(user=self.hr)
+        response = self.client.get(reverse('dashboard-cache-stats'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['hits'], 2)
+        self.assertEqual(response.data['misses'], 1)
@@ -1,7 +1,14 @@
 from django.urls import path
-from .views import EmployeeDashboardView, HRDashboardView
+from .views import (
+    EmployeeDashboardView,
+    HRDashboardView,
+    AttendanceTrendView,
+    DashboardCacheStatsView
+)
 
 urlpatterns = [
     path('employee/', EmployeeDashboardView.as_view(), name='employee-dashboard'),
     path('hr/', HRDashboardView.as_view(), name='hr-dashboard'),
+    path('hr/attendance-trend/', AttendanceTrendView.as_view(), name='attendance-trend'),
+    path('cache-stats/', DashboardCacheStatsView.as_view(), name='dashboard-cache-stats'),
 ]
@@ -1,7 +1,12 @@
 """
 Dashboard APIs for Employee and HR
 Simple views to display key metrics and data
+
+The employee and HR dashboards are async views: their queries don't depend
+on each other, so they are awaited together with asyncio.gather.
 """
+import asyncio
+from asgiref.sync import sync_to_async
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -9,37 +14,53 @@ from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
 from datetime import timedelta, date
 from attendance.models import Attendance
+from attendance.rollups import attendance_totals, attendance_trend
 from leaves.models import Leave
 from payroll.models import Payroll
+from payroll.services import month_range
+from users.models import User
 from users.permissions import IsAdminOrHR
+from Dayflow.async_views import AsyncAPIView
+from .cache import get_employee_dashboard, cache_stats
 
 
-class EmployeeDashboardView(APIView):
+class EmployeeDashboardView(AsyncAPIView):
     """Simple employee dashboard with key metrics"""
     permission_classes = [IsAuthenticated]
     
-    def get(self, request):
+    async def get(self, request):
         employee = request.user
         today = date.today()
         
-        # Today's attendance
-        today_attendance = Attendance.objects.filter(
-            employee=employee, 
-            date=today
-        ).first()
-        
-        # Pending leaves
-        pending_leaves = Leave.objects.filter(
-            employee=employee, 
-            status='PENDING'
-        ).count()
+        dashboard_data, hit = await get_employee_dashboard(
+            employee.id, today, lambda: self.build_dashboard(employee, today)
+        )
         
-        # This month's payroll
-        this_month_payroll = Payroll.objects.filter(
-            employee=employee,
-            month__year=today.year,
-            month__month=today.month
-        ).first()
+        response = Response(dashboard_data, status=status.HTTP_200_OK)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+    
+    @staticmethod
+    async def build_dashboard(employee, today):
+        month_start, month_end = month_range(today.year, today.month)
+        today_attendance, pending_leaves, this_month_payroll = await asyncio.gather(
+            # Today's attendance
+            Attendance.objects.filter(
+                employee=employee, 
+                date=today
+            ).afirst(),
+            # Pending leaves
+            Leave.objects.filter(
+                employee=employee, 
+                status='PENDING'
+            ).acount(),
+            # This month's payroll
+            Payroll.objects.filter(
+                employee=employee,
+                month__gte=month_start,
+                month__lt=month_end
+            ).afirst(),
+        )
         
         dashboard_data = {
             'employee': {
@@ -62,38 +83,32 @@ class EmployeeDashboardView(APIView):
             }
         }
         
-        return Response(dashboard_data, status=status.HTTP_200_OK)
+        return dashboard_data
 
 
-class HRDashboardView(APIView):
+class HRDashboardView(AsyncAPIView):
     """Simple HR dashboard with team metrics"""
     permission_classes = [IsAdminOrHR]
     
-    def get(self, request):
+    async def get(self, request):
         today = date.today()
+        month_start, month_end = month_range(today.year, today.month)
         
-        # Count employees
-        from users.models import User
-        total_employees = User.objects.filter(role='EMPLOYEE').count()
-        
-        # Today's attendance
-        today_present = Attendance.objects.filter(
-            date=today,
-            status='PRESENT'
-        ).count()
-        today_absent = Attendance.objects.filter(
-            date=today,
-            status='ABSENT'
-        ).count()
-        
-        # Pending leaves
-        pending_leaves = Leave.objects.filter(status='PENDING').count()
-        
-        # Payroll summary
-        monthly_payroll_count = Payroll.objects.filter(
-            month__year=today.year,
-            month__month=today.month
-        ).count()
+        total_employees, today_counts, pending_leaves, monthly_payroll_count = await asyncio.gather(
+            # Count employees
+            User.objects.filter(role='EMPLOYEE').acount(),
+            # Today's attendance (from the daily rollup, not the attendance table)
+            sync_to_async(attendance_totals)(today),
+            # Pending leaves
+            Leave.objects.filter(status='PENDING').acount(),
+            # Payroll summary
+            Payroll.objects.filter(
+                month__gte=month_start,
+                month__lt=month_end
+            ).acount(),
+        )
+        today_present = today_counts['present_count']
+        today_absent = today_counts['absent_count']
         
         dashboard_data = {
             'employees': {
@@ -102,6 +117,9 @@ class HRDashboardView(APIView):
             'attendance': {
                 'present': today_present,
                 'absent': today_absent,
+                'half_day': today_counts['half_day_count'],
+                'leave': today_counts['leave_count'],
+                'late': today_counts['late_count'],
                 'total_marked': today_present + today_absent
             },
             'leaves': {
@@ -114,3 +132,37 @@ class HRDashboardView(APIView):
         }
         
         return Response(dashboard_data, status=status.HTTP_200_OK)
+
+
+class AttendanceTrendView(APIView):
+    """Daily attendance counts over a date range (Admin/HR only)"""
+    permission_classes = [IsAdminOrHR]
+    
+    MAX_DAYS = 366
+    
+    def get(self, request):
+        department = request.query_params.get('department', None)
+        
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        days = max(1, min(days, self.MAX_DAYS))
+        
+        end = date.today()
+        start = end - timedelta(days=days - 1)
+        
+        return Response({
+            'from_date': start,
+            'to_date': end,
+            'department': department,
+            'trend': attendance_trend(start, end, department)
+        }, status=status.HTTP_200_OK)
+
+
+class DashboardCacheStatsView(APIView):
+    """Employee dashboard cache hit/miss counters (Admin/HR only)"""
+    permission_classes = [IsAdminOrHR]
+    
+    def get(self, request):
+        return Response(cache_stats(), status=status.HTTP_200_OK)
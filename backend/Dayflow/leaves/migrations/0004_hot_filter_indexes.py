@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-17 23:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaves', '0003_add_casual_leave_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leave',
+            index=models.Index(fields=['employee', 'status'], name='leaves_employe_da7fd0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leave',
+            index=models.Index(fields=['status', 'applied_on'], name='leaves_status_25386a_idx'),
+        ),
+    ]
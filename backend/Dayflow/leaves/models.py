@@ -33,6 +33,12 @@ class Leave(models.Model):
         verbose_name = 'Leave'
         verbose_name_plural = 'Leaves'
         ordering = ['-applied_on']
+        indexes = [
+            # Pending count on the employee dashboard, "my leaves" status filter
+            models.Index(fields=['employee', 'status']),
+            # HR queue filtered by status, paged by applied_on
+            models.Index(fields=['status', 'applied_on']),
+        ]
     
     def __str__(self):
         return f"{self.employee.username} - {self.leave_type} - {self.status}"
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from Dayflow.prefetch import PrefetchPlanMixin
 from .models import Leave
 
 
-class LeaveSerializer(serializers.ModelSerializer):
+class LeaveSerializer(PrefetchPlanMixin, serializers.ModelSerializer):
     """Leave Serializer"""
     
     employee_name = serializers.CharField(source='employee.username', read_only=True)
@@ -0,0 +1,25 @@
+"""
+Leave services
+Query helpers shared by the leave list and export views
+"""
+
+
+def filter_leaves(leaves, params):
+    """Apply the employee_id, status, leave_type and date range filters HR list views accept"""
+    employee_id = params.get('employee_id', None)
+    status_filter = params.get('status', None)
+    leave_type = params.get('leave_type', None)
+    from_date = params.get('from_date', None)
+    to_date = params.get('to_date', None)
+
+    if employee_id:
+        leaves = leaves.filter(employee__id=employee_id)
+    if status_filter:
+        leaves = leaves.filter(status=status_filter.upper())
+    if leave_type:
+        leaves = leaves.filter(leave_type=leave_type.upper())
+    if from_date:
+        leaves = leaves.filter(start_date__gte=from_date)
+    if to_date:
+        leaves = leaves.filter(end_date__lte=to_date)
+    return leaves
@@ -1,3 +1,47 @@
-from django.test import TestCase
+import csv
+import io
+from datetime import date
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from users.models import User
+from leaves.models import Leave
 
-# Create your tests here.
+
+class LeaveExportTestCase(APITestCase):
+    """Test the streaming leave export"""
+
+    def setUp(self):
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        self.hr = User.objects.create_user(
+            username='hr',
+            email='hr@example.com',
+            password='pass123',
+            employee_id='HR001',
+            role='HR'
+        )
+        for day, leave_status in ((3, 'PENDING'), (10, 'APPROVED'), (17, 'PENDING')):
+            Leave.objects.create(
+                employee=self.employee,
+                leave_type='SICK',
+                start_date=date(2025, 3, day),
+                end_date=date(2025, 3, day),
+                reason='Flu',
+                status=leave_status,
+            )
+        self.client.force_authenticate(user=self.hr)
+
+    def test_export_filters_by_status(self):
+        """Test status and date filters match the all-leaves list"""
+        response = self.client.get(reverse('export-leaves'), {'status': 'pending', 'to_date': '2025-03-10'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['start_date'] for row in rows], ['2025-03-03'])
+        self.assertEqual(rows[0]['employee_id'], 'EMP001')
@@ -3,6 +3,7 @@ from .views import (
     ApplyLeaveView,
     MyLeavesView,
     AllLeavesView,
+    LeaveExportView,
     LeaveDetailView,
     LeaveApprovalView,
     LeaveCancelView
@@ -12,6 +13,7 @@ urlpatterns = [
     path('apply/', ApplyLeaveView.as_view(), name='apply-leave'),
     path('my-leaves/', MyLeavesView.as_view(), name='my-leaves'),
     path('all/', AllLeavesView.as_view(), name='all-leaves'),
+    path('export/', LeaveExportView.as_view(), name='export-leaves'),
     path('<int:pk>/', LeaveDetailView.as_view(), name='leave-detail'),
     path('<int:pk>/approve/', LeaveApprovalView.as_view(), name='leave-approval'),
     path('<int:pk>/cancel/', LeaveCancelView.as_view(), name='leave-cancel'),
@@ -5,6 +5,9 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from .models import Leave
 from .serializers import LeaveSerializer, LeaveApprovalSerializer
+from .services import filter_leaves
+from Dayflow.pagination import KeysetPagination
+from Dayflow.exports import export_response
 from users.permissions import IsAdminOrHR, CanApproveLeaves, IsOwnerOrAdmin
 
 
@@ -30,6 +33,8 @@ class ApplyLeaveView(APIView):
 class MyLeavesView(APIView):
     """Get current user's leave applications"""
     permission_classes = [IsAuthenticated]
+    # Only filters by the user's id, so the token claims are enough
+    claims_user = True
     
     def get(self, request):
         user = request.user if hasattr(request, 'user') else None
@@ -53,11 +58,10 @@ class MyLeavesView(APIView):
         if to_date:
             leaves = leaves.filter(end_date__lte=to_date)
         
-        serializer = LeaveSerializer(leaves, many=True)
-        return Response({
-            'count': leaves.count(),
-            'leaves': serializer.data
-        }, status=status.HTTP_200_OK)
+        paginator = KeysetPagination(ordering=('-applied_on', '-id'))
+        page = paginator.paginate_queryset(leaves, request)
+        serializer = LeaveSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data, 'leaves')
 
 
 class AllLeavesView(APIView):
@@ -65,31 +69,39 @@ class AllLeavesView(APIView):
     permission_classes = [IsAdminOrHR]
     
     def get(self, request):
-        # Filter parameters
-        employee_id = request.query_params.get('employee_id', None)
-        status_filter = request.query_params.get('status', None)
-        leave_type = request.query_params.get('leave_type', None)
-        from_date = request.query_params.get('from_date', None)
-        to_date = request.query_params.get('to_date', None)
+        leaves = filter_leaves(Leave.objects.select_related('employee'), request.query_params)
         
-        leaves = Leave.objects.select_related('employee').all()
-        
-        if employee_id:
-            leaves = leaves.filter(employee__id=employee_id)
-        if status_filter:
-            leaves = leaves.filter(status=status_filter.upper())
-        if leave_type:
-            leaves = leaves.filter(leave_type=leave_type.upper())
-        if from_date:
-            leaves = leaves.filter(start_date__gte=from_date)
-        if to_date:
-            leaves = leaves.filter(end_date__lte=to_date)
-        
-        serializer = LeaveSerializer(leaves, many=True)
-        return Response({
-            'count': leaves.count(),
-            'leaves': serializer.data
-        }, status=status.HTTP_200_OK)
+        paginator = KeysetPagination(ordering=('-applied_on', '-id'))
+        page = paginator.paginate_queryset(leaves, request)
+        serializer = LeaveSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data, 'leaves')
+
+
+class LeaveExportView(APIView):
+    """Stream leave applications as CSV or NDJSON (Admin/HR/Manager)"""
+    permission_classes = [IsAdminOrHR]
+    
+    columns = [
+        ('id', 'id'),
+        ('employee', 'employee_id'),
+        ('employee_id', 'employee__employee_id'),
+        ('employee_name', 'employee__username'),
+        ('leave_type', 'leave_type'),
+        ('start_date', 'start_date'),
+        ('end_date', 'end_date'),
+        ('reason', 'reason'),
+        ('status', 'status'),
+        ('admin_comment', 'admin_comment'),
+        ('applied_on', 'applied_on'),
+        ('updated_on', 'updated_on'),
+    ]
+    
+    def get(self, request):
+        try:
+            leaves = filter_leaves(Leave.objects.all(), request.query_params)
+            return export_response(request, leaves.order_by('-applied_on', '-id'), self.columns, 'leaves')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
 class LeaveDetailView(APIView):
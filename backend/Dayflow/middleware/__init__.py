@@ -4,9 +4,11 @@ Custom middleware for Dayflow HRMS
 from .request_logging import RequestLoggingMiddleware
 from .error_handling import ErrorHandlingMiddleware
 from .audit_logging import AuditLoggingMiddleware
+from .query_instrumentation import QueryInstrumentationMiddleware
 
 __all__ = [
     'RequestLoggingMiddleware',
     'ErrorHandlingMiddleware',
     'AuditLoggingMiddleware',
+    'QueryInstrumentationMiddleware',
 ]
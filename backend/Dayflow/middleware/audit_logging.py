@@ -2,15 +2,14 @@
 Audit Logging Middleware
 Tracks user actions for compliance and security auditing
 """
-import logging
-import json
-from django.utils.deprecation import MiddlewareMixin
-from datetime import datetime
+from django.utils import timezone
+from asgiref.sync import sync_to_async
+from audit.pipeline import record_event
+from .base import AsyncHookMiddleware, request_user
+from .request_body import sanitized_body, sanitize_data
 
-logger = logging.getLogger('audit')
 
-
-class AuditLoggingMiddleware(MiddlewareMixin):
+class AuditLoggingMiddleware(AsyncHookMiddleware):
     """
     Middleware to log user actions for audit trail
     Tracks who did what, when, and from where
@@ -28,63 +27,68 @@ class AuditLoggingMiddleware(MiddlewareMixin):
     
     def process_response(self, request, response):
         """Log auditable actions after successful response"""
+        if self.should_audit(request, response) and self.is_authenticated(getattr(request, 'user', None)):
+            self.log_audit_event(request, response)
+        
+        return response
+    
+    async def aprocess_response(self, request, response):
+        # Checks run on the event loop; only audited requests hop to a thread,
+        # since the pipeline may write inline
+        if self.should_audit(request, response) and self.is_authenticated(await request_user(request)):
+            await sync_to_async(self.log_audit_event)(request, response)
         
+        return response
+    
+    def should_audit(self, request, response):
         # Only audit specific methods
         if request.method not in self.AUDITABLE_METHODS:
-            return response
-        
-        # Only audit if user is authenticated
-        user = getattr(request, 'user', None)
-        if not user or not user.is_authenticated:
-            return response
+            return False
         
         # Check if path should be audited
-        should_audit = any(
+        audited_path = any(
             request.path.startswith(path) 
             for path in self.SENSITIVE_PATHS
         )
         
-        if should_audit and response.status_code < 400:
-            self.log_audit_event(request, response)
-        
-        return response
+        return audited_path and response.status_code < 400
+    
+    @staticmethod
+    def is_authenticated(user):
+        # Only audit if user is authenticated
+        return bool(user and user.is_authenticated)
     
     def log_audit_event(self, request, response):
-        """Create detailed audit log entry"""
+        """
+        Queue a detailed audit entry
+        
+        The entry is written to the AuditEvent table and audit.log in batches
+        by the audit pipeline, off the request thread.
+        """
         user = request.user
         
         audit_entry = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timezone.now(),
             'user_id': user.id,
             'username': user.username,
-            'employee_id': getattr(user, 'employee_id', None),
+            'employee_id': getattr(user, 'employee_id', None) or '',
             'action': request.method,
-            'resource': request.path,
+            'resource': request.path[:255],
             'ip_address': self.get_client_ip(request),
             'user_agent': request.META.get('HTTP_USER_AGENT', '')[:200],
             'status_code': response.status_code,
+            # Parsed and sanitized once, shared with request logging
+            'request_data': sanitized_body(request),
         }
         
-        # Add request data for POST/PUT/PATCH
-        if request.method in ['POST', 'PUT', 'PATCH']:
-            try:
-                if request.content_type == 'application/json' and request.body:
-                    body = json.loads(request.body)
-                    # Sanitize sensitive data
-                    sanitized_body = self.sanitize_data(body)
-                    audit_entry['request_data'] = sanitized_body
-            except Exception:
-                pass
-        
-        # Log as structured JSON
-        logger.info(json.dumps(audit_entry))
+        record_event(audit_entry)
     
     @staticmethod
     def get_client_ip(request):
         """Extract client IP address from request"""
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
         if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
+            ip = x_forwarded_for.split(',')[0].strip()
         else:
             ip = request.META.get('REMOTE_ADDR')
         return ip
@@ -92,21 +96,4 @@ class AuditLoggingMiddleware(MiddlewareMixin):
     @staticmethod
     def sanitize_data(data):
         """Remove sensitive information before logging"""
-        if not isinstance(data, dict):
-            return data
-        
-        sensitive_fields = [
-            'password', 'password2', 'token', 'secret', 
-            'api_key', 'access_token', 'refresh_token'
-        ]
-        
-        sanitized = {}
-        for key, value in data.items():
-            if key.lower() in sensitive_fields:
-                sanitized[key] = '***REDACTED***'
-            elif isinstance(value, dict):
-                sanitized[key] = AuditLoggingMiddleware.sanitize_data(value)
-            else:
-                sanitized[key] = value
-        
-        return sanitized
+        return sanitize_data(data)
@@ -0,0 +1,43 @@
+"""
+Async-capable hook middleware
+MiddlewareMixin whose process_request/process_response hooks run on the event loop
+
+Django's MiddlewareMixin serves ASGI requests by running each hook through
+sync_to_async, a thread hop per hook per request. AsyncHookMiddleware
+awaits ``aprocess_request``/``aprocess_response`` when a subclass defines
+them and otherwise calls the sync hook inline, so hooks used on the async
+path must not touch the database or block on the network.
+"""
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+
+class AsyncHookMiddleware(MiddlewareMixin):
+    """MiddlewareMixin without the per-hook thread hops under ASGI"""
+
+    async def __acall__(self, request):
+        response = None
+        if hasattr(self, 'aprocess_request'):
+            response = await self.aprocess_request(request)
+        elif hasattr(self, 'process_request'):
+            response = self.process_request(request)
+        response = response or await self.get_response(request)
+        if hasattr(self, 'aprocess_response'):
+            response = await self.aprocess_response(request, response)
+        elif hasattr(self, 'process_response'):
+            response = self.process_response(request, response)
+        return response
+
+
+async def request_user(request):
+    """
+    request.user without a blocking query on the event loop
+
+    AuthenticationMiddleware's lazy session user would load the session
+    synchronously, so it is resolved through request.auser(); a user set by
+    DRF authentication is returned as is.
+    """
+    user = getattr(request, 'user', None)
+    if isinstance(user, SimpleLazyObject) and hasattr(request, 'auser'):
+        return await request.auser()
+    return user
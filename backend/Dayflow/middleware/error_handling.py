@@ -5,13 +5,13 @@ Provides consistent error responses and handles uncaught exceptions
 import logging
 import traceback
 from django.http import JsonResponse
-from django.utils.deprecation import MiddlewareMixin
 from rest_framework import status
+from .base import AsyncHookMiddleware
 
 logger = logging.getLogger(__name__)
 
 
-class ErrorHandlingMiddleware(MiddlewareMixin):
+class ErrorHandlingMiddleware(AsyncHookMiddleware):
     """
     Middleware to handle all uncaught exceptions and return consistent JSON error responses
     """
@@ -3,15 +3,15 @@ JWT Enhancement Middleware
 Provides additional JWT token handling and validation
 """
 import logging
-from django.utils.deprecation import MiddlewareMixin
 from django.http import JsonResponse
-from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
+from users.authentication import verify_access_token
+from .base import AsyncHookMiddleware
 
 logger = logging.getLogger(__name__)
 
 
-class JWTMiddleware(MiddlewareMixin):
+class JWTMiddleware(AsyncHookMiddleware):
     """
     Middleware to enhance JWT token handling
     - Validates tokens on protected endpoints
@@ -49,11 +49,13 @@ class JWTMiddleware(MiddlewareMixin):
             
             token_string = auth_header.split(' ')[1]
             
-            # Validate token
-            token = AccessToken(token_string)
+            # Validate token (cached until it expires); DRF authentication
+            # reuses it through request.jwt_raw_token instead of decoding again
+            token = verify_access_token(token_string)
             
             # Add token info to request
             request.jwt_token = token
+            request.jwt_raw_token = token_string
             request.jwt_user_id = token.get('user_id')
             
             # Log token usage for monitoring
@@ -0,0 +1,212 @@
+"""
+Query Instrumentation Middleware
+Records per-request SQL counts and timings and exposes them as Server-Timing
+
+Every connection carries one permanent execute wrapper that forwards to the
+current request's QueryRecorder, found through a context variable. Context
+variables follow a request into sync_to_async threads, so queries are
+recorded the same way under WSGI and under ASGI, where the ORM runs in a
+worker thread with its own connection.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_REQUEST_MS = 500
+DEFAULT_SLOW_REQUEST_QUERY_COUNT = 100
+MAX_RECORDED_QUERIES = 1000
+
+# Literals collapsed when fingerprinting SQL
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \((?:\s*(?:%s|\?|\d+)\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Normalize SQL so queries differing only in literals compare equal"""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """
+    connection.execute_wrapper callable that records every query it sees
+
+    Only the first MAX_RECORDED_QUERIES statements are kept for the slow
+    request dump; counts and timings cover all of them.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = None
+        self.queries = []
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, params, time.perf_counter() - start)
+
+    def record(self, sql, params, duration):
+        self.count += 1
+        self.duration += duration
+        self.fingerprints[fingerprint(sql)] += 1
+        if self.slowest is None or duration > self.slowest[1]:
+            self.slowest = (sql, duration)
+        if len(self.queries) < MAX_RECORDED_QUERIES:
+            self.queries.append((sql, params, duration))
+
+    @property
+    def duplicates(self):
+        """Fingerprints executed more than once, most repeated first"""
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count > 1]
+
+
+_current_recorder = ContextVar('query_recorder', default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    """Execute wrapper installed on every connection"""
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+# Connections opened later, e.g. by the threads serving sync_to_async calls
+connection_created.connect(install_query_recorder)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Middleware to measure database work per request
+
+    Adds a Server-Timing header (total, db and app time) and logs query
+    count, DB time, the slowest statement and repeated fingerprints. Requests
+    slower than SLOW_REQUEST_MS, or issuing more than
+    SLOW_REQUEST_QUERY_COUNT queries, also log their full query list as
+    fingerprints and timings. Parameters carry password hashes, emails and
+    salaries, so they are only logged with SLOW_REQUEST_LOG_PARAMS under DEBUG.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(settings, 'QUERY_INSTRUMENTATION_ENABLED', True):
+            return self.get_response(request)
+
+        # This thread's connections may predate connection_created
+        for connection in connections.all():
+            install_query_recorder(connection)
+        recorder = QueryRecorder()
+        token = _current_recorder.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self.finish(request, response, recorder, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if not getattr(settings, 'QUERY_INSTRUMENTATION_ENABLED', True):
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        token = _current_recorder.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self.finish(request, response, recorder, time.perf_counter() - start)
+
+    def finish(self, request, response, recorder, total):
+        request.query_metrics = self.metrics(recorder, total)
+        response['Server-Timing'] = self.server_timing(request.query_metrics)
+        self.log(request, response, recorder, request.query_metrics)
+        return response
+
+    @staticmethod
+    def metrics(recorder, total):
+        duplicates = recorder.duplicates
+        return {
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(recorder.duration * 1000, 2),
+            'app_ms': round(max(total - recorder.duration, 0) * 1000, 2),
+            'query_count': recorder.count,
+            'duplicate_queries': sum(count - 1 for _, count in duplicates),
+            'slowest_query_ms': round(recorder.slowest[1] * 1000, 2) if recorder.slowest else 0.0,
+            'slowest_query': fingerprint(recorder.slowest[0]) if recorder.slowest else None,
+            'duplicate_fingerprints': [
+                {'sql': sql, 'count': count} for sql, count in duplicates[:5]
+            ],
+        }
+
+    @staticmethod
+    def server_timing(metrics):
+        return (
+            f"total;dur={metrics['total_ms']}, "
+            f"db;dur={metrics['db_ms']};desc=\"{metrics['query_count']} queries, "
+            f"{metrics['duplicate_queries']} duplicated\", "
+            f"app;dur={metrics['app_ms']}"
+        )
+
+    def log(self, request, response, recorder, metrics):
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **{key: value for key, value in metrics.items() if key != 'duplicate_fingerprints'},
+        }
+        logger.info(
+            f"QUERIES | {request.method} {request.path} | "
+            f"Queries: {metrics['query_count']} | DB: {metrics['db_ms']:.2f}ms | "
+            f"Total: {metrics['total_ms']:.2f}ms | Duplicates: {metrics['duplicate_queries']}",
+            extra={'query_metrics': fields},
+        )
+
+        slow_ms = getattr(settings, 'SLOW_REQUEST_MS', DEFAULT_SLOW_REQUEST_MS)
+        max_queries = getattr(settings, 'SLOW_REQUEST_QUERY_COUNT', DEFAULT_SLOW_REQUEST_QUERY_COUNT)
+        if metrics['total_ms'] < slow_ms and metrics['query_count'] <= max_queries:
+            return
+
+        log_params = settings.DEBUG and getattr(settings, 'SLOW_REQUEST_LOG_PARAMS', False)
+        lines = [
+            f"  {index}. [{duration * 1000:.2f}ms] {fingerprint(sql)}"
+            + (f" | params={params!r}" if log_params else '')
+            for index, (sql, params, duration) in enumerate(recorder.queries, 1)
+        ]
+        for item in metrics['duplicate_fingerprints']:
+            lines.append(f"  duplicated x{item['count']}: {item['sql']}")
+        logger.warning(
+            f"SLOW REQUEST | {request.method} {request.path} | "
+            f"Total: {metrics['total_ms']:.2f}ms | Queries: {metrics['query_count']}\n" + '\n'.join(lines),
+            extra={'query_metrics': fields},
+        )
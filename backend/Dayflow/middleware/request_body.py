@@ -0,0 +1,48 @@
+"""
+Shared request body parsing
+Decodes and sanitizes a JSON request body once per request for all middleware
+"""
+import json
+
+SENSITIVE_FIELDS = {
+    'password', 'password2', 'old_password', 'new_password', 'token', 'secret',
+    'api_key', 'access_token', 'refresh_token',
+}
+
+REDACTED = '***REDACTED***'
+
+_UNSET = object()
+
+
+def sanitize_data(data):
+    """Recursively redact sensitive keys in dicts and lists"""
+    if isinstance(data, dict):
+        return {
+            key: REDACTED if str(key).lower() in SENSITIVE_FIELDS else sanitize_data(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [sanitize_data(item) for item in data]
+    return data
+
+
+def sanitized_body(request):
+    """
+    Parsed and sanitized JSON body, or None
+
+    The result is cached on the request, so request logging and audit
+    logging share one json.loads and one sanitize pass.
+    """
+    cached = getattr(request, '_sanitized_body', _UNSET)
+    if cached is not _UNSET:
+        return cached
+
+    body = None
+    if request.method in ('POST', 'PUT', 'PATCH') and request.content_type == 'application/json':
+        try:
+            body = sanitize_data(json.loads(request.body)) if request.body else {}
+        except Exception:
+            # Malformed JSON, or the stream was already consumed
+            body = None
+    request._sanitized_body = body
+    return body
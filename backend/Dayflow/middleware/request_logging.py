@@ -5,12 +5,13 @@ Logs all incoming requests and responses for debugging and monitoring
 import logging
 import time
 import json
-from django.utils.deprecation import MiddlewareMixin
+from .base import AsyncHookMiddleware, request_user
+from .request_body import sanitized_body, sanitize_data
 
 logger = logging.getLogger(__name__)
 
 
-class RequestLoggingMiddleware(MiddlewareMixin):
+class RequestLoggingMiddleware(AsyncHookMiddleware):
     """
     Middleware to log all HTTP requests and responses
     Tracks request method, path, user, duration, and status code
@@ -18,10 +19,22 @@ class RequestLoggingMiddleware(MiddlewareMixin):
     
     def process_request(self, request):
         """Called on each request, before Django decides which view to execute"""
-        request.start_time = time.time()
+        self.log_request(request, getattr(request, 'user', None))
+    
+    async def aprocess_request(self, request):
+        self.log_request(request, await request_user(request))
+    
+    def process_response(self, request, response):
+        """Called on each response"""
+        return self.log_response(request, response, getattr(request, 'user', None))
+    
+    async def aprocess_response(self, request, response):
+        return self.log_response(request, response, await request_user(request))
+    
+    def log_request(self, request, user):
+        request.start_time = time.perf_counter()
         
         # Log request details
-        user = getattr(request, 'user', None)
         username = user.username if user and user.is_authenticated else 'Anonymous'
         
         logger.info(
@@ -29,27 +42,21 @@ class RequestLoggingMiddleware(MiddlewareMixin):
             f"IP: {self.get_client_ip(request)}"
         )
         
-        # Log request body for POST/PUT/PATCH (excluding sensitive data)
-        if request.method in ['POST', 'PUT', 'PATCH'] and request.content_type == 'application/json':
-            try:
-                body = json.loads(request.body) if request.body else {}
-                # Remove sensitive fields from logging
-                safe_body = self.sanitize_data(body)
-                logger.debug(f"REQUEST BODY | {json.dumps(safe_body)}")
-            except Exception as e:
-                logger.debug(f"Could not parse request body: {e}")
+        # Parse the body before the view consumes the stream; the sanitized
+        # result is cached on the request and reused by audit logging
+        safe_body = sanitized_body(request)
+        if safe_body is not None:
+            logger.debug(f"REQUEST BODY | {json.dumps(safe_body)}")
     
-    def process_response(self, request, response):
-        """Called on each response"""
+    def log_response(self, request, response, user):
         if hasattr(request, 'start_time'):
-            duration = time.time() - request.start_time
+            duration = time.perf_counter() - request.start_time
             
-            user = getattr(request, 'user', None)
             username = user.username if user and user.is_authenticated else 'Anonymous'
             
             logger.info(
                 f"RESPONSE | {request.method} {request.path} | "
-                f"Status: {response.status_code} | Duration: {duration:.2f}s | "
+                f"Status: {response.status_code} | Duration: {duration * 1000:.2f}ms | "
                 f"User: {username}"
             )
             
@@ -82,14 +89,4 @@ class RequestLoggingMiddleware(MiddlewareMixin):
     @staticmethod
     def sanitize_data(data):
         """Remove sensitive information from data before logging"""
-        if not isinstance(data, dict):
-            return data
-        
-        sensitive_fields = ['password', 'password2', 'token', 'secret', 'api_key']
-        sanitized = data.copy()
-        
-        for field in sensitive_fields:
-            if field in sanitized:
-                sanitized[field] = '***REDACTED***'
-        
-        return sanitized
+        return sanitize_data(data)
@@ -0,0 +1,4 @@
+# Import test modules
+from .test_query_instrumentation import *
+from .test_query_budgets import *
+from .test_async_middleware import *
@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from users.models import User
+from users.jwt_serializers import CustomTokenObtainPairSerializer
+from audit.models import AuditEvent
+from middleware.base import AsyncHookMiddleware
+
+
+class AsyncMiddlewareTestCase(APITestCase):
+    """Test the middleware stack serving requests under ASGI"""
+
+    def setUp(self):
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        self.token = CustomTokenObtainPairSerializer.get_token(self.employee).access_token
+        self.client = AsyncClient()
+
+    @property
+    def auth(self):
+        return {'Authorization': f'Bearer {self.token}'}
+
+    async def test_hooks_run_without_thread_hops(self):
+        """Test request hooks run on the event loop, not through MiddlewareMixin's sync_to_async"""
+        hooks = []
+
+        def record_hop(func, *args, **kwargs):
+            hooks.append(type(getattr(func, '__self__', None)))
+            return sync_to_async(func, *args, **kwargs)
+
+        with mock.patch('django.utils.deprecation.sync_to_async', side_effect=record_hop), \
+                self.assertLogs('middleware.request_logging', 'INFO') as logs:
+            response = await self.client.get(reverse('my-leaves'), headers=self.auth)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Django's own MiddlewareMixin middleware still hop; ours must not
+        self.assertTrue(hooks)
+        self.assertFalse([hook for hook in hooks if issubclass(hook, AsyncHookMiddleware)])
+        self.assertIn('X-Token-Expires-At', response)
+        self.assertIn('X-Request-Duration', response)
+        # The response log sees the user DRF authenticated
+        self.assertIn('User: employee', logs.output[-1])
+
+    async def test_queries_are_instrumented(self):
+        """Test ORM queries run in worker threads still reach Server-Timing"""
+        response = await self.client.get(reverse('my-leaves'), headers=self.auth)
+
+        self.assertRegex(response['Server-Timing'], r'desc="[1-9]\d* queries')
+
+    async def test_writes_are_audited(self):
+        """Test audit logging records writes served under ASGI"""
+        start = date.today() + timedelta(days=7)
+        response = await self.client.post(reverse('apply-leave'), {
+            'leave_type': 'SICK',
+            'start_date': start.isoformat(),
+            'end_date': start.isoformat(),
+            'reason': 'Flu',
+        }, content_type='application/json', headers=self.auth)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        event = await sync_to_async(AuditEvent.objects.get)()
+        self.assertEqual(event.user_id, self.employee.id)
+        self.assertEqual(event.request_data['leave_type'], 'SICK')
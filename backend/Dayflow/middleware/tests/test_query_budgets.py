@@ -0,0 +1,127 @@
+from datetime import date, time, timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from attendance.models import Attendance, AttendanceRegularization
+from leaves.models import Leave
+from notifications.broadcasts import start_broadcast
+from notifications.models import Notification
+from payroll.models import Payroll, PayrollComponent, PayrollDetail, SalaryStructure
+from users.models import EmployeeProfile, User
+
+# Most queries a list endpoint may run for a full page, whatever the page
+# size. A serializer field that reads a relation missing from its prefetch
+# plan costs one query per row and blows the budget.
+QUERY_BUDGETS = {
+    'my-attendance': ('employee', 2),
+    'all-attendance': ('hr', 1),
+    'my-regularizations': ('employee', 3),
+    'all-regularizations': ('hr', 1),
+    'my-leaves': ('employee', 2),
+    'all-leaves': ('hr', 1),
+    'my-payroll': ('employee', 3),
+    'all-payroll': ('hr', 2),
+    'my-notifications': ('employee', 6),
+    'employee-list': ('employee', 1),
+}
+
+ROWS = 15
+
+
+class ListQueryBudgetTestCase(APITestCase):
+    """Test list endpoints stay within a fixed query budget as rows grow"""
+
+    def setUp(self):
+        cache.clear()
+        self.hr = User.objects.create_user(
+            username='hr',
+            email='hr@example.com',
+            password='pass123',
+            employee_id='HR001',
+            role='HR'
+        )
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        components = [
+            PayrollComponent.objects.create(name='HRA', component_type='ALLOWANCE'),
+            PayrollComponent.objects.create(name='PF', component_type='DEDUCTION'),
+        ]
+        for i in range(ROWS):
+            # A distinct owner per row for the org-wide lists
+            colleague = User.objects.create_user(
+                username=f'colleague{i}',
+                email=f'colleague{i}@example.com',
+                password='pass123',
+                employee_id=f'COL{i:03d}',
+                role='EMPLOYEE'
+            )
+            EmployeeProfile.objects.create(user=colleague, department='Engineering')
+            day = date(2025, 1, 1) + timedelta(days=i)
+            for owner in (self.employee, colleague):
+                Attendance.objects.create(employee=owner, date=day, status='PRESENT')
+                AttendanceRegularization.objects.create(
+                    employee=owner,
+                    date=day,
+                    requested_check_in=time(9, 0),
+                    requested_check_out=time(18, 0),
+                    reason='Forgot to punch',
+                    reviewed_by=self.hr,
+                )
+                Leave.objects.create(
+                    employee=owner,
+                    leave_type='SICK',
+                    start_date=day,
+                    end_date=day,
+                    reason='Flu',
+                )
+                payroll = Payroll.objects.create(
+                    employee=owner,
+                    basic_salary=50000,
+                    net_salary=50000,
+                    month=date(2020 + i // 12, i % 12 + 1, 1),
+                )
+                for component in components:
+                    PayrollDetail.objects.create(payroll=payroll, component=component, amount=1000)
+                Notification.objects.create(recipient=owner, title=f'Notice {i}', message='Message')
+            SalaryStructure.objects.create(employee=colleague, basic_salary=50000, effective_from=day)
+        for i in range(3):
+            start_broadcast(f'Announcement {i}', 'Message')
+
+    def test_list_endpoints_within_budget(self):
+        """Test every list endpoint serializes a page within its query budget"""
+        users = {'hr': self.hr, 'employee': self.employee}
+        for name, (role, budget) in QUERY_BUDGETS.items():
+            with self.subTest(endpoint=name):
+                self.client.force_authenticate(user=users[role])
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(reverse(name), {'page_size': ROWS})
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertGreaterEqual(len(next(v for v in response.data.values() if isinstance(v, list))), ROWS)
+                self.assertLessEqual(
+                    len(context.captured_queries), budget,
+                    '\n'.join(query['sql'] for query in context.captured_queries)
+                )
+
+    def test_payroll_details_are_prefetched(self):
+        """Test nested payroll details and their components come from the prefetch"""
+        self.client.force_authenticate(user=self.hr)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('all-payroll'), {'page_size': ROWS})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [detail['component_name'] for detail in response.data['payroll'][0]['details']],
+            ['HRA', 'PF']
+        )
+        detail_queries = [q for q in context.captured_queries if 'payroll_details' in q['sql']]
+        self.assertEqual(len(detail_queries), 1)
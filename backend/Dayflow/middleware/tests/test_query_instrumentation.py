@@ -0,0 +1,99 @@
+from django.urls import reverse
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from users.models import User
+from middleware.query_instrumentation import QueryRecorder, fingerprint
+
+
+class QueryInstrumentationTestCase(APITestCase):
+    """Test per-request query metrics and Server-Timing headers"""
+
+    def setUp(self):
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        self.client.force_authenticate(user=self.employee)
+
+    def test_server_timing_header(self):
+        """Test responses carry total, db and app timings"""
+        response = self.client.get(reverse('user-profile'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timing = response['Server-Timing']
+        self.assertIn('total;dur=', timing)
+        self.assertIn('db;dur=', timing)
+        self.assertIn('app;dur=', timing)
+        self.assertIn('queries', timing)
+
+    def test_query_count_logged(self):
+        """Test each request logs its query count and DB time"""
+        with self.assertLogs('middleware.query_instrumentation', level='INFO') as logs:
+            self.client.get(reverse('my-leaves'))
+
+        record = logs.records[0]
+        self.assertIn('QUERIES | GET /leaves/my-leaves/', record.getMessage())
+        self.assertGreaterEqual(record.query_metrics['query_count'], 1)
+        self.assertEqual(record.query_metrics['status'], 200)
+
+    @override_settings(SLOW_REQUEST_MS=0)
+    def test_slow_request_logs_full_query_list(self):
+        """Test requests over the threshold dump every query"""
+        with self.assertLogs('middleware.query_instrumentation', level='WARNING') as logs:
+            self.client.get(reverse('my-leaves'))
+
+        message = logs.records[0].getMessage()
+        self.assertIn('SLOW REQUEST | GET /leaves/my-leaves/', message)
+        self.assertIn('1. [', message)
+        self.assertNotIn('params=', message)
+
+    @override_settings(SLOW_REQUEST_MS=0)
+    def test_slow_request_never_logs_personal_data(self):
+        """Test a slow registration logs query shapes, not password hashes or emails"""
+        self.client.force_authenticate(user=None)
+        with self.assertLogs('middleware.query_instrumentation', level='WARNING') as logs:
+            response = self.client.post(reverse('user-register'), {
+                'username': 'newhire', 'email': 'newhire@example.com', 'employee_id': 'EMP777',
+                'password': 'Str0ng-pass!', 'password2': 'Str0ng-pass!', 'role': 'EMPLOYEE'
+            }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        message = '\n'.join(record.getMessage() for record in logs.records)
+        self.assertIn('SLOW REQUEST | POST /users/register/', message)
+        self.assertIn('INSERT INTO', message)
+        self.assertNotIn('newhire@example.com', message)
+        self.assertNotIn(User.objects.get(username='newhire').password, message)
+
+    @override_settings(SLOW_REQUEST_MS=0, SLOW_REQUEST_LOG_PARAMS=True, DEBUG=True)
+    def test_params_logged_only_when_enabled_under_debug(self):
+        """Test parameters appear only with SLOW_REQUEST_LOG_PARAMS in DEBUG"""
+        with self.assertLogs('middleware.query_instrumentation', level='WARNING') as logs:
+            self.client.get(reverse('my-leaves'))
+
+        self.assertIn('params=', logs.records[0].getMessage())
+
+    @override_settings(QUERY_INSTRUMENTATION_ENABLED=False)
+    def test_disabled(self):
+        """Test instrumentation can be switched off"""
+        response = self.client.get(reverse('user-profile'))
+
+        self.assertNotIn('Server-Timing', response)
+
+    def test_duplicate_fingerprints(self):
+        """Test queries differing only in literals are grouped"""
+        recorder = QueryRecorder()
+        recorder.record('SELECT * FROM users WHERE id = 1', None, 0.001)
+        recorder.record('SELECT * FROM users WHERE id = 2', None, 0.003)
+        recorder.record("SELECT * FROM leaves WHERE status = 'PENDING'", None, 0.002)
+
+        self.assertEqual(recorder.count, 3)
+        self.assertEqual(recorder.slowest[0], 'SELECT * FROM users WHERE id = 2')
+        self.assertEqual(recorder.duplicates, [('SELECT * FROM users WHERE id = ?', 2)])
+        self.assertEqual(
+            fingerprint('SELECT 1 FROM t WHERE id IN (%s, %s, %s)'),
+            'SELECT ? FROM t WHERE id IN (...)'
+        )
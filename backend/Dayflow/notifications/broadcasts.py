@@ -0,0 +1,155 @@
+"""
+Broadcast messages
+Stores a broadcast once and resolves each user's copy when they read it
+
+A broadcast is a single NotificationBroadcast row. Whether a user sees it is
+decided at read time from the broadcast's audience (role), the user's join
+date and their notification preferences; their read/deleted state is a
+BroadcastReceipt row that only exists once they have opened, marked or
+deleted it. Sending to 20k users is therefore one INSERT plus a COUNT
+instead of 20k copies of the text.
+"""
+from django.db import transaction
+from django.db.models import BooleanField, Count, F, FilteredRelation, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from users.models import User
+from .events import publish_broadcast
+from .models import BroadcastReceipt, NotificationBroadcast, NotificationPreference
+from .preferences import allows, get_preferences
+
+
+def broadcast_recipients(notification_type, role=None):
+    """
+    Users who should receive a broadcast of ``notification_type``
+
+    Preferences are applied in the same query through a LEFT JOIN on
+    notification_preferences: users without a preference row get everything.
+    """
+    users = User.objects.all()
+    if role:
+        users = users.filter(role=role.upper())
+
+    preference_field = NotificationPreference.TYPE_FIELDS.get(notification_type)
+    if preference_field:
+        users = users.filter(
+            Q(notification_preferences__isnull=True) |
+            Q(**{f'notification_preferences__{preference_field}': True})
+        )
+
+    return users.order_by('id')
+
+
+def start_broadcast(title, message, notification_type='GENERAL', priority='MEDIUM',
+                    role=None, created_by=None):
+    """
+    Publish a broadcast to everyone in its audience
+
+    Nothing is written per recipient; the audience is counted once so the
+    broadcast status endpoint can report how many users it reached.
+    """
+    role = (role or '').upper()
+    recipients = broadcast_recipients(notification_type, role).count()
+    now = timezone.now()
+    broadcast = NotificationBroadcast.objects.create(
+        title=title,
+        message=message,
+        notification_type=notification_type,
+        priority=priority,
+        role=role,
+        created_by=created_by,
+        status='COMPLETED',
+        total_recipients=recipients,
+        delivered_count=recipients,
+        fan_out_on_read=True,
+        completed_at=now,
+    )
+    publish_broadcast(broadcast)
+    return broadcast
+
+
+def visible_broadcasts(user, include_deleted=False):
+    """
+    Broadcasts ``user`` can see, annotated with their receipt state
+
+    Each row carries ``is_read`` and ``read_at`` from the user's receipt
+    (unread when there is none). Broadcasts sent before the user joined are
+    left out, as are types their preferences turn off. ``user`` may be a
+    claims-only instance: only its id and role are used.
+    """
+    flags = get_preferences([user.pk])[user.pk]
+    disabled = [
+        notification_type for notification_type in NotificationPreference.TYPE_FIELDS
+        if not allows(flags, notification_type)
+    ]
+
+    broadcasts = NotificationBroadcast.objects.filter(
+        Q(role='') | Q(role=user.role),
+        fan_out_on_read=True,
+        created_at__gte=Subquery(User.objects.filter(pk=user.pk).values('date_joined')[:1]),
+    ).annotate(
+        receipt=FilteredRelation('receipts', condition=Q(receipts__user=user.pk)),
+    ).annotate(
+        is_read=Coalesce(F('receipt__is_read'), Value(False), output_field=BooleanField()),
+        read_at=F('receipt__read_at'),
+        is_deleted=Coalesce(F('receipt__is_deleted'), Value(False), output_field=BooleanField()),
+    )
+    if disabled:
+        broadcasts = broadcasts.exclude(notification_type__in=disabled)
+    if not include_deleted:
+        broadcasts = broadcasts.filter(is_deleted=False)
+    return broadcasts
+
+
+def broadcast_counts(user):
+    """
+    Total and unread visible broadcasts per type for one user, in one query
+
+    Returns:
+        dict mapping notification_type -> (total, unread)
+    """
+    rows = (
+        visible_broadcasts(user)
+        .order_by()
+        .values('notification_type')
+        .annotate(total=Count('id'), unread=Count('id', filter=Q(is_read=False)))
+    )
+    return {row['notification_type']: (row['total'], row['unread']) for row in rows}
+
+
+def set_receipt(user, broadcast_id, **state):
+    """
+    Record one user's read or deleted state for a broadcast
+
+    The receipt is created on first use. Returns False if the broadcast is
+    not visible to the user.
+    """
+    if not visible_broadcasts(user, include_deleted=True).filter(pk=broadcast_id).exists():
+        return False
+    receipt, created = BroadcastReceipt.objects.get_or_create(
+        broadcast_id=broadcast_id, user_id=user.pk, defaults=state
+    )
+    if not created:
+        BroadcastReceipt.objects.filter(pk=receipt.pk).update(**state)
+    return True
+
+
+def mark_broadcasts_read(user, read_at):
+    """
+    Mark every unread visible broadcast as read, creating receipts in bulk
+
+    Returns the number of broadcasts marked.
+    """
+    unread = list(visible_broadcasts(user).filter(is_read=False).values_list('id', flat=True))
+    if unread:
+        with transaction.atomic():
+            BroadcastReceipt.objects.bulk_create([
+                BroadcastReceipt(broadcast_id=broadcast_id, user_id=user.pk, is_read=True, read_at=read_at)
+                for broadcast_id in unread
+            ], ignore_conflicts=True)
+            # Rows that already had a receipt (e.g. marked unread) kept their old state
+            BroadcastReceipt.objects.filter(
+                broadcast_id__in=unread, user_id=user.pk, is_read=False
+            ).update(is_read=True, read_at=read_at)
+    return len(unread)
+
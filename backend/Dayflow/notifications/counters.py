@@ -0,0 +1,169 @@
+"""
+Notification counters
+Keeps NotificationCounter in step with writes to Notification
+
+Each (user, notification_type) pair has one counter row with its total and
+unread counts, so badge counts and stats are a single indexed read instead
+of COUNT(*) queries over the notifications table. Writers hand their
+changes to apply_counter_changes(), which turns them into F() increments:
+single creates and deletes arrive through the signals in
+notifications.signals, bulk inserts and bulk read-marking call it directly.
+Bulk deleters that have already adjusted the counters delete inside
+uncounted_deletes() so the post_delete handler doesn't count them again.
+"""
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from django.db import transaction
+from django.db.models import Count, F, Q
+from .broadcasts import broadcast_counts
+from .models import Notification, NotificationCounter
+
+_local = threading.local()
+
+
+@contextmanager
+def uncounted_deletes():
+    """
+    Leave counters alone for notifications deleted in this block
+
+    Per thread, so deletes in other requests are still counted.
+    """
+    previous = getattr(_local, 'uncounted', False)
+    _local.uncounted = True
+    try:
+        yield
+    finally:
+        _local.uncounted = previous
+
+
+def deletes_counted():
+    return not getattr(_local, 'uncounted', False)
+
+
+def apply_counter_changes(deltas):
+    """
+    Add per-user, per-type deltas to the counters
+
+    Users sharing the same change (a broadcast chunk, say) are updated with
+    one UPDATE ... WHERE user_id IN (...), so the cost follows the number of
+    distinct changes rather than the number of users.
+
+    Args:
+        deltas: dict mapping (user_id, notification_type) -> (total delta, unread delta)
+    """
+    groups = defaultdict(list)
+    missing = []
+    for (user_id, notification_type), (total, unread) in deltas.items():
+        if total or unread:
+            groups[(notification_type, total, unread)].append(user_id)
+        if total > 0:
+            missing.append(NotificationCounter(user_id=user_id, notification_type=notification_type))
+    if not groups:
+        return
+
+    with transaction.atomic(savepoint=False):
+        if missing:
+            NotificationCounter.objects.bulk_create(missing, ignore_conflicts=True)
+        for (notification_type, total, unread), user_ids in groups.items():
+            NotificationCounter.objects.filter(
+                user_id__in=user_ids, notification_type=notification_type
+            ).update(
+                total_count=F('total_count') + total,
+                unread_count=F('unread_count') + unread,
+            )
+
+
+def count_created(notifications):
+    """Count newly inserted notifications (e.g. after bulk_create)"""
+    deltas = defaultdict(lambda: [0, 0])
+    for notification in notifications:
+        delta = deltas[(notification.recipient_id, notification.notification_type)]
+        delta[0] += 1
+        delta[1] += 0 if notification.is_read else 1
+    apply_counter_changes(deltas)
+
+
+def mark_all_read(user_id, read_at):
+    """
+    Mark every unread notification of a user as read
+
+    The counter rows are locked first so notifications created meanwhile
+    wait for the commit instead of being zeroed out. Returns the number of
+    notifications marked.
+    """
+    with transaction.atomic():
+        locked = NotificationCounter.objects.select_for_update().filter(user_id=user_id)
+        list(locked.values_list('id', flat=True))
+        count = Notification.objects.filter(recipient_id=user_id, is_read=False).update(
+            is_read=True, read_at=read_at
+        )
+        NotificationCounter.objects.filter(user_id=user_id, unread_count__gt=0).update(unread_count=0)
+    return count
+
+
+def notification_counts(user):
+    """
+    Total, unread and per-type counts for one user
+
+    Direct notifications come from the user's counter rows and broadcasts
+    from one aggregate over the broadcasts visible to them. by_type follows
+    NOTIFICATION_TYPES order and leaves out empty types.
+    """
+    rows = defaultdict(lambda: (0, 0))
+    for notification_type, total, unread in NotificationCounter.objects.filter(
+        user_id=user.pk
+    ).values_list('notification_type', 'total_count', 'unread_count'):
+        rows[notification_type] = (total, unread)
+    for notification_type, (total, unread) in broadcast_counts(user).items():
+        direct_total, direct_unread = rows[notification_type]
+        rows[notification_type] = (direct_total + total, direct_unread + unread)
+    return {
+        'total': sum(total for total, _ in rows.values()),
+        'unread': sum(unread for _, unread in rows.values()),
+        'by_type': {
+            ntype: rows[ntype][0]
+            for ntype, _ in Notification.NOTIFICATION_TYPES
+            if rows[ntype][0] > 0
+        },
+    }
+
+
+def rebuild_counters(user_ids=None):
+    """
+    Recompute counters from the notifications table with one GROUP BY
+
+    Used to backfill existing data and to repair drift. Returns the number
+    of counter rows written.
+    """
+    notifications = Notification.objects.all()
+    existing = NotificationCounter.objects.all()
+    if user_ids:
+        notifications = notifications.filter(recipient_id__in=user_ids)
+        existing = existing.filter(user_id__in=user_ids)
+
+    rows = (
+        notifications
+        .order_by()
+        .values('recipient_id', 'notification_type')
+        .annotate(
+            total_count=Count('id'),
+            unread_count=Count('id', filter=Q(is_read=False)),
+        )
+    )
+
+    counters = [
+        NotificationCounter(
+            user_id=row['recipient_id'],
+            notification_type=row['notification_type'],
+            total_count=row['total_count'],
+            unread_count=row['unread_count'],
+        )
+        for row in rows
+    ]
+
+    with transaction.atomic():
+        existing.delete()
+        NotificationCounter.objects.bulk_create(counters, batch_size=500)
+
+    return len(counters)
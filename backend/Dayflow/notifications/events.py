@@ -0,0 +1,221 @@
+"""
+Notification events
+Publish/subscribe log feeding the live notification stream
+
+New notifications and broadcasts are appended to a short, ordered event
+log once their transaction commits; each open stream reads the log from its
+last event id and keeps the events meant for its user. Event ids are
+"<epoch>-<sequence>" strings that only grow, so a reconnecting client can
+resume with the id it saw last; has_gap() tells it when the events it missed
+are no longer in the log and it should reload instead.
+
+The backend is chosen by NOTIFICATION_EVENTS['BACKEND']: LocalEventBackend
+keeps the log in process memory (one worker, tests), RedisEventBackend keeps
+it in a Redis stream shared by every worker. Publishing is synchronous;
+reading is async and is only done by the stream view.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+from .serializers import LiveBroadcastSerializer, LiveNotificationSerializer
+
+DEFAULT_BUFFER_SIZE = 1000
+DEFAULT_STREAM_KEY = 'dayflow:notification-events'
+
+
+def parse_event_id(event_id):
+    """(epoch, sequence) for an event id, or None if it is malformed"""
+    try:
+        epoch, sequence = str(event_id).split('-')
+        return int(epoch), int(sequence)
+    except (TypeError, ValueError):
+        return None
+
+
+class LocalEventBackend:
+    """
+    Event log in process memory
+
+    Keeps the last ``buffer_size`` events. The epoch is the time the process
+    started, so ids handed out by an earlier process always show up as a gap.
+    """
+
+    def __init__(self, location='', buffer_size=None):
+        self.buffer_size = buffer_size or DEFAULT_BUFFER_SIZE
+        self.epoch = int(time.time() * 1000)
+        self._events = deque(maxlen=self.buffer_size)
+        self._sequence = 0
+        self._lock = threading.Lock()
+        # (loop, asyncio.Event) for every stream waiting on a new event
+        self._waiters = set()
+
+    def publish(self, event):
+        with self._lock:
+            self._sequence += 1
+            self._events.append((self._sequence, event))
+            waiters = list(self._waiters)
+        # Publishers run in request threads; wake the streams on their own loops
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(waiter.set)
+            except RuntimeError:
+                # Loop already closed; its stream is gone
+                pass
+        return f'{self.epoch}-{self._sequence}'
+
+    async def latest_id(self):
+        with self._lock:
+            return f'{self.epoch}-{self._sequence}'
+
+    async def has_gap(self, after_id):
+        parsed = parse_event_id(after_id)
+        if parsed is None or parsed[0] != self.epoch:
+            return True
+        with self._lock:
+            if parsed[1] > self._sequence:
+                return True
+            oldest = self._events[0][0] if self._events else self._sequence + 1
+            return parsed[1] + 1 < oldest
+
+    async def read(self, after_id, timeout):
+        events = self._after(after_id)
+        if events:
+            return events
+
+        waiter = asyncio.Event()
+        entry = (asyncio.get_running_loop(), waiter)
+        with self._lock:
+            self._waiters.add(entry)
+        try:
+            # Re-check: an event may have arrived before the waiter was registered
+            events = self._after(after_id)
+            if not events:
+                try:
+                    await asyncio.wait_for(waiter.wait(), timeout)
+                except asyncio.TimeoutError:
+                    return []
+                events = self._after(after_id)
+        finally:
+            with self._lock:
+                self._waiters.discard(entry)
+        return events
+
+    def _after(self, after_id):
+        sequence = parse_event_id(after_id)[1]
+        with self._lock:
+            newer = []
+            for event_sequence, event in reversed(self._events):
+                if event_sequence <= sequence:
+                    break
+                newer.append((f'{self.epoch}-{event_sequence}', event))
+        newer.reverse()
+        return newer
+
+
+class RedisEventBackend:
+    """
+    Event log in a Redis stream (XADD/XREAD), shared by every worker
+
+    The stream is trimmed to roughly ``buffer_size`` entries. Stream ids
+    already have the "<milliseconds>-<sequence>" shape used for event ids.
+    """
+
+    def __init__(self, location='', buffer_size=None, key=DEFAULT_STREAM_KEY):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError as e:
+            raise ImproperlyConfigured('RedisEventBackend requires the redis package') from e
+        if not location:
+            raise ImproperlyConfigured("RedisEventBackend requires NOTIFICATION_EVENTS['LOCATION']")
+
+        self.buffer_size = buffer_size or DEFAULT_BUFFER_SIZE
+        self.key = key
+        self._response_error = redis.ResponseError
+        self._client = redis.Redis.from_url(location, decode_responses=True)
+        self._async_client = redis.asyncio.Redis.from_url(location, decode_responses=True)
+
+    def publish(self, event):
+        return self._client.xadd(
+            self.key, {'event': json.dumps(event, cls=DjangoJSONEncoder)},
+            maxlen=self.buffer_size, approximate=True
+        )
+
+    async def latest_id(self):
+        info = await self._info()
+        return info.get('last-generated-id', '0-0') if info else '0-0'
+
+    async def has_gap(self, after_id):
+        parsed = parse_event_id(after_id)
+        if parsed is None:
+            return True
+        info = await self._info()
+        if not info:
+            return parsed != (0, 0)
+        if parsed > parse_event_id(info['last-generated-id']):
+            return True
+        # Redis 7 reports the newest id removed by trimming
+        deleted = parse_event_id(info.get('max-deleted-entry-id', '0-0'))
+        return deleted is not None and deleted > parsed
+
+    async def read(self, after_id, timeout):
+        # BLOCK 0 would wait forever
+        response = await self._async_client.xread({self.key: after_id}, block=max(int(timeout * 1000), 1))
+        if not response:
+            return []
+        return [(event_id, json.loads(fields['event'])) for event_id, fields in response[0][1]]
+
+    async def _info(self):
+        try:
+            return await self._async_client.xinfo_stream(self.key)
+        except self._response_error:
+            # No stream yet: nothing has been published
+            return None
+
+
+@lru_cache(maxsize=None)
+def get_event_backend():
+    """The configured event backend, created once per process"""
+    config = getattr(settings, 'NOTIFICATION_EVENTS', {})
+    backend = import_string(config.get('BACKEND', 'notifications.events.LocalEventBackend'))
+    return backend(location=config.get('LOCATION', ''), buffer_size=config.get('BUFFER_SIZE'))
+
+
+def publish_notifications(notifications):
+    """Publish newly created notifications once the transaction commits"""
+    events = [
+        {
+            'type': 'notification',
+            'user_id': notification.recipient_id,
+            'data': LiveNotificationSerializer(notification).data,
+        }
+        for notification in notifications
+    ]
+    # robust: a backend outage must not fail a request that already committed
+    transaction.on_commit(lambda: _publish(events), robust=True)
+
+
+def publish_broadcast(broadcast):
+    """Publish a new broadcast to its audience once the transaction commits"""
+    event = {
+        'type': 'notification',
+        'user_id': None,
+        'role': broadcast.role,
+        'notification_type': broadcast.notification_type,
+        'data': LiveBroadcastSerializer(broadcast).data,
+    }
+    transaction.on_commit(lambda: _publish([event]), robust=True)
+
+
+def _publish(events):
+    backend = get_event_backend()
+    for event in events:
+        backend.publish(event)
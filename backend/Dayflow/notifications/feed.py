@@ -0,0 +1,60 @@
+"""
+Notification feed
+Direct notifications and broadcasts merged into one newest-first list
+
+A page is chosen with a single UNION ALL over the two sources that selects
+only (id, created_at, source), ordered and cut by the keyset cursor. The
+rows behind that page are then loaded with one query per source.
+"""
+from django.db.models import CharField, Value
+from .broadcasts import visible_broadcasts
+from .models import Notification
+from .serializers import BroadcastMessageSerializer, NotificationSerializer
+
+# source breaks ties between a notification and a broadcast sharing a timestamp
+FEED_ORDERING = ('-created_at', '-source', '-id')
+
+NOTIFICATION = 'notification'
+BROADCAST = 'broadcast'
+
+
+def feed_querysets(user, unread_only=False, notification_type=None):
+    """The two parts of a user's feed, as values() querysets ready for paginate_union()"""
+    notifications = Notification.objects.filter(recipient=user)
+    broadcasts = visible_broadcasts(user)
+
+    if unread_only:
+        notifications = notifications.filter(is_read=False)
+        broadcasts = broadcasts.filter(is_read=False)
+
+    if notification_type:
+        notifications = notifications.filter(notification_type=notification_type.upper())
+        broadcasts = broadcasts.filter(notification_type=notification_type.upper())
+
+    # Model fields come before annotations in the SELECT, so both parts line up
+    return [
+        queryset.annotate(source=Value(source, output_field=CharField())).values('id', 'created_at', 'source')
+        for queryset, source in ((notifications, NOTIFICATION), (broadcasts, BROADCAST))
+    ]
+
+
+def serialize_feed(user, keys):
+    """Load and serialize the rows behind a page of feed keys, in page order"""
+    ids = {NOTIFICATION: [], BROADCAST: []}
+    for key in keys:
+        ids[key['source']].append(key['id'])
+
+    notifications = Notification.objects.in_bulk(ids[NOTIFICATION])
+    for notification in notifications.values():
+        # Every row belongs to the requesting user; skip loading it per row
+        notification.recipient = user
+    broadcasts = visible_broadcasts(user).in_bulk(ids[BROADCAST])
+
+    data = []
+    for key in keys:
+        # A row deleted since the page query is simply left out
+        if key['source'] == NOTIFICATION and key['id'] in notifications:
+            data.append(NotificationSerializer(notifications[key['id']]).data)
+        elif key['source'] == BROADCAST and key['id'] in broadcasts:
+            data.append(BroadcastMessageSerializer(broadcasts[key['id']], context={'user': user}).data)
+    return data
@@ -0,0 +1,38 @@
+"""
+Notification archival
+Moves read notifications past their retention period into the archive table
+
+Usage:
+    python manage.py archive_notifications
+    python manage.py archive_notifications --batch-size 500 --max-batches 20 --pause 0.2
+    python manage.py archive_notifications --dry-run
+"""
+from django.core.management.base import BaseCommand, CommandError
+from notifications.retention import archive_notifications
+
+
+class Command(BaseCommand):
+    help = 'Archive read notifications older than their retention period in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Notifications per transaction (default: NOTIFICATION_ARCHIVE_BATCH_SIZE)')
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='Stop after this many batches; rerun to continue')
+        parser.add_argument('--pause', type=float, default=0,
+                            help='Seconds to sleep between batches so other writers get the lock')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived')
+
+    def handle(self, *args, **options):
+        try:
+            count = archive_notifications(
+                batch_size=options['batch_size'],
+                max_batches=options['max_batches'],
+                pause=options['pause'],
+                dry_run=options['dry_run'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        verb = 'Would archive' if options['dry_run'] else 'Archived'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {count} notification(s)'))
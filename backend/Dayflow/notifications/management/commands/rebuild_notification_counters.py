@@ -0,0 +1,21 @@
+"""
+Rebuild notification counters from the notifications table
+
+Usage:
+    python manage.py rebuild_notification_counters
+    python manage.py rebuild_notification_counters --user 12 --user 40
+"""
+from django.core.management.base import BaseCommand
+from notifications.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute NotificationCounter rows with one GROUP BY over notifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', dest='user_ids', type=int, action='append',
+                            help='Only rebuild this user id (repeatable)')
+
+    def handle(self, *args, **options):
+        count = rebuild_counters(options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} notification counter row(s)'))
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.1 on 2026-10-18 00:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notificationcounter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BroadcastReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_read', models.BooleanField(default=False)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+            ],
+            options={
+                'verbose_name': 'Broadcast Receipt',
+                'verbose_name_plural': 'Broadcast Receipts',
+                'db_table': 'notification_broadcast_receipts',
+            },
+        ),
+        migrations.AddField(
+            model_name='notificationbroadcast',
+            name='fan_out_on_read',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='notificationbroadcast',
+            index=models.Index(fields=['fan_out_on_read', 'created_at'], name='notificatio_fan_out_018e8a_idx'),
+        ),
+        migrations.AddField(
+            model_name='broadcastreceipt',
+            name='broadcast',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to='notifications.notificationbroadcast'),
+        ),
+        migrations.AddField(
+            model_name='broadcastreceipt',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_receipts', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='broadcastreceipt',
+            unique_together={('broadcast', 'user')},
+        ),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations
+from django.db.models import Count, Q
+
+
+def backfill_counters(apps, schema_editor):
+    """
+    Build counters for notifications written before counters existed
+
+    Same GROUP BY as notifications.counters.rebuild_counters, against the
+    historical models, so unread badges and stats are right from the first
+    request after deploy.
+    """
+    Notification = apps.get_model('notifications', 'Notification')
+    NotificationCounter = apps.get_model('notifications', 'NotificationCounter')
+    db_alias = schema_editor.connection.alias
+
+    rows = (
+        Notification.objects.using(db_alias)
+        .order_by()
+        .values('recipient_id', 'notification_type')
+        .annotate(
+            total_count=Count('id'),
+            unread_count=Count('id', filter=Q(is_read=False)),
+        )
+    )
+    NotificationCounter.objects.using(db_alias).all().delete()
+    NotificationCounter.objects.using(db_alias).bulk_create(
+        [
+            NotificationCounter(
+                user_id=row['recipient_id'],
+                notification_type=row['notification_type'],
+                total_count=row['total_count'],
+                unread_count=row['unread_count'],
+            )
+            for row in rows
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_notificationarchive'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,76 @@ from django.db import models
 from users.models import User
 
 
+class NotificationBroadcast(models.Model):
+    """
+    One message shared by every user in its audience
+    
+    Broadcasts are fanned out on read: the content is stored once and each
+    recipient's read/deleted state lives in BroadcastReceipt, created the
+    first time they touch it. Older broadcasts (fan_out_on_read=False) were
+    copied into one Notification row per recipient instead.
+    """
+    
+    STATUS_CHOICES = (
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    )
+    
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    notification_type = models.CharField(max_length=30, default='GENERAL')
+    priority = models.CharField(max_length=10, default='MEDIUM')
+    role = models.CharField(max_length=10, blank=True, help_text="Empty means all users")
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='broadcasts')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    total_recipients = models.PositiveIntegerField(default=0)
+    delivered_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    fan_out_on_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'notification_broadcasts'
+        verbose_name = 'Notification Broadcast'
+        verbose_name_plural = 'Notification Broadcasts'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['fan_out_on_read', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.title} ({self.status})"
+    
+    @property
+    def progress(self):
+        """Delivered fraction between 0 and 1"""
+        if not self.total_recipients:
+            return 1.0 if self.status == 'COMPLETED' else 0.0
+        return round(self.delivered_count / self.total_recipients, 4)
+
+
+class BroadcastReceipt(models.Model):
+    """One user's read/deleted state for a broadcast"""
+    
+    broadcast = models.ForeignKey(NotificationBroadcast, on_delete=models.CASCADE, related_name='receipts')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='broadcast_receipts')
+    is_read = models.BooleanField(default=False)
+    read_at = models.DateTimeField(null=True, blank=True)
+    is_deleted = models.BooleanField(default=False)
+    
+    class Meta:
+        db_table = 'notification_broadcast_receipts'
+        verbose_name = 'Broadcast Receipt'
+        verbose_name_plural = 'Broadcast Receipts'
+        unique_together = ['broadcast', 'user']
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.broadcast.title}"
+
+
 class Notification(models.Model):
     """Notification model for system notifications"""
     
@@ -33,6 +103,7 @@ class Notification(models.Model):
     related_object_type = models.CharField(max_length=50, blank=True, help_text="e.g., 'leave', 'payroll'")
     related_object_id = models.PositiveIntegerField(null=True, blank=True)
     action_url = models.CharField(max_length=255, blank=True, help_text="URL for action button")
+    broadcast = models.ForeignKey(NotificationBroadcast, on_delete=models.SET_NULL, null=True, blank=True, related_name='notifications')
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -52,14 +123,88 @@ class Notification(models.Model):
         """Mark notification as read"""
         if not self.is_read:
             from django.utils import timezone
+            from .counters import apply_counter_changes
             self.is_read = True
             self.read_at = timezone.now()
-            self.save()
+            # Conditional update so two concurrent reads only count once
+            if Notification.objects.filter(pk=self.pk, is_read=False).update(is_read=True, read_at=self.read_at):
+                apply_counter_changes({(self.recipient_id, self.notification_type): (0, -1)})
+    
+    def mark_as_unread(self):
+        """Mark notification as unread"""
+        if self.is_read:
+            from .counters import apply_counter_changes
+            self.is_read = False
+            self.read_at = None
+            if Notification.objects.filter(pk=self.pk, is_read=True).update(is_read=False, read_at=None):
+                apply_counter_changes({(self.recipient_id, self.notification_type): (0, 1)})
+
+
+class NotificationArchive(models.Model):
+    """
+    Read notifications past their retention, moved out of the hot table
+    
+    Keeps only what history lookups show, under the original id.
+    """
+    
+    id = models.BigIntegerField(primary_key=True)
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    notification_type = models.CharField(max_length=30)
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    priority = models.CharField(max_length=10)
+    related_object_type = models.CharField(max_length=50, blank=True)
+    related_object_id = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    read_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'notification_archive'
+        verbose_name = 'Archived Notification'
+        verbose_name_plural = 'Archived Notifications'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.recipient.username} - {self.title}"
+
+
+class NotificationCounter(models.Model):
+    """Per-user, per-type notification totals maintained on every write"""
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notification_counters')
+    notification_type = models.CharField(max_length=30)
+    total_count = models.IntegerField(default=0)
+    unread_count = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'notification_counters'
+        verbose_name = 'Notification Counter'
+        verbose_name_plural = 'Notification Counters'
+        unique_together = ['user', 'notification_type']
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.notification_type}: {self.unread_count}/{self.total_count}"
 
 
 class NotificationPreference(models.Model):
     """User notification preferences"""
     
+    # Preference flag that controls each notification type.
+    # Types missing here are always delivered.
+    TYPE_FIELDS = {
+        'LEAVE_REQUESTED': 'leave_notifications',
+        'LEAVE_APPROVED': 'leave_notifications',
+        'LEAVE_REJECTED': 'leave_notifications',
+        'ATTENDANCE_REGULARIZATION': 'attendance_notifications',
+        'PAYROLL_GENERATED': 'payroll_notifications',
+        'PAYROLL_PAID': 'payroll_notifications',
+        'GENERAL': 'general_notifications',
+    }
+    
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='notification_preferences')
     email_notifications = models.BooleanField(default=True)
     leave_notifications = models.BooleanField(default=True)
@@ -0,0 +1,82 @@
+"""
+Notification preference cache
+Per-process cache of NotificationPreference flags keyed by user id
+
+Rows are loaded for many users in one query and invalidated by the
+post_save/post_delete handlers in notifications.signals. Entries also
+expire after NOTIFICATION_PREFERENCE_CACHE_TTL seconds so that changes
+made in another worker process are picked up.
+"""
+import threading
+import time
+from django.conf import settings
+from .models import NotificationPreference
+
+DEFAULT_CACHE_TTL = 300  # seconds
+DEFAULT_CACHE_MAX_ENTRIES = 10000
+
+PREFERENCE_FIELDS = tuple(sorted(set(NotificationPreference.TYPE_FIELDS.values())))
+
+# user_id -> (expires_at, flags dict or None when the user has no preference row)
+_cache = {}
+_lock = threading.Lock()
+
+
+def get_preferences(user_ids):
+    """
+    Preference flags for many users, querying only the uncached ones
+
+    Returns:
+        dict mapping user id -> flags dict, or None if the user has no
+        preference row (meaning every notification type is allowed)
+    """
+    user_ids = set(user_ids)
+    now = time.monotonic()
+    result = {}
+
+    with _lock:
+        for user_id in user_ids:
+            entry = _cache.get(user_id)
+            if entry and entry[0] > now:
+                result[user_id] = entry[1]
+
+    missing = user_ids - result.keys()
+    if missing:
+        rows = NotificationPreference.objects.filter(
+            user_id__in=missing
+        ).values('user_id', *PREFERENCE_FIELDS)
+
+        loaded = {user_id: None for user_id in missing}
+        for row in rows:
+            loaded[row.pop('user_id')] = row
+
+        ttl = getattr(settings, 'NOTIFICATION_PREFERENCE_CACHE_TTL', DEFAULT_CACHE_TTL)
+        max_entries = getattr(settings, 'NOTIFICATION_PREFERENCE_CACHE_MAX_ENTRIES', DEFAULT_CACHE_MAX_ENTRIES)
+        with _lock:
+            if len(_cache) + len(loaded) > max_entries:
+                _cache.clear()
+            for user_id, flags in loaded.items():
+                _cache[user_id] = (now + ttl, flags)
+        result.update(loaded)
+
+    return result
+
+
+def allows(flags, notification_type):
+    """Whether cached preference flags allow a notification type"""
+    if flags is None:
+        return True
+    field = NotificationPreference.TYPE_FIELDS.get(notification_type)
+    return field is None or flags[field]
+
+
+def invalidate_preferences(user_id):
+    """Drop one user's cached preferences"""
+    with _lock:
+        _cache.pop(user_id, None)
+
+
+def clear_preference_cache():
+    """Drop every cached preference row"""
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,123 @@
+"""
+Notification retention
+Moves read notifications past their retention period into NotificationArchive
+
+How long a read notification stays in the hot table depends on its type
+and priority (NOTIFICATION_RETENTION_* settings). archive_notifications()
+works through the table in id order, one short transaction per batch: copy
+the batch into the archive, take it off the recipients' counters and
+delete it by primary key. Each batch is committed on its own, so a run can
+be stopped at any point and the next run simply carries on; ``pause``
+leaves room between batches for other writers, which matters on SQLite
+where a write transaction locks the whole database.
+"""
+import time
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .counters import apply_counter_changes, uncounted_deletes
+from .models import Notification, NotificationArchive
+
+DEFAULT_RETENTION_DAYS = 90
+DEFAULT_ARCHIVE_BATCH_SIZE = 1000
+
+ARCHIVE_FIELDS = (
+    'id', 'recipient_id', 'notification_type', 'title', 'message', 'priority',
+    'related_object_type', 'related_object_id', 'created_at', 'read_at',
+)
+
+
+def retention_days(notification_type, priority):
+    """
+    Days a read notification of this type and priority is kept
+
+    Type and priority overrides can both apply; the longer one wins, so an
+    override can only shorten retention when nothing else extends it.
+    """
+    by_type = getattr(settings, 'NOTIFICATION_RETENTION_BY_TYPE', {})
+    by_priority = getattr(settings, 'NOTIFICATION_RETENTION_BY_PRIORITY', {})
+    overrides = [
+        days for days in (by_type.get(notification_type), by_priority.get(priority))
+        if days is not None
+    ]
+    if overrides:
+        return max(overrides)
+    return getattr(settings, 'NOTIFICATION_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+
+
+def expired_filter(now=None):
+    """Q matching read notifications past their retention"""
+    now = now or timezone.now()
+    known_types = [ntype for ntype, _ in Notification.NOTIFICATION_TYPES]
+    priorities = [priority for priority, _ in Notification.PRIORITY_CHOICES]
+
+    # days -> notification_type (None for types outside NOTIFICATION_TYPES) -> priorities
+    policy = defaultdict(lambda: defaultdict(list))
+    for ntype in known_types + [None]:
+        for priority in priorities:
+            policy[retention_days(ntype, priority)][ntype].append(priority)
+
+    condition = Q()
+    for days, types in policy.items():
+        matches = Q()
+        for ntype, type_priorities in types.items():
+            type_match = Q(notification_type=ntype) if ntype else ~Q(notification_type__in=known_types)
+            matches |= type_match & Q(priority__in=type_priorities)
+        condition |= matches & Q(created_at__lt=now - timedelta(days=days))
+    return Q(is_read=True) & condition
+
+
+def archive_notifications(batch_size=None, max_batches=None, pause=0, dry_run=False, now=None):
+    """
+    Move expired read notifications into the archive in bounded batches
+
+    Args:
+        batch_size: Notifications per transaction (default NOTIFICATION_ARCHIVE_BATCH_SIZE)
+        max_batches: Stop after this many batches; the next run continues
+        pause: Seconds to sleep between batches
+        dry_run: Only count what would be archived
+
+    Returns the number of notifications archived (or that would be).
+    """
+    batch_size = batch_size or getattr(settings, 'NOTIFICATION_ARCHIVE_BATCH_SIZE', DEFAULT_ARCHIVE_BATCH_SIZE)
+    if batch_size < 1:
+        raise ValueError('batch_size must be positive')
+
+    expired = Notification.objects.filter(expired_filter(now)).order_by('id')
+    if dry_run:
+        return expired.count()
+
+    archived = 0
+    batches = 0
+    last_id = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            # Locked so a notification marked unread meanwhile isn't archived
+            rows = list(expired.select_for_update().filter(id__gt=last_id).values(*ARCHIVE_FIELDS)[:batch_size])
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+            archived += _archive_batch(rows)
+        batches += 1
+        if pause:
+            time.sleep(pause)
+    return archived
+
+
+def _archive_batch(rows):
+    """Copy rows into the archive, uncount them and delete them"""
+    deltas = defaultdict(lambda: [0, 0])
+    for row in rows:
+        deltas[(row['recipient_id'], row['notification_type'])][0] -= 1
+
+    NotificationArchive.objects.bulk_create(
+        [NotificationArchive(**row) for row in rows], ignore_conflicts=True
+    )
+    apply_counter_changes(deltas)
+    # Counters are already adjusted for the whole batch
+    with uncounted_deletes():
+        deleted, _ = Notification.objects.filter(id__in=[row['id'] for row in rows]).delete()
+    return deleted
@@ -1,38 +1,126 @@
 from rest_framework import serializers
-from .models import Notification, NotificationPreference
+from Dayflow.prefetch import PrefetchPlanMixin
+from .models import Notification, NotificationArchive, NotificationPreference, NotificationBroadcast
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+def time_ago(created_at):
+    """Get human-readable time difference"""
+    from django.utils import timezone
+    
+    now = timezone.now()
+    diff = now - created_at
+    
+    if diff.days > 0:
+        return f"{diff.days} day{'s' if diff.days != 1 else ''} ago"
+    elif diff.seconds >= 3600:
+        hours = diff.seconds // 3600
+        return f"{hours} hour{'s' if hours != 1 else ''} ago"
+    elif diff.seconds >= 60:
+        minutes = diff.seconds // 60
+        return f"{minutes} minute{'s' if minutes != 1 else ''} ago"
+    else:
+        return "Just now"
+
+
+class NotificationSerializer(PrefetchPlanMixin, serializers.ModelSerializer):
     """Notification Serializer"""
     
+    source = serializers.SerializerMethodField()
     recipient_name = serializers.CharField(source='recipient.username', read_only=True)
     time_ago = serializers.SerializerMethodField()
     
     class Meta:
         model = Notification
-        fields = ['id', 'recipient', 'recipient_name', 'notification_type', 'title', 
+        fields = ['id', 'source', 'recipient', 'recipient_name', 'notification_type', 'title', 
                   'message', 'priority', 'is_read', 'read_at', 'related_object_type',
                   'related_object_id', 'action_url', 'created_at', 'time_ago']
         read_only_fields = ['id', 'recipient', 'created_at', 'read_at']
     
+    def get_source(self, obj):
+        return 'notification'
+    
+    def get_time_ago(self, obj):
+        return time_ago(obj.created_at)
+
+
+class BroadcastMessageSerializer(serializers.ModelSerializer):
+    """
+    A broadcast as one recipient sees it, shaped like NotificationSerializer
+    
+    Expects a broadcast from visible_broadcasts() (with is_read/read_at
+    annotations) and the recipient in context['user'].
+    """
+    
+    source = serializers.SerializerMethodField()
+    recipient = serializers.SerializerMethodField()
+    recipient_name = serializers.SerializerMethodField()
+    is_read = serializers.BooleanField(read_only=True)
+    read_at = serializers.DateTimeField(read_only=True)
+    related_object_type = serializers.SerializerMethodField()
+    related_object_id = serializers.IntegerField(source='id', read_only=True)
+    action_url = serializers.SerializerMethodField()
+    time_ago = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = NotificationBroadcast
+        fields = ['id', 'source', 'recipient', 'recipient_name', 'notification_type', 'title',
+                  'message', 'priority', 'is_read', 'read_at', 'related_object_type',
+                  'related_object_id', 'action_url', 'created_at', 'time_ago']
+        read_only_fields = fields
+    
+    def get_source(self, obj):
+        return 'broadcast'
+    
+    def get_recipient(self, obj):
+        return self.context['user'].pk
+    
+    def get_recipient_name(self, obj):
+        return self.context['user'].username
+    
+    def get_related_object_type(self, obj):
+        return 'broadcast'
+    
+    def get_action_url(self, obj):
+        return ''
+    
     def get_time_ago(self, obj):
-        """Get human-readable time difference"""
-        from django.utils import timezone
-        from datetime import datetime
-        
-        now = timezone.now()
-        diff = now - obj.created_at
-        
-        if diff.days > 0:
-            return f"{diff.days} day{'s' if diff.days != 1 else ''} ago"
-        elif diff.seconds >= 3600:
-            hours = diff.seconds // 3600
-            return f"{hours} hour{'s' if hours != 1 else ''} ago"
-        elif diff.seconds >= 60:
-            minutes = diff.seconds // 60
-            return f"{minutes} minute{'s' if minutes != 1 else ''} ago"
-        else:
-            return "Just now"
+        return time_ago(obj.created_at)
+
+
+class LiveNotificationSerializer(NotificationSerializer):
+    """
+    Notification as published to the live stream
+    
+    Leaves out the recipient's name so publishing needs no user rows; the
+    stream adds recipient details for the connected user.
+    """
+    
+    recipient_name = None
+    
+    class Meta(NotificationSerializer.Meta):
+        fields = [field for field in NotificationSerializer.Meta.fields if field != 'recipient_name']
+
+
+class LiveBroadcastSerializer(BroadcastMessageSerializer):
+    """Broadcast as published to the live stream: new, so unread, and without a recipient"""
+    
+    recipient = None
+    recipient_name = None
+    is_read = serializers.SerializerMethodField()
+    read_at = serializers.SerializerMethodField()
+    
+    class Meta(BroadcastMessageSerializer.Meta):
+        fields = [
+            field for field in BroadcastMessageSerializer.Meta.fields
+            if field not in ('recipient', 'recipient_name')
+        ]
+        read_only_fields = fields
+    
+    def get_is_read(self, obj):
+        return False
+    
+    def get_read_at(self, obj):
+        return None
 
 
 class NotificationCreateSerializer(serializers.ModelSerializer):
@@ -53,3 +141,27 @@ class NotificationPreferenceSerializer(serializers.ModelSerializer):
                   'attendance_notifications', 'payroll_notifications', 
                   'general_notifications', 'created_at', 'updated_at']
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']
+
+
+class NotificationBroadcastSerializer(serializers.ModelSerializer):
+    """Notification Broadcast Serializer (progress polling)"""
+    
+    progress = serializers.FloatField(read_only=True)
+    
+    class Meta:
+        model = NotificationBroadcast
+        fields = ['id', 'title', 'notification_type', 'priority', 'role', 'status',
+                  'total_recipients', 'delivered_count', 'progress', 'error',
+                  'created_by', 'created_at', 'completed_at']
+        read_only_fields = fields
+
+
+class NotificationArchiveSerializer(serializers.ModelSerializer):
+    """Archived Notification Serializer (read-only history)"""
+    
+    class Meta:
+        model = NotificationArchive
+        fields = ['id', 'notification_type', 'title', 'message', 'priority',
+                  'related_object_type', 'related_object_id', 'created_at',
+                  'read_at', 'archived_at']
+        read_only_fields = fields
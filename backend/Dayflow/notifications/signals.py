@@ -0,0 +1,37 @@
+"""
+Notification signal handlers
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .counters import apply_counter_changes, count_created, deletes_counted
+from .events import publish_notifications
+from .models import Notification, NotificationPreference
+from .preferences import invalidate_preferences
+
+
+@receiver(post_save, sender=NotificationPreference)
+@receiver(post_delete, sender=NotificationPreference)
+def invalidate_cached_preferences(sender, instance, **kwargs):
+    """Keep the per-process preference cache in step with writes"""
+    invalidate_preferences(instance.user_id)
+
+
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    """
+    Count and publish single creates (e.g. HR's create endpoint); bulk
+    inserts call count_created() and publish_notifications() themselves
+    """
+    if created:
+        count_created([instance])
+        publish_notifications([instance])
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_deleted_notification(sender, instance, **kwargs):
+    """Take a deleted notification off its recipient's counters"""
+    if not deletes_counted():
+        return
+    apply_counter_changes({
+        (instance.recipient_id, instance.notification_type): (-1, 0 if instance.is_read else -1)
+    })
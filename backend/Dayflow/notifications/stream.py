@@ -0,0 +1,117 @@
+"""
+Live notification stream
+Server-Sent Events for one user, read from the notification event log
+
+The stream opens with a ``counts`` event (the badge numbers) unless the
+client resumes with a Last-Event-ID that is still in the log, in which case
+it picks up right after that event; a resume id that has fallen out of the
+log gets a ``reset`` event first so the client reloads its list. After that
+each new notification or broadcast for the user arrives as a
+``notification`` event shaped like an item of my-notifications.
+
+Without ``keep_open`` (WSGI) the stream never waits: it returns whatever
+is pending and the client reconnects after the ``retry`` delay.
+"""
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+from .counters import notification_counts
+from .events import get_event_backend
+from .preferences import allows, get_preferences
+
+DEFAULT_MAX_AGE = 300
+DEFAULT_HEARTBEAT = 15
+DEFAULT_RETRY_MS = 3000
+
+
+def format_event(event_type, data, event_id=None):
+    """One SSE message"""
+    lines = []
+    if event_id:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event_type}')
+    lines.append(f'data: {json.dumps(data, cls=DjangoJSONEncoder)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Accepts EventSource's ``Accept: text/event-stream`` in content negotiation
+
+    The stream itself is a plain Django response; only error responses
+    (401, 403, 429) are rendered here, as an ``error`` event.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return format_event('error', data).encode(self.charset)
+
+
+async def is_visible(user, event):
+    """Whether an event from the log is meant for ``user``"""
+    if event['user_id'] is not None:
+        return event['user_id'] == user.pk
+    if event['role'] and event['role'] != user.role:
+        return False
+    flags = (await sync_to_async(get_preferences)([user.pk]))[user.pk]
+    return allows(flags, event['notification_type'])
+
+
+async def event_stream(user, last_event_id=None, max_age=None, keep_open=True):
+    """
+    Yield SSE messages for ``user`` for up to ``max_age`` seconds
+
+    With ``keep_open`` False nothing is waited for: the stream yields what
+    is already pending and ends, and the client reconnects with the last id.
+    """
+    backend = get_event_backend()
+    heartbeat = getattr(settings, 'NOTIFICATION_STREAM_HEARTBEAT', DEFAULT_HEARTBEAT)
+    retry = getattr(settings, 'NOTIFICATION_STREAM_RETRY_MS', DEFAULT_RETRY_MS)
+    yield f'retry: {retry}\n\n'
+
+    if last_event_id and not await backend.has_gap(last_event_id):
+        after_id = last_event_id
+    else:
+        if last_event_id:
+            yield format_event('reset', {})
+        after_id = await backend.latest_id()
+        counts = await sync_to_async(notification_counts)(user)
+        yield format_event('counts', counts, after_id)
+        if not keep_open:
+            return
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + (max_age if max_age is not None else heartbeat)
+    while True:
+        if keep_open:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            events = await backend.read(after_id, min(heartbeat, remaining))
+        else:
+            events = await backend.read(after_id, 0)
+        if not events:
+            if not keep_open:
+                return
+            yield ': keep-alive\n\n'
+            continue
+
+        delivered = False
+        for event_id, event in events:
+            after_id = event_id
+            if await is_visible(user, event):
+                data = dict(event['data'], recipient=user.pk, recipient_name=user.username)
+                yield format_event(event['type'], data, event_id)
+                delivered = True
+        if not delivered:
+            # Move the client's Last-Event-ID past events meant for others
+            yield f'id: {after_id}\n\n'
+        if not keep_open:
+            return
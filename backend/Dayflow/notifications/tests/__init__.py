@@ -1,2 +1,7 @@
 # Import test modules
 from .test_notifications import *
+from .test_broadcasts import *
+from .test_bulk_notifications import *
+from .test_notification_counters import *
+from .test_notification_retention import *
+from .test_notification_stream import *
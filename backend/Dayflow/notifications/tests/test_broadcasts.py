@@ -0,0 +1,141 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from users.models import User
+from notifications.models import BroadcastReceipt, Notification, NotificationPreference, NotificationBroadcast
+from notifications.broadcasts import start_broadcast, visible_broadcasts
+from notifications.preferences import clear_preference_cache
+from notifications.utils import create_notification
+
+
+class BroadcastPipelineTestCase(APITestCase):
+    """Test broadcasts are stored once and resolved per recipient on read"""
+
+    def setUp(self):
+        clear_preference_cache()
+        self.hr = User.objects.create_user(
+            username='hr',
+            email='hr@example.com',
+            password='pass123',
+            employee_id='HR001',
+            role='HR'
+        )
+        User.objects.bulk_create([
+            User(username=f'employee{i}', email=f'employee{i}@example.com',
+                 employee_id=f'EMP{i:03d}', role='EMPLOYEE')
+            for i in range(25)
+        ])
+        self.employees = list(User.objects.filter(role='EMPLOYEE').order_by('id'))
+
+    def test_broadcast_stores_message_once(self):
+        """Test publishing costs the same statements however many recipients"""
+        with self.assertNumQueries(2):
+            broadcast = start_broadcast('Announcement', 'Hello everyone')
+
+        self.assertEqual(broadcast.status, 'COMPLETED')
+        self.assertEqual(broadcast.total_recipients, 26)
+        self.assertEqual(broadcast.delivered_count, 26)
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(BroadcastReceipt.objects.exists())
+
+    def test_broadcast_respects_preferences(self):
+        """Test users who disabled the type are skipped"""
+        NotificationPreference.objects.create(user=self.employees[0], general_notifications=False)
+        NotificationPreference.objects.create(user=self.employees[1], leave_notifications=False)
+
+        broadcast = start_broadcast('Announcement', 'Hello', role='employee')
+
+        self.assertEqual(broadcast.delivered_count, 24)
+        self.assertFalse(visible_broadcasts(self.employees[0]).exists())
+        self.assertTrue(visible_broadcasts(self.employees[1]).exists())
+
+    def test_broadcast_endpoint_returns_pollable_id(self):
+        """Test the API returns a broadcast id that can be polled"""
+        self.client.force_authenticate(user=self.hr)
+
+        response = self.client.post(reverse('broadcast-notification'), {
+            'title': 'System Announcement',
+            'message': 'Maintenance tonight',
+            'role': 'EMPLOYEE'
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['count'], 25)
+        broadcast_id = response.data['broadcast_id']
+
+        response = self.client.get(reverse('broadcast-status', args=[broadcast_id]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'COMPLETED')
+        self.assertEqual(response.data['progress'], 1.0)
+        self.assertEqual(NotificationBroadcast.objects.get(pk=broadcast_id).created_by, self.hr)
+
+    def test_employee_cannot_poll_broadcast(self):
+        """Test broadcast status is HR-only"""
+        broadcast = start_broadcast('Announcement', 'Hello')
+        self.client.force_authenticate(user=self.employees[0])
+
+        response = self.client.get(reverse('broadcast-status', args=[broadcast.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_feed_merges_notifications_and_broadcasts(self):
+        """Test my-notifications pages through both sources newest first"""
+        employee = self.employees[0]
+        create_notification(employee, 'Direct 1', 'Message')
+        start_broadcast('Broadcast 1', 'Hello')
+        create_notification(employee, 'Direct 2', 'Message')
+        start_broadcast('Broadcast 2', 'Hello', role='HR')
+        start_broadcast('Broadcast 3', 'Hello', role='EMPLOYEE')
+        self.client.force_authenticate(user=employee)
+
+        titles = []
+        cursor = None
+        while True:
+            params = {'page_size': 2}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.client.get(reverse('my-notifications'), params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            titles += [item['title'] for item in response.data['notifications']]
+            cursor = response.data['next_cursor']
+            if not cursor:
+                break
+
+        self.assertEqual(titles, ['Broadcast 3', 'Direct 2', 'Broadcast 1', 'Direct 1'])
+        self.assertEqual(response.data['unread_count'], 4)
+
+    def test_receipts_track_read_and_deleted_state(self):
+        """Test receipts are created lazily and in bulk by mark-all-read"""
+        employee = self.employees[0]
+        first = start_broadcast('First', 'Hello')
+        second = start_broadcast('Second', 'Hello')
+        self.client.force_authenticate(user=employee)
+
+        response = self.client.get(reverse('broadcast-message', args=[first.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['source'], 'broadcast')
+        self.assertTrue(response.data['is_read'])
+        self.assertEqual(BroadcastReceipt.objects.filter(user=employee).count(), 1)
+
+        response = self.client.get(reverse('notification-stats'))
+        self.assertEqual(response.data['unread_notifications'], 1)
+
+        self.client.post(reverse('mark-all-read'))
+        self.assertEqual(BroadcastReceipt.objects.filter(user=employee, is_read=True).count(), 2)
+
+        response = self.client.delete(reverse('broadcast-message', args=[second.id]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.get(reverse('my-notifications'))
+        self.assertEqual([item['title'] for item in response.data['notifications']], ['First'])
+        # Other recipients are unaffected
+        self.assertEqual(visible_broadcasts(self.employees[1]).filter(is_read=False).count(), 2)
+
+    def test_broadcast_hidden_from_other_roles(self):
+        """Test a broadcast outside the user's audience can't be opened"""
+        broadcast = start_broadcast('HR only', 'Hello', role='HR')
+        self.client.force_authenticate(user=self.employees[0])
+
+        response = self.client.get(reverse('broadcast-message', args=[broadcast.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
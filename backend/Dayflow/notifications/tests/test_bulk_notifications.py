@@ -0,0 +1,97 @@
+from rest_framework.test import APITestCase
+from datetime import date
+from types import SimpleNamespace
+from users.models import User
+from notifications.models import Notification, NotificationPreference
+from notifications.preferences import clear_preference_cache, get_preferences
+from notifications.utils import (
+    create_notification, create_notifications_bulk, notify_leave_request
+)
+
+
+class BulkNotificationTestCase(APITestCase):
+    """Test preference-aware bulk notification creation"""
+
+    def setUp(self):
+        clear_preference_cache()
+
+        self.approvers = [
+            User.objects.create_user(
+                username=f'hr{i}',
+                email=f'hr{i}@example.com',
+                password='pass123',
+                employee_id=f'HR00{i}',
+                role='HR'
+            )
+            for i in range(4)
+        ]
+        NotificationPreference.objects.create(user=self.approvers[0], leave_notifications=False)
+        NotificationPreference.objects.create(user=self.approvers[1], general_notifications=False)
+
+    def test_bulk_resolves_preferences_in_one_query(self):
+        """Test one preference query, one insert and two counter statements for many recipients"""
+        with self.assertNumQueries(4):
+            created = create_notifications_bulk(
+                self.approvers,
+                title='Leave',
+                message='Pending approval',
+                notification_type='LEAVE_REQUESTED'
+            )
+
+        self.assertEqual(len(created), 3)
+        self.assertFalse(Notification.objects.filter(recipient=self.approvers[0]).exists())
+
+    def test_cached_preferences_skip_the_query(self):
+        """Test a warm cache needs only the insert and the counter statements"""
+        get_preferences([u.id for u in self.approvers])
+
+        with self.assertNumQueries(3):
+            created = create_notifications_bulk(
+                [u.id for u in self.approvers],
+                title='Hello',
+                message='General',
+            )
+
+        self.assertEqual(len(created), 3)
+
+    def test_preference_change_invalidates_cache(self):
+        """Test saving preferences drops the cached row"""
+        self.assertIsNone(create_notification(
+            self.approvers[0], 'Leave', 'Message', notification_type='LEAVE_APPROVED'
+        ))
+
+        preferences = NotificationPreference.objects.get(user=self.approvers[0])
+        preferences.leave_notifications = True
+        preferences.save()
+
+        self.assertIsNotNone(create_notification(
+            self.approvers[0], 'Leave', 'Message', notification_type='LEAVE_APPROVED'
+        ))
+
+    def test_preference_delete_invalidates_cache(self):
+        """Test deleting preferences re-enables every type"""
+        get_preferences([self.approvers[1].id])
+        NotificationPreference.objects.filter(user=self.approvers[1]).delete()
+
+        self.assertIsNone(get_preferences([self.approvers[1].id])[self.approvers[1].id])
+
+    def test_notify_helpers_route_through_bulk(self):
+        """Test notify_leave_request creates one row per allowed approver"""
+        employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001'
+        )
+        leave = SimpleNamespace(
+            id=7, employee=employee,
+            start_date=date(2026, 1, 5), end_date=date(2026, 1, 6)
+        )
+
+        created = notify_leave_request(leave, self.approvers)
+
+        self.assertEqual(len(created), 3)
+        self.assertEqual(
+            Notification.objects.filter(notification_type='LEAVE_REQUESTED', related_object_id=7).count(),
+            3
+        )
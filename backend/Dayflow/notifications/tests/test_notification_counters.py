@@ -0,0 +1,141 @@
+import importlib
+from io import StringIO
+from types import SimpleNamespace
+from django.apps import apps
+from django.db import connection
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from users.models import User
+from notifications.broadcasts import start_broadcast, visible_broadcasts
+from notifications.counters import notification_counts
+from notifications.models import Notification, NotificationCounter
+from notifications.preferences import clear_preference_cache
+from notifications.utils import create_notification, create_notifications_bulk
+
+
+class NotificationCounterTestCase(APITestCase):
+    """Test per-user notification counters stay in step with every write path"""
+
+    def setUp(self):
+        clear_preference_cache()
+
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        self.hr = User.objects.create_user(
+            username='hr',
+            email='hr@example.com',
+            password='pass123',
+            employee_id='HR001',
+            role='HR'
+        )
+
+    def assertCountersMatch(self, user):
+        """Counters must agree with COUNTs over notifications and visible broadcasts"""
+        notifications = Notification.objects.filter(recipient=user)
+        broadcasts = visible_broadcasts(user)
+        by_type = {}
+        for ntype, _ in Notification.NOTIFICATION_TYPES:
+            count = notifications.filter(notification_type=ntype).count() + \
+                broadcasts.filter(notification_type=ntype).count()
+            if count:
+                by_type[ntype] = count
+        self.assertEqual(notification_counts(user), {
+            'total': notifications.count() + broadcasts.count(),
+            'unread': notifications.filter(is_read=False).count() + broadcasts.filter(is_read=False).count(),
+            'by_type': by_type,
+        })
+
+    def test_creates_are_counted(self):
+        """Test single creates, bulk creates and broadcasts update counters"""
+        Notification.objects.create(recipient=self.employee, title='Direct', message='Message')
+        create_notification(self.employee, 'Paid', 'Message', notification_type='PAYROLL_PAID')
+        create_notifications_bulk([self.employee, self.hr], 'Leave', 'Message', notification_type='LEAVE_REQUESTED')
+        start_broadcast(title='Holiday', message='Office closed')
+
+        self.assertCountersMatch(self.employee)
+        self.assertCountersMatch(self.hr)
+        self.assertEqual(notification_counts(self.employee)['unread'], 4)
+
+    def test_read_state_changes_are_counted(self):
+        """Test reading, unreading and mark-all-read move the unread count"""
+        first = create_notification(self.employee, 'One', 'Message')
+        create_notification(self.employee, 'Two', 'Message', notification_type='PAYROLL_PAID')
+        create_notification(self.employee, 'Three', 'Message', notification_type='PAYROLL_PAID')
+        self.client.force_authenticate(user=self.employee)
+
+        self.client.get(reverse('notification-detail', kwargs={'pk': first.pk}))
+        # Reading it again must not count twice
+        first.mark_as_read()
+        self.assertEqual(notification_counts(self.employee)['unread'], 2)
+
+        self.client.patch(reverse('notification-detail', kwargs={'pk': first.pk}), {'is_read': False}, format='json')
+        self.assertCountersMatch(self.employee)
+
+        response = self.client.post(reverse('mark-all-read'))
+        self.assertEqual(response.data['message'], '3 notification(s) marked as read')
+        self.assertCountersMatch(self.employee)
+
+    def test_deletes_are_counted(self):
+        """Test deleting read and unread notifications updates both counts"""
+        unread = create_notification(self.employee, 'Unread', 'Message')
+        read = create_notification(self.employee, 'Read', 'Message')
+        read.mark_as_read()
+        self.client.force_authenticate(user=self.employee)
+
+        self.client.delete(reverse('notification-detail', kwargs={'pk': unread.pk}))
+        read.delete()
+
+        self.assertEqual(notification_counts(self.employee), {'total': 0, 'unread': 0, 'by_type': {}})
+
+    def test_stats_and_badge_read_counters(self):
+        """Test stats read the counter rows and one broadcast aggregate"""
+        for ntype in ('GENERAL', 'PAYROLL_PAID', 'LEAVE_APPROVED'):
+            create_notification(self.employee, ntype, 'Message', notification_type=ntype)
+        self.client.force_authenticate(user=self.employee)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('notification-stats'))
+
+        self.assertEqual(response.data, {
+            'total_notifications': 3,
+            'unread_notifications': 3,
+            'read_notifications': 0,
+            'by_type': {'LEAVE_APPROVED': 1, 'PAYROLL_PAID': 1, 'GENERAL': 1},
+        })
+        response = self.client.get(reverse('my-notifications'))
+        self.assertEqual(response.data['unread_count'], 3)
+
+    def test_rebuild_repairs_drift(self):
+        """Test the rebuild command recomputes counters from notifications"""
+        create_notification(self.employee, 'One', 'Message')
+        create_notification(self.hr, 'Two', 'Message', notification_type='PAYROLL_PAID')
+        # Bulk updates bypass the counters
+        Notification.objects.filter(recipient=self.employee).update(is_read=True)
+        NotificationCounter.objects.filter(user=self.hr).delete()
+
+        out = StringIO()
+        call_command('rebuild_notification_counters', stdout=out)
+
+        self.assertIn('Rebuilt 2 notification counter row(s)', out.getvalue())
+        self.assertCountersMatch(self.employee)
+        self.assertCountersMatch(self.hr)
+
+    def test_migration_backfills_existing_notifications(self):
+        """Test the data migration builds counters for rows written before counters existed"""
+        create_notification(self.employee, 'One', 'Message')
+        create_notification(self.employee, 'Two', 'Message', notification_type='PAYROLL_PAID')
+        Notification.objects.filter(title='One').update(is_read=True)
+        # As deployed before the counters table was populated
+        NotificationCounter.objects.all().delete()
+        migration = importlib.import_module('notifications.migrations.0006_backfill_notification_counters')
+
+        migration.backfill_counters(apps, SimpleNamespace(connection=connection))
+
+        self.assertCountersMatch(self.employee)
+        self.assertEqual(notification_counts(self.employee)['unread'], 1)
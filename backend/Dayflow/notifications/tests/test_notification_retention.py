@@ -0,0 +1,122 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from users.models import User
+from notifications.counters import notification_counts
+from notifications.models import Notification, NotificationArchive
+from notifications.preferences import clear_preference_cache
+from notifications.retention import archive_notifications, retention_days
+
+
+class NotificationRetentionTestCase(APITestCase):
+    """Test read notifications move to the archive once past retention"""
+
+    def setUp(self):
+        clear_preference_cache()
+
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+
+    def notify(self, title, age_days, is_read=True, **fields):
+        notification = Notification.objects.create(
+            recipient=self.employee, title=title, message='Message', is_read=is_read, **fields
+        )
+        # created_at is auto_now_add, so backdate it afterwards
+        Notification.objects.filter(pk=notification.pk).update(
+            created_at=timezone.now() - timedelta(days=age_days)
+        )
+        return notification
+
+    def test_policy_per_type_and_priority(self):
+        """Test overrides apply and the longer of type and priority wins"""
+        with self.settings(NOTIFICATION_RETENTION_DAYS=90,
+                           NOTIFICATION_RETENTION_BY_TYPE={'GENERAL': 30, 'PAYROLL_PAID': 365},
+                           NOTIFICATION_RETENTION_BY_PRIORITY={'URGENT': 180}):
+            self.assertEqual(retention_days('LEAVE_APPROVED', 'MEDIUM'), 90)
+            self.assertEqual(retention_days('GENERAL', 'MEDIUM'), 30)
+            self.assertEqual(retention_days('GENERAL', 'URGENT'), 180)
+            self.assertEqual(retention_days('PAYROLL_PAID', 'URGENT'), 365)
+
+    def test_archives_only_expired_read_notifications(self):
+        """Test unread and recent notifications stay, in several batches"""
+        with self.settings(NOTIFICATION_RETENTION_DAYS=90,
+                           NOTIFICATION_RETENTION_BY_TYPE={'GENERAL': 30},
+                           NOTIFICATION_RETENTION_BY_PRIORITY={}):
+            for i in range(5):
+                self.notify(f'Old general {i}', 40)
+            self.notify('Old leave', 40, notification_type='LEAVE_APPROVED')
+            self.notify('Old unread', 400, is_read=False)
+            self.notify('Ancient leave', 100, notification_type='LEAVE_APPROVED')
+
+            archived = archive_notifications(batch_size=2)
+
+        self.assertEqual(archived, 6)
+        self.assertEqual(
+            sorted(Notification.objects.values_list('title', flat=True)),
+            ['Old leave', 'Old unread']
+        )
+        self.assertEqual(NotificationArchive.objects.filter(recipient=self.employee).count(), 6)
+        self.assertEqual(notification_counts(self.employee)['total'], 2)
+        self.assertEqual(notification_counts(self.employee)['unread'], 1)
+
+    def test_archiving_counts_each_notification_once(self):
+        """Test archived rows leave the counters once and later deletes are counted again"""
+        for i in range(3):
+            self.notify(f'Old {i}', 400)
+        recent = self.notify('Recent', 1, is_read=False)
+
+        self.assertEqual(archive_notifications(batch_size=2), 3)
+        self.assertEqual(notification_counts(self.employee)['total'], 1)
+        self.assertEqual(notification_counts(self.employee)['unread'], 1)
+
+        recent.delete()
+        self.assertEqual(notification_counts(self.employee)['total'], 0)
+        self.assertEqual(notification_counts(self.employee)['unread'], 0)
+
+    def test_max_batches_resumes(self):
+        """Test a bounded run stops early and the next run carries on"""
+        for i in range(5):
+            self.notify(f'Old {i}', 400)
+
+        self.assertEqual(archive_notifications(batch_size=2, max_batches=1), 2)
+        self.assertEqual(Notification.objects.count(), 3)
+
+        out = StringIO()
+        call_command('archive_notifications', '--batch-size', '2', stdout=out)
+
+        self.assertIn('Archived 3 notification(s)', out.getvalue())
+        self.assertFalse(Notification.objects.exists())
+
+    def test_dry_run_moves_nothing(self):
+        """Test the command's dry run only counts"""
+        self.notify('Old', 400)
+
+        out = StringIO()
+        call_command('archive_notifications', '--dry-run', stdout=out)
+
+        self.assertIn('Would archive 1 notification(s)', out.getvalue())
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_archive_endpoint_lists_own_history(self):
+        """Test the archive endpoint pages through the user's archived notifications"""
+        self.notify('Old', 400, notification_type='PAYROLL_PAID')
+        self.notify('Older', 500)
+        archive_notifications()
+        self.client.force_authenticate(user=self.employee)
+
+        response = self.client.get(reverse('notification-archive'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['title'] for item in response.data['notifications']], ['Old', 'Older'])
+
+        response = self.client.get(reverse('notification-archive'), {'type': 'payroll_paid'})
+        self.assertEqual(response.data['count'], 1)
@@ -0,0 +1,159 @@
+import asyncio
+import re
+import time
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from users.models import User
+from users.jwt_serializers import CustomTokenObtainPairSerializer
+from notifications.broadcasts import start_broadcast
+from notifications.events import LocalEventBackend, get_event_backend
+from notifications.preferences import clear_preference_cache
+from notifications.utils import create_notification
+
+
+class NotificationStreamTestCase(APITestCase):
+    """Test the live notification stream and its event log"""
+
+    def setUp(self):
+        clear_preference_cache()
+        get_event_backend.cache_clear()
+
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        self.hr = User.objects.create_user(
+            username='hr',
+            email='hr@example.com',
+            password='pass123',
+            employee_id='HR001',
+            role='HR'
+        )
+        self.token = CustomTokenObtainPairSerializer.get_token(self.employee).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def tearDown(self):
+        get_event_backend.cache_clear()
+
+    def connect(self, **headers):
+        response = self.client.get(reverse('notification-stream'), **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return response.content.decode()
+
+    def notify_committed(self, title):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_notification(self.employee, title, 'Message')
+
+    def test_requires_authentication(self):
+        """Test the stream rejects missing credentials"""
+        self.client.credentials()
+        response = self.client.get(reverse('notification-stream'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_wsgi_returns_without_waiting(self):
+        """Test a WSGI connection with nothing pending returns at once with a retry hint"""
+        last_id = re.search(r'id: (\S+)\nevent: counts', self.connect()).group(1)
+
+        started = time.monotonic()
+        with self.settings(NOTIFICATION_STREAM_HEARTBEAT=5):
+            body = self.connect(HTTP_LAST_EVENT_ID=last_id, HTTP_ACCEPT='text/event-stream')
+
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertTrue(body.startswith('retry: '))
+        self.assertNotIn('event:', body)
+
+    def test_event_stream_errors(self):
+        """Test EventSource clients get auth errors as an event"""
+        self.client.credentials()
+
+        response = self.client.get(reverse('notification-stream'), HTTP_ACCEPT='text/event-stream')
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertTrue(response.content.decode().startswith('event: error\n'))
+
+    def test_first_connect_sends_counts(self):
+        """Test a fresh connection starts with the badge counts"""
+        create_notification(self.employee, 'Unread', 'Message')
+
+        body = self.connect()
+
+        self.assertIn('event: counts', body)
+        self.assertIn('"unread": 1', body)
+
+    def test_resume_delivers_own_events_only(self):
+        """Test resuming from Last-Event-ID delivers what the user missed"""
+        last_id = re.search(r'id: (\S+)\nevent: counts', self.connect()).group(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            create_notification(self.hr, 'For HR', 'Message')
+            create_notification(self.employee, 'For employee', 'Message')
+            start_broadcast(title='HR only', message='Message', role='HR')
+            start_broadcast(title='Everyone', message='Message')
+
+        body = self.connect(HTTP_LAST_EVENT_ID=last_id)
+
+        self.assertNotIn('event: counts', body)
+        self.assertIn('"title": "For employee"', body)
+        self.assertIn('"recipient_name": "employee"', body)
+        self.assertIn('"title": "Everyone"', body)
+        self.assertNotIn('For HR', body)
+        self.assertNotIn('HR only', body)
+
+    def test_created_by_hr_reaches_stream(self):
+        """Test notifications from the create endpoint are published too"""
+        last_id = re.search(r'id: (\S+)\nevent: counts', self.connect()).group(1)
+        self.client.credentials()
+        self.client.force_authenticate(user=self.hr)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('create-notification'), {
+                'recipient': self.employee.id, 'title': 'From HR', 'message': 'Message'
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.client.force_authenticate(user=None)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+        body = self.connect(HTTP_LAST_EVENT_ID=last_id)
+
+        self.assertEqual(body.count('"title": "From HR"'), 1)
+
+    def test_lost_events_reset_the_client(self):
+        """Test an id from another process asks the client to reload"""
+        body = self.connect(HTTP_LAST_EVENT_ID='1-5')
+
+        self.assertLess(body.index('event: reset'), body.index('event: counts'))
+
+    def test_local_backend_reports_gaps(self):
+        """Test ids that fell out of the buffer are reported as a gap"""
+        backend = LocalEventBackend(buffer_size=2)
+        first = async_to_sync(backend.latest_id)()
+        second = backend.publish({'n': 1})
+        for n in range(2, 4):
+            backend.publish({'n': n})
+
+        self.assertTrue(async_to_sync(backend.has_gap)(first))
+        self.assertFalse(async_to_sync(backend.has_gap)(second))
+        events = async_to_sync(backend.read)(second, 0)
+        self.assertEqual([event for _, event in events], [{'n': 2}, {'n': 3}])
+
+    async def test_asgi_stream_pushes_new_notifications(self):
+        """Test an open ASGI stream receives a notification created after connecting"""
+        client = AsyncClient()
+        with self.settings(NOTIFICATION_STREAM_MAX_AGE=5):
+            response = await client.get(reverse('notification-stream'), headers={
+                'Authorization': f'Bearer {self.token}',
+            })
+            messages = aiter(response.streaming_content)
+            while b'event: counts' not in await anext(messages):
+                pass
+
+            await sync_to_async(self.notify_committed)('Pushed')
+            message = await asyncio.wait_for(anext(messages), 2)
+            await messages.aclose()
+
+        self.assertIn(b'"title": "Pushed"', message)
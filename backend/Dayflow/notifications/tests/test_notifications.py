@@ -4,12 +4,16 @@ from rest_framework import status
 from users.models import User
 from notifications.models import Notification, NotificationPreference
 from notifications.utils import create_notification
+from notifications.broadcasts import visible_broadcasts
+from notifications.preferences import clear_preference_cache
 
 
 class NotificationsTestCase(APITestCase):
     """Test notifications system"""
     
     def setUp(self):
+        clear_preference_cache()
+        
         # Create test users
         self.employee = User.objects.create_user(
             username='employee',
@@ -228,11 +232,11 @@ class NotificationsTestCase(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         
-        # Check all users received notification
-        total_notifications = Notification.objects.filter(
-            title='System Announcement'
-        ).count()
-        self.assertGreaterEqual(total_notifications, 2)
+        # Check all users received notification, with the text stored once
+        for user in User.objects.all():
+            self.assertTrue(visible_broadcasts(user).filter(title='System Announcement').exists())
+        self.assertEqual(response.data['count'], User.objects.count())
+        self.assertFalse(Notification.objects.filter(title='System Announcement').exists())
     
     def test_broadcast_to_specific_role(self):
         """Test broadcasting to specific role"""
@@ -250,11 +254,8 @@ class NotificationsTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         
         # Check only employees received
-        employee_notifications = Notification.objects.filter(
-            recipient=self.employee,
-            title='Employee Announcement'
-        ).count()
-        self.assertEqual(employee_notifications, 1)
+        self.assertEqual(visible_broadcasts(self.employee).filter(title='Employee Announcement').count(), 1)
+        self.assertFalse(visible_broadcasts(self.hr).filter(title='Employee Announcement').exists())
     
     def test_get_notification_preferences(self):
         """Test getting notification preferences"""
@@ -1,20 +1,28 @@
 from django.urls import path
 from .views import (
     MyNotificationsView,
+    ArchivedNotificationsView,
+    NotificationStreamView,
     NotificationDetailView,
     MarkAllReadView,
     CreateNotificationView,
     BroadcastNotificationView,
+    BroadcastStatusView,
+    BroadcastMessageView,
     NotificationPreferencesView,
     NotificationStatsView
 )
 
 urlpatterns = [
     path('my-notifications/', MyNotificationsView.as_view(), name='my-notifications'),
+    path('stream/', NotificationStreamView.as_view(), name='notification-stream'),
+    path('archive/', ArchivedNotificationsView.as_view(), name='notification-archive'),
     path('<int:pk>/', NotificationDetailView.as_view(), name='notification-detail'),
     path('mark-all-read/', MarkAllReadView.as_view(), name='mark-all-read'),
     path('create/', CreateNotificationView.as_view(), name='create-notification'),
     path('broadcast/', BroadcastNotificationView.as_view(), name='broadcast-notification'),
+    path('broadcast/<int:pk>/', BroadcastStatusView.as_view(), name='broadcast-status'),
+    path('broadcast/<int:pk>/message/', BroadcastMessageView.as_view(), name='broadcast-message'),
     path('preferences/', NotificationPreferencesView.as_view(), name='notification-preferences'),
     path('stats/', NotificationStatsView.as_view(), name='notification-stats'),
 ]
@@ -1,7 +1,68 @@
 """
 Utility functions for creating notifications
 """
-from .models import Notification, NotificationPreference
+from django.db import transaction
+from .counters import count_created
+from .events import publish_notifications
+from .models import Notification
+from .preferences import get_preferences, allows
+
+
+def create_notifications_bulk(recipients, title, message, notification_type='GENERAL',
+                              priority='MEDIUM', related_object_type='',
+                              related_object_id=None, action_url=''):
+    """
+    Create the same notification for many users at once
+    
+    Preferences for all recipients are resolved in one query (or from the
+    per-process preference cache) and the allowed notifications are written
+    with a single bulk insert.
+    
+    Args:
+        recipients: Iterable of User objects or user ids
+        title, message, notification_type, priority, related_object_type,
+        related_object_id, action_url: See create_notification
+    
+    Returns:
+        List of created Notification objects (users who disabled this
+        type are skipped)
+    """
+    recipient_ids = []
+    seen = set()
+    for recipient in recipients:
+        recipient_id = getattr(recipient, 'pk', recipient)
+        if recipient_id not in seen:
+            seen.add(recipient_id)
+            recipient_ids.append(recipient_id)
+    
+    if not recipient_ids:
+        return []
+    
+    # Check user preferences
+    preferences = get_preferences(recipient_ids)
+    
+    notifications = [
+        Notification(
+            recipient_id=recipient_id,
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            priority=priority,
+            related_object_type=related_object_type,
+            related_object_id=related_object_id,
+            action_url=action_url
+        )
+        for recipient_id in recipient_ids
+        if allows(preferences[recipient_id], notification_type)
+    ]
+    
+    if notifications:
+        with transaction.atomic(savepoint=False):
+            notifications = Notification.objects.bulk_create(notifications)
+            count_created(notifications)
+            publish_notifications(notifications)
+    
+    return notifications
 
 
 def create_notification(recipient, title, message, notification_type='GENERAL', 
@@ -23,56 +84,32 @@ def create_notification(recipient, title, message, notification_type='GENERAL',
     Returns:
         Notification object or None if preferences don't allow
     """
-    # Check user preferences
-    try:
-        preferences = NotificationPreference.objects.get(user=recipient)
-        
-        # Check if user wants this type of notification
-        type_map = {
-            'LEAVE_REQUESTED': preferences.leave_notifications,
-            'LEAVE_APPROVED': preferences.leave_notifications,
-            'LEAVE_REJECTED': preferences.leave_notifications,
-            'ATTENDANCE_REGULARIZATION': preferences.attendance_notifications,
-            'PAYROLL_GENERATED': preferences.payroll_notifications,
-            'PAYROLL_PAID': preferences.payroll_notifications,
-            'GENERAL': preferences.general_notifications,
-        }
-        
-        if notification_type in type_map and not type_map[notification_type]:
-            return None  # User has disabled this type
-            
-    except NotificationPreference.DoesNotExist:
-        # No preferences set, create notification anyway
-        pass
-    
-    # Create notification
-    notification = Notification.objects.create(
-        recipient=recipient,
-        notification_type=notification_type,
+    notifications = create_notifications_bulk(
+        [recipient],
         title=title,
         message=message,
+        notification_type=notification_type,
         priority=priority,
         related_object_type=related_object_type,
         related_object_id=related_object_id,
         action_url=action_url
     )
     
-    return notification
+    return notifications[0] if notifications else None
 
 
 def notify_leave_request(leave_request, approvers):
     """Notify approvers about new leave request"""
-    for approver in approvers:
-        create_notification(
-            recipient=approver,
-            title='New Leave Request',
-            message=f'{leave_request.employee.username} has requested leave from {leave_request.start_date} to {leave_request.end_date}',
-            notification_type='LEAVE_REQUESTED',
-            priority='MEDIUM',
-            related_object_type='leave',
-            related_object_id=leave_request.id,
-            action_url=f'/leaves/{leave_request.id}/'
-        )
+    return create_notifications_bulk(
+        approvers,
+        title='New Leave Request',
+        message=f'{leave_request.employee.username} has requested leave from {leave_request.start_date} to {leave_request.end_date}',
+        notification_type='LEAVE_REQUESTED',
+        priority='MEDIUM',
+        related_object_type='leave',
+        related_object_id=leave_request.id,
+        action_url=f'/leaves/{leave_request.id}/'
+    )
 
 
 def notify_leave_status(leave_request):
@@ -98,17 +135,16 @@ def notify_leave_status(leave_request):
 
 def notify_attendance_regularization(regularization, approvers):
     """Notify approvers about attendance regularization request"""
-    for approver in approvers:
-        create_notification(
-            recipient=approver,
-            title='Attendance Regularization Request',
-            message=f'{regularization.employee.username} has requested attendance regularization for {regularization.date}',
-            notification_type='ATTENDANCE_REGULARIZATION',
-            priority='MEDIUM',
-            related_object_type='regularization',
-            related_object_id=regularization.id,
-            action_url=f'/attendance/regularization/{regularization.id}/'
-        )
+    return create_notifications_bulk(
+        approvers,
+        title='Attendance Regularization Request',
+        message=f'{regularization.employee.username} has requested attendance regularization for {regularization.date}',
+        notification_type='ATTENDANCE_REGULARIZATION',
+        priority='MEDIUM',
+        related_object_type='regularization',
+        related_object_id=regularization.id,
+        action_url=f'/attendance/regularization/{regularization.id}/'
+    )
 
 
 def notify_payroll_generated(payroll):
@@ -1,20 +1,34 @@
+import time
 from rest_framework.views import APIView
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from .models import Notification, NotificationPreference
+from .models import Notification, NotificationArchive, NotificationPreference, NotificationBroadcast
 from .serializers import (
-    NotificationSerializer, NotificationCreateSerializer,
-    NotificationPreferenceSerializer
+    NotificationSerializer, NotificationCreateSerializer, BroadcastMessageSerializer,
+    NotificationPreferenceSerializer, NotificationBroadcastSerializer,
+    NotificationArchiveSerializer
 )
+from .broadcasts import mark_broadcasts_read, set_receipt, start_broadcast, visible_broadcasts
+from .counters import mark_all_read, notification_counts
+from .feed import FEED_ORDERING, feed_querysets, serialize_feed
+from .stream import DEFAULT_MAX_AGE, EventStreamRenderer, event_stream
 from users.permissions import IsAdminOrHR
+from Dayflow.async_views import AsyncAPIView
+from Dayflow.pagination import KeysetPagination
 
 
 class MyNotificationsView(APIView):
-    """Get current user's notifications"""
+    """Get current user's notifications and broadcasts, newest first"""
     permission_classes = [IsAuthenticated]
+    # Reads only the user's id, role and username, all in the token claims
+    claims_user = True
     
     def get(self, request):
         user = request.user
@@ -23,20 +37,76 @@ class MyNotificationsView(APIView):
         unread_only = request.query_params.get('unread_only', 'false').lower() == 'true'
         notification_type = request.query_params.get('type', None)
         
-        notifications = Notification.objects.filter(recipient=user)
+        paginator = KeysetPagination(ordering=FEED_ORDERING)
+        page = paginator.paginate_union(feed_querysets(user, unread_only, notification_type), request)
+        return paginator.get_paginated_response(serialize_feed(user, page), 'notifications', extra={
+            'unread_count': notification_counts(user)['unread'],
+        })
+
+
+class NotificationStreamView(AsyncAPIView):
+    """
+    Live notifications as Server-Sent Events (replaces polling)
+    
+    Under ASGI the connection stays open for NOTIFICATION_STREAM_MAX_AGE
+    seconds, or until the access token expires, and the client reconnects
+    with Last-Event-ID. Under WSGI an open stream would hold a worker, so
+    the response returns at once with whatever is pending and the client
+    reconnects after the ``retry`` delay (polling, minus the extra requests
+    for the list).
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+    # Reads only the user's id, role and username, all in the token claims
+    claims_user = True
+    
+    async def get(self, request):
+        user = request.user
+        
+        # EventSource sends the header on reconnect; the parameter serves first loads
+        last_event_id = request.headers.get('Last-Event-ID') or request.query_params.get('last_event_id')
+        keep_open = isinstance(request._request, ASGIRequest)
+        
+        if keep_open:
+            max_age = getattr(settings, 'NOTIFICATION_STREAM_MAX_AGE', DEFAULT_MAX_AGE)
+            max_age = min(max_age, request.auth['exp'] - time.time())
+            events = event_stream(user, last_event_id, max_age=max_age)
+            response = StreamingHttpResponse(events, content_type='text/event-stream')
+        else:
+            events = event_stream(user, last_event_id, keep_open=False)
+            response = HttpResponse(''.join([message async for message in events]),
+                                    content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class ArchivedNotificationsView(APIView):
+    """Get current user's archived notifications (history past retention)"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        user = request.user
+        
+        # Filter parameters
+        notification_type = request.query_params.get('type', None)
+        from_date = request.query_params.get('from_date', None)
+        to_date = request.query_params.get('to_date', None)
         
-        if unread_only:
-            notifications = notifications.filter(is_read=False)
+        archived = NotificationArchive.objects.filter(recipient=user)
         
         if notification_type:
-            notifications = notifications.filter(notification_type=notification_type.upper())
+            archived = archived.filter(notification_type=notification_type.upper())
+        if from_date:
+            archived = archived.filter(created_at__date__gte=from_date)
+        if to_date:
+            archived = archived.filter(created_at__date__lte=to_date)
         
-        serializer = NotificationSerializer(notifications, many=True)
-        return Response({
-            'count': notifications.count(),
-            'unread_count': Notification.objects.filter(recipient=user, is_read=False).count(),
-            'notifications': serializer.data
-        }, status=status.HTTP_200_OK)
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        page = paginator.paginate_queryset(archived, request)
+        serializer = NotificationArchiveSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data, 'notifications')
 
 
 class NotificationDetailView(APIView):
@@ -62,9 +132,7 @@ class NotificationDetailView(APIView):
         if is_read and not notification.is_read:
             notification.mark_as_read()
         elif not is_read and notification.is_read:
-            notification.is_read = False
-            notification.read_at = None
-            notification.save()
+            notification.mark_as_unread()
         
         serializer = NotificationSerializer(notification)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -78,6 +146,36 @@ class NotificationDetailView(APIView):
         }, status=status.HTTP_204_NO_CONTENT)
 
 
+class BroadcastMessageView(APIView):
+    """Read, mark or delete the current user's copy of a broadcast"""
+    permission_classes = [IsAuthenticated]
+    
+    def get_message(self, request, pk):
+        broadcast = get_object_or_404(visible_broadcasts(request.user), pk=pk)
+        return BroadcastMessageSerializer(broadcast, context={'user': request.user}).data
+    
+    def get(self, request, pk):
+        # Auto-mark as read when retrieved
+        if not set_receipt(request.user, pk, is_read=True, read_at=timezone.now()):
+            return Response({'error': 'Broadcast not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(self.get_message(request, pk), status=status.HTTP_200_OK)
+    
+    def patch(self, request, pk):
+        """Mark broadcast as read/unread"""
+        is_read = request.data.get('is_read', True)
+        if not set_receipt(request.user, pk, is_read=is_read, read_at=timezone.now() if is_read else None):
+            return Response({'error': 'Broadcast not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(self.get_message(request, pk), status=status.HTTP_200_OK)
+    
+    def delete(self, request, pk):
+        """Hide broadcast from the current user"""
+        if not set_receipt(request.user, pk, is_deleted=True):
+            return Response({'error': 'Broadcast not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'message': 'Notification deleted successfully'
+        }, status=status.HTTP_204_NO_CONTENT)
+
+
 class MarkAllReadView(APIView):
     """Mark all notifications as read"""
     permission_classes = [IsAuthenticated]
@@ -85,10 +183,8 @@ class MarkAllReadView(APIView):
     def post(self, request):
         user = request.user
         
-        notifications = Notification.objects.filter(recipient=user, is_read=False)
-        count = notifications.count()
-        
-        notifications.update(is_read=True, read_at=timezone.now())
+        now = timezone.now()
+        count = mark_all_read(user.id, now) + mark_broadcasts_read(user, now)
         
         return Response({
             'message': f'{count} notification(s) marked as read'
@@ -126,31 +222,38 @@ class BroadcastNotificationView(APIView):
                 'error': 'Title and message are required'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        from users.models import User
-        
-        # Get recipients
-        users = User.objects.all()
-        if role:
-            users = users.filter(role=role.upper())
-        
-        # Create notifications for all users
-        notifications = []
-        for user in users:
-            notification = Notification.objects.create(
-                recipient=user,
-                title=title,
-                message=message,
-                priority=priority,
-                notification_type=notification_type
-            )
-            notifications.append(notification)
+        broadcast = start_broadcast(
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            priority=priority,
+            role=role,
+            created_by=request.user
+        )
+        
+        if broadcast.status == 'COMPLETED':
+            message = f'Notification broadcast to {broadcast.delivered_count} user(s)'
+        else:
+            message = 'Notification broadcast queued'
         
         return Response({
-            'message': f'Notification broadcast to {len(notifications)} user(s)',
-            'count': len(notifications)
+            'message': message,
+            'count': broadcast.delivered_count,
+            'broadcast_id': broadcast.id,
+            'broadcast': NotificationBroadcastSerializer(broadcast).data
         }, status=status.HTTP_201_CREATED)
 
 
+class BroadcastStatusView(APIView):
+    """Poll the progress of a broadcast (Admin/HR only)"""
+    permission_classes = [IsAdminOrHR]
+    
+    def get(self, request, pk):
+        broadcast = get_object_or_404(NotificationBroadcast, pk=pk)
+        serializer = NotificationBroadcastSerializer(broadcast)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
 class NotificationPreferencesView(APIView):
     """Get or update notification preferences"""
     permission_classes = [IsAuthenticated]
@@ -187,22 +290,12 @@ class NotificationStatsView(APIView):
     def get(self, request):
         user = request.user
         
-        total = Notification.objects.filter(recipient=user).count()
-        unread = Notification.objects.filter(recipient=user, is_read=False).count()
-        
-        # Count by type
-        by_type = {}
-        for ntype, _ in Notification.NOTIFICATION_TYPES:
-            count = Notification.objects.filter(
-                recipient=user, 
-                notification_type=ntype
-            ).count()
-            if count > 0:
-                by_type[ntype] = count
+        # One read of the user's counter rows instead of a COUNT per type
+        counts = notification_counts(user)
         
         return Response({
-            'total_notifications': total,
-            'unread_notifications': unread,
-            'read_notifications': total - unread,
-            'by_type': by_type
+            'total_notifications': counts['total'],
+            'unread_notifications': counts['unread'],
+            'read_notifications': counts['total'] - counts['unread'],
+            'by_type': counts['by_type']
         }, status=status.HTTP_200_OK)
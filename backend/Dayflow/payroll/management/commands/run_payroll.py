@@ -0,0 +1,51 @@
+"""
+Month-end payroll run
+Generates DRAFT payrolls from active salary structures in bulk
+
+Usage:
+    python manage.py run_payroll --month 2026-01
+    python manage.py run_payroll --month 2026-01-01 --department Engineering --chunk-size 1000
+"""
+import json
+from django.core.management.base import BaseCommand, CommandError
+from payroll.services import run_payroll
+
+
+class Command(BaseCommand):
+    help = 'Generate payrolls for all eligible employees for a month'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', required=True, help='Payroll month (YYYY-MM or YYYY-MM-DD)')
+        parser.add_argument('--employee', type=int, action='append', dest='employee_ids',
+                            help='Limit the run to this user id (repeatable)')
+        parser.add_argument('--department', help='Limit the run to a department')
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help='Rows per bulk insert (default: PAYROLL_RUN_CHUNK_SIZE)')
+        parser.add_argument('--json', action='store_true', help='Print the run report as JSON')
+
+    def handle(self, *args, **options):
+        try:
+            report = run_payroll(
+                options['month'],
+                employee_ids=options['employee_ids'],
+                department=options['department'],
+                chunk_size=options['chunk_size'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Payroll run for {report['month']}: "
+            f"{report['created']} created, {report['skipped']} skipped, "
+            f"{report['missing_structure']} missing salary structure "
+            f"({report['employees_in_scope']} employees in scope)"
+        ))
+        if report['missing_structure_employee_ids']:
+            self.stdout.write(
+                'Missing salary structure for user ids: '
+                + ', '.join(str(pk) for pk in report['missing_structure_employee_ids'])
+            )
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-17 23:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0003_payrollcomponent_payroll_gross_salary_payroll_notes_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payroll',
+            index=models.Index(fields=['month', 'status'], name='payroll_month_9cecce_idx'),
+        ),
+    ]
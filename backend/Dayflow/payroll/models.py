@@ -56,6 +56,10 @@ class Payroll(models.Model):
         verbose_name_plural = 'Payrolls'
         unique_together = ['employee', 'month']
         ordering = ['-month']
+        indexes = [
+            # Period filters are rewritten as ranges on month (see services.filter_payroll_period)
+            models.Index(fields=['month', 'status']),
+        ]
     
     def calculate_salary(self):
         """Calculate gross and net salary"""
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from Dayflow.prefetch import PrefetchPlanMixin
 from .models import Payroll, PayrollComponent, PayrollDetail, SalaryStructure
 
 
@@ -11,7 +12,7 @@ class PayrollComponentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class PayrollDetailSerializer(serializers.ModelSerializer):
+class PayrollDetailSerializer(PrefetchPlanMixin, serializers.ModelSerializer):
     """Payroll Detail Serializer"""
     
     component_name = serializers.CharField(source='component.name', read_only=True)
@@ -23,7 +24,7 @@ class PayrollDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class PayrollSerializer(serializers.ModelSerializer):
+class PayrollSerializer(PrefetchPlanMixin, serializers.ModelSerializer):
     """Payroll Serializer"""
     
     employee_name = serializers.CharField(source='employee.username', read_only=True)
@@ -62,7 +63,7 @@ class PayrollCreateSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class SalaryStructureSerializer(serializers.ModelSerializer):
+class SalaryStructureSerializer(PrefetchPlanMixin, serializers.ModelSerializer):
     """Salary Structure Serializer"""
     
     employee_name = serializers.CharField(source='employee.username', read_only=True)
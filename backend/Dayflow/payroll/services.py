@@ -0,0 +1,161 @@
+"""
+Payroll services
+Batch operations shared by the payroll API views and management commands
+"""
+from datetime import datetime, date
+from django.conf import settings
+from django.db import transaction
+from users.models import User
+from dashboard.cache import invalidate_employee_dashboards
+from .models import Payroll, SalaryStructure
+
+
+DEFAULT_RUN_CHUNK_SIZE = 500
+
+
+def parse_payroll_month(value):
+    """
+    Normalize a month value to the first day of that month
+
+    Accepts a date or a 'YYYY-MM-DD' / 'YYYY-MM' string.
+    Raises ValueError for anything else.
+    """
+    if isinstance(value, date):
+        return value.replace(day=1)
+
+    value = str(value).strip()
+    for fmt in ('%Y-%m-%d', '%Y-%m'):
+        try:
+            return datetime.strptime(value, fmt).date().replace(day=1)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid month '{value}'. Use YYYY-MM-DD or YYYY-MM")
+
+
+def month_range(year, month=None):
+    """Half-open [start, end) date range covering one month, or a whole year"""
+    if month:
+        start = date(year, month, 1)
+        end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    else:
+        start, end = date(year, 1, 1), date(year + 1, 1, 1)
+    return start, end
+
+
+def filter_payroll_period(payrolls, year=None, month=None):
+    """
+    Filter payrolls by year and/or month with index-friendly predicates
+
+    A year, or a year and month, becomes one half-open range on the
+    ``month`` column. month__month wraps the column in a date-extract
+    function and can't use an index, so it is only used for a month
+    without a year, which has no single range.
+
+    Raises ValueError for non-numeric or out-of-range values.
+    """
+    if year:
+        start, end = month_range(int(year), int(month) if month else None)
+        return payrolls.filter(month__gte=start, month__lt=end)
+    if month:
+        return payrolls.filter(month__month=int(month))
+    return payrolls
+
+
+def filter_payrolls(payrolls, params):
+    """
+    Apply the employee_id, month and year filters HR list views accept
+
+    Raises ValueError for an invalid month or year.
+    """
+    employee_id = params.get('employee_id', None)
+    if employee_id:
+        payrolls = payrolls.filter(employee__id=employee_id)
+    return filter_payroll_period(payrolls, params.get('year', None), params.get('month', None))
+
+
+def run_payroll(month, employee_ids=None, department=None, chunk_size=None):
+    """
+    Generate DRAFT payrolls for every eligible employee in one run
+
+    Args:
+        month: Payroll month (date or 'YYYY-MM-DD' / 'YYYY-MM' string)
+        employee_ids: Optional iterable of user ids to limit the run to
+        department: Optional department name (case-insensitive) to limit the run to
+        chunk_size: Rows per bulk INSERT (defaults to PAYROLL_RUN_CHUNK_SIZE)
+
+    Returns:
+        dict report with created, skipped and missing-structure counts
+    """
+    month_date = parse_payroll_month(month)
+    if chunk_size is None:
+        chunk_size = getattr(settings, 'PAYROLL_RUN_CHUNK_SIZE', DEFAULT_RUN_CHUNK_SIZE)
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be a positive integer')
+
+    # Employees in scope
+    employees = User.objects.filter(is_active=True)
+    if employee_ids:
+        employees = employees.filter(id__in=list(employee_ids))
+    if department:
+        employees = employees.filter(profile__department__iexact=department)
+
+    with transaction.atomic():
+        # Locking the employees makes overlapping runs for the same scope
+        # take turns; ignore_conflicts below covers any other writer
+        employee_ids_in_scope = set(employees.select_for_update().values_list('id', flat=True))
+
+        # Every active salary structure for the scope in one query
+        structures = SalaryStructure.objects.filter(
+            is_active=True,
+            employee__in=employees,
+        )
+
+        # Existing payrolls for the scope and month in one set lookup
+        month_payrolls = Payroll.objects.filter(month=month_date, employee__in=employees)
+        existing = set(month_payrolls.values_list('employee_id', flat=True))
+
+        to_create = []
+        structured_ids = set()
+        skipped = 0
+        for structure in structures:
+            structured_ids.add(structure.employee_id)
+            if structure.employee_id in existing:
+                skipped += 1
+                continue
+
+            payroll = Payroll(
+                employee_id=structure.employee_id,
+                basic_salary=structure.basic_salary,
+                allowances=structure.total_allowances(),
+                deductions=structure.total_deductions(),
+                tax=structure.income_tax,
+                month=month_date,
+                status='DRAFT'
+            )
+            # bulk_create bypasses save(), so derive gross/net here
+            payroll.calculate_salary()
+            to_create.append(payroll)
+
+        created = 0
+        if to_create:
+            # Rows another writer added since the existing check are
+            # skipped by the insert and left out of created
+            before = month_payrolls.count()
+            Payroll.objects.bulk_create(to_create, batch_size=chunk_size, ignore_conflicts=True)
+            created = month_payrolls.count() - before
+            skipped += len(to_create) - created
+
+    # bulk_create skips post_save, so invalidate cached dashboards here
+    invalidate_employee_dashboards(payroll.employee_id for payroll in to_create)
+
+    missing = sorted(employee_ids_in_scope - structured_ids)
+
+    return {
+        'month': month_date.isoformat(),
+        'employees_in_scope': len(employee_ids_in_scope),
+        'created': created,
+        'skipped': skipped,
+        'missing_structure': len(missing),
+        'missing_structure_employee_ids': missing,
+        'chunk_size': chunk_size,
+    }
@@ -1,2 +1,4 @@
 # Import test modules
 from .test_payroll_enhancements import *
+from .test_payroll_run import *
+from .test_payroll_period import *
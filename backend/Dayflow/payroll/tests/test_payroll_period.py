@@ -0,0 +1,92 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date
+from decimal import Decimal
+from users.models import User
+from payroll.models import Payroll
+from payroll.services import month_range, filter_payroll_period
+
+
+class PayrollPeriodFilterTestCase(APITestCase):
+    """Test range-based payroll period filters"""
+
+    def setUp(self):
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+
+        self.hr = User.objects.create_user(
+            username='hr',
+            email='hr@example.com',
+            password='pass123',
+            employee_id='HR001',
+            role='HR'
+        )
+
+        for month in (date(2024, 11, 1), date(2024, 12, 1), date(2025, 1, 1), date(2025, 12, 1)):
+            Payroll.objects.create(
+                employee=self.employee,
+                basic_salary=Decimal('50000.00'),
+                month=month
+            )
+
+    def test_month_range(self):
+        """Test month and year ranges are half-open"""
+        self.assertEqual(month_range(2024, 12), (date(2024, 12, 1), date(2025, 1, 1)))
+        self.assertEqual(month_range(2024, 2), (date(2024, 2, 1), date(2024, 3, 1)))
+        self.assertEqual(month_range(2024), (date(2024, 1, 1), date(2025, 1, 1)))
+
+    def test_filter_by_year_and_month(self):
+        """Test year and month filters select the same rows as date lookups"""
+        payrolls = Payroll.objects.all()
+
+        self.assertEqual(filter_payroll_period(payrolls, '2024', '12').count(), 1)
+        self.assertEqual(filter_payroll_period(payrolls, '2024').count(), 2)
+        self.assertEqual(filter_payroll_period(payrolls, month='12').count(), 2)
+        self.assertEqual(filter_payroll_period(payrolls).count(), 4)
+
+    def test_filter_uses_range_predicate(self):
+        """Test year filters compile to a plain range on the month column"""
+        sql = str(filter_payroll_period(Payroll.objects.all(), 2024, 12).query)
+
+        self.assertIn('"payroll"."month" >=', sql)
+        self.assertIn('"payroll"."month" <', sql)
+        self.assertNotIn('django_date_extract', sql)
+
+    def test_invalid_period_returns_400(self):
+        """Test non-numeric or out-of-range periods are rejected"""
+        self.client.force_authenticate(user=self.hr)
+
+        response = self.client.get(reverse('all-payroll'), {'year': '2024', 'month': '13'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(reverse('payroll-summary'), {'year': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_my_payroll_year_filter(self):
+        """Test employees can filter their payroll by year"""
+        self.client.force_authenticate(user=self.employee)
+
+        response = self.client.get(reverse('my-payroll'), {'year': '2025'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['payroll']), 2)
+
+    def test_export_uses_period_filters(self):
+        """Test the payroll export applies the same period filters and validation"""
+        self.client.force_authenticate(user=self.hr)
+
+        response = self.client.get(reverse('export-payroll'), {'year': '2024'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].split(',')[10].startswith('2024-12'))
+
+        response = self.client.get(reverse('export-payroll'), {'year': '2024', 'month': '13'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
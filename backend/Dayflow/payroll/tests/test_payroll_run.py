@@ -0,0 +1,158 @@
+from django.urls import reverse
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from users.models import User, EmployeeProfile
+from payroll.models import Payroll, SalaryStructure
+from payroll.services import run_payroll
+
+
+class PayrollRunTestCase(APITestCase):
+    """Test batch month-end payroll runs"""
+
+    def setUp(self):
+        self.hr = User.objects.create_user(
+            username='hr',
+            email='hr@example.com',
+            password='pass123',
+            employee_id='HR001',
+            role='HR'
+        )
+
+        self.employees = []
+        for i, department in enumerate(['Engineering', 'Engineering', 'Sales']):
+            employee = User.objects.create_user(
+                username=f'employee{i}',
+                email=f'employee{i}@example.com',
+                password='pass123',
+                employee_id=f'EMP00{i}',
+                role='EMPLOYEE'
+            )
+            EmployeeProfile.objects.create(
+                user=employee,
+                full_name=f'Employee {i}',
+                department=department
+            )
+            SalaryStructure.objects.create(
+                employee=employee,
+                basic_salary=50000,
+                hra=10000,
+                provident_fund=6000,
+                income_tax=5000,
+                effective_from=date(2025, 1, 1)
+            )
+            self.employees.append(employee)
+
+    def test_run_creates_payrolls_and_reports(self):
+        """Test run creates one payroll per structured employee"""
+        report = run_payroll('2026-01', chunk_size=2)
+
+        self.assertEqual(report['month'], '2026-01-01')
+        self.assertEqual(report['created'], 3)
+        self.assertEqual(report['skipped'], 0)
+        # HR user has no salary structure
+        self.assertEqual(report['missing_structure'], 1)
+        self.assertEqual(report['missing_structure_employee_ids'], [self.hr.id])
+
+        payroll = Payroll.objects.get(employee=self.employees[0], month=date(2026, 1, 1))
+        self.assertEqual(payroll.gross_salary, Decimal('60000'))
+        self.assertEqual(payroll.net_salary, Decimal('44000'))
+        self.assertEqual(payroll.status, 'DRAFT')
+
+    def test_run_skips_existing_payrolls(self):
+        """Test rerunning a month skips employees already paid"""
+        Payroll.objects.create(
+            employee=self.employees[0],
+            basic_salary=1000,
+            month=date(2026, 1, 1)
+        )
+
+        report = run_payroll(date(2026, 1, 15))
+
+        self.assertEqual(report['created'], 2)
+        self.assertEqual(report['skipped'], 1)
+        self.assertEqual(Payroll.objects.filter(month=date(2026, 1, 1)).count(), 3)
+
+    def test_run_skips_payrolls_created_meanwhile(self):
+        """Test a payroll inserted after the existing check is skipped, not a 500"""
+        calculate_salary = Payroll.calculate_salary
+        raced = []
+
+        def overlapping_run(payroll):
+            # Another run inserts the first employee's payroll in between
+            if not raced:
+                raced.append(payroll.employee_id)
+                Payroll.objects.create(employee_id=payroll.employee_id, basic_salary=1000, month=payroll.month)
+            calculate_salary(payroll)
+
+        with mock.patch.object(Payroll, 'calculate_salary', autospec=True, side_effect=overlapping_run):
+            report = run_payroll('2026-01')
+
+        self.assertEqual(report['created'], 2)
+        self.assertEqual(report['skipped'], 1)
+        self.assertEqual(Payroll.objects.get(employee_id=raced[0]).basic_salary, Decimal('1000'))
+
+    def test_run_rejects_non_positive_chunk_size(self):
+        """Test chunk_size 0 or below is a 400, not the default"""
+        self.client.force_authenticate(user=self.hr)
+
+        for chunk_size in (0, -1):
+            response = self.client.post(
+                reverse('payroll-run'), {'month': '2026-01', 'chunk_size': chunk_size}, format='json'
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Payroll.objects.exists())
+
+    def test_run_query_count_is_constant(self):
+        """Test the run does not issue per-employee queries"""
+        with self.assertNumQueries(8):
+            run_payroll('2026-01')
+
+    def test_run_filters_by_department(self):
+        """Test department filter limits the run"""
+        report = run_payroll('2026-01', department='engineering')
+
+        self.assertEqual(report['employees_in_scope'], 2)
+        self.assertEqual(report['created'], 2)
+        self.assertEqual(report['missing_structure'], 0)
+
+    def test_run_endpoint(self):
+        """Test HR can trigger a payroll run through the API"""
+        self.client.force_authenticate(user=self.hr)
+
+        url = reverse('payroll-run')
+        response = self.client.post(url, {
+            'month': '2026-02-01',
+            'employee_ids': [self.employees[2].id]
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['report']['created'], 1)
+
+    def test_run_endpoint_requires_month(self):
+        """Test run endpoint validates month"""
+        self.client.force_authenticate(user=self.hr)
+
+        response = self.client.post(reverse('payroll-run'), {'month': 'bad'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_employee_cannot_run_payroll(self):
+        """Test employees cannot trigger payroll runs"""
+        self.client.force_authenticate(user=self.employees[0])
+
+        response = self.client.post(reverse('payroll-run'), {'month': '2026-01'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_run_payroll_command(self):
+        """Test the management command"""
+        out = StringIO()
+        call_command('run_payroll', '--month', '2026-03', stdout=out)
+
+        self.assertIn('3 created', out.getvalue())
+        self.assertEqual(Payroll.objects.filter(month=date(2026, 3, 1)).count(), 3)
@@ -4,10 +4,12 @@ from .views import (
     UpdatePayrollView,
     MyPayrollView,
     AllPayrollView,
+    PayrollExportView,
     PayrollDetailView,
     PayrollComponentListView,
     SalaryStructureView,
     GeneratePayrollView,
+    PayrollRunView,
     PayrollStatusUpdateView,
     PayrollSummaryView
 )
@@ -17,6 +19,7 @@ urlpatterns = [
     path('<int:pk>/update/', UpdatePayrollView.as_view(), name='update-payroll'),
     path('my-payroll/', MyPayrollView.as_view(), name='my-payroll'),
     path('all/', AllPayrollView.as_view(), name='all-payroll'),
+    path('export/', PayrollExportView.as_view(), name='export-payroll'),
     path('<int:pk>/', PayrollDetailView.as_view(), name='payroll-detail'),
     
     # Component management
@@ -27,6 +30,7 @@ urlpatterns = [
     
     # Payroll generation and status
     path('generate/', GeneratePayrollView.as_view(), name='generate-payroll'),
+    path('run/', PayrollRunView.as_view(), name='payroll-run'),
     path('<int:pk>/status/', PayrollStatusUpdateView.as_view(), name='payroll-status'),
     
     # Summary
@@ -10,6 +10,9 @@ from .serializers import (
     PayrollSerializer, PayrollCreateSerializer,
     PayrollComponentSerializer, SalaryStructureSerializer
 )
+from .services import run_payroll, filter_payroll_period, filter_payrolls
+from Dayflow.pagination import KeysetPagination
+from Dayflow.exports import export_response
 from users.permissions import IsAdminOrHR, ReadOnlyForEmployees
 
 
@@ -59,16 +62,15 @@ class MyPayrollView(APIView):
         
         payrolls = Payroll.objects.filter(employee=user)
         
-        if month:
-            payrolls = payrolls.filter(month__month=month)
-        if year:
-            payrolls = payrolls.filter(month__year=year)
+        try:
+            payrolls = filter_payroll_period(payrolls, year, month)
+        except ValueError:
+            return Response({'error': 'Invalid month or year'}, status=status.HTTP_400_BAD_REQUEST)
         
-        serializer = PayrollSerializer(payrolls, many=True)
-        return Response({
-            'count': payrolls.count(),
-            'payroll': serializer.data
-        }, status=status.HTTP_200_OK)
+        paginator = KeysetPagination(ordering=('-month', '-id'))
+        page = paginator.paginate_queryset(payrolls, request)
+        serializer = PayrollSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data, 'payroll')
 
 
 class AllPayrollView(APIView):
@@ -76,25 +78,46 @@ class AllPayrollView(APIView):
     permission_classes = [IsAdminOrHR]
     
     def get(self, request):
-        # Filter parameters
-        employee_id = request.query_params.get('employee_id', None)
-        month = request.query_params.get('month', None)
-        year = request.query_params.get('year', None)
-        
-        payrolls = Payroll.objects.select_related('employee').all()
-        
-        if employee_id:
-            payrolls = payrolls.filter(employee__id=employee_id)
-        if month:
-            payrolls = payrolls.filter(month__month=month)
-        if year:
-            payrolls = payrolls.filter(month__year=year)
+        try:
+            payrolls = filter_payrolls(Payroll.objects.select_related('employee'), request.query_params)
+        except ValueError:
+            return Response({'error': 'Invalid month or year'}, status=status.HTTP_400_BAD_REQUEST)
         
-        serializer = PayrollSerializer(payrolls, many=True)
-        return Response({
-            'count': payrolls.count(),
-            'payroll': serializer.data
-        }, status=status.HTTP_200_OK)
+        paginator = KeysetPagination(ordering=('-month', '-id'))
+        page = paginator.paginate_queryset(payrolls, request)
+        serializer = PayrollSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data, 'payroll')
+
+
+class PayrollExportView(APIView):
+    """Stream payroll records as CSV or NDJSON (Admin/HR only)"""
+    permission_classes = [IsAdminOrHR]
+    
+    columns = [
+        ('id', 'id'),
+        ('employee', 'employee_id'),
+        ('employee_id', 'employee__employee_id'),
+        ('employee_name', 'employee__username'),
+        ('basic_salary', 'basic_salary'),
+        ('allowances', 'allowances'),
+        ('deductions', 'deductions'),
+        ('gross_salary', 'gross_salary'),
+        ('tax', 'tax'),
+        ('net_salary', 'net_salary'),
+        ('month', 'month'),
+        ('status', 'status'),
+        ('payment_date', 'payment_date'),
+        ('notes', 'notes'),
+        ('created_on', 'created_on'),
+        ('updated_on', 'updated_on'),
+    ]
+    
+    def get(self, request):
+        try:
+            payrolls = filter_payrolls(Payroll.objects.all(), request.query_params)
+            return export_response(request, payrolls.order_by('-month', '-id'), self.columns, 'payroll')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
 class PayrollDetailView(APIView):
@@ -238,6 +261,47 @@ class GeneratePayrollView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
 
 
+class PayrollRunView(APIView):
+    """Generate payrolls for many employees in one batch run (Admin/HR only)"""
+    permission_classes = [IsAdminOrHR]
+    
+    def post(self, request):
+        month = request.data.get('month')  # Format: YYYY-MM-01 or YYYY-MM
+        if hasattr(request.data, 'getlist'):
+            employee_ids = request.data.getlist('employee_ids') or None
+        else:
+            employee_ids = request.data.get('employee_ids', None)
+        department = request.data.get('department', None)
+        chunk_size = request.data.get('chunk_size', None)
+        
+        if not month:
+            return Response({
+                'error': 'month is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if employee_ids is not None and not isinstance(employee_ids, list):
+            employee_ids = [employee_ids]
+        
+        try:
+            if chunk_size is not None:
+                chunk_size = int(chunk_size)
+            report = run_payroll(
+                month,
+                employee_ids=employee_ids,
+                department=department,
+                chunk_size=chunk_size
+            )
+        except (TypeError, ValueError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'message': f"Payroll run completed: {report['created']} created, "
+                       f"{report['skipped']} skipped, "
+                       f"{report['missing_structure']} missing salary structure",
+            'report': report
+        }, status=status.HTTP_201_CREATED)
+
+
 class PayrollStatusUpdateView(APIView):
     """Update payroll status (Admin/HR only)"""
     permission_classes = [IsAdminOrHR]
@@ -275,10 +339,10 @@ class PayrollSummaryView(APIView):
         year = request.query_params.get('year', datetime.now().year)
         month = request.query_params.get('month', None)
         
-        payrolls = Payroll.objects.filter(month__year=year)
-        
-        if month:
-            payrolls = payrolls.filter(month__month=month)
+        try:
+            payrolls = filter_payroll_period(Payroll.objects.all(), year, month)
+        except ValueError:
+            return Response({'error': 'Invalid month or year'}, status=status.HTTP_400_BAD_REQUEST)
         
         summary = payrolls.aggregate(
             total_basic=Sum('basic_salary'),
@@ -0,0 +1,175 @@
+"""
+JWT authentication with a single decode per request
+Verified tokens are cached until they expire and read-only requests to
+views that opt in build the user from token claims instead of loading it
+from the database
+"""
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from rest_framework import permissions
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+from .models import User
+from .token_versions import token_is_current
+
+DEFAULT_VERIFIED_TOKEN_CACHE_SIZE = 10000
+
+# Claims added by CustomTokenObtainPairSerializer.get_token
+USER_CLAIMS = ('username', 'email', 'role', 'employee_id', 'first_name', 'last_name')
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of tokens whose signature has already been verified
+
+    Keyed by the raw token string. Entries are dropped once the token's
+    ``exp`` passes, so a cache hit never outlives the token itself.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or getattr(
+            settings, 'JWT_VERIFIED_TOKEN_CACHE_SIZE', DEFAULT_VERIFIED_TOKEN_CACHE_SIZE
+        )
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, raw_token):
+        with self._lock:
+            entry = self._entries.get(raw_token)
+            if entry is None:
+                self.misses += 1
+                return None
+            token, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[raw_token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(raw_token)
+            self.hits += 1
+            return token
+
+    def set(self, raw_token, token):
+        expires_at = token.get('exp')
+        if not expires_at:
+            return
+        with self._lock:
+            self._entries[raw_token] = (token, expires_at)
+            self._entries.move_to_end(raw_token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+verified_tokens = VerifiedTokenCache()
+
+
+def verify_access_token(raw_token):
+    """
+    Return a validated AccessToken, decoding and verifying it at most once
+
+    Raises TokenError if the token is invalid or expired.
+    """
+    if isinstance(raw_token, bytes):
+        raw_token = raw_token.decode()
+    token = verified_tokens.get(raw_token)
+    if token is None:
+        token = AccessToken(raw_token)
+        verified_tokens.set(raw_token, token)
+    return token
+
+
+def user_from_claims(token):
+    """
+    Build an unsaved-looking User from token claims, or None if claims are missing
+
+    The instance carries the real primary key, so it works in ORM filters
+    and foreign key assignments, but fields outside USER_CLAIMS keep their
+    model defaults.
+    """
+    user_id = token.get(settings.SIMPLE_JWT.get('USER_ID_CLAIM', 'user_id'))
+    if user_id is None or any(claim not in token for claim in USER_CLAIMS):
+        return None
+
+    user = User(
+        id=User._meta.pk.to_python(user_id),
+        is_active=True,
+        **{claim: token[claim] for claim in USER_CLAIMS}
+    )
+    user._state.adding = False
+    user._state.db = 'default'
+    user.from_token_claims = True
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that reuses JWTMiddleware's validated token
+
+    Safe-method requests to views that set ``claims_user = True`` get a
+    user built from the token claims, so they don't touch the users table.
+    Only views that read nothing beyond USER_CLAIMS and the id should opt
+    in; everything else, and every unsafe method, loads the full user from
+    the database.
+
+    Either way the token's token_version claim must match the user's
+    current version, or the token is treated as revoked.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token, request)
+
+        if self.use_claims_user(request):
+            user = user_from_claims(validated_token)
+            if user is not None:
+                if not token_is_current(validated_token):
+                    raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+                return user, validated_token
+
+        user = self.get_user(validated_token)
+        if validated_token.get('token_version', 0) != user.token_version:
+            raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+        return user, validated_token
+
+    def get_validated_token(self, raw_token, request=None):
+        if isinstance(raw_token, bytes):
+            raw_token = raw_token.decode()
+        # Token already verified by JWTMiddleware for this request
+        django_request = getattr(request, '_request', None)
+        if getattr(django_request, 'jwt_raw_token', None) == raw_token:
+            return django_request.jwt_token
+        try:
+            return verify_access_token(raw_token)
+        except TokenError as e:
+            raise InvalidToken({
+                'detail': 'Given token not valid for any token type',
+                'messages': [{'token_class': 'AccessToken', 'token_type': 'access', 'message': e.args[0]}],
+            })
+
+    @staticmethod
+    def use_claims_user(request):
+        if request.method not in permissions.SAFE_METHODS:
+            return False
+        view = (getattr(request, 'parser_context', None) or {}).get('view')
+        return getattr(view, 'claims_user', False)
@@ -0,0 +1,56 @@
+"""
+Authentication backend
+Logs users in by username, email or employee ID with one indexed query
+"""
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Q
+from django.db.models.functions import Lower
+from .models import User
+
+
+def find_user_by_identifier(identifier):
+    """
+    The user whose email, employee ID or username matches ``identifier``
+
+    Email and employee ID match case-insensitively through the Lower()
+    functional indexes on users; username matches exactly, as in Django's
+    ModelBackend. If the identifier matches different users in different
+    fields, email wins over employee ID, which wins over username.
+    """
+    lowered = identifier.lower()
+    candidates = list(
+        User.objects
+        .alias(email_lower=Lower('email'), employee_id_lower=Lower('employee_id'))
+        .filter(Q(email_lower=lowered) | Q(employee_id_lower=lowered) | Q(username=identifier))
+        .order_by('id')
+    )
+    for matches in (
+        lambda user: user.email.lower() == lowered,
+        lambda user: user.employee_id.lower() == lowered,
+        lambda user: user.username == identifier,
+    ):
+        for user in candidates:
+            if matches(user):
+                return user
+    return None
+
+
+class IdentifierBackend(ModelBackend):
+    """
+    ModelBackend that accepts an email or employee ID in place of the username
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        user = find_user_by_identifier(username)
+        if user is None:
+            # Run the hasher anyway so unknown identifiers take as long as wrong passwords
+            User().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
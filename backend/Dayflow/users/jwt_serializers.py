@@ -2,15 +2,16 @@
 Custom JWT Token Serializers
 Adds custom claims like role and employee_id to JWT tokens
 """
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.views import TokenObtainPairView
-from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from .token_blacklist import RefreshToken
 
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
     Custom JWT serializer to add additional user information to token claims
     """
+    token_class = RefreshToken
     
     @classmethod
     def get_token(cls, user):
@@ -26,6 +27,8 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         token['employee_id'] = user.employee_id
         token['first_name'] = user.first_name
         token['last_name'] = user.last_name
+        # Bumped on role change or deactivation to revoke older tokens
+        token['token_version'] = user.token_version
         
         return token
     
@@ -33,23 +36,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         """
         Validate credentials and return tokens with user data
         """
-        # Allow login via username, email, or employee_id by normalizing to username
-        identifier = attrs.get(self.username_field)
-        if identifier:
-            User = get_user_model()
-            try:
-                # Match by email
-                user = User.objects.filter(email__iexact=identifier).first()
-                # If not found by email, try employee_id
-                if not user:
-                    user = User.objects.filter(employee_id__iexact=identifier).first()
-                # If found, replace the identifier with actual username
-                if user:
-                    attrs[self.username_field] = user.get_username()
-            except Exception:
-                # Fallback to default behavior if lookup fails
-                pass
-
+        # Username, email or employee_id; resolved by users.backends.IdentifierBackend
         data = super().validate(attrs)
         
         # Add user information to response
@@ -71,3 +58,17 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     Custom token view using our custom serializer
     """
     serializer_class = CustomTokenObtainPairSerializer
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh serializer that checks the blacklist through the Bloom filter
+    """
+    token_class = RefreshToken
+
+
+class CustomTokenRefreshView(TokenRefreshView):
+    """
+    Token refresh view using our custom serializer
+    """
+    serializer_class = CustomTokenRefreshSerializer
@@ -0,0 +1,31 @@
+"""
+Token blacklist compaction
+Deletes expired outstanding refresh tokens and their blacklist rows in chunks
+
+Usage:
+    python manage.py compact_token_blacklist
+    python manage.py compact_token_blacklist --chunk-size 1000 --dry-run
+"""
+from django.core.management.base import BaseCommand, CommandError
+from users.token_blacklist import compact_expired_tokens
+
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding and blacklisted refresh tokens'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help='Tokens deleted per chunk (default: TOKEN_COMPACTION_CHUNK_SIZE)')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be deleted')
+
+    def handle(self, *args, **options):
+        try:
+            removed = compact_expired_tokens(chunk_size=options['chunk_size'], dry_run=options['dry_run'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {removed['outstanding']} expired outstanding tokens "
+            f"and {removed['blacklisted']} blacklisted tokens"
+        ))
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser
 
 
@@ -14,11 +15,18 @@ class User(AbstractUser):
     employee_id = models.CharField(max_length=20, unique=True)
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='EMPLOYEE')
     is_active = models.BooleanField(default=True)
+    # Embedded in issued JWTs; bumping it revokes every outstanding token
+    token_version = models.PositiveIntegerField(default=0)
     
     class Meta:
         db_table = 'users'
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        indexes = [
+            # Case-insensitive login by email or employee ID (users/backends.py)
+            models.Index(Lower('email'), name='users_email_lower_idx'),
+            models.Index(Lower('employee_id'), name='users_employee_id_lower_idx'),
+        ]
     
     def __str__(self):
         return f"{self.username} ({self.employee_id})"
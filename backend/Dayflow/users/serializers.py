@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
+from Dayflow.prefetch import PrefetchPlanMixin
 from .models import User, EmployeeProfile
 
 
@@ -72,7 +73,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class EmployeeProfileSerializer(serializers.ModelSerializer):
+class EmployeeProfileSerializer(PrefetchPlanMixin, serializers.ModelSerializer):
     """Employee Profile Serializer"""
     
     user = UserSerializer(read_only=True)
@@ -0,0 +1,39 @@
+"""
+Users signal handlers
+Revoke outstanding tokens when a user's role or active flag changes
+"""
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import User
+from .token_versions import invalidate_token_version, publish_token_version, revoke_tokens
+
+# Changes to these fields invalidate tokens issued before the change
+REVOKING_FIELDS = ('role', 'is_active')
+
+
+@receiver(pre_save, sender=User)
+def detect_revoking_change(sender, instance, update_fields=None, **kwargs):
+    instance._revoke_tokens = False
+    if instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not set(REVOKING_FIELDS) & set(update_fields):
+        return
+
+    previous = User.objects.filter(pk=instance.pk).values(*REVOKING_FIELDS).first()
+    if previous and any(previous[field] != getattr(instance, field) for field in REVOKING_FIELDS):
+        instance._revoke_tokens = True
+
+
+@receiver(post_save, sender=User)
+def apply_token_version(sender, instance, created, **kwargs):
+    if created:
+        # New users start at their initial version; no need to hit the DB later
+        publish_token_version(instance.pk, instance.token_version)
+    elif getattr(instance, '_revoke_tokens', False):
+        instance._revoke_tokens = False
+        revoke_tokens(instance)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    invalidate_token_version(instance.pk)
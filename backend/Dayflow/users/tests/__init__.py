@@ -1,2 +1,6 @@
 # Import test modules
 from .test_password_reset import *
+from .test_jwt_authentication import *
+from .test_token_versions import *
+from .test_token_blacklist import *
+from .test_identifier_login import *
@@ -0,0 +1,73 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from users.models import User
+from users.backends import find_user_by_identifier
+
+
+def user_selects(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT') and 'FROM "users"' in query['sql']
+    ]
+
+
+class IdentifierLoginTestCase(APITestCase):
+    """Test logging in by username, email or employee ID"""
+
+    def setUp(self):
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='Employee@Example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+
+    def login(self, identifier, password='pass123'):
+        return self.client.post(reverse('token-obtain-pair'), {
+            'username': identifier,
+            'password': password,
+        }, format='json')
+
+    def test_login_by_each_identifier(self):
+        """Test username, email and employee ID all log in, case-insensitively where allowed"""
+        for identifier in ('employee', 'employee@example.com', 'EMPLOYEE@EXAMPLE.COM', 'emp001'):
+            response = self.login(identifier)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, identifier)
+            self.assertEqual(response.data['user']['id'], self.employee.id)
+
+    def test_wrong_password_rejected(self):
+        """Test a known identifier with a bad password is rejected"""
+        self.assertEqual(self.login('EMP001', 'wrong').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.login('nobody').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_inactive_user_rejected(self):
+        """Test deactivated users can't log in by email"""
+        User.objects.filter(pk=self.employee.pk).update(is_active=False)
+
+        self.assertEqual(self.login('employee@example.com').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_single_user_lookup(self):
+        """Test the identifier resolves in one query that uses the functional indexes"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.login('EMP001')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        selects = user_selects(context)
+        self.assertEqual(len(selects), 1)
+        self.assertIn('LOWER("users"."email")', selects[0])
+
+    def test_email_wins_over_username(self):
+        """Test an identifier matching two users prefers the email match"""
+        other = User.objects.create_user(
+            username='employee@example.com',
+            email='other@example.com',
+            password='pass123',
+            employee_id='EMP002',
+        )
+
+        self.assertEqual(find_user_by_identifier('employee@example.com'), self.employee)
+        self.assertEqual(find_user_by_identifier('other@example.com'), other)
@@ -0,0 +1,116 @@
+import time
+from unittest import mock
+from datetime import date, timedelta
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import User
+from users.jwt_serializers import CustomTokenObtainPairSerializer
+from users.authentication import VerifiedTokenCache, verified_tokens
+
+
+def users_table_queries(context):
+    return [query['sql'] for query in context.captured_queries if 'FROM "users"' in query['sql']]
+
+
+class ClaimsJWTAuthenticationTestCase(APITestCase):
+    """Test single-decode JWT authentication with claims-based users"""
+
+    def setUp(self):
+        verified_tokens.clear()
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        token = CustomTokenObtainPairSerializer.get_token(self.employee).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_read_request_skips_users_table(self):
+        """Test GET requests authenticate from claims without a user query"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('my-leaves'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(users_table_queries(context), [])
+
+    def test_token_decoded_once(self):
+        """Test middleware and DRF share one decode, later requests hit the cache"""
+        with mock.patch('users.authentication.AccessToken', wraps=AccessToken) as decode:
+            self.client.get(reverse('my-leaves'))
+            self.assertEqual(decode.call_count, 1)
+
+            self.client.get(reverse('my-notifications'))
+            self.assertEqual(decode.call_count, 1)
+
+        self.assertEqual(verified_tokens.stats()['entries'], 1)
+
+    def test_write_request_loads_user(self):
+        """Test unsafe methods still load the full user from the database"""
+        start = date.today() + timedelta(days=7)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(reverse('apply-leave'), {
+                'leave_type': 'SICK',
+                'start_date': start.isoformat(),
+                'end_date': start.isoformat(),
+                'reason': 'Flu',
+            }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(users_table_queries(context))
+
+    def test_read_request_loads_user_by_default(self):
+        """Test GET views that don't opt in to claims users load the user"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('monthly-summary'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(users_table_queries(context))
+
+    def test_profile_reads_fresh_user(self):
+        """Test views that don't opt in to claims users see database changes"""
+        User.objects.filter(pk=self.employee.pk).update(email='changed@example.com')
+
+        response = self.client.get(reverse('user-profile'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], 'changed@example.com')
+
+    def test_invalid_token_rejected(self):
+        """Test tampered tokens are rejected"""
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not.a.token')
+
+        response = self.client.get(reverse('my-leaves'))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class VerifiedTokenCacheTestCase(SimpleTestCase):
+    """Test LRU eviction and expiry of verified tokens"""
+
+    def test_lru_eviction(self):
+        """Test the least recently used token is evicted first"""
+        cache = VerifiedTokenCache(max_entries=2)
+        exp = time.time() + 60
+        cache.set('a', {'exp': exp})
+        cache.set('b', {'exp': exp})
+        cache.get('a')
+        cache.set('c', {'exp': exp})
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+    def test_expired_entries_are_dropped(self):
+        """Test a cached token stops matching once exp has passed"""
+        cache = VerifiedTokenCache(max_entries=2)
+        cache.set('old', {'exp': time.time() - 1})
+
+        self.assertIsNone(cache.get('old'))
+        self.assertEqual(cache.stats()['entries'], 0)
@@ -0,0 +1,179 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from users.models import User
+from users.jwt_serializers import CustomTokenObtainPairSerializer
+from users.authentication import verified_tokens
+from users.token_blacklist import BloomFilter, blacklist_filter, compact_expired_tokens
+from users.token_versions import clear_token_version_cache
+
+
+def blacklist_lookups(context):
+    # simplejwt's check joins the blacklist to outstanding tokens on jti
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'token_blacklist_blacklistedtoken' in query['sql'] and 'JOIN' in query['sql']
+    ]
+
+
+class TokenBlacklistFilterTestCase(APITestCase):
+    """Test refresh-path blacklist checks through the Bloom filter"""
+
+    def setUp(self):
+        cache.clear()
+        clear_token_version_cache()
+        verified_tokens.clear()
+        blacklist_filter.reset()
+
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        self.refresh = CustomTokenObtainPairSerializer.get_token(self.employee)
+
+    def refresh_with(self, token):
+        return self.client.post(reverse('token-refresh'), {'refresh': str(token)}, format='json')
+
+    @override_settings(TOKEN_BLACKLIST_SHARED_CACHE=True)
+    def test_live_token_skips_blacklist_join(self):
+        """Test refreshing a token that was never blacklisted skips the join"""
+        blacklist_filter.rebuild()
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.refresh_with(self.refresh)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('refresh', response.data)
+        self.assertEqual(blacklist_lookups(context), [])
+        self.assertEqual(blacklist_filter.stats()['skipped'], 1)
+
+    def test_rotated_token_is_rejected(self):
+        """Test a refresh token can't be reused after rotation"""
+        self.assertEqual(self.refresh_with(self.refresh).status_code, status.HTTP_200_OK)
+
+        response = self.refresh_with(self.refresh)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logged_out_token_is_rejected(self):
+        """Test logout blacklists the refresh token for later refreshes"""
+        # Build the filter before logout so the new jti isn't in the snapshot
+        self.refresh_with(CustomTokenObtainPairSerializer.get_token(self.employee))
+        self.client.force_authenticate(user=self.employee)
+        response = self.client.post(reverse('logout'), {'refresh_token': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.force_authenticate(user=None)
+
+        self.assertEqual(self.refresh_with(self.refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TOKEN_BLACKLIST_SHARED_CACHE=True)
+    def test_marker_covers_other_processes(self):
+        """Test a jti blacklisted elsewhere is caught before the next rebuild"""
+        blacklist_filter.might_contain('warm-up')
+
+        # Another worker blacklisted the token: its filter has the jti, ours doesn't
+        jti = self.refresh['jti']
+        token = OutstandingToken.objects.get(jti=jti)
+        BlacklistedToken.objects.create(token=token)
+        cache.set(f'token_blacklisted:{jti}', True)
+
+        self.assertEqual(self.refresh_with(self.refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_local_cache_always_checks_database(self):
+        """Test a stale filter can't let a token blacklisted by another worker through"""
+        blacklist_filter.rebuild()
+
+        # Another worker blacklisted the token: its local-memory marker and
+        # filter are invisible here, and our filter predates the row
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=self.refresh['jti']))
+        self.assertFalse(blacklist_filter.might_contain(self.refresh['jti']))
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.refresh_with(self.refresh)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(len(blacklist_lookups(context)), 1)
+        self.assertEqual(blacklist_filter.stats()['skipped'], 0)
+
+    def test_rebuild_picks_up_database_rows(self):
+        """Test rows blacklisted outside RefreshToken are seen after a rebuild"""
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=self.refresh['jti']))
+
+        blacklist_filter.rebuild()
+
+        self.assertTrue(blacklist_filter.might_contain(self.refresh['jti']))
+        self.assertEqual(self.refresh_with(self.refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TokenCompactionTestCase(APITestCase):
+    """Test chunked deletion of expired outstanding and blacklisted tokens"""
+
+    def setUp(self):
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        now = timezone.now()
+        for i in range(7):
+            token = OutstandingToken.objects.create(
+                user=self.employee,
+                jti=f'expired-{i}',
+                token='x',
+                created_at=now - timedelta(days=10),
+                expires_at=now - timedelta(days=3),
+            )
+            if i % 2 == 0:
+                BlacklistedToken.objects.create(token=token)
+        self.live = OutstandingToken.objects.create(
+            user=self.employee,
+            jti='live',
+            token='x',
+            created_at=now,
+            expires_at=now + timedelta(days=7),
+        )
+        BlacklistedToken.objects.create(token=self.live)
+
+    def test_compaction_deletes_expired_in_chunks(self):
+        """Test only expired rows go, across several chunks"""
+        removed = compact_expired_tokens(chunk_size=3)
+
+        self.assertEqual(removed, {'outstanding': 7, 'blacklisted': 4})
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['live'])
+        self.assertEqual(BlacklistedToken.objects.get().token_id, self.live.id)
+
+    def test_dry_run_deletes_nothing(self):
+        """Test the command's dry run only reports counts"""
+        out = StringIO()
+        call_command('compact_token_blacklist', '--dry-run', stdout=out)
+
+        self.assertIn('Would delete 7 expired outstanding tokens and 4 blacklisted tokens', out.getvalue())
+        self.assertEqual(OutstandingToken.objects.count(), 8)
+
+
+class BloomFilterTestCase(SimpleTestCase):
+    """Test the Bloom filter has no false negatives and few false positives"""
+
+    def test_membership(self):
+        """Test added items are always found and others mostly aren't"""
+        bloom = BloomFilter(capacity=2000, error_rate=0.01)
+        for i in range(2000):
+            bloom.add(f'jti-{i}')
+
+        self.assertTrue(all(f'jti-{i}' in bloom for i in range(2000)))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
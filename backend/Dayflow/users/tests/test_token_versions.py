@@ -0,0 +1,128 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from users.models import User
+from users.jwt_serializers import CustomTokenObtainPairSerializer
+from users.authentication import verified_tokens
+from users.token_versions import clear_token_version_cache, revoke_tokens
+
+
+class TokenVersionRevocationTestCase(APITestCase):
+    """Test token_version based revocation of outstanding JWTs"""
+
+    def setUp(self):
+        cache.clear()
+        clear_token_version_cache()
+        verified_tokens.clear()
+
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='pass123',
+            employee_id='EMP001',
+            role='EMPLOYEE'
+        )
+        self.hr = User.objects.create_user(
+            username='hr',
+            email='hr@example.com',
+            password='pass123',
+            employee_id='HR001',
+            role='HR'
+        )
+        self.client.force_authenticate(user=self.hr)
+
+        self.employee_client = APIClient()
+        self.employee_client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_for(self.employee)}')
+
+    @staticmethod
+    def token_for(user):
+        return CustomTokenObtainPairSerializer.get_token(user).access_token
+
+    def test_token_carries_version(self):
+        """Test issued tokens embed the user's token_version"""
+        self.assertEqual(self.token_for(self.employee)['token_version'], 0)
+
+    def test_role_change_revokes_tokens(self):
+        """Test HR changing a role invalidates the user's outstanding tokens"""
+        self.assertEqual(self.employee_client.get(reverse('my-leaves')).status_code, status.HTTP_200_OK)
+
+        response = self.client.put(reverse('user-detail', args=[self.employee.pk]), {'role': 'HR'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.token_version, 1)
+        response = self.employee_client.get(reverse('my-leaves'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # A fresh login works again
+        self.employee_client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_for(self.employee)}')
+        self.assertEqual(self.employee_client.get(reverse('my-leaves')).status_code, status.HTTP_200_OK)
+
+    def test_deactivation_revokes_tokens(self):
+        """Test deactivating a user rejects their tokens on reads and writes"""
+        self.client.put(reverse('user-detail', args=[self.employee.pk]), {'is_active': False})
+
+        self.assertEqual(
+            self.employee_client.get(reverse('my-leaves')).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+        self.assertEqual(
+            self.employee_client.post(reverse('mark-all-read')).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+
+    def test_deletion_revokes_tokens(self):
+        """Test deleted users can't keep using claims-based tokens"""
+        self.employee_client.get(reverse('my-leaves'))
+
+        self.client.delete(reverse('user-detail', args=[self.employee.pk]))
+
+        self.assertEqual(
+            self.employee_client.get(reverse('my-leaves')).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+
+    def test_unrelated_update_keeps_tokens(self):
+        """Test edits that don't touch role or is_active keep tokens valid"""
+        self.client.put(reverse('user-detail', args=[self.employee.pk]), {'first_name': 'New'})
+
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.token_version, 0)
+        self.assertEqual(self.employee_client.get(reverse('my-leaves')).status_code, status.HTTP_200_OK)
+
+    def test_version_check_needs_no_query(self):
+        """Test repeated reads check the version without touching the users table"""
+        self.employee_client.get(reverse('my-leaves'))
+
+        with CaptureQueriesContext(connection) as context:
+            self.employee_client.get(reverse('my-leaves'))
+
+        self.assertFalse([q for q in context.captured_queries if 'FROM "users"' in q['sql']])
+
+    @override_settings(TOKEN_VERSION_CHECK_INTERVAL=0)
+    def test_bump_from_another_process_is_seen(self):
+        """Test a version bumped elsewhere is picked up from the shared cache"""
+        self.employee_client.get(reverse('my-leaves'))
+
+        # Another worker revoked the tokens and published the new version
+        User.objects.filter(pk=self.employee.pk).update(token_version=3)
+        cache.set(f'token_version:{self.employee.pk}', 3)
+
+        self.assertEqual(
+            self.employee_client.get(reverse('my-leaves')).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+
+    def test_revoke_tokens(self):
+        """Test explicit revocation bumps the version"""
+        revoke_tokens(self.employee)
+
+        self.assertEqual(self.employee.token_version, 1)
+        self.assertEqual(
+            self.employee_client.get(reverse('my-leaves')).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
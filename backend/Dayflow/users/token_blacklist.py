@@ -0,0 +1,286 @@
+"""
+Refresh token blacklist
+Bloom filter in front of simplejwt's blacklist lookup, plus chunked compaction
+
+With ROTATE_REFRESH_TOKENS and BLACKLIST_AFTER_ROTATION every refresh
+verifies the presented token against the blacklist (a join of
+BlacklistedToken and OutstandingToken on jti) before rotating it. Almost
+every token presented is not blacklisted, so each process keeps a Bloom
+filter of the jtis blacklisted at its last rebuild and only runs the join
+when the filter says "maybe".
+
+Tokens blacklisted after a rebuild are covered by a short-lived marker in
+the shared cache, set by RefreshToken.blacklist(). The filter is trusted
+for twice TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS, which is as long as the
+markers live; past that every check falls back to the database until the
+rebuild finishes. Rows blacklisted without going through RefreshToken
+(the admin, raw SQL) are only seen after the next rebuild.
+
+Markers only reach other workers through a cache they share, so the
+filter is only consulted when TOKEN_BLACKLIST_SHARED_CACHE is on (it
+defaults to on when REDIS_URL is set). With the local-memory cache every
+check goes to the database; otherwise a token blacklisted by one worker
+could be replayed against another until that worker's filter rebuilt.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FILTER_REBUILD_SECONDS = 300
+DEFAULT_FILTER_ERROR_RATE = 0.01
+DEFAULT_COMPACTION_CHUNK_SIZE = 5000
+
+# Smallest filter built, so the first few blacklisted tokens don't force a resize
+MIN_FILTER_CAPACITY = 1024
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings
+
+    No false negatives; false positives at roughly ``error_rate`` once
+    ``capacity`` items have been added.
+    """
+
+    def __init__(self, capacity, error_rate=DEFAULT_FILTER_ERROR_RATE):
+        capacity = max(capacity, MIN_FILTER_CAPACITY)
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+def _rebuild_interval():
+    return getattr(settings, 'TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS', DEFAULT_FILTER_REBUILD_SECONDS)
+
+
+def _marker_key(jti):
+    return f'token_blacklisted:{jti}'
+
+
+class BlacklistFilter:
+    """Per-process Bloom filter of blacklisted, unexpired refresh token jtis"""
+
+    def __init__(self):
+        self._bloom = None
+        self._built_at = None
+        self._rebuilding = False
+        self._lock = threading.Lock()
+        self.skipped = 0
+        self.checked = 0
+
+    def rebuild(self):
+        """Load every unexpired blacklisted jti into a fresh filter"""
+        # Anything blacklisted after this point carries a cache marker
+        started = time.monotonic()
+        blacklisted = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        # Headroom for tokens this process blacklists before the next rebuild
+        bloom = BloomFilter(
+            blacklisted.count() * 2,
+            getattr(settings, 'TOKEN_BLACKLIST_FILTER_ERROR_RATE', DEFAULT_FILTER_ERROR_RATE),
+        )
+        for jti in blacklisted.values_list('token__jti', flat=True).iterator(chunk_size=10000):
+            bloom.add(jti)
+        with self._lock:
+            self._bloom = bloom
+            self._built_at = started
+            self._rebuilding = False
+        logger.info(
+            f"Token blacklist filter rebuilt with {bloom.count} jtis "
+            f"in {(time.monotonic() - started) * 1000:.0f}ms"
+        )
+
+    def _try_rebuild(self):
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception('Token blacklist filter rebuild failed')
+            with self._lock:
+                self._rebuilding = False
+
+    def _rebuild_in_background(self):
+        try:
+            self._try_rebuild()
+        finally:
+            # The thread's own connection, opened by the rebuild query
+            close_old_connections()
+
+    def might_contain(self, jti):
+        """
+        False if ``jti`` is definitely not blacklisted as of the last rebuild
+
+        Returns True (check the database) while no trusted filter exists.
+        Starts a rebuild once the filter is older than the rebuild interval.
+        """
+        interval = _rebuild_interval()
+        now = time.monotonic()
+        with self._lock:
+            bloom, built_at = self._bloom, self._built_at
+            stale = built_at is None or now - built_at >= interval
+            start_rebuild = stale and not self._rebuilding
+            if start_rebuild:
+                self._rebuilding = True
+
+        if start_rebuild:
+            if getattr(settings, 'TOKEN_BLACKLIST_FILTER_ASYNC', True):
+                threading.Thread(
+                    target=self._rebuild_in_background, name='token-blacklist-filter', daemon=True
+                ).start()
+            else:
+                self._try_rebuild()
+                with self._lock:
+                    bloom, built_at = self._bloom, self._built_at
+
+        # Past the marker lifetime a stale filter could miss recent blacklists
+        if bloom is None or time.monotonic() - built_at >= 2 * interval:
+            return True
+        return jti in bloom
+
+    def add(self, jti):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+    def reset(self):
+        """Drop the filter so the next check rebuilds it (tests)"""
+        with self._lock:
+            self._bloom = None
+            self._built_at = None
+            self._rebuilding = False
+            self.skipped = 0
+            self.checked = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'jtis': self._bloom.count if self._bloom is not None else 0,
+                'age_seconds': round(time.monotonic() - self._built_at, 1) if self._built_at is not None else None,
+                'skipped': self.skipped,
+                'checked': self.checked,
+            }
+
+
+blacklist_filter = BlacklistFilter()
+
+
+def is_blacklisted(jti):
+    """True if the refresh token with this jti has been blacklisted"""
+    if (
+        getattr(settings, 'TOKEN_BLACKLIST_SHARED_CACHE', False)
+        and not blacklist_filter.might_contain(jti)
+        and not cache.get(_marker_key(jti))
+    ):
+        blacklist_filter.skipped += 1
+        return False
+    blacklist_filter.checked += 1
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+def mark_blacklisted(jti):
+    """Make a newly blacklisted jti visible before the next filter rebuild"""
+    blacklist_filter.add(jti)
+    cache.set(_marker_key(jti), True, 2 * _rebuild_interval())
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    RefreshToken with a cheaper refresh path
+
+    The blacklist check goes through the Bloom filter, and blacklist() and
+    outstand() skip simplejwt's user lookup when the outstanding row already
+    exists or the user id is known from the claims.
+    """
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        token = OutstandingToken.objects.filter(jti=jti).first()
+        if token is None:
+            result = super().blacklist()
+        else:
+            result = BlacklistedToken.objects.get_or_create(token=token)
+        mark_blacklisted(jti)
+        return result
+
+    def outstand(self):
+        user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().outstand()
+        return OutstandingToken.objects.get_or_create(
+            jti=self.payload[api_settings.JTI_CLAIM],
+            defaults={
+                'user_id': User._meta.pk.to_python(user_id),
+                'created_at': self.current_time,
+                'token': str(self),
+                'expires_at': datetime_from_epoch(self.payload['exp']),
+            },
+        )
+
+
+def compact_expired_tokens(chunk_size=None, dry_run=False):
+    """
+    Delete expired outstanding tokens and their blacklist rows in chunks
+
+    Expired tokens fail signature validation before the blacklist is
+    consulted, so their rows serve no purpose. Each chunk is its own pair of
+    DELETEs by primary key, keeping locks and transactions short. Returns
+    the number of outstanding and blacklisted rows removed (or that would
+    be, with ``dry_run``).
+    """
+    chunk_size = chunk_size or getattr(settings, 'TOKEN_COMPACTION_CHUNK_SIZE', DEFAULT_COMPACTION_CHUNK_SIZE)
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be positive')
+
+    expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+    if dry_run:
+        return {
+            'outstanding': expired.count(),
+            'blacklisted': BlacklistedToken.objects.filter(token__in=expired).count(),
+        }
+
+    removed = {'outstanding': 0, 'blacklisted': 0}
+    last_id = 0
+    while True:
+        # Upper id bound of the next chunk_size expired tokens
+        bounds = list(expired.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:chunk_size])
+        if not bounds:
+            break
+        chunk = expired.filter(id__gt=last_id, id__lte=bounds[-1])
+        last_id = bounds[-1]
+        # Blacklist rows first, so the outstanding delete has no cascade to collect
+        removed['blacklisted'] += BlacklistedToken.objects.filter(token__in=chunk.values('id')).delete()[0]
+        removed['outstanding'] += chunk.only('id').delete()[0]
+    return removed
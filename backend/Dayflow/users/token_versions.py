@@ -0,0 +1,106 @@
+"""
+Token version checks
+Revokes outstanding JWTs by comparing their token_version claim with the user's
+
+Every token carries the user's token_version at issue time. Bumping the
+version (role change, deactivation, deletion) makes older tokens fail.
+
+Lookups go through two levels so the request path normally does no query:
+a per-process dict re-checked every TOKEN_VERSION_CHECK_INTERVAL seconds,
+backed by the shared Django cache, backed by the users table.
+"""
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from .models import User
+
+DEFAULT_CHECK_INTERVAL = 5
+DEFAULT_CACHE_TIMEOUT = 3600
+DEFAULT_MAX_ENTRIES = 10000
+
+# Version reported for deleted or deactivated users; never matches a token
+REVOKED = -1
+
+_local = OrderedDict()
+_lock = threading.Lock()
+
+
+def _cache_key(user_id):
+    return f'token_version:{user_id}'
+
+
+def _cache_timeout():
+    return getattr(settings, 'TOKEN_VERSION_CACHE_TIMEOUT', DEFAULT_CACHE_TIMEOUT)
+
+
+def current_token_version(user_id):
+    """The user's current token version, or REVOKED if they can't log in"""
+    # Token claims carry the id as a string; key everything the same way
+    user_id = str(user_id)
+    interval = getattr(settings, 'TOKEN_VERSION_CHECK_INTERVAL', DEFAULT_CHECK_INTERVAL)
+    now = time.monotonic()
+    with _lock:
+        entry = _local.get(user_id)
+        if entry is not None and now - entry[1] < interval:
+            return entry[0]
+
+    version = cache.get(_cache_key(user_id))
+    if version is None:
+        row = User.objects.filter(pk=user_id).values_list('token_version', 'is_active').first()
+        version = row[0] if row and row[1] else REVOKED
+        cache.set(_cache_key(user_id), version, _cache_timeout())
+
+    max_entries = getattr(settings, 'TOKEN_VERSION_LOCAL_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)
+    with _lock:
+        _local[user_id] = (version, now)
+        _local.move_to_end(user_id)
+        while len(_local) > max_entries:
+            _local.popitem(last=False)
+    return version
+
+
+def token_is_current(token):
+    """True if the token's version claim matches the user's current version"""
+    user_id = token.get(settings.SIMPLE_JWT.get('USER_ID_CLAIM', 'user_id'))
+    # Tokens issued before token_version existed count as version 0
+    return token.get('token_version', 0) == current_token_version(user_id)
+
+
+def publish_token_version(user_id, version):
+    """Seed the shared cache with a known version (e.g. for a new user)"""
+    cache.set(_cache_key(user_id), version, _cache_timeout())
+    with _lock:
+        _local.pop(str(user_id), None)
+
+
+def invalidate_token_version(user_id):
+    """
+    Drop cached versions so the next check reads the database
+
+    Runs now, so this process sees the change at once, and again after
+    commit, in case another process re-cached the old value in between.
+    """
+    def invalidate():
+        cache.delete(_cache_key(user_id))
+        with _lock:
+            _local.pop(str(user_id), None)
+
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def revoke_tokens(user):
+    """Invalidate every token issued to ``user`` so far"""
+    User.objects.filter(pk=user.pk).update(token_version=F('token_version') + 1)
+    user.refresh_from_db(fields=['token_version'])
+    invalidate_token_version(user.pk)
+
+
+def clear_token_version_cache():
+    """Forget every per-process entry (tests, management commands)"""
+    with _lock:
+        _local.clear()
@@ -1,6 +1,5 @@
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView
-from .jwt_serializers import CustomTokenObtainPairView
+from .jwt_serializers import CustomTokenObtainPairView, CustomTokenRefreshView
 from .views import (
     UserRegistrationView, 
     UserProfileView, 
@@ -18,7 +17,7 @@ urlpatterns = [
     # Authentication
     path('register/', UserRegistrationView.as_view(), name='user-register'),
     path('login/', CustomTokenObtainPairView.as_view(), name='token-obtain-pair'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+    path('token/refresh/', CustomTokenRefreshView.as_view(), name='token-refresh'),
     path('logout/', LogoutView.as_view(), name='logout'),
     
     # Password Management
@@ -3,7 +3,6 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
@@ -16,6 +15,8 @@ from .serializers import (
     EmployeeProfileSerializer
 )
 from .permissions import IsAdminOrHR, IsSelfOrAdmin
+from .token_blacklist import RefreshToken
+from Dayflow.pagination import KeysetPagination
 
 
 class UserRegistrationView(APIView):
@@ -112,11 +113,10 @@ class UserListView(APIView):
         if is_active is not None:
             users = users.filter(is_active=is_active.lower() == 'true')
         
-        serializer = UserSerializer(users, many=True)
-        return Response({
-            'count': users.count(),
-            'users': serializer.data
-        }, status=status.HTTP_200_OK)
+        paginator = KeysetPagination(ordering=('id',))
+        page = paginator.paginate_queryset(users, request)
+        serializer = UserSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data, 'users')
 
 
 class UserDetailView(APIView):
@@ -159,11 +159,10 @@ class EmployeeListView(APIView):
         if department:
             profiles = profiles.filter(department__icontains=department)
         
-        serializer = EmployeeProfileSerializer(profiles, many=True)
-        return Response({
-            'count': profiles.count(),
-            'employees': serializer.data
-        }, status=status.HTTP_200_OK)
+        paginator = KeysetPagination(ordering=('id',))
+        page = paginator.paginate_queryset(profiles, request)
+        serializer = EmployeeProfileSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data, 'employees')
 
 
 class LogoutView(APIView):
@@ -0,0 +1,284 @@
+"""
+API load benchmark
+Drives the real URL routes in-process and reports latency and queries per endpoint
+
+Seeds a synthetic org (employees, years of attendance, leaves, payrolls,
+notifications) into a throwaway SQLite database, then replays GET requests
+against every hot endpoint through Django's test client from a pool of
+worker threads. Each endpoint is reported with p50/p95/p99 latency, SQL
+queries per request and rows returned, as JSON, so two runs can be diffed.
+
+Usage (from backend/):
+    python benchmarks/api_load.py --employees 200 --years 1
+    python benchmarks/api_load.py --requests 200 --concurrency 8 --output before.json
+    python benchmarks/api_load.py --db /tmp/org.sqlite3 --keep     # seed once ...
+    python benchmarks/api_load.py --db /tmp/org.sqlite3 --reuse    # ... rerun on another commit
+    python benchmarks/api_load.py --compare before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import BACKEND_DIR, load_seeded, seed, setup_django, timed  # noqa: E402
+
+
+def endpoints(seeded):
+    """(name, role, path) for every endpoint under load"""
+    end = seeded['end']
+    month_ago = (end - timedelta(days=30)).isoformat()
+    return [
+        ('employee-dashboard', 'employee', '/dashboard/employee/'),
+        ('my-attendance', 'employee', '/attendance/my-attendance/'),
+        ('monthly-summary', 'employee', f'/attendance/monthly-summary/?month={end.month}&year={end.year}'),
+        ('my-leaves', 'employee', '/leaves/my-leaves/'),
+        ('my-payroll', 'employee', f'/payroll/my-payroll/?year={end.year}'),
+        ('my-notifications', 'employee', '/notifications/my-notifications/'),
+        ('notification-stats', 'employee', '/notifications/stats/'),
+        ('user-profile', 'employee', '/users/profile/'),
+        ('hr-dashboard', 'hr', '/dashboard/hr/'),
+        ('attendance-trend', 'hr', '/dashboard/hr/attendance-trend/?days=30'),
+        ('all-attendance', 'hr', f'/attendance/all/?from_date={month_ago}&status=ABSENT'),
+        ('team-monthly-summary', 'hr',
+         f'/attendance/monthly-summary/team/?department=Engineering&month={end.month}&year={end.year}'),
+        ('all-regularizations', 'hr', '/attendance/regularization/all/?status=PENDING'),
+        ('all-leaves', 'hr', '/leaves/all/?status=PENDING'),
+        ('all-payroll', 'hr', f'/payroll/all/?year={end.year}&month={end.month}'),
+        ('payroll-summary', 'hr', f'/payroll/summary/?year={end.year}'),
+        ('employee-list', 'hr', '/users/employees/'),
+    ]
+
+
+def access_tokens(user_ids):
+    from users.jwt_serializers import CustomTokenObtainPairSerializer
+    from users.models import User
+
+    # Same claims as tokens issued by the login endpoint
+    return {
+        user.id: str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+        for user in User.objects.filter(id__in=user_ids)
+    }
+
+
+def rows_returned(response):
+    """Length of the longest top-level list in a JSON response body"""
+    try:
+        body = json.loads(response.content or b'null')
+    except ValueError:
+        return 0
+    if isinstance(body, list):
+        return len(body)
+    if isinstance(body, dict):
+        return max((len(value) for value in body.values() if isinstance(value, list)), default=0)
+    return 0
+
+
+def worker(plan, tokens, results, lock):
+    """Replay ``plan`` on this thread's own client and DB connection"""
+    from django.db import connection
+    from django.test import Client
+
+    client = Client()
+    queries = [0]
+
+    def count_queries(execute, sql, params, many, context):
+        queries[0] += 1
+        return execute(sql, params, many, context)
+
+    try:
+        with connection.execute_wrapper(count_queries):
+            for name, path, user_id in plan:
+                queries[0] = 0
+                start = time.perf_counter()
+                response = client.get(path, HTTP_AUTHORIZATION=f'Bearer {tokens[user_id]}')
+                elapsed = (time.perf_counter() - start) * 1000
+                sample = (elapsed, queries[0], rows_returned(response), response.status_code)
+                with lock:
+                    results[name].append(sample)
+    finally:
+        connection.close()
+
+
+def build_plan(targets, seeded, total_requests):
+    """Round-robin requests over endpoints, rotating through the seeded users"""
+    user_ids = seeded['user_ids']
+    hr_ids = user_ids[:5]
+    employee_ids = user_ids[5:] or user_ids
+    plan = []
+    for i in range(total_requests):
+        name, role, path = targets[i % len(targets)]
+        pool = hr_ids if role == 'hr' else employee_ids
+        plan.append((name, path, pool[(i // len(targets)) % len(pool)]))
+    return plan
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(targets, results):
+    summary = {}
+    for name, _, path in targets:
+        samples = results[name]
+        if not samples:
+            continue
+        latencies = [sample[0] for sample in samples]
+        queries = [sample[1] for sample in samples]
+        summary[name] = {
+            'path': path,
+            'requests': len(samples),
+            'errors': sum(1 for sample in samples if sample[3] >= 400),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'mean_ms': round(statistics.fmean(latencies), 2),
+            'queries_per_request': round(statistics.fmean(queries), 2),
+            'max_queries': max(queries),
+            'rows_per_request': round(statistics.fmean(sample[2] for sample in samples), 1),
+        }
+    return summary
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args, seeded):
+    import django
+    from collections import defaultdict
+    from django.test.utils import setup_test_environment
+
+    # Allows the test client's 'testserver' host
+    setup_test_environment()
+
+    targets = endpoints(seeded)
+    if args.only:
+        targets = [target for target in targets if target[0] in args.only]
+    tokens = access_tokens(seeded['user_ids'])
+
+    # Warm caches, URL resolvers and connections outside the measurement
+    warmup = defaultdict(list)
+    worker(build_plan(targets, seeded, len(targets) * args.warmup), tokens, warmup, threading.Lock())
+
+    plan = build_plan(targets, seeded, args.requests)
+    results = defaultdict(list)
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=worker, args=(plan[i::args.concurrency], tokens, results, lock))
+        for i in range(args.concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'employees': seeded['employees'],
+            'attendance_rows': seeded['attendance_rows'],
+            'requests': len(plan),
+            'concurrency': args.concurrency,
+            'wall_seconds': round(wall, 2),
+            'throughput_rps': round(len(plan) / wall, 1) if wall else None,
+        },
+        'endpoints': summarize(targets, results),
+    }
+
+
+def compare(before_path, after_path):
+    """Print per-endpoint p95 and query-count deltas between two reports"""
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+
+    print(f"before: {before['meta'].get('commit')}  after: {after['meta'].get('commit')}")
+    names = [name for name in after['endpoints'] if name in before['endpoints']]
+    width = max((len(name) for name in names), default=8)
+    print(f"{'endpoint':<{width}}  {'p95 before':>10}  {'p95 after':>10}  {'change':>8}  {'queries':>11}")
+    for name in names:
+        old, new = before['endpoints'][name], after['endpoints'][name]
+        change = (new['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100 if old['p95_ms'] else 0
+        queries = f"{old['queries_per_request']:g} -> {new['queries_per_request']:g}"
+        print(f"{name:<{width}}  {old['p95_ms']:>8.2f}ms  {new['p95_ms']:>8.2f}ms  {change:>+7.1f}%  {queries:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--employees', type=int, default=200, help='employees to seed')
+    parser.add_argument('--years', type=float, default=1, help='years of attendance history to seed')
+    parser.add_argument('--notifications', type=int, default=50, help='notifications per employee')
+    parser.add_argument('--requests', type=int, default=1000, help='total timed requests')
+    parser.add_argument('--concurrency', type=int, default=4, help='worker threads')
+    parser.add_argument('--warmup', type=int, default=2, help='untimed requests per endpoint first')
+    parser.add_argument('--only', nargs='+', metavar='ENDPOINT', help='limit the run to these endpoints')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--db', help='SQLite file to use (defaults to a temporary file)')
+    parser.add_argument('--keep', action='store_true', help='keep the database file afterwards')
+    parser.add_argument('--reuse', action='store_true', help='reuse an already seeded --db')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='diff two JSON reports')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.concurrency < 1 or args.requests < 1:
+        parser.error('--concurrency and --requests must be positive')
+    if args.reuse and not (args.db and os.path.exists(args.db)):
+        parser.error('--reuse needs an existing --db')
+    if args.db and os.path.exists(args.db) and not args.reuse:
+        parser.error(f'{args.db} already exists; pass --reuse or a new path')
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='dayflow-bench-'), 'bench.sqlite3')
+    keep = args.keep or args.reuse
+    try:
+        setup_django(db_path)
+        if args.reuse:
+            seeded = load_seeded()
+        else:
+            print('Seeding:', file=sys.stderr)
+            with timed('total'):
+                seeded = seed(
+                    employees=args.employees,
+                    days=max(1, round(args.years * 365)),
+                    notifications_per_employee=args.notifications,
+                )
+        report = run(args, seeded)
+    finally:
+        if not keep and os.path.exists(db_path):
+            os.remove(db_path)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f'Report written to {args.output}', file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""
+Benchmark helpers
+Django bootstrap against a throwaway SQLite database and fast bulk seeding
+
+Seeding goes through executemany() on raw INSERTs rather than the ORM so a
+million-row attendance table builds in well under a minute.
+"""
+import logging
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.join(BACKEND_DIR, 'Dayflow')
+
+DEPARTMENTS = ['Engineering', 'Sales', 'Finance', 'Operations', 'Support', 'HR']
+
+INSERT_BATCH = 10000
+
+
+def setup_django(db_path):
+    """Point the default database at ``db_path`` and migrate it"""
+    if PROJECT_DIR not in sys.path:
+        sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Dayflow.settings')
+
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+
+    import django
+    django.setup()
+    # Keep the per-request INFO logging out of the timings
+    logging.disable(logging.INFO)
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def timed(label):
+    """Context manager that prints how long a block took"""
+    class _Timer:
+        def __enter__(self):
+            self.start = time.perf_counter()
+            return self
+
+        def __exit__(self, *exc):
+            self.elapsed = time.perf_counter() - self.start
+            print(f'  {label}: {self.elapsed:.1f}s', file=sys.stderr)
+
+    return _Timer()
+
+
+def _insert(cursor, table, columns, rows):
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        table, ', '.join(columns), ', '.join(['%s'] * len(columns))
+    )
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH:
+            cursor.executemany(sql, batch)
+            batch = []
+    if batch:
+        cursor.executemany(sql, batch)
+
+
+def seed(attendance_rows=1_000_000, employees=2000, days=None,
+         notifications_per_employee=0, seed_value=42):
+    """
+    Seed users, profiles, attendance, leaves, payroll, regularizations and
+    notifications, then rebuild the daily attendance rollups
+
+    Attendance covers ``days`` consecutive days ending today, or enough days
+    to reach ``attendance_rows`` when ``days`` is not given. Returns a dict
+    with the seeded counts and the date range covered.
+    """
+    from django.contrib.auth.hashers import make_password
+    from django.db import connection, transaction
+    from attendance.rollups import rebuild_rollups
+
+    rng = random.Random(seed_value)
+    days = days or max(1, -(-attendance_rows // employees))
+    end = date.today()
+    start = end - timedelta(days=days - 1)
+    now = datetime.now().isoformat(sep=' ')
+    password = make_password('pass123')
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        with timed(f'{employees} users'):
+            _insert(cursor, 'users', [
+                'password', 'is_superuser', 'username', 'first_name', 'last_name',
+                'email', 'is_staff', 'date_joined', 'employee_id', 'role', 'is_active', 'token_version',
+            ], (
+                (password, False, f'bench{i}', 'Bench', str(i), f'bench{i}@example.com',
+                 False, now, f'BENCH{i:06d}', 'HR' if i < 5 else 'EMPLOYEE', True, 0)
+                for i in range(employees)
+            ))
+            cursor.execute('SELECT id FROM users WHERE username LIKE %s ORDER BY id', ['bench%'])
+            user_ids = [row[0] for row in cursor.fetchall()]
+
+            _insert(cursor, 'employee_profiles', [
+                'user_id', 'full_name', 'phone', 'address', 'job_title', 'department',
+            ], (
+                (user_id, f'Bench {user_id}', '', '', 'Engineer', DEPARTMENTS[user_id % len(DEPARTMENTS)])
+                for user_id in user_ids
+            ))
+
+        def attendance():
+            for offset in range(days):
+                day = start + timedelta(days=offset)
+                for user_id in user_ids:
+                    roll = rng.random()
+                    if roll < 0.80:
+                        status = 'PRESENT'
+                    elif roll < 0.88:
+                        status = 'ABSENT'
+                    elif roll < 0.94:
+                        status = 'HALF_DAY'
+                    else:
+                        status = 'LEAVE'
+                    present = status in ('PRESENT', 'HALF_DAY')
+                    yield (
+                        user_id, day.isoformat(),
+                        '09:00:00' if present else None,
+                        '17:00:00' if present else None,
+                        status, present and rng.random() < 0.1, False,
+                        8 if status == 'PRESENT' else 4 if status == 'HALF_DAY' else None,
+                        0, '',
+                    )
+
+        with timed(f'{days * len(user_ids)} attendance rows over {days} days'):
+            _insert(cursor, 'attendance', [
+                'employee_id', 'date', 'check_in_time', 'check_out_time', 'status',
+                'is_late', 'is_early_departure', 'working_hours', 'overtime_hours', 'notes',
+            ], attendance())
+
+        def leaves():
+            for user_id in user_ids:
+                for _ in range(20):
+                    leave_start = start + timedelta(days=rng.randrange(days))
+                    roll = rng.random()
+                    status = 'PENDING' if roll < 0.05 else 'REJECTED' if roll < 0.15 else 'APPROVED'
+                    applied = datetime.combine(leave_start, datetime.min.time()) - timedelta(days=7)
+                    yield (
+                        user_id, rng.choice(['PAID', 'SICK', 'UNPAID', 'CASUAL']),
+                        leave_start.isoformat(), (leave_start + timedelta(days=rng.randrange(3))).isoformat(),
+                        'Benchmark', status, applied.isoformat(sep=' '), now,
+                    )
+
+        with timed(f'{len(user_ids) * 20} leaves'):
+            _insert(cursor, 'leaves', [
+                'employee_id', 'leave_type', 'start_date', 'end_date', 'reason',
+                'status', 'applied_on', 'updated_on',
+            ], leaves())
+
+        months = sorted({(start + timedelta(days=offset)).replace(day=1) for offset in range(days)})
+
+        with timed(f'{len(user_ids) * len(months)} payrolls over {len(months)} months'):
+            _insert(cursor, 'payroll', [
+                'employee_id', 'basic_salary', 'allowances', 'deductions', 'gross_salary',
+                'tax', 'net_salary', 'month', 'status', 'notes', 'created_on', 'updated_on',
+            ], (
+                (user_id, 50000, 10000, 2000, 60000, 5000, 53000, month.isoformat(),
+                 'PAID' if month < months[-1] else 'DRAFT', '', now, now)
+                for month in months
+                for user_id in user_ids
+            ))
+
+        def regularizations():
+            for user_id in user_ids:
+                for _ in range(5):
+                    day = start + timedelta(days=rng.randrange(days))
+                    status = 'PENDING' if rng.random() < 0.1 else 'APPROVED'
+                    created = datetime.combine(day, datetime.min.time()) + timedelta(days=1)
+                    yield (user_id, day.isoformat(), '09:00:00', '17:00:00', 'Benchmark',
+                           status, created.isoformat(sep=' '))
+
+        with timed(f'{len(user_ids) * 5} regularizations'):
+            _insert(cursor, 'attendance_regularization', [
+                'employee_id', 'date', 'requested_check_in', 'requested_check_out',
+                'reason', 'status', 'created_at',
+            ], regularizations())
+
+        def notifications():
+            for user_id in user_ids:
+                for i in range(notifications_per_employee):
+                    created = datetime.combine(
+                        start + timedelta(days=rng.randrange(days)), datetime.min.time()
+                    )
+                    yield (user_id, 'GENERAL', f'Benchmark {i}', 'Benchmark notification',
+                           'MEDIUM', rng.random() < 0.7, '', '', created.isoformat(sep=' '))
+
+        if notifications_per_employee:
+            with timed(f'{len(user_ids) * notifications_per_employee} notifications'):
+                _insert(cursor, 'notifications', [
+                    'recipient_id', 'notification_type', 'title', 'message', 'priority',
+                    'is_read', 'related_object_type', 'action_url', 'created_at',
+                ], notifications())
+
+    with timed('attendance rollups'):
+        rebuild_rollups()
+
+    return {
+        'employees': len(user_ids),
+        'user_ids': user_ids,
+        'attendance_rows': days * len(user_ids),
+        'start': start,
+        'end': end,
+    }
+
+
+def load_seeded():
+    """Rebuild the seed() summary from a database seeded by an earlier run"""
+    from django.db.models import Max, Min
+    from attendance.models import Attendance
+    from users.models import User
+
+    user_ids = list(
+        User.objects.filter(username__startswith='bench').order_by('id').values_list('id', flat=True)
+    )
+    if not user_ids:
+        raise RuntimeError('Database has no benchmark users; seed it first')
+    span = Attendance.objects.filter(employee_id__in=user_ids[:1]).aggregate(
+        start=Min('date'), end=Max('date')
+    )
+    return {
+        'employees': len(user_ids),
+        'user_ids': user_ids,
+        'attendance_rows': Attendance.objects.count(),
+        'start': span['start'],
+        'end': span['end'],
+    }
@@ -0,0 +1,149 @@
+"""
+Export benchmark
+Time-to-first-byte, throughput and peak memory of the streaming export endpoints
+
+Seeds a throwaway SQLite database (or reuses one from api_load.py with
+--db/--reuse), then downloads each export through the real URL routes and
+middleware. For every endpoint and format it reports the time to the
+first byte and to the first data row, total time, rows and bytes on the
+wire. With --trace-memory it also reports the peak Python memory
+allocated while streaming (tracemalloc), which should stay flat as the
+row count grows; tracing slows the download several times over, so
+timings from that run are not comparable.
+
+Usage (from backend/):
+    python benchmarks/exports.py --rows 1000000
+    python benchmarks/exports.py --db /tmp/org.sqlite3 --reuse --only attendance --trace-memory
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import load_seeded, seed, setup_django, timed  # noqa: E402
+
+EXPORTS = {
+    'attendance': '/attendance/export/',
+    'leaves': '/leaves/export/',
+    'payroll': '/payroll/export/',
+}
+
+# (query string, header lines before the first row)
+VARIANTS = {
+    'csv': ('export_format=csv', 1),
+    'ndjson': ('export_format=ndjson', 0),
+    'csv.gz': ('export_format=csv&gzip=true', 1),
+}
+
+
+def download(client, path, token, header_lines, trace_memory=False):
+    """Stream one export, returning timings, size and optionally peak traced memory"""
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(path, HTTP_AUTHORIZATION=f'Bearer {token}')
+    decompressor = zlib.decompressobj(31) if response['Content-Type'] == 'application/gzip' else None
+    first_byte = first_row = None
+    size = 0
+    lines = 0
+    for chunk in response.streaming_content:
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        size += len(chunk)
+        lines += (decompressor.decompress(chunk) if decompressor else chunk).count(b'\n')
+        if first_row is None and lines > header_lines:
+            first_row = time.perf_counter() - start
+    total = time.perf_counter() - start
+    response.close()
+    result = {
+        'status': response.status_code,
+        'first_byte_ms': round(first_byte * 1000, 1) if first_byte is not None else None,
+        'first_row_ms': round(first_row * 1000, 1) if first_row is not None else None,
+        'total_seconds': round(total, 2),
+        'rows': lines - header_lines,
+        'bytes': size,
+        'rows_per_second': round((lines - header_lines) / total) if total else None,
+    }
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['peak_memory_mb'] = round(peak / 1024 / 1024, 2)
+    return result
+
+
+def run(args, seeded):
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from users.jwt_serializers import CustomTokenObtainPairSerializer
+    from users.models import User
+
+    setup_test_environment()
+    client = Client()
+    hr = User.objects.get(pk=seeded['user_ids'][0])
+    token = str(CustomTokenObtainPairSerializer.get_token(hr).access_token)
+
+    results = {}
+    for name, path in EXPORTS.items():
+        if args.only and name not in args.only:
+            continue
+        for variant, (query, header_lines) in VARIANTS.items():
+            results[f'{name}.{variant}'] = download(
+                client, f'{path}?{query}', token, header_lines, args.trace_memory
+            )
+            print(f'  {name}.{variant}: {results[f"{name}.{variant}"]}', file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='attendance rows to seed')
+    parser.add_argument('--employees', type=int, default=2000, help='employees to seed')
+    parser.add_argument('--only', nargs='+', choices=sorted(EXPORTS), help='limit the run to these exports')
+    parser.add_argument('--trace-memory', action='store_true', help='report peak memory (slows the run)')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--db', help='SQLite file to use (defaults to a temporary file)')
+    parser.add_argument('--keep', action='store_true', help='keep the database file afterwards')
+    parser.add_argument('--reuse', action='store_true', help='reuse an already seeded --db')
+    args = parser.parse_args()
+
+    if args.reuse and not (args.db and os.path.exists(args.db)):
+        parser.error('--reuse needs an existing --db')
+    if args.db and os.path.exists(args.db) and not args.reuse:
+        parser.error(f'{args.db} already exists; pass --reuse or a new path')
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='dayflow-bench-'), 'bench.sqlite3')
+    keep = args.keep or args.reuse
+    try:
+        setup_django(db_path)
+        if args.reuse:
+            seeded = load_seeded()
+        else:
+            print('Seeding:', file=sys.stderr)
+            with timed('total'):
+                seeded = seed(attendance_rows=args.rows, employees=args.employees)
+        print('Exporting:', file=sys.stderr)
+        report = {
+            'meta': {'employees': seeded['employees'], 'attendance_rows': seeded['attendance_rows']},
+            'exports': run(args, seeded),
+        }
+    finally:
+        if not keep and os.path.exists(db_path):
+            os.remove(db_path)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f'Report written to {args.output}', file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Login benchmark
+Login throughput with DB time and password-hash time reported separately
+
+Seeds ``--employees`` users into a throwaway SQLite database, then logs
+them in through CustomTokenObtainPairSerializer with a mix of usernames,
+emails and employee IDs in varying case, as the login page allows. Runs
+twice: with the previous resolution (email__iexact, then employee_id__iexact,
+then Django's ModelBackend) and with users.backends.IdentifierBackend.
+
+Each login is split into time spent in SQL, time spent in the password
+hasher and everything else. With the production hasher the hash dominates;
+pass ``--hasher md5`` to make the DB share visible.
+
+Usage (from backend/):
+    python benchmarks/login.py --employees 20000 --logins 200
+    python benchmarks/login.py --employees 20000 --logins 2000 --hasher md5 --output login.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import seed, setup_django  # noqa: E402
+
+HASHERS = {
+    'default': None,
+    'md5': ['django.contrib.auth.hashers.MD5PasswordHasher'],
+}
+
+
+def legacy_serializer_class():
+    """CustomTokenObtainPairSerializer as it resolved identifiers before IdentifierBackend"""
+    from django.contrib.auth import get_user_model
+    from users.jwt_serializers import CustomTokenObtainPairSerializer
+
+    class LegacySerializer(CustomTokenObtainPairSerializer):
+        def validate(self, attrs):
+            identifier = attrs.get(self.username_field)
+            if identifier:
+                User = get_user_model()
+                user = User.objects.filter(email__iexact=identifier).first()
+                if not user:
+                    user = User.objects.filter(employee_id__iexact=identifier).first()
+                if user:
+                    attrs[self.username_field] = user.get_username()
+            return super().validate(attrs)
+
+    return LegacySerializer
+
+
+def identifiers(user_ids, logins):
+    """Rotate through users and identifier styles"""
+    from users.models import User
+
+    users = list(User.objects.filter(id__in=user_ids).order_by('id'))
+    styles = [
+        lambda user: user.username,
+        lambda user: user.email.upper(),
+        lambda user: user.employee_id.lower(),
+    ]
+    # Step through users so consecutive logins don't hit the same row
+    step = max(1, len(users) // 7)
+    return [styles[i % len(styles)](users[(i * step) % len(users)]) for i in range(logins)]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def run_logins(serializer_class, logins):
+    from django.contrib.auth import base_user
+    from django.db import connection
+
+    totals, db_times, hash_times, query_counts = [], [], [], []
+    current = {'db': 0.0, 'hash': 0.0, 'queries': 0}
+
+    def time_queries(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            current['db'] += time.perf_counter() - start
+            current['queries'] += 1
+
+    check_password = base_user.check_password
+
+    def timed_check_password(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return check_password(*args, **kwargs)
+        finally:
+            current['hash'] += time.perf_counter() - start
+
+    with connection.execute_wrapper(time_queries), \
+            mock.patch.object(base_user, 'check_password', timed_check_password):
+        for identifier in logins:
+            current.update(db=0.0, hash=0.0, queries=0)
+            start = time.perf_counter()
+            serializer = serializer_class(data={'username': identifier, 'password': 'pass123'})
+            serializer.is_valid(raise_exception=True)
+            totals.append((time.perf_counter() - start) * 1000)
+            db_times.append(current['db'] * 1000)
+            hash_times.append(current['hash'] * 1000)
+            query_counts.append(current['queries'])
+
+    mean_total = statistics.fmean(totals)
+    mean_db = statistics.fmean(db_times)
+    mean_hash = statistics.fmean(hash_times)
+    return {
+        'logins': len(totals),
+        'throughput_per_second': round(1000 / mean_total, 1),
+        'p50_ms': round(percentile(totals, 50), 3),
+        'p95_ms': round(percentile(totals, 95), 3),
+        'mean_ms': round(mean_total, 3),
+        'db_ms': round(mean_db, 3),
+        'hash_ms': round(mean_hash, 3),
+        'other_ms': round(mean_total - mean_db - mean_hash, 3),
+        'queries_per_login': round(statistics.fmean(query_counts), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--employees', type=int, default=20000, help='users to seed')
+    parser.add_argument('--logins', type=int, default=200, help='timed logins per mode')
+    parser.add_argument('--hasher', choices=sorted(HASHERS), default='default',
+                        help='password hasher to seed and verify with')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='dayflow-bench-'), 'bench.sqlite3')
+    try:
+        setup_django(db_path)
+        from django.test.utils import override_settings
+        from users.jwt_serializers import CustomTokenObtainPairSerializer
+
+        hasher_settings = {'PASSWORD_HASHERS': HASHERS[args.hasher]} if HASHERS[args.hasher] else {}
+        with override_settings(**hasher_settings):
+            print('Seeding:', file=sys.stderr)
+            seeded = seed(attendance_rows=args.employees, employees=args.employees, days=1)
+            plan = identifiers(seeded['user_ids'], args.logins)
+
+            with override_settings(AUTHENTICATION_BACKENDS=['django.contrib.auth.backends.ModelBackend']):
+                legacy = run_logins(legacy_serializer_class(), plan)
+            indexed = run_logins(CustomTokenObtainPairSerializer, plan)
+    finally:
+        if os.path.exists(db_path):
+            os.remove(db_path)
+
+    output = json.dumps({
+        'meta': {'employees': args.employees, 'hasher': args.hasher},
+        'legacy_iexact': legacy,
+        'identifier_backend': indexed,
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f'Report written to {args.output}', file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+Query plan benchmark
+Compares the hot list and dashboard queries with and without the composite indexes
+
+Seeds a throwaway SQLite database (1M attendance rows by default), drops
+the Meta.indexes added for these queries, records EXPLAIN QUERY PLAN and
+timings, then recreates the indexes and measures again.
+
+Usage (from backend/):
+    python benchmarks/query_plans.py
+    python benchmarks/query_plans.py --rows 200000 --employees 1000
+    python benchmarks/query_plans.py --db /tmp/dayflow-bench.sqlite3 --keep
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import seed, setup_django, timed  # noqa: E402
+
+
+def hot_queries(seeded):
+    """(label, zero-argument queryset factory) for every query under test"""
+    from django.db.models import Count
+    from attendance.models import Attendance, AttendanceRegularization
+    from leaves.models import Leave
+    from payroll.models import Payroll
+    from payroll.services import filter_payroll_period
+
+    end = seeded['end']
+    employee_id = seeded['user_ids'][len(seeded['user_ids']) // 2]
+    last_month = (end.replace(day=1) - timedelta(days=1)).replace(day=1)
+
+    return [
+        ('attendance: HR list, 30 days + status', lambda: (
+            Attendance.objects
+            .filter(date__gte=end - timedelta(days=30), date__lte=end, status='ABSENT')
+            .order_by('-date', '-id')[:100]
+        )),
+        ('attendance: one day by status', lambda: (
+            Attendance.objects.filter(date=end)
+            .order_by().values('status').annotate(total=Count('id'))
+        )),
+        ('leaves: employee pending count', lambda: (
+            Leave.objects.filter(employee_id=employee_id, status='PENDING')
+            .order_by().values('employee_id').annotate(total=Count('id'))
+        )),
+        ('leaves: HR pending queue', lambda: (
+            Leave.objects.filter(status='PENDING').order_by('-applied_on', '-id')[:100]
+        )),
+        ('payroll: month__year/month__month', lambda: (
+            Payroll.objects.filter(month__year=last_month.year, month__month=last_month.month)
+        )),
+        ('payroll: month range', lambda: (
+            filter_payroll_period(Payroll.objects.all(), last_month.year, last_month.month)
+        )),
+        ('payroll: year summary by status', lambda: (
+            filter_payroll_period(Payroll.objects.all(), end.year)
+            .order_by().values('status').annotate(total=Count('id'))
+        )),
+        ('regularizations: HR pending queue', lambda: (
+            AttendanceRegularization.objects.filter(status='PENDING')
+            .order_by('-created_at', '-id')[:100]
+        )),
+    ]
+
+
+def benchmarked_indexes():
+    """(model, index) pairs declared in Meta.indexes for the hot queries"""
+    from attendance.models import Attendance, AttendanceRegularization
+    from leaves.models import Leave
+    from payroll.models import Payroll
+
+    return [
+        (model, index)
+        for model in (Attendance, AttendanceRegularization, Leave, Payroll)
+        for index in model._meta.indexes
+    ]
+
+
+def explain(queryset):
+    from django.db import connection
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def measure(factory, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        list(factory())
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run_queries(queries, repeat):
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+    results = {}
+    for label, factory in queries:
+        results[label] = {
+            'plan': explain(factory()),
+            'ms': measure(factory, repeat),
+        }
+    return results
+
+
+def set_indexes(enabled):
+    from django.db import connection
+
+    with connection.schema_editor() as editor:
+        for model, index in benchmarked_indexes():
+            if enabled:
+                editor.add_index(model, index)
+            else:
+                editor.remove_index(model, index)
+
+
+def report(queries, without, with_):
+    width = max(len(label) for label, _ in queries)
+    print()
+    print(f"{'query':<{width}}  {'no index':>10}  {'indexed':>10}  {'speedup':>8}")
+    for label, _ in queries:
+        before, after = without[label]['ms'], with_[label]['ms']
+        speedup = before / after if after else float('inf')
+        print(f'{label:<{width}}  {before:>8.2f}ms  {after:>8.2f}ms  {speedup:>7.1f}x')
+
+    print()
+    for label, _ in queries:
+        print(label)
+        print('  no index: ' + ' | '.join(without[label]['plan']))
+        print('  indexed:  ' + ' | '.join(with_[label]['plan']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='attendance rows to seed')
+    parser.add_argument('--employees', type=int, default=2000, help='employees to seed')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per query (median is reported)')
+    parser.add_argument('--db', help='SQLite file to use (defaults to a temporary file)')
+    parser.add_argument('--keep', action='store_true', help='keep the database file afterwards')
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='dayflow-bench-'), 'bench.sqlite3')
+    if os.path.exists(db_path):
+        parser.error(f'{db_path} already exists; pass a new path')
+
+    print(f'Database: {db_path}')
+    try:
+        setup_django(db_path)
+        print('Seeding:')
+        with timed('total'):
+            seeded = seed(attendance_rows=args.rows, employees=args.employees)
+
+        queries = hot_queries(seeded)
+        set_indexes(False)
+        without = run_queries(queries, args.repeat)
+        set_indexes(True)
+        with_ = run_queries(queries, args.repeat)
+        report(queries, without, with_)
+    finally:
+        if not args.keep and os.path.exists(db_path):
+            os.remove(db_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Attendance recompute benchmark
+Row-by-row model methods vs the vectorized batch recompute
+
+Seeds a throwaway SQLite database (or reuses one with --db/--reuse). The
+seeded hours and late flags do not match the seeded check-in/check-out
+times, so a recompute has real work to do. Reports, over the same rows:
+
+- row_by_row: load model instances and call calculate_working_hours,
+  check_late_arrival and check_early_departure on each (compute only)
+- vectorized_dry_run: recompute_attendance(dry_run=True) (compute only)
+- vectorized: recompute_attendance() including the write-back
+- vectorized_again: a second pass, which should find nothing to write
+
+The first two must agree on how many rows change.
+
+Usage (from backend/):
+    python benchmarks/recompute.py --rows 1000000
+    python benchmarks/recompute.py --db /tmp/org.sqlite3 --reuse --chunk-size 50000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import load_seeded, seed, setup_django, timed  # noqa: E402
+
+
+def row_by_row():
+    """Count rows whose metrics the model methods would change"""
+    from attendance.models import Attendance
+
+    fields = ('working_hours', 'overtime_hours', 'is_late', 'is_early_departure')
+    rows = changed = 0
+    for attendance in Attendance.objects.order_by('id').iterator(chunk_size=5000):
+        before = [getattr(attendance, field) for field in fields]
+        attendance.calculate_working_hours()
+        attendance.check_late_arrival()
+        attendance.check_early_departure()
+        rows += 1
+        changed += before != [getattr(attendance, field) for field in fields]
+    return {'rows': rows, 'changed': changed}
+
+
+def measure(label, func):
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    result = {
+        'rows': result['rows'],
+        'changed': result['changed'],
+        'seconds': round(seconds, 2),
+        'rows_per_second': round(result['rows'] / seconds) if seconds else None,
+    }
+    print(f'  {label}: {result}', file=sys.stderr)
+    return result
+
+
+def run(args):
+    from attendance.recompute import recompute_attendance
+
+    results = {
+        'row_by_row': measure('row_by_row', row_by_row),
+        'vectorized_dry_run': measure(
+            'vectorized_dry_run', lambda: recompute_attendance(chunk_size=args.chunk_size, dry_run=True)
+        ),
+    }
+    if args.dry_run:
+        return results
+    results['vectorized'] = measure('vectorized', lambda: recompute_attendance(chunk_size=args.chunk_size))
+    results['vectorized_again'] = measure(
+        'vectorized_again', lambda: recompute_attendance(chunk_size=args.chunk_size)
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='attendance rows to seed')
+    parser.add_argument('--employees', type=int, default=2000, help='employees to seed')
+    parser.add_argument('--chunk-size', type=int, default=None, help='rows per recompute chunk')
+    parser.add_argument('--dry-run', action='store_true', help='skip the write-back passes')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--db', help='SQLite file to use (defaults to a temporary file)')
+    parser.add_argument('--keep', action='store_true', help='keep the database file afterwards')
+    parser.add_argument('--reuse', action='store_true', help='reuse an already seeded --db')
+    args = parser.parse_args()
+
+    if args.reuse and not (args.db and os.path.exists(args.db)):
+        parser.error('--reuse needs an existing --db')
+    if args.db and os.path.exists(args.db) and not args.reuse:
+        parser.error(f'{args.db} already exists; pass --reuse or a new path')
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='dayflow-bench-'), 'bench.sqlite3')
+    keep = args.keep or args.reuse
+    try:
+        setup_django(db_path)
+        if args.reuse:
+            seeded = load_seeded()
+        else:
+            print('Seeding:', file=sys.stderr)
+            with timed('total'):
+                seeded = seed(attendance_rows=args.rows, employees=args.employees)
+        print('Recomputing:', file=sys.stderr)
+        report = {
+            'meta': {'employees': seeded['employees'], 'attendance_rows': seeded['attendance_rows']},
+            'recompute': run(args),
+        }
+    finally:
+        if not keep and os.path.exists(db_path):
+            os.remove(db_path)
+
+    if report['recompute']['row_by_row']['changed'] != report['recompute']['vectorized_dry_run']['changed']:
+        print('WARNING: row-by-row and vectorized change counts differ', file=sys.stderr)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f'Report written to {args.output}', file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
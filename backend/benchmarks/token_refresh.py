@@ -0,0 +1,196 @@
+"""
+Token refresh benchmark
+Refresh throughput against a large token blacklist, before and after compaction
+
+Seeds a throwaway SQLite database with ``--tokens`` historical refresh
+tokens (most expired, nearly all blacklisted by rotation, as a long-running
+deployment accumulates them), then rotates refresh tokens through
+simplejwt's stock serializer and through ours, which checks the blacklist
+via the per-process Bloom filter and skips simplejwt's redundant user
+lookups. Each mode reports throughput, latency percentiles and queries per
+refresh. The same runs are repeated after compact_expired_tokens() has
+pruned the expired rows.
+
+Usage (from backend/):
+    python benchmarks/token_refresh.py --tokens 1000000
+    python benchmarks/token_refresh.py --tokens 200000 --refreshes 5000 --output refresh.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import _insert, seed, setup_django, timed  # noqa: E402
+
+
+def seed_tokens(user_ids, total, expired_share, blacklisted_share, seed_value=42):
+    """Insert ``total`` outstanding tokens, blacklisting ``blacklisted_share`` of them"""
+    from django.db import connection, transaction
+
+    rng = random.Random(seed_value)
+    now = datetime.now()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SELECT COALESCE(MAX(id), 0) FROM token_blacklist_outstandingtoken')
+        first_id = cursor.fetchone()[0] + 1
+
+        def outstanding():
+            for i in range(total):
+                if rng.random() < expired_share:
+                    created = now - timedelta(days=rng.uniform(8, 365))
+                else:
+                    created = now - timedelta(days=rng.uniform(0, 6.9))
+                yield (
+                    uuid.UUID(int=rng.getrandbits(128)).hex, 'x', created,
+                    created + timedelta(days=7), user_ids[i % len(user_ids)],
+                )
+
+        with timed(f'{total} outstanding tokens'):
+            _insert(cursor, 'token_blacklist_outstandingtoken',
+                    ['jti', 'token', 'created_at', 'expires_at', 'user_id'], outstanding())
+
+        with timed('blacklisted tokens'):
+            _insert(cursor, 'token_blacklist_blacklistedtoken', ['token_id', 'blacklisted_at'], (
+                (first_id + i, now) for i in range(total) if rng.random() < blacklisted_share
+            ))
+
+
+def token_counts():
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+    return {
+        'outstanding': OutstandingToken.objects.count(),
+        'blacklisted': BlacklistedToken.objects.count(),
+    }
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(latencies, query_counts, wall):
+    return {
+        'refreshes': len(latencies),
+        'throughput_per_second': round(len(latencies) / wall, 1),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'queries_per_refresh': round(statistics.fmean(query_counts), 2),
+    }
+
+
+def run_modes(user_ids, refreshes, rounds):
+    """
+    Rotate a chain of refresh tokens per user through each serializer
+
+    Modes alternate in ``rounds`` blocks so table growth from the rotations
+    themselves doesn't favour whichever mode runs first.
+    """
+    from django.conf import settings
+    from django.db import connection
+    from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+    from users.jwt_serializers import CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer
+    from users.models import User
+    from users.token_blacklist import blacklist_filter
+
+    # The filter is only trusted with a cache shared between workers (Redis)
+    settings.TOKEN_BLACKLIST_SHARED_CACHE = True
+    blacklist_filter.reset()
+    start = time.perf_counter()
+    blacklist_filter.rebuild()
+    rebuild_ms = (time.perf_counter() - start) * 1000
+
+    modes = {'simplejwt': TokenRefreshSerializer, 'bloom_filter': CustomTokenRefreshSerializer}
+    users = list(User.objects.filter(id__in=user_ids))
+    chains = {name: [str(CustomTokenObtainPairSerializer.get_token(user)) for user in users] for name in modes}
+    samples = {name: ([], [], [0.0]) for name in modes}
+    queries = [0]
+
+    def count_queries(execute, sql, params, many, context):
+        queries[0] += 1
+        return execute(sql, params, many, context)
+
+    per_round = max(1, refreshes // rounds)
+    with connection.execute_wrapper(count_queries):
+        for _ in range(rounds):
+            for name, serializer_class in modes.items():
+                latencies, query_counts, wall = samples[name]
+                chain = chains[name]
+                for i in range(per_round):
+                    slot = (len(latencies) + i) % len(chain)
+                    queries[0] = 0
+                    began = time.perf_counter()
+                    serializer = serializer_class(data={'refresh': chain[slot]})
+                    serializer.is_valid(raise_exception=True)
+                    elapsed = time.perf_counter() - began
+                    wall[0] += elapsed
+                    latencies.append(elapsed * 1000)
+                    query_counts.append(queries[0])
+                    chain[slot] = serializer.validated_data['refresh']
+
+    results = {name: summarize(*samples[name][:2], samples[name][2][0]) for name in modes}
+    results['bloom_filter']['filter_rebuild_ms'] = round(rebuild_ms, 1)
+    results['bloom_filter']['filter'] = blacklist_filter.stats()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--tokens', type=int, default=1_000_000, help='historical refresh tokens to seed')
+    parser.add_argument('--expired', type=float, default=0.9, help='share of seeded tokens already expired')
+    parser.add_argument('--blacklisted', type=float, default=0.95, help='share of seeded tokens blacklisted')
+    parser.add_argument('--users', type=int, default=200, help='users to seed')
+    parser.add_argument('--refreshes', type=int, default=2000, help='timed refreshes per mode')
+    parser.add_argument('--rounds', type=int, default=10, help='alternating blocks the refreshes are split into')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='dayflow-bench-'), 'bench.sqlite3')
+    try:
+        setup_django(db_path)
+        from users.token_blacklist import compact_expired_tokens
+
+        print('Seeding:', file=sys.stderr)
+        seeded = seed(attendance_rows=args.users, employees=args.users, days=1)
+        seed_tokens(seeded['user_ids'], args.tokens, args.expired, args.blacklisted)
+
+        report = {'meta': {'seeded_tokens': args.tokens, 'users': args.users}}
+        report['before_compaction'] = {
+            'tables': token_counts(),
+            **run_modes(seeded['user_ids'], args.refreshes, args.rounds),
+        }
+
+        start = time.perf_counter()
+        removed = compact_expired_tokens()
+        report['compaction'] = {'removed': removed, 'seconds': round(time.perf_counter() - start, 2)}
+
+        report['after_compaction'] = {
+            'tables': token_counts(),
+            **run_modes(seeded['user_ids'], args.refreshes, args.rounds),
+        }
+    finally:
+        if os.path.exists(db_path):
+            os.remove(db_path)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f'Report written to {args.output}', file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+"""
+WSGI vs ASGI benchmark
+Latency of the same endpoints served through Django's WSGI and ASGI handlers
+
+Seeds a synthetic org into a throwaway SQLite database, then sends identical
+GET requests to django.core.handlers.wsgi.WSGIHandler (one thread per
+concurrent client, as a threaded WSGI server would) and to
+django.core.handlers.asgi.ASGIHandler (concurrent tasks on one event loop,
+as uvicorn would). No network server is involved, so the numbers are
+handler, middleware and view time only.
+
+The dashboards are async views, so under WSGI they also pay for
+async_to_sync; the plain DRF endpoints show the middleware stack's cost in
+each mode. The employee dashboard cache is bypassed unless --cache is given,
+so every request runs its queries.
+
+Usage (from backend/):
+    python benchmarks/wsgi_asgi.py --employees 200 --requests 500 --concurrency 8
+    python benchmarks/wsgi_asgi.py --db /tmp/org.sqlite3 --reuse --output asgi.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import load_seeded, seed, setup_django, timed  # noqa: E402
+from api_load import access_tokens, build_plan, git_commit, percentile  # noqa: E402
+
+HOST = 'localhost'
+
+
+def endpoints():
+    """(name, role, path) for every endpoint measured"""
+    return [
+        ('employee-dashboard', 'employee', '/dashboard/employee/'),
+        ('hr-dashboard', 'hr', '/dashboard/hr/'),
+        ('my-leaves', 'employee', '/leaves/my-leaves/'),
+        ('notification-stats', 'employee', '/notifications/stats/'),
+    ]
+
+
+def wsgi_environ(path, token):
+    path, _, query = path.partition('?')
+    return {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SCRIPT_NAME': '',
+        'SERVER_NAME': HOST,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'HTTP_HOST': HOST,
+        'HTTP_AUTHORIZATION': f'Bearer {token}',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(b''),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+
+def asgi_scope(path, token):
+    path, _, query = path.partition('?')
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'root_path': '',
+        'query_string': query.encode(),
+        'headers': [(b'host', HOST.encode()), (b'authorization', f'Bearer {token}'.encode())],
+        'client': ('127.0.0.1', 50000),
+        'server': (HOST, 80),
+    }
+
+
+def run_wsgi(handler, plan, tokens, concurrency):
+    """Replay ``plan`` from ``concurrency`` threads; returns samples per endpoint"""
+    results = defaultdict(list)
+    lock = threading.Lock()
+
+    def worker(requests):
+        from django.db import connection
+
+        try:
+            for name, path, user_id in requests:
+                status = []
+                start = time.perf_counter()
+                body = handler(wsgi_environ(path, tokens[user_id]), lambda s, headers: status.append(s))
+                b''.join(body)
+                body.close()
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    results[name].append((elapsed, int(status[0].split()[0])))
+        finally:
+            connection.close()
+
+    threads = [
+        threading.Thread(target=worker, args=(plan[i::concurrency],))
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+async def asgi_request(handler, path, token):
+    """One request through the ASGI handler; returns the status code"""
+    sent = False
+    disconnect = asyncio.Event()
+    status = []
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Django listens for a disconnect while the view runs
+        await disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await handler(asgi_scope(path, token), receive, send)
+    disconnect.set()
+    return status[0]
+
+
+async def run_asgi(handler, plan, tokens, concurrency):
+    """Replay ``plan`` from ``concurrency`` tasks on this event loop"""
+    results = defaultdict(list)
+
+    async def client(requests):
+        for name, path, user_id in requests:
+            start = time.perf_counter()
+            status = await asgi_request(handler, path, tokens[user_id])
+            results[name].append(((time.perf_counter() - start) * 1000, status))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(plan[i::concurrency]) for i in range(concurrency)))
+    return results, time.perf_counter() - start
+
+
+def summarize(targets, results, wall, requests):
+    summary = {}
+    for name, _, path in targets:
+        samples = results[name]
+        if not samples:
+            continue
+        latencies = [sample[0] for sample in samples]
+        summary[name] = {
+            'path': path,
+            'requests': len(samples),
+            'errors': sum(1 for sample in samples if sample[1] >= 400),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'mean_ms': round(statistics.fmean(latencies), 2),
+        }
+    return {
+        'wall_seconds': round(wall, 2),
+        'throughput_rps': round(requests / wall, 1) if wall else None,
+        'endpoints': summary,
+    }
+
+
+def run(args, seeded):
+    import django
+    from django.conf import settings
+    from django.core.handlers.asgi import ASGIHandler
+    from django.core.handlers.wsgi import WSGIHandler
+
+    settings.ALLOWED_HOSTS = [HOST]
+    if not args.cache:
+        settings.CACHES['benchmark-dummy'] = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+        settings.DASHBOARD_CACHE_ALIAS = 'benchmark-dummy'
+
+    targets = endpoints()
+    if args.only:
+        targets = [target for target in targets if target[0] in args.only]
+    tokens = access_tokens(seeded['user_ids'])
+    warmup = build_plan(targets, seeded, len(targets) * args.warmup)
+    plan = build_plan(targets, seeded, args.requests)
+
+    modes = {}
+    wsgi = WSGIHandler()
+    run_wsgi(wsgi, warmup, tokens, 1)
+    results, wall = run_wsgi(wsgi, plan, tokens, args.concurrency)
+    modes['wsgi'] = summarize(targets, results, wall, len(plan))
+
+    asgi = ASGIHandler()
+    asyncio.run(run_asgi(asgi, warmup, tokens, 1))
+    results, wall = asyncio.run(run_asgi(asgi, plan, tokens, args.concurrency))
+    modes['asgi'] = summarize(targets, results, wall, len(plan))
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'django': django.get_version(),
+            'database': settings.DATABASES['default']['ENGINE'],
+            'employees': seeded['employees'],
+            'requests': len(plan),
+            'concurrency': args.concurrency,
+            'dashboard_cache': args.cache,
+        },
+        'modes': modes,
+    }
+
+
+def print_table(report):
+    wsgi, asgi = report['modes']['wsgi'], report['modes']['asgi']
+    names = [name for name in wsgi['endpoints'] if name in asgi['endpoints']]
+    width = max((len(name) for name in names), default=8)
+    print(f"{'endpoint':<{width}}  {'wsgi p50':>9}  {'asgi p50':>9}  {'wsgi p95':>9}  {'asgi p95':>9}",
+          file=sys.stderr)
+    for name in names:
+        old, new = wsgi['endpoints'][name], asgi['endpoints'][name]
+        print(f"{name:<{width}}  {old['p50_ms']:>7.2f}ms  {new['p50_ms']:>7.2f}ms  "
+              f"{old['p95_ms']:>7.2f}ms  {new['p95_ms']:>7.2f}ms", file=sys.stderr)
+    print(f"{'throughput':<{width}}  {wsgi['throughput_rps']:>7.1f}/s  {asgi['throughput_rps']:>7.1f}/s",
+          file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--employees', type=int, default=200, help='employees to seed')
+    parser.add_argument('--years', type=float, default=1, help='years of attendance history to seed')
+    parser.add_argument('--requests', type=int, default=500, help='timed requests per mode')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients per mode')
+    parser.add_argument('--warmup', type=int, default=2, help='untimed requests per endpoint first')
+    parser.add_argument('--only', nargs='+', metavar='ENDPOINT', help='limit the run to these endpoints')
+    parser.add_argument('--cache', action='store_true', help='keep the employee dashboard cache on')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--db', help='SQLite file to use (defaults to a temporary file)')
+    parser.add_argument('--keep', action='store_true', help='keep the database file afterwards')
+    parser.add_argument('--reuse', action='store_true', help='reuse an already seeded --db')
+    args = parser.parse_args()
+
+    if args.concurrency < 1 or args.requests < 1:
+        parser.error('--concurrency and --requests must be positive')
+    if args.reuse and not (args.db and os.path.exists(args.db)):
+        parser.error('--reuse needs an existing --db')
+    if args.db and os.path.exists(args.db) and not args.reuse:
+        parser.error(f'{args.db} already exists; pass --reuse or a new path')
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='dayflow-bench-'), 'bench.sqlite3')
+    keep = args.keep or args.reuse
+    try:
+        setup_django(db_path)
+        if args.reuse:
+            seeded = load_seeded()
+        else:
+            print('Seeding:', file=sys.stderr)
+            with timed('total'):
+                seeded = seed(employees=args.employees, days=max(1, round(args.years * 365)))
+        report = run(args, seeded)
+    finally:
+        if not keep and os.path.exists(db_path):
+            os.remove(db_path)
+
+    print_table(report)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f'Report written to {args.output}', file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()